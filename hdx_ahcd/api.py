@@ -33,11 +33,64 @@ def get_cleaned_data_by_year(**kwargs):
             force_download (:class:`bool`): Whether to force download
                 NAMCS raw dataset file even if data set file exists locally.
                 *Default** :const:`False`.
+            pipeline (:class:`bool`): Whether to overlap download,
+                translation and export of consecutive years, used only when
+                `do_export` is True. *Default** :const:`False`.
+            workers (:class:`int`): Number of worker processes used to
+                translate and export years in parallel, used only when
+                `do_export` is True, not supported with `pipeline`.
+                *Default** :const:`None`.
+            export_format (:class:`str`): File format translated data is
+                exported to, `csv`, `arrow` (Arrow IPC) or `parquet`, used
+                only when `do_export` is True. Columnar formats require
+                package `pyarrow`. *Default** `csv`.
+            compression (:class:`str`): Compression of exported csv file,
+                `gzip`, `bz2` or `xz`, or `zstd` and `lz4` if corresponding
+                package is installed. Compression runs in background thread.
+                *Default** :const:`None`.
+            force_export (:class:`bool`): Whether to export years whose
+                exported file is up to date, used only when `do_export` is
+                True. Exported file is up to date if dataset file, year
+                layout, converter version and export options are unchanged
+                since it was written. *Default** :const:`False`.
+            sinks (:class:`list`): Objects of
+                :class:`hdx_ahcd.controllers.namcs_sinks.RecordSink`, like
+                :class:`StatsSink` or :class:`CallbackSink`, fed in the same
+                pass over translated records as export. Result of every sink
+                is returned by its name as `sinks`. *Default** :const:`None`.
+            partitioned (:class:`bool`): Whether to export into Hive style
+                partitioned layout, like
+                `NAMCS_CONVERTED/year=2000/month=01/part-0000.csv`, with
+                bounded number of records per file and row counts per
+                partition in `_metadata.json`. *Default** :const:`False`.
+            use_cache (:class:`bool`): Whether to read translated records
+                from persistent cache of decoded years under
+                `NAMCS_ROOT_PATH`, written on first full iteration of a year
+                and rebuilt when dataset file, year layout or converter
+                version changes. Requires package `pyarrow`, not supported
+                with `pipeline`. *Default** :const:`False`.
+            use_memory_cache (:class:`bool`): Whether to keep translated
+                years in in-process cache, so that repeated calls for same
+                year are served from memory. Least recently used years are
+                evicted beyond `MEMORY_CACHE_MAX_BYTES`, counters are
+                returned by `DECODED_YEAR_CACHE.get_stats()` of
+                :mod:`hdx_ahcd.controllers.namcs_cache`. Not supported with
+                `pipeline`. *Default** :const:`False`.
+            where (:class:`dict` or :class:`list`): Values of sex, month of
+                visit or age group records must match, like
+                `{"sex": "Female", "month_of_visit": (1, 2, 3),
+                "age_bucket": ("65-74", "75 and over")}`. Values of a field
+                are OR-ed, fields are AND-ed and a list of such filters is
+                OR-ed. Matching records are selected by bitmap index of year,
+                written next to dataset file on first use, before any record
+                is decoded. Not supported with `do_export`.
+                *Default** :const:`None`.
     Returns:
         :class:`defaultdict`: Dictionary containing generator of converted
         NAMCS patient case data for given year along with source file info.
         Further if `do_export` is True, it returns the absolute path of csv
-        file where the data is exported.
+        file where the data is exported, and with `pipeline` busy time, wait
+        time and utilization of every pipeline stage as `pipeline_stats`.
 
     Usage:
 
@@ -153,3 +206,45 @@ def get_cleaned_data_by_year(**kwargs):
         ERROR:hdx_ahcd:NAMCS dataset file:/var/tmp/2015 doesn't exist
     """
     return __NAMCSProcessor().execute(**kwargs)
+
+
+async def get_cleaned_data_by_year_async(**kwargs):
+    """
+    Asyncio counterpart of :func:`get_cleaned_data_by_year`, for use in
+    asyncio applications. Blocking validation, download, file reading and
+    translation run in an executor, translated records are handed to the
+    event loop in batches.
+
+    Parameters:
+        **kwargs (:class:`dict`) : Following are permissible parameters.
+            year (:class:`int` or :class:`tuple` or :class:`list`): NAMCS year.
+            file_name (:class:`str`): Absolute path of
+                raw dataset input file.
+            do_validation (:class:`bool`): If to perform validation
+                on `year` and `file_name`. *Default** :const:`True`.
+            force_download (:class:`bool`): Whether to force download
+                NAMCS raw dataset file even if data set file exists locally.
+                *Default** :const:`False`.
+            batches (:class:`bool`): Whether to yield lists of translated
+                records instead of single records. *Default** :const:`False`.
+            batch_size (:class:`int`): Number of records translated in
+                executor at once. **Default** `ASYNC_BATCH_SIZE`.
+            executor (:class:`concurrent.futures.ThreadPoolExecutor`):
+                Executor running blocking work. **Default** default executor
+                of event loop.
+    Returns:
+        :class:`defaultdict`: Dictionary containing asynchronous generator of
+        converted NAMCS patient case data for given year along with source
+        file info.
+
+    Usage:
+
+        >>> import asyncio
+        >>> from hdx_ahcd.api import get_cleaned_data_by_year_async
+        >>> async def main():
+        ...     gen = await get_cleaned_data_by_year_async(year=1973)
+        ...     async for record in gen.get(1973).get("generator"):
+        ...         print(record["source_file_row"])
+        >>> asyncio.run(main())
+    """
+    return await __NAMCSProcessor().execute_async(**kwargs)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing asyncio counterparts of methods to download and translate
+NAMCS dataset file(s). Blocking download, file reading and translation run in
+an executor, and translated records are handed to the event loop in batches
+so that the cost of switching between event loop and executor is paid once
+per batch instead of once per record.
+"""
+# Python modules
+from functools import partial
+from itertools import islice
+import asyncio
+
+# Other modules
+from hdx_ahcd.controllers.namcs_converter import get_generator_by_year
+from hdx_ahcd.controllers.namcs_extractor import initiate_namcs_dataset_download
+from hdx_ahcd.helpers.functions import get_iterable
+from hdx_ahcd.namcs.config import (
+    ASYNC_BATCH_SIZE,
+    YEARS_AVAILABLE,
+)
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# -N/A
+
+
+async def initiate_namcs_dataset_download_async(year=None,
+                                                force_download=False,
+                                                executor=None):
+    """
+    Asyncio counterpart of :func:`initiate_namcs_dataset_download`, dataset
+    files of `year` are downloaded and extracted concurrently in `executor`.
+
+    Parameters:
+        year(:class:`int` or :class:`list` or :class:`tuple`): Year(s) for
+            which dataset files will be downloaded and extracted.
+        force_download (:class:`bool`): Whether to force download
+            NAMCS raw dataset file even if data set file exists locally.
+            *Default** :const:`False`.
+        executor (:class:`concurrent.futures.Executor`): Executor running
+            blocking download and extraction. **Default** default executor
+            of event loop.
+    """
+    loop = asyncio.get_running_loop()
+    year = YEARS_AVAILABLE if year is None else get_iterable(year)
+    await asyncio.gather(*(
+        loop.run_in_executor(
+            executor,
+            partial(
+                initiate_namcs_dataset_download,
+                year=_year,
+                force_download=force_download
+            )
+        )
+        for _year in map(int, year)
+    ))
+
+
+def _get_next_batch(generator, batch_size):
+    """
+    Method to get next `batch_size` translated records from `generator`.
+
+    Parameters:
+        generator (:class:`generator`): Translated NAMCS records.
+        batch_size (:class:`int`): Maximum number of records in batch.
+
+    Returns:
+        :class:`list`: Translated records, empty if `generator` is exhausted.
+    """
+    return list(islice(generator, batch_size))
+
+
+async def get_batches_by_year(year, namcs_raw_dataset_file=None,
+                              batch_size=ASYNC_BATCH_SIZE, executor=None):
+    """
+    Asynchronous generator of translated NAMCS patient case data for `year`
+    in batches. While a batch is consumed, the next one is translated in
+    `executor`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            input file. If not specified, local file path will be deduced on
+            the basis of `year`.
+        batch_size (:class:`int`): Maximum number of records in batch.
+            **Default** `ASYNC_BATCH_SIZE`.
+        executor (:class:`concurrent.futures.ThreadPoolExecutor`): Executor
+            running file reading and translation. **Default** default
+            executor of event loop.
+
+    Returns:
+        :class:`async_generator`: Lists of translated records for `year`.
+
+    Note:
+        Translation of single `year` is sequential, at most one batch is
+        translated ahead of the consumer.
+    """
+    loop = asyncio.get_running_loop()
+    generator = get_generator_by_year(year, namcs_raw_dataset_file)
+    pending_batch = loop.run_in_executor(
+        executor, _get_next_batch, generator, batch_size
+    )
+    try:
+        while True:
+            batch = await pending_batch
+            if not batch:
+                pending_batch = None
+                break
+            # Translate next batch while current batch is consumed
+            pending_batch = loop.run_in_executor(
+                executor, _get_next_batch, generator, batch_size
+            )
+            yield batch
+    finally:
+        # Generator can not be closed while it runs in executor
+        if pending_batch is not None:
+            await asyncio.wait([pending_batch])
+        generator.close()
+
+
+async def get_records_by_year(year, namcs_raw_dataset_file=None,
+                              batch_size=ASYNC_BATCH_SIZE, executor=None):
+    """
+    Asynchronous generator of translated NAMCS patient case data for `year`,
+    record by record. See :func:`get_batches_by_year`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            input file.
+        batch_size (:class:`int`): Number of records translated in
+            `executor` at once. **Default** `ASYNC_BATCH_SIZE`.
+        executor (:class:`concurrent.futures.ThreadPoolExecutor`): Executor
+            running file reading and translation.
+
+    Returns:
+        :class:`async_generator`: Translated records for `year`.
+    """
+    batches = get_batches_by_year(
+        year, namcs_raw_dataset_file, batch_size=batch_size, executor=executor
+    )
+    try:
+        async for batch in batches:
+            for translated_record in batch:
+                yield translated_record
+    finally:
+        await batches.aclose()
@@ -0,0 +1,438 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing bitmap indexes of low cardinality fields, like sex, month
+of visit and age group of patient, see `BITMAP_INDEX_FIELDS`. Index of a year
+holds a bitmap of records for every value of every field, see
+:class:`BitmapIndex`, and is written next to extracted dataset file of the
+year while it is translated. Filters like `females, Q1, age 65+` are answered
+by AND and OR of bitmaps, only matching records are then decoded, see
+:func:`get_filtered_generator_by_year`.
+
+Bitmaps are python integers, bit `n` is set if record number `n` has the
+value. Index file starts with a json header line holding field, value and
+size of every bitmap, followed by zlib compressed bitmaps, runs of records not
+having a value are compressed away. Index file has a fingerprint file next to
+it, see :mod:`hdx_ahcd.controllers.namcs_fingerprint`, index is rebuilt when
+dataset file, year layout or converter version changes.
+"""
+# Python modules
+from functools import reduce
+from operator import or_
+import json
+import os
+import uuid
+import zlib
+
+# Other modules
+from hdx_ahcd.controllers.namcs_converter import get_generator_by_year
+from hdx_ahcd.controllers.namcs_estimates import get_dimension_values_method
+from hdx_ahcd.controllers.namcs_fingerprint import (
+    get_export_fingerprint,
+    is_export_up_to_date,
+    record_fingerprint,
+)
+from hdx_ahcd.controllers.namcs_index import (
+    get_index_file_path,
+    get_records_by_rows,
+)
+from hdx_ahcd.controllers.namcs_sinks import (
+    fan_out,
+    RecordSink,
+)
+from hdx_ahcd.helpers.functions import get_namcs_dataset_path_for_year
+from hdx_ahcd.namcs.config import (
+    BITMAP_INDEX_FIELDS,
+    BITMAP_INDEX_FILE_NAME_SUFFIX,
+    log,
+)
+from hdx_ahcd.namcs.enums import NAMCSFieldEnum
+from hdx_ahcd.utils.context import try_except
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# -N/A
+
+
+def get_bitmap_index_path(year, index_dir=None):
+    """
+    Method to get absolute path of bitmap index file of `year`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        index_dir (:class:`str`): Directory holding index files.
+            **Default** directory of extracted dataset file of `year`.
+
+    Returns:
+        :class:`str`: Absolute path of index file, like
+        `2000_NAMCS_BITMAP_INDEX.idx`, see
+        :func:`hdx_ahcd.controllers.namcs_index.get_index_file_path`.
+    """
+    return get_index_file_path(year, BITMAP_INDEX_FILE_NAME_SUFFIX, index_dir)
+
+
+def get_bitmap_index_fingerprint(year, dataset_file, index_file):
+    """
+    Method to get fingerprint of bitmap index of `dataset_file`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+        index_file (:class:`str`): Absolute path of index file.
+
+    Returns:
+        :class:`dict`: Fingerprint, see
+        :func:`hdx_ahcd.controllers.namcs_fingerprint.get_export_fingerprint`.
+    """
+    return get_export_fingerprint(
+        year, dataset_file, index_file,
+        export_options={
+            "index": BITMAP_INDEX_FILE_NAME_SUFFIX,
+            "fields": list(BITMAP_INDEX_FIELDS),
+        }
+    )
+
+
+def validate_where(where):
+    """
+    Method to validate filter `where`.
+
+    Parameters:
+        where (:class:`dict` or :class:`list`): Values of fields of
+            `BITMAP_INDEX_FIELDS` to match, a value or :class:`tuple` or
+            :class:`list` of values by field. Records matching any value of
+            a field and all the fields are selected, like
+            `{"sex": "Female", "month_of_visit": (1, 2, 3)}`. A :class:`list`
+            of such filters selects records matching any of them.
+
+    Raises:
+        :class:`ValueError`: If `where` is empty or has a field which is not
+        indexed.
+    """
+    conditions = where if isinstance(where, list) else [where]
+    if not conditions:
+        raise ValueError("Filter `where` is empty")
+    for condition in conditions:
+        if not isinstance(condition, dict) or not condition:
+            raise ValueError(
+                "Invalid filter: {}, expected field values by field".format(
+                    condition
+                )
+            )
+        for field in condition:
+            if field not in BITMAP_INDEX_FIELDS:
+                raise ValueError(
+                    "Field: {} is not indexed, filter on one of: {}".format(
+                        field, ", ".join(BITMAP_INDEX_FIELDS)
+                    )
+                )
+
+
+class BitmapIndex(object):
+    """
+    Bitmap index of low cardinality fields of a year. Bit `n` of
+    `bitmaps[field][value]` is set if record number `n` has `value` of
+    `field`. Record numbers are same as `source_file_row` of translated
+    records, one based.
+    """
+    def __init__(self, bitmaps=None):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            bitmaps (:class:`dict`): Bitmaps by value by field.
+        """
+        self.bitmaps = bitmaps if bitmaps is not None else {}
+
+    @classmethod
+    def read(cls, index_file):
+        """
+        Method to read index from `index_file`.
+
+        Parameters:
+            index_file (:class:`str`): Absolute path of index file.
+
+        Returns:
+            :class:`BitmapIndex`: Index read from file.
+        """
+        bitmaps = {}
+        with open(index_file, "rb") as file_handle:
+            header = json.loads(file_handle.readline().decode("utf-8"))
+            for field, value, size in header["bitmaps"]:
+                bitmaps.setdefault(field, {})[value] = int.from_bytes(
+                    zlib.decompress(file_handle.read(size)), "little"
+                )
+        return cls(bitmaps)
+
+    def write(self, index_file):
+        """
+        Method to write index into `index_file`, file is replaced
+        atomically.
+
+        Parameters:
+            index_file (:class:`str`): Absolute path of index file.
+        """
+        entries = []
+        compressed_bitmaps = []
+        for field, value_bitmaps in self.bitmaps.items():
+            for value, bitmap in value_bitmaps.items():
+                compressed_bitmap = zlib.compress(
+                    bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+                )
+                entries.append([field, value, len(compressed_bitmap)])
+                compressed_bitmaps.append(compressed_bitmap)
+
+        os.makedirs(os.path.dirname(index_file), exist_ok=True)
+        temporary_file_name = os.path.join(
+            os.path.dirname(index_file),
+            ".{}.{}.tmp".format(os.path.basename(index_file), uuid.uuid4().hex)
+        )
+        try:
+            with open(temporary_file_name, "wb") as file_handle:
+                file_handle.write(
+                    json.dumps({"bitmaps": entries}).encode("utf-8") + b"\n"
+                )
+                for compressed_bitmap in compressed_bitmaps:
+                    file_handle.write(compressed_bitmap)
+            os.replace(temporary_file_name, index_file)
+        except BaseException:
+            with try_except():
+                os.remove(temporary_file_name)
+            raise
+
+    def get_values(self, field):
+        """
+        Method to get indexed values of `field`.
+
+        Parameters:
+            field (:class:`str`): Field of `BITMAP_INDEX_FIELDS`.
+
+        Returns:
+            :class:`list`: Values of `field` present in records.
+        """
+        return list(self.bitmaps.get(field, {}))
+
+    def get_bitmap(self, where):
+        """
+        Method to get bitmap of records matching filter `where`, values of
+        a field are OR-ed and fields are AND-ed.
+
+        Parameters:
+            where (:class:`dict` or :class:`list`): Filter, see
+                :func:`validate_where`.
+
+        Returns:
+            :class:`int`: Bitmap of matching records.
+        """
+        validate_where(where)
+        bitmap = 0
+        for condition in where if isinstance(where, list) else [where]:
+            condition_bitmap = None
+            for field, values in condition.items():
+                value_bitmaps = self.bitmaps.get(field, {})
+                if not isinstance(values, (tuple, list, set, frozenset)):
+                    values = (values,)
+                field_bitmap = reduce(
+                    or_, (value_bitmaps.get(value, 0) for value in values), 0
+                )
+                condition_bitmap = field_bitmap if condition_bitmap is None \
+                    else condition_bitmap & field_bitmap
+                if not condition_bitmap:
+                    break
+            bitmap |= condition_bitmap
+        return bitmap
+
+    def count(self, where):
+        """
+        Method to count records matching filter `where`, without decoding
+        them.
+
+        Parameters:
+            where (:class:`dict` or :class:`list`): Filter, see
+                :func:`validate_where`.
+
+        Returns:
+            :class:`int`: Number of matching records.
+        """
+        return bin(self.get_bitmap(where)).count("1")
+
+    @staticmethod
+    def get_rows(bitmap):
+        """
+        Method to get record numbers of set bits of `bitmap`.
+
+        Parameters:
+            bitmap (:class:`int`): Bitmap of records.
+
+        Returns:
+            :class:`list`: Sorted record numbers.
+        """
+        rows = []
+        for byte_no, byte in enumerate(
+                bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+        ):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte >> bit & 1:
+                    rows.append(byte_no * 8 + bit)
+        return rows
+
+
+class BitmapIndexSink(RecordSink):
+    """
+    Sink writing bitmap index of translated records, see
+    :mod:`hdx_ahcd.controllers.namcs_sinks`. Along with export sink, index
+    is built in the same pass as conversion.
+    """
+    name = "bitmap_index"
+
+    def __init__(self, index_dir=None, namcs_raw_dataset_file=None):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            index_dir (:class:`str`): Directory where index file is written.
+                **Default** directory of extracted dataset file.
+            namcs_raw_dataset_file (:class:`str`): Absolute path of raw
+                dataset file records are translated from, recorded in
+                fingerprint of index. **Default** dataset file of the year.
+        """
+        self.index_dir = index_dir
+        self.namcs_raw_dataset_file = namcs_raw_dataset_file
+
+    def open(self, year):
+        super().open(year)
+        self.values_methods = [
+            (field, get_dimension_values_method(field))
+            for field in BITMAP_INDEX_FIELDS
+        ]
+        # Bitmaps are built in byte arrays, setting a bit of python integer
+        # copies it
+        self.byte_arrays = {field: {} for field in BITMAP_INDEX_FIELDS}
+
+    def write(self, translated_records):
+        for translated_record in translated_records:
+            row = translated_record.get(NAMCSFieldEnum.SOURCE_FILE_ROW.value)
+            byte_no, bit = divmod(row, 8)
+            for field, get_values in self.values_methods:
+                value_byte_arrays = self.byte_arrays[field]
+                for value in get_values(translated_record):
+                    byte_array = value_byte_arrays.get(value)
+                    if byte_array is None:
+                        byte_array = value_byte_arrays[value] = bytearray()
+                    if byte_no >= len(byte_array):
+                        byte_array.extend(
+                            bytes(max(byte_no + 1, 2 * len(byte_array)) -
+                                  len(byte_array))
+                        )
+                    byte_array[byte_no] |= 1 << bit
+
+    def close(self):
+        self.index = BitmapIndex({
+            field: {
+                value: int.from_bytes(byte_array, "little")
+                for value, byte_array in value_byte_arrays.items()
+            }
+            for field, value_byte_arrays in self.byte_arrays.items()
+        })
+        dataset_file = self.namcs_raw_dataset_file or \
+            get_namcs_dataset_path_for_year(self.year)
+        index_file = get_bitmap_index_path(
+            self.year, self.index_dir or os.path.dirname(dataset_file)
+        )
+        with record_fingerprint(
+                index_file,
+                get_bitmap_index_fingerprint(
+                    self.year, dataset_file, index_file
+                )
+        ):
+            self.index.write(index_file)
+        log.info("Finished writing to the file %s" % index_file)
+        return index_file
+
+
+def get_bitmap_index(year, namcs_raw_dataset_file=None, index_dir=None):
+    """
+    Method to get bitmap index of `year`, year is translated and index is
+    written if index file is missing or outdated.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            file. **Default** dataset file of `year`.
+        index_dir (:class:`str`): Directory holding index files.
+            **Default** directory of extracted dataset file.
+
+    Returns:
+        :class:`BitmapIndex`: Index of `year`, :const:`None` if dataset
+        file of `year` is not available.
+    """
+    dataset_file = namcs_raw_dataset_file or \
+        get_namcs_dataset_path_for_year(year)
+    if dataset_file is None or not os.path.exists(dataset_file):
+        return None
+
+    index_file = get_bitmap_index_path(
+        year, index_dir or os.path.dirname(dataset_file)
+    )
+    if is_export_up_to_date(
+            index_file,
+            get_bitmap_index_fingerprint(year, dataset_file, index_file)
+    ):
+        return BitmapIndex.read(index_file)
+
+    sink = BitmapIndexSink(os.path.dirname(index_file), dataset_file)
+    fan_out(year, get_generator_by_year(year, dataset_file), [sink])
+    return sink.index
+
+
+def get_filtered_generator_by_year(year, namcs_raw_dataset_file=None,
+                                   where=None, index_dir=None):
+    """
+    Method to get translated records of `year` matching filter `where`.
+    Matching records are selected from bitmap index of `year`, only they are
+    decoded.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            file. **Default** dataset file of `year`.
+        where (:class:`dict` or :class:`list`): Filter, see
+            :func:`validate_where`.
+        index_dir (:class:`str`): Directory holding index files.
+            **Default** directory of extracted dataset file.
+
+    Returns:
+        :class:`generator`: Generator object containing translated records.
+
+    Raises:
+        :class:`ValueError`: If `where` is invalid.
+
+    Usage:
+        >>> elderly_women_q1 = list(get_filtered_generator_by_year(
+        ...     2015, where={"sex": "Female", "month_of_visit": (1, 2, 3),
+        ...                  "age_bucket": ("65-74", "75 and over")}
+        ... ))
+    """
+    # Invalid `where` is raised on call, not on first record
+    validate_where(where)
+
+    def _get_filtered_records():
+        bitmap_index = get_bitmap_index(
+            year, namcs_raw_dataset_file, index_dir
+        )
+        if bitmap_index is None:
+            log.error(
+                "NAMCS dataset file for year: {} is not available".format(
+                    year
+                )
+            )
+            return
+        yield from get_records_by_rows(
+            year, bitmap_index.get_rows(bitmap_index.get_bitmap(where)),
+            namcs_raw_dataset_file
+        )
+
+    return _get_filtered_records()
@@ -0,0 +1,536 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing persistent cache of translated NAMCS patient case data.
+Translated records of a year are written into Arrow IPC file under
+`CACHE_DIR_PATH` while they are translated the first time, and read back by
+memory mapping the file afterwards, without parsing raw dataset file.
+
+Physician diagnoses are cached as int32 ids of diagnosis dictionary kept in
+`CACHE_DIR_PATH`, see :mod:`hdx_ahcd.controllers.namcs_encoding`. Cache file
+of a year has a fingerprint file next to it, see
+:mod:`hdx_ahcd.controllers.namcs_fingerprint`, recording hash of source
+dataset file, hash of year layout definition and converter version. Cache is
+rebuilt automatically when any of them changes.
+
+In-process cache, :class:`DecodedYearCache`, holds translated years of
+long running process in memory, within a memory budget, so that repeated
+calls neither translate nor read cache file again.
+
+Note:
+    Persistent cache requires 3rd party package `pyarrow`, without it records
+    are translated from raw dataset file every time.
+"""
+# Python modules
+from collections import OrderedDict
+from itertools import islice
+import os
+import sys
+import threading
+import uuid
+
+# Other modules
+from hdx_ahcd.controllers.namcs_columnar import (
+    get_columnar_schema,
+    get_columnar_writer,
+    get_record_batch,
+    is_columnar_export_available,
+)
+from hdx_ahcd.controllers.namcs_converter import get_generator_by_year
+from hdx_ahcd.controllers.namcs_encoding import (
+    get_diagnosis_dictionary,
+    get_diagnosis_dictionary_path,
+)
+from hdx_ahcd.controllers.namcs_fingerprint import (
+    get_export_fingerprint,
+    is_export_up_to_date,
+    read_fingerprint,
+    record_fingerprint,
+)
+from hdx_ahcd.helpers.functions import (
+    get_customized_file_name,
+    get_namcs_dataset_path_for_year,
+    get_normalized_namcs_file_name,
+)
+from hdx_ahcd.helpers.pools import get_value_pools
+from hdx_ahcd.namcs.config import (
+    CACHE_DIR_PATH,
+    CACHE_FILE_NAME_SUFFIX,
+    CACHE_RECORD_BATCH_SIZE,
+    CONVERTED_CSV_FIELDS,
+    log,
+    MEMORY_CACHE_MAX_BYTES,
+    MEMORY_CACHE_SIZE_SAMPLE_ROWS,
+)
+from hdx_ahcd.namcs.enums import (
+    ExportFormatEnum,
+    NAMCSFieldEnum,
+)
+from hdx_ahcd.utils.context import try_except
+
+# 3rd party modules
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+# Global vars
+# -N/A
+
+
+def is_cache_available():
+    """
+    Method to check if 3rd party packages required by cache are installed.
+
+    Returns:
+        :class:`bool`: True if translated records can be cached.
+    """
+    return is_columnar_export_available(ExportFormatEnum.ARROW.value)
+
+
+def get_cache_file_path(year, cache_dir=None):
+    """
+    Method to get absolute path of cache file of `year`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        cache_dir (:class:`str`): Directory holding cache files.
+            **Default** `CACHE_DIR_PATH`.
+
+    Returns:
+        :class:`str`: Absolute path of cache file, like
+        `2000_NAMCS_CACHE.arrow`.
+    """
+    return os.path.join(
+        cache_dir or CACHE_DIR_PATH,
+        get_customized_file_name(
+            get_normalized_namcs_file_name(year),
+            CACHE_FILE_NAME_SUFFIX,
+            extension=ExportFormatEnum.ARROW.value
+        )
+    )
+
+
+def get_cache_fingerprint(year, dataset_file, cache_file,
+                          diagnosis_dictionary):
+    """
+    Method to get fingerprint of translated records of `dataset_file`
+    cached in `cache_file`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+        cache_file (:class:`str`): Absolute path of cache file.
+        diagnosis_dictionary (:class:`DiagnosisDictionary`): Dictionary
+            physician diagnoses of cache file are encoded with.
+
+    Returns:
+        :class:`dict`: Fingerprint, see
+        :func:`hdx_ahcd.controllers.namcs_fingerprint.get_export_fingerprint`.
+
+    Note:
+        Digest of codes of `diagnosis_dictionary` known when cache file was
+        written is part of fingerprint, so that cache is rebuilt if
+        dictionary file is lost.
+    """
+    recorded_fingerprint = read_fingerprint(cache_file) or {}
+    dictionary_size = recorded_fingerprint.get("export_options", {}).get(
+        "diagnosis_dictionary", {}
+    ).get("size")
+    return get_export_fingerprint(
+        year, dataset_file, cache_file,
+        export_options={
+            "cache": ExportFormatEnum.ARROW.value,
+            "diagnosis_dictionary":
+                diagnosis_dictionary.get_digest(dictionary_size),
+        }
+    )
+
+
+def read_cache(cache_file, diagnosis_dictionary):
+    """
+    Method to read translated records from `cache_file`. File is memory
+    mapped and records are materialized one record batch at a time.
+
+    Parameters:
+        cache_file (:class:`str`): Absolute path of cache file.
+        diagnosis_dictionary (:class:`DiagnosisDictionary`): Dictionary
+            physician diagnoses of cache file are encoded with.
+
+    Returns:
+        :class:`generator`: Generator object containing translated records.
+    """
+    diagnoses_field = NAMCSFieldEnum.PHYSICIANS_DIAGNOSES.value
+    with pyarrow.memory_map(cache_file, "r") as source:
+        reader = pyarrow.ipc.open_file(source)
+        for batch_no in range(reader.num_record_batches):
+            for translated_record in reader.get_batch(batch_no).to_pylist():
+                translated_record[diagnoses_field] = \
+                    diagnosis_dictionary.decode_list(
+                        translated_record[diagnoses_field]
+                    )
+                yield translated_record
+
+
+def write_cache(year, generator_object, cache_file, fingerprint,
+                diagnosis_dictionary, batch_size=CACHE_RECORD_BATCH_SIZE):
+    """
+    Method to yield translated records of `generator_object` while writing
+    them into `cache_file`. Cache file is replaced and `fingerprint` is
+    recorded only if all the records are consumed.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        generator_object (:class:`generator`): Generator object containing
+            translated NAMCS patient case data for `year`.
+        cache_file (:class:`str`): Absolute path of cache file.
+        fingerprint (:class:`dict`): Fingerprint as returned by
+            :func:`get_cache_fingerprint`.
+        diagnosis_dictionary (:class:`DiagnosisDictionary`): Dictionary
+            physician diagnoses are encoded with, saved along with cache.
+        batch_size (:class:`int`): Number of records per record batch.
+            **Default** `CACHE_RECORD_BATCH_SIZE`.
+
+    Returns:
+        :class:`generator`: Generator object containing translated records.
+    """
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    temporary_file_name = os.path.join(
+        os.path.dirname(cache_file),
+        ".{}.{}.tmp".format(os.path.basename(cache_file), uuid.uuid4().hex)
+    )
+    schema = get_columnar_schema(encode_diagnoses=True)
+    with record_fingerprint(cache_file, fingerprint):
+        writer, write_batch = get_columnar_writer(
+            temporary_file_name, ExportFormatEnum.ARROW.value, schema
+        )
+        try:
+            for translated_records in iter(
+                    lambda: list(islice(generator_object, batch_size)), []
+            ):
+                write_batch(
+                    get_record_batch(
+                        translated_records, schema, diagnosis_dictionary
+                    )
+                )
+                yield from translated_records
+            writer.close()
+            diagnosis_dictionary.save()
+            os.replace(temporary_file_name, cache_file)
+            # Recorded along with cache once it is written, codes are added
+            # while writing
+            fingerprint["export_options"]["diagnosis_dictionary"] = \
+                diagnosis_dictionary.get_digest()
+        except BaseException:
+            # Also reached when caller stops iterating, partial cache is
+            # discarded
+            with try_except():
+                writer.close()
+            with try_except():
+                os.remove(temporary_file_name)
+            raise
+    log.info("Finished writing cache of year: {} to the file {}".format(
+        year, cache_file
+    ))
+
+
+def get_cached_generator_by_year(year, namcs_raw_dataset_file=None,
+                                 cache_dir=None):
+    """
+    Method to get translated NAMCS patient case data for a given year from
+    cache, same as :func:`get_generator_by_year`. Cache of `year` is written
+    on first full iteration and served by memory mapping afterwards, until
+    dataset file, year layout or converter version changes.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            file. **Default** dataset file of `year`.
+        cache_dir (:class:`str`): Directory holding cache files.
+            **Default** `CACHE_DIR_PATH`.
+
+    Returns:
+        :class:`generator`: Generator object containing translated records.
+
+    Note:
+        Validity of cache is checked when iteration starts. Records served
+        from cache are not validated again, so error file of `year` is not
+        written.
+
+    Usage:
+        >>> records = list(get_cached_generator_by_year(2000))  # Translated
+        >>> records = list(get_cached_generator_by_year(2000))  # From cache
+    """
+    dataset_file = namcs_raw_dataset_file or \
+        get_namcs_dataset_path_for_year(year)
+    if not is_cache_available() or dataset_file is None or \
+            not os.path.exists(dataset_file):
+        yield from get_generator_by_year(year, namcs_raw_dataset_file)
+        return
+
+    cache_file = get_cache_file_path(year, cache_dir)
+    diagnosis_dictionary = get_diagnosis_dictionary(
+        get_diagnosis_dictionary_path(cache_dir or CACHE_DIR_PATH)
+    )
+    fingerprint = get_cache_fingerprint(
+        year, dataset_file, cache_file, diagnosis_dictionary
+    )
+    if is_export_up_to_date(cache_file, fingerprint):
+        log.debug("Reading year: {} from cache {}".format(year, cache_file))
+        yield from read_cache(cache_file, diagnosis_dictionary)
+        return
+
+    yield from write_cache(
+        year, get_generator_by_year(year, dataset_file), cache_file,
+        fingerprint, diagnosis_dictionary
+    )
+
+
+def get_cached_table(year, namcs_raw_dataset_file=None, cache_dir=None):
+    """
+    Method to get cached translated records of `year` as a table, without
+    materializing records. Unlike :func:`get_cached_generator_by_year`, cache
+    is not written if it is missing or outdated.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            file. **Default** dataset file of `year`.
+        cache_dir (:class:`str`): Directory holding cache files.
+            **Default** `CACHE_DIR_PATH`.
+
+    Returns:
+        :class:`tuple`: With elements as:
+            :class:`pyarrow.Table`: Memory mapped translated records, with
+            physician diagnoses as int32 ids.
+            :class:`DiagnosisDictionary`: Dictionary of ids.
+        :const:`None` if cache of `year` is not up to date.
+    """
+    dataset_file = namcs_raw_dataset_file or \
+        get_namcs_dataset_path_for_year(year)
+    if not is_cache_available() or dataset_file is None or \
+            not os.path.exists(dataset_file):
+        return None
+
+    cache_file = get_cache_file_path(year, cache_dir)
+    diagnosis_dictionary = get_diagnosis_dictionary(
+        get_diagnosis_dictionary_path(cache_dir or CACHE_DIR_PATH)
+    )
+    if not is_export_up_to_date(
+            cache_file,
+            get_cache_fingerprint(
+                year, dataset_file, cache_file, diagnosis_dictionary
+            )
+    ):
+        return None
+    with pyarrow.memory_map(cache_file, "r") as source:
+        return pyarrow.ipc.open_file(source).read_all(), diagnosis_dictionary
+
+
+class DecodedYearCache(object):
+    """
+    Least recently used cache of translated years, evicting years once their
+    estimated size exceeds memory budget. Records are held as tuples in the
+    order of `CONVERTED_CSV_FIELDS`, which takes less memory than dicts.
+    """
+    def __init__(self, max_bytes=MEMORY_CACHE_MAX_BYTES):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            max_bytes (:class:`int`): Memory budget in bytes.
+                **Default** `MEMORY_CACHE_MAX_BYTES`.
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_rows_size(rows, sample_size=MEMORY_CACHE_SIZE_SAMPLE_ROWS):
+        """
+        Method to estimate memory used by `rows`, from size of at most
+        `sample_size` evenly spaced rows scaled by number of rows. Objects
+        shared between sampled rows, like pooled values, are counted once.
+
+        Parameters:
+            rows (:class:`tuple`): Rows of translated records.
+            sample_size (:class:`int`): Maximum number of rows sampled.
+                **Default** `MEMORY_CACHE_SIZE_SAMPLE_ROWS`, size is exact
+                for as many rows or less.
+
+        Returns:
+            :class:`int`: Size in bytes.
+        """
+        seen_objects = set()
+
+        def _get_size(value):
+            if id(value) in seen_objects:
+                return 0
+            seen_objects.add(id(value))
+            size = sys.getsizeof(value)
+            if isinstance(value, tuple):
+                size += sum(map(_get_size, value))
+            return size
+
+        # Every `step` th row, at most `sample_size` rows
+        step = (len(rows) + sample_size - 1) // sample_size or 1
+        sampled_rows = rows[::step]
+        sampled_size = sum(map(_get_size, sampled_rows))
+        return sys.getsizeof(rows) + (
+            sampled_size * len(rows) // len(sampled_rows)
+            if sampled_rows else 0
+        )
+
+    def get(self, key):
+        """
+        Method to get rows cached for `key`, marking them most recently used.
+
+        Parameters:
+            key (:class:`tuple`): Key of translated year.
+
+        Returns:
+            :class:`tuple`: Rows of translated records, :const:`None` if
+            `key` is not cached.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, rows):
+        """
+        Method to cache `rows` for `key`, evicting least recently used years
+        until cached years fit into memory budget.
+
+        Parameters:
+            key (:class:`tuple`): Key of translated year.
+            rows (:class:`tuple`): Rows of translated records.
+
+        Returns:
+            :class:`bool`: True if `rows` are cached, False if `rows` alone
+            exceed memory budget.
+        """
+        size = self.get_rows_size(rows)
+        with self.lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                log.info(
+                    "Year: {} of {} bytes exceeds memory cache budget of {} "
+                    "bytes, not cached".format(key[0], size, self.max_bytes)
+                )
+                return False
+            while self.size + size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+            self.entries[key] = (rows, size)
+            self.size += size
+            return True
+
+    def _remove(self, key):
+        """
+        Method to remove `key` from cache, if cached.
+        """
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear(self):
+        """
+        Method to remove all the cached years, counters are kept.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def get_stats(self):
+        """
+        Method to get counters of cache.
+
+        Returns:
+            :class:`dict`: Number of `hits`, `misses` and `evictions`, number
+            of cached years as `entries`, their estimated size in bytes as
+            `size` and memory budget as `max_bytes`.
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "size": self.size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# In-process cache shared by :func:`get_memory_cached_generator_by_year`
+DECODED_YEAR_CACHE = DecodedYearCache()
+
+
+def get_memory_cached_generator_by_year(year, namcs_raw_dataset_file=None,
+                                        generator_method=None,
+                                        memory_cache=None):
+    """
+    Method to get translated NAMCS patient case data for a given year from
+    in-process cache, same as :func:`get_generator_by_year`. Year is cached
+    on first full iteration.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            file. **Default** dataset file of `year`.
+        generator_method (:class:`function`): Method to get translated
+            records on cache miss, like :func:`get_cached_generator_by_year`.
+            **Default** :func:`get_generator_by_year`.
+        memory_cache (:class:`DecodedYearCache`): Cache of translated years.
+            **Default** `DECODED_YEAR_CACHE`.
+
+    Returns:
+        :class:`generator`: Generator object containing translated records,
+        records are new objects on every iteration.
+
+    Note:
+        Cached year is not checked against dataset file, call
+        :func:`DecodedYearCache.clear` once dataset files are replaced.
+    """
+    memory_cache = memory_cache or DECODED_YEAR_CACHE
+    key = (int(year), namcs_raw_dataset_file)
+    diagnoses_index = CONVERTED_CSV_FIELDS.index(
+        NAMCSFieldEnum.PHYSICIANS_DIAGNOSES.value
+    )
+    # Records read from cache file are not pooled, pool them before caching
+    value_pools = [
+        (CONVERTED_CSV_FIELDS.index(field_name), value_pool)
+        for field_name, value_pool in get_value_pools().items()
+    ]
+
+    rows = memory_cache.get(key)
+    if rows is not None:
+        for row in rows:
+            translated_record = dict(zip(CONVERTED_CSV_FIELDS, row))
+            translated_record[CONVERTED_CSV_FIELDS[diagnoses_index]] = \
+                list(row[diagnoses_index])
+            yield translated_record
+        return
+
+    rows = []
+    for translated_record in (generator_method or get_generator_by_year)(
+            year, namcs_raw_dataset_file
+    ):
+        row = list(map(translated_record.get, CONVERTED_CSV_FIELDS))
+        row[diagnoses_index] = tuple(row[diagnoses_index] or ())
+        for index, value_pool in value_pools:
+            if isinstance(row[index], tuple):
+                row[index] = tuple(map(value_pool.intern, row[index]))
+            elif row[index] is not None:
+                row[index] = value_pool.intern(row[index])
+        rows.append(tuple(row))
+        yield translated_record
+    memory_cache.put(key, tuple(rows))
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing sorted ranges over ICD-9 codes of physician diagnoses, for
+hierarchical queries like all the codes of a category or chapter, see
+:class:`DiagnosisCodeRanges`. A code pattern is resolved to matching codes
+and their ids once, by binary search over sorted distinct codes, instead of
+matching every diagnosis of every record.
+
+Code patterns are:
+    - Prefix, like `250` (category), `250.0` (subcategory), `V70` or
+      `25` (categories 250 to 259). Trailing `x`, `*` and `.` are ignored,
+      `250.xx` is same as `250`.
+    - Inclusive range of codes or categories, like `390-459` (chapter) or
+      `V01-V82`. Both bounds must be of same kind, numeric or same letter.
+    - Special values of
+      :class:`hdx_ahcd.namcs.enums.PhysicianDiagnosesEnum`, like
+      `AHCD.LBBS`, or prefix `AHCD` for all of them. Special values are
+      matched by name only, never by prefix or range of ICD-9 codes they
+      are recoded from, like `V99`.
+
+Codes are compared as converted by
+:func:`hdx_ahcd.mappers.functions.convert_physician_diagnoses_code`, with
+3 digit zero padded category, like `001.0`, hence ranges like `1-139` must be
+written as `001-139`.
+"""
+# Python modules
+from bisect import bisect_left
+
+# Other modules
+from hdx_ahcd.helpers.functions import get_iterable
+from hdx_ahcd.namcs.enums import PhysicianDiagnosesEnum
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# Separator of bounds of range pattern, like `390-459`
+RANGE_SEPARATOR = "-"
+# Prefix of special values of `PhysicianDiagnosesEnum`
+SPECIAL_CODE_PREFIX = \
+    PhysicianDiagnosesEnum.LEFT_BEFORE_BEING_SEEN.value.split(".")[0]
+# Greater than any string starting with a given prefix, when appended to it
+MAX_CODE_SUFFIX = chr(0x10FFFF)
+
+
+def normalize_code_pattern(pattern):
+    """
+    Method to normalize prefix or bound of range `pattern`.
+
+    Parameters:
+        pattern (:class:`str`): Code prefix, like `250.xx` or `v70`.
+
+    Returns:
+        :class:`str`: Normalized prefix, like `250` or `V70`.
+
+    Raises:
+        :class:`ValueError`: If `pattern` is empty.
+    """
+    normalized_pattern = pattern.strip().upper().rstrip("X*").rstrip(".")
+    if not normalized_pattern:
+        raise ValueError("Invalid diagnosis code pattern: {}".format(pattern))
+    return normalized_pattern
+
+
+def get_code_kind(code):
+    """
+    Method to get kind of `code`, codes of different kinds don't form a
+    range.
+
+    Parameters:
+        code (:class:`str`): ICD-9 code or its prefix.
+
+    Returns:
+        :class:`str`: `SPECIAL_CODE_PREFIX` for special values of
+        :class:`PhysicianDiagnosesEnum`, leading letter for supplementary
+        codes, like `V`, and empty string for numeric codes.
+    """
+    if code.startswith(SPECIAL_CODE_PREFIX):
+        return SPECIAL_CODE_PREFIX
+    return "" if code[:1].isdigit() else code[:1]
+
+
+class DiagnosisCodeRanges(object):
+    """
+    Sorted distinct ICD-9 codes with their ids, see
+    :class:`hdx_ahcd.controllers.namcs_encoding.DiagnosisDictionary`,
+    resolving code patterns to matching codes and ids. Resolved patterns are
+    cached.
+    """
+    def __init__(self, codes=(), ids=None):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            codes (:class:`iterable`): ICD-9 codes, blank codes are ignored.
+            ids (:class:`iterable`): Ids of `codes`, in the order of `codes`.
+                **Default** position of code in `codes`.
+        """
+        code_ids = sorted(
+            (code, _id)
+            for code, _id in zip(
+                codes, ids if ids is not None else range(len(codes))
+            )
+            if code
+        )
+        self.codes = [code for code, _ in code_ids]
+        self.ids = [_id for _, _id in code_ids]
+        self.resolved_patterns = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    @classmethod
+    def from_dictionary(cls, diagnosis_dictionary):
+        """
+        Method to construct ranges over codes of `diagnosis_dictionary`.
+
+        Parameters:
+            diagnosis_dictionary (:class:`DiagnosisDictionary`): Dictionary
+                of codes.
+
+        Returns:
+            :class:`DiagnosisCodeRanges`: Ranges over codes, with their ids
+            in dictionary.
+        """
+        return cls(list(diagnosis_dictionary.codes))
+
+    def get_slice(self, pattern):
+        """
+        Method to get positions of codes matching `pattern` in sorted codes.
+
+        Parameters:
+            pattern (:class:`str`): Code prefix or range, see module
+                documentation.
+
+        Returns:
+            :class:`slice`: Positions of matching codes.
+
+        Raises:
+            :class:`ValueError`: If `pattern` is empty, or is a range with
+            bounds of different kinds or in descending order.
+        """
+        lower_bound, separator, upper_bound = \
+            pattern.strip().partition(RANGE_SEPARATOR)
+        lower_bound = normalize_code_pattern(lower_bound)
+        if not separator:
+            return slice(
+                bisect_left(self.codes, lower_bound),
+                bisect_left(self.codes, lower_bound + MAX_CODE_SUFFIX)
+            )
+
+        upper_bound = normalize_code_pattern(upper_bound)
+        kind = get_code_kind(lower_bound)
+        if kind != get_code_kind(upper_bound) or \
+                kind == SPECIAL_CODE_PREFIX or lower_bound > upper_bound:
+            raise ValueError(
+                "Invalid diagnosis code range: {}, bounds must be ICD-9 "
+                "codes of same kind in ascending order".format(pattern)
+            )
+        # Codes of upper bound category, like `459.9` of `390-459`, are
+        # included
+        return slice(
+            bisect_left(self.codes, lower_bound),
+            bisect_left(self.codes, upper_bound + MAX_CODE_SUFFIX)
+        )
+
+    def get_codes(self, pattern):
+        """
+        Method to get codes matching `pattern`.
+
+        Parameters:
+            pattern (:class:`str` or :class:`tuple` or :class:`list`): Code
+                prefix or range, or their list, see module documentation.
+
+        Returns:
+            :class:`list`: Sorted distinct matching codes.
+        """
+        codes = set()
+        for _pattern in get_iterable(pattern):
+            codes.update(self.codes[self.get_slice(_pattern)])
+        return sorted(codes)
+
+    def get_ids(self, pattern):
+        """
+        Method to get ids of codes matching `pattern`, pattern is resolved
+        only once.
+
+        Parameters:
+            pattern (:class:`str` or :class:`tuple` or :class:`list`): Code
+                prefix or range, or their list, see module documentation.
+
+        Returns:
+            :class:`frozenset`: Ids of matching codes.
+
+        Usage:
+            >>> code_ranges = DiagnosisCodeRanges.from_dictionary(
+            ...     DiagnosisDictionary()
+            ... )
+            >>> circulatory_ids = code_ranges.get_ids("390-459")
+            >>> visits = [
+            ...     _ids for _ids in visit_ids
+            ...     if not circulatory_ids.isdisjoint(_ids)
+            ... ]
+        """
+        key = tuple(get_iterable(pattern))
+        ids = self.resolved_patterns.get(key)
+        if ids is None:
+            ids = frozenset()
+            for _pattern in key:
+                ids = ids.union(self.ids[self.get_slice(_pattern)])
+            self.resolved_patterns[key] = ids
+        return ids
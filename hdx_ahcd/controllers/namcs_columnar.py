@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing methods to export translated NAMCS patient case data into
+columnar binary files, Arrow IPC or Parquet. Unlike csv, columns are typed
+and physician diagnoses are stored as list column, so that exported data can
+be loaded without parsing text.
+
+Note:
+    Columnar export requires 3rd party package `pyarrow`.
+"""
+# Python modules
+from itertools import islice
+import os
+import uuid
+
+# Other modules
+from hdx_ahcd.controllers.namcs_encoding import get_diagnosis_dictionary
+from hdx_ahcd.helpers.functions import (
+    get_customized_file_name,
+    get_normalized_namcs_file_name,
+)
+from hdx_ahcd.namcs.config import (
+    COLUMNAR_ROW_GROUP_SIZE,
+    CONVERTED_CSV_FILE_NAME_SUFFIX,
+    log,
+    NAMCS_DATA_DIR_PATH,
+)
+from hdx_ahcd.namcs.enums import (
+    ExportFormatEnum,
+    NAMCSFieldEnum,
+)
+from hdx_ahcd.utils.context import try_except
+
+# 3rd party modules
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    import pyarrow.parquet
+    import pyarrow.ipc
+except (AttributeError, ImportError):
+    pass
+
+# Global vars
+# -N/A
+
+
+def get_columnar_schema(encode_diagnoses=False):
+    """
+    Method to get schema of columnar export, columns are in the order of
+    `CONVERTED_CSV_FIELDS`.
+
+    Parameters:
+        encode_diagnoses (:class:`bool`): Whether physician diagnoses are
+            stored as int32 ids of diagnosis dictionary, see
+            :mod:`hdx_ahcd.controllers.namcs_encoding`.
+            **Default** :const:`False`.
+
+    Returns:
+        :class:`pyarrow.Schema`: Schema of exported translated data.
+    """
+    return pyarrow.schema([
+        (NAMCSFieldEnum.SOURCE_FILE_ID.value, pyarrow.string()),
+        (NAMCSFieldEnum.SOURCE_FILE_ROW.value, pyarrow.int32()),
+        (NAMCSFieldEnum.MONTH_OF_VISIT.value, pyarrow.int16()),
+        (NAMCSFieldEnum.YEAR_OF_VISIT.value, pyarrow.int16()),
+        (NAMCSFieldEnum.GENDER.value, pyarrow.string()),
+        (NAMCSFieldEnum.PATIENT_AGE.value, pyarrow.float64()),
+        (
+            NAMCSFieldEnum.PHYSICIANS_DIAGNOSES.value,
+            pyarrow.list_(
+                pyarrow.int32() if encode_diagnoses else pyarrow.string()
+            )
+        ),
+        (NAMCSFieldEnum.VISIT_WEIGHT.value, pyarrow.float64()),
+    ])
+
+
+def is_columnar_export_available(export_format):
+    """
+    Method to check if 3rd party packages required for `export_format` are
+    installed.
+
+    Parameters:
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+
+    Returns:
+        :class:`bool`: True if `export_format` can be exported.
+    """
+    if pyarrow is None:
+        return False
+    if export_format == ExportFormatEnum.PARQUET.value:
+        return hasattr(pyarrow, "parquet")
+    return hasattr(pyarrow, "ipc")
+
+
+def validate_columnar_export_format(export_format):
+    """
+    Method to check if translated data can be exported to `export_format`.
+
+    Parameters:
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+
+    Raises:
+        :class:`ImportError`: If `pyarrow` is not installed.
+        :class:`ValueError`: If `export_format` is not columnar format.
+    """
+    if export_format not in (ExportFormatEnum.ARROW.value,
+                             ExportFormatEnum.PARQUET.value):
+        raise ValueError(
+            "Export format: {} is not columnar format".format(export_format)
+        )
+    if not is_columnar_export_available(export_format):
+        raise ImportError(
+            "Package pyarrow is required for export format: {}, install it "
+            "using `pip install pyarrow`".format(export_format)
+        )
+
+
+def get_columnar_file_path(year, export_format, export_dir=None):
+    """
+    Method to get absolute path of columnar file of `year`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+        export_dir (:class:`str`): Directory where file is written.
+            **Default** `NAMCS_DATA_DIR_PATH`.
+
+    Returns:
+        :class:`str`: Absolute path of columnar file, like
+        `2000_NAMCS_CONVERTED.parquet`.
+    """
+    return os.path.join(
+        export_dir or NAMCS_DATA_DIR_PATH,
+        get_customized_file_name(
+            get_normalized_namcs_file_name(year),
+            CONVERTED_CSV_FILE_NAME_SUFFIX,
+            extension=export_format
+        )
+    )
+
+
+def get_record_batch(translated_records, schema, diagnosis_dictionary=None):
+    """
+    Method to convert translated records into typed record batch.
+
+    Parameters:
+        translated_records (:class:`list`): Translated records.
+        schema (:class:`pyarrow.Schema`): Schema of record batch.
+        diagnosis_dictionary (:class:`DiagnosisDictionary`): Dictionary
+            physician diagnoses are encoded with, for schema with
+            `encode_diagnoses`. **Default** :const:`None`.
+
+    Returns:
+        :class:`pyarrow.RecordBatch`: Record batch with column per field of
+        `schema`.
+    """
+    def _get_values(field_name):
+        values = [
+            translated_record.get(field_name)
+            for translated_record in translated_records
+        ]
+        if diagnosis_dictionary is not None and \
+                field_name == NAMCSFieldEnum.PHYSICIANS_DIAGNOSES.value:
+            values = [
+                diagnosis_dictionary.encode_list(codes or ())
+                for codes in values
+            ]
+        return values
+
+    return pyarrow.RecordBatch.from_arrays(
+        [
+            pyarrow.array(_get_values(field.name), type=field.type)
+            for field in schema
+        ],
+        schema=schema
+    )
+
+
+def get_columnar_writer(columnar_file, export_format, schema):
+    """
+    Method to open writer of columnar file.
+
+    Parameters:
+        columnar_file (:class:`str`): Absolute path of columnar file.
+        export_format (:class:`str`): `arrow` for Arrow IPC file or
+            `parquet` for Parquet file.
+        schema (:class:`pyarrow.Schema`): Schema of columnar file.
+
+    Returns:
+        :class:`tuple`: With elements as:
+            :class:`object`: Writer, closed by caller.
+            :class:`function`: Method to write :class:`pyarrow.RecordBatch`.
+    """
+    if export_format == ExportFormatEnum.PARQUET.value:
+        writer = pyarrow.parquet.ParquetWriter(columnar_file, schema)
+
+        def write_batch(batch):
+            # Every batch is written as a single row group
+            writer.write_table(pyarrow.Table.from_batches([batch]))
+    else:
+        writer = pyarrow.ipc.new_file(columnar_file, schema)
+        write_batch = writer.write_batch
+    return writer, write_batch
+
+
+def export_to_columnar(year, generator_object,
+                       export_format=ExportFormatEnum.PARQUET.value,
+                       export_dir=None, row_group_size=COLUMNAR_ROW_GROUP_SIZE,
+                       encode_diagnoses=False):
+    """
+    Method to export the translated NAMCS patient case data into columnar
+    file for a given year. Records are written batch by batch as they are
+    translated, at most `row_group_size` records are held in memory.
+
+    Parameters:
+        year (:class:`int`): Year for which translated NAMCS data will be
+            exported.
+        generator_object (:class:`generator`): Generator object containing
+            translated NAMCS patient case data for `year`.
+        export_format (:class:`str`): `arrow` for Arrow IPC file or
+            `parquet` for Parquet file. **Default** `parquet`.
+        export_dir (:class:`str`): Directory where file is written.
+            **Default** `NAMCS_DATA_DIR_PATH`.
+        row_group_size (:class:`int`): Number of records per record batch or
+            row group. **Default** `COLUMNAR_ROW_GROUP_SIZE`.
+        encode_diagnoses (:class:`bool`): Whether to store physician
+            diagnoses as int32 ids of shared diagnosis dictionary, which is
+            saved along with file. **Default** :const:`False`.
+
+    Returns:
+        :class:`str`: Absolute path of exported file.
+
+    Raises:
+        :class:`ImportError`: If `pyarrow` is not installed.
+        :class:`ValueError`: If `export_format` is not columnar format.
+
+    Note:
+        File is written atomically, existing file is replaced only once all
+        the records are written.
+    """
+    validate_columnar_export_format(export_format)
+    schema = get_columnar_schema(encode_diagnoses)
+    diagnosis_dictionary = get_diagnosis_dictionary() \
+        if encode_diagnoses else None
+    columnar_file = get_columnar_file_path(year, export_format, export_dir)
+    temporary_file_name = os.path.join(
+        os.path.dirname(columnar_file),
+        ".{}.{}.tmp".format(os.path.basename(columnar_file), uuid.uuid4().hex)
+    )
+    writer, write_batch = get_columnar_writer(
+        temporary_file_name, export_format, schema
+    )
+    try:
+        for translated_records in iter(
+                lambda: list(islice(generator_object, row_group_size)), []
+        ):
+            write_batch(
+                get_record_batch(
+                    translated_records, schema, diagnosis_dictionary
+                )
+            )
+        writer.close()
+        os.replace(temporary_file_name, columnar_file)
+    except BaseException:
+        # Existing file is kept, partial file is discarded
+        with try_except():
+            writer.close()
+        with try_except():
+            os.remove(temporary_file_name)
+        raise
+    if diagnosis_dictionary is not None:
+        diagnosis_dictionary.save()
+    log.info("Finished writing to the file %s" % columnar_file)
+
+    return os.path.realpath(columnar_file)
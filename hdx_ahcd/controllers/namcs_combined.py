@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing methods to export translated NAMCS data of multiple years
+into a single file. Years are translated by producers in parallel worker
+processes, while a single writer appends their rows in year order, so that
+output is same irrespective of number of workers.
+
+Note:
+    Writer runs in calling process rather than in a process of its own.
+    Calling process only waits for the export otherwise, and rows reach
+    writer through queues of `multiprocessing.Manager` either way, so a
+    separate writer process would only add a process to start and to
+    report errors from.
+"""
+# Python modules
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import Manager
+from queue import Empty
+import csv
+import os
+import time
+
+# Other modules
+from hdx_ahcd.controllers.namcs_converter import (
+    get_csv_rows,
+    get_generator_by_year,
+)
+from hdx_ahcd.helpers.compression import (
+    get_compressed_file_name,
+    open_export_file,
+)
+from hdx_ahcd.helpers.functions import (
+    get_iterable,
+    get_namcs_dataset_path_for_year,
+)
+from hdx_ahcd.namcs.config import (
+    COMBINED_EXPORT_BATCH_SIZE,
+    COMBINED_EXPORT_FILE_NAME,
+    COMBINED_EXPORT_QUEUE_SIZE,
+    CONVERTED_CSV_FIELDS,
+    log,
+    NAMCS_DATA_DIR_PATH,
+    YEARS_AVAILABLE,
+)
+from hdx_ahcd.utils.context import try_except
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# Seconds writer waits for a batch before checking if producer is alive
+PRODUCER_POLL_INTERVAL = 1.0
+
+
+def produce_year_rows(year, dataset_file, row_queue, batch_size,
+                      diagnoses_separator=None):
+    """
+    Producer of csv rows of translated records of `year`, executed in worker
+    process. Rows are put on `row_queue` in batches, followed by
+    :const:`None` once `year` is done.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+        row_queue (:class:`queue.Queue`): Bounded queue shared with writer.
+        batch_size (:class:`int`): Number of rows per batch.
+        diagnoses_separator (:class:`str`): Separator used to join physician
+            diagnoses codes, see
+            :func:`hdx_ahcd.controllers.namcs_converter.get_csv_rows`.
+
+    Returns:
+        :class:`int`: Number of rows produced.
+    """
+    row_count = 0
+    try:
+        rows = get_csv_rows(
+            get_generator_by_year(year, dataset_file), diagnoses_separator
+        )
+        for batch in iter(lambda: list(islice(rows, batch_size)), []):
+            row_queue.put(batch)
+            row_count += len(batch)
+    except Exception as exc:
+        # Writer stops at first error, see :func:`export_combined`
+        row_queue.put({"error": str(exc)})
+    finally:
+        row_queue.put(None)
+    return row_count
+
+
+def _get_batches(row_queue, future):
+    """
+    Method to get batches of a year from `row_queue` until producer is done.
+
+    Parameters:
+        row_queue (:class:`queue.Queue`): Queue of producer of year.
+        future (:class:`concurrent.futures.Future`): Future of producer.
+
+    Returns:
+        :class:`generator`: Batches of rows, or `dict` with `error` if
+        producer failed.
+
+    Raises:
+        :class:`RuntimeError`: If worker process of producer died.
+    """
+    while True:
+        try:
+            batch = row_queue.get(timeout=PRODUCER_POLL_INTERVAL)
+        except Empty:
+            # Producer always ends with `None`, unless its process died
+            if future.done() and future.exception() is not None:
+                raise RuntimeError(
+                    "Producer failed: {}".format(future.exception())
+                )
+            continue
+        if batch is None:
+            return
+        yield batch
+
+
+def export_combined(year=None, output_file=None, workers=None,
+                    delimiter=",", diagnoses_separator=None, compression=None,
+                    batch_size=COMBINED_EXPORT_BATCH_SIZE,
+                    queue_size=COMBINED_EXPORT_QUEUE_SIZE):
+    """
+    Method to export translated NAMCS data for `year` into single file, with
+    a header row followed by rows of every year in year order. Years for
+    which NAMCS dataset file is not available locally are skipped.
+
+    Parameters:
+        year (:class:`int` or :class:`tuple` or :class:`list`): NAMCS year(s)
+            to export. If year is not specified, all the years defined in
+            `YEARS_AVAILABLE` are exported.
+        output_file (:class:`str`): Absolute path of output file, without
+            extension of `compression`. **Default**
+            `COMBINED_EXPORT_FILE_NAME` in `NAMCS_DATA_DIR_PATH`.
+        workers (:class:`int`): Maximum number of producer processes.
+            **Default** number of processors on the machine.
+        delimiter (:class:`str`): Field delimiter, like `\\t` for tsv file.
+            **Default** `,`.
+        diagnoses_separator (:class:`str`): Separator used to join physician
+            diagnoses codes. **Default** :const:`None`.
+        compression (:class:`str`): Value of :class:`CompressionEnum`.
+            **Default** :const:`None`.
+        batch_size (:class:`int`): Number of rows handed to writer at once.
+            **Default** `COMBINED_EXPORT_BATCH_SIZE`.
+        queue_size (:class:`int`): Maximum number of batches per year waiting
+            for writer. **Default** `COMBINED_EXPORT_QUEUE_SIZE`.
+
+    Returns:
+        :class:`dict`: Absolute path of output file as `file_name`, number
+        of rows per year as `rows`, years skipped as `skipped` and
+        `elapsed_time`.
+
+    Raises:
+        :class:`RuntimeError`: If translation of any year failed, existing
+        output file is kept.
+
+    Note:
+        Producers are submitted in year order, so the year being written is
+        always running. Memory is bounded by `queue_size` * `batch_size`
+        rows for each of at most `workers` years ahead of writer, which runs
+        in calling process, see module documentation.
+
+    Usage:
+        >>> export_combined((2000, 2001), "/tmp/namcs.tsv", delimiter="\\t")
+        {'file_name': '/tmp/namcs.tsv', 'rows': {2000: 27369, ...}, ...}
+    """
+    years = sorted(
+        set(map(int, YEARS_AVAILABLE if year is None else get_iterable(year)))
+    )
+    output_file = output_file or \
+        os.path.join(NAMCS_DATA_DIR_PATH, COMBINED_EXPORT_FILE_NAME)
+    started_at = time.perf_counter()
+
+    dataset_files = {}
+    skipped_years = []
+    for _year in years:
+        # Resolve dataset path in parent process, worker processes
+        # do not share configuration changed at runtime
+        dataset_file = get_namcs_dataset_path_for_year(_year)
+        if dataset_file is None:
+            log.error(
+                "NAMCS dataset file for year: {} is not available, skipping "
+                "year".format(_year)
+            )
+            skipped_years.append(_year)
+            continue
+        dataset_files[_year] = dataset_file
+
+    year_wise_rows = {}
+    drained_years = set()
+    with Manager() as manager, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        producers = []
+        for _year, dataset_file in dataset_files.items():
+            row_queue = manager.Queue(maxsize=queue_size)
+            future = executor.submit(
+                produce_year_rows, _year, dataset_file, row_queue,
+                batch_size, diagnoses_separator
+            )
+            producers.append((_year, row_queue, future))
+
+        try:
+            with open_export_file(
+                    output_file, compression=compression
+            ) as file_handle:
+                writer = csv.writer(file_handle, delimiter=delimiter)
+                writer.writerow(CONVERTED_CSV_FIELDS)
+                for _year, row_queue, future in producers:
+                    year_wise_rows[_year] = 0
+                    for batch in _get_batches(row_queue, future):
+                        if isinstance(batch, dict):
+                            raise RuntimeError(
+                                "Error: '{}', while translating year: "
+                                "{}".format(batch["error"], _year)
+                            )
+                        writer.writerows(batch)
+                        year_wise_rows[_year] += len(batch)
+                    drained_years.add(_year)
+                    log.info(
+                        "Combined year: {}, rows: {}".format(
+                            _year, year_wise_rows[_year]
+                        )
+                    )
+        except BaseException:
+            # Unblock producers ahead of writer, so that pool can shut down
+            for _year, row_queue, future in producers:
+                if _year not in drained_years and not future.cancel():
+                    with try_except():
+                        for _ in _get_batches(row_queue, future):
+                            pass
+            raise
+
+    elapsed_time = time.perf_counter() - started_at
+    output_file = get_compressed_file_name(output_file, compression)
+    log.info(
+        "Finished writing {} rows of {} year(s) to the file {} in "
+        "{:.2f}s".format(
+            sum(year_wise_rows.values()), len(year_wise_rows), output_file,
+            elapsed_time
+        )
+    )
+    return {
+        "file_name": os.path.realpath(output_file),
+        "rows": year_wise_rows,
+        "skipped": skipped_years,
+        "elapsed_time": elapsed_time,
+    }
@@ -5,11 +5,26 @@ human readable form.
 """
 # Python modules
 from collections import defaultdict
-from itertools import tee
+from contextlib import ExitStack
+from functools import partial
+from itertools import islice
 import csv
 import os
 
 # Other modules
+from hdx_ahcd.controllers.namcs_columnar import (
+    export_to_columnar,
+    get_columnar_file_path,
+)
+from hdx_ahcd.controllers.namcs_fingerprint import (
+    get_export_fingerprint,
+    is_export_up_to_date,
+    record_fingerprint,
+)
+from hdx_ahcd.helpers.compression import (
+    get_compressed_file_name,
+    open_export_file,
+)
 from hdx_ahcd.helpers.functions import (
     get_customized_file_name,
     get_field_code_from_record,
@@ -21,16 +36,23 @@ from hdx_ahcd.helpers.functions import (
     populate_missing_fields,
     safe_read_file
 )
+from hdx_ahcd.helpers.pools import (
+    get_value_pools,
+    get_value_pools_stats,
+    intern_record,
+)
 from hdx_ahcd.mappers import years
 from hdx_ahcd.namcs.config import (
     CONVERTED_CSV_FIELDS,
     CONVERTED_CSV_FILE_NAME_SUFFIX,
+    CSV_WRITE_BATCH_SIZE,
     ERROR_FILES_DIR_PATH,
     NAMCS_DATA_DIR_PATH,
     log,
     YEARS_AVAILABLE
 )
 from hdx_ahcd.namcs.enums import (
+    ExportFormatEnum,
     NAMCSErrorFieldEnum,
     NAMCSFieldEnum, 
 )
@@ -45,8 +67,142 @@ from hdx_ahcd.utils.utils import detailed_exception_info
 # -N/A
 
 
+def get_error_file_path(year):
+    """
+    Method to get absolute path of error file where records of `year`
+    rejected during translation are dumped.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+
+    Returns:
+        :class:`str`: Absolute path of error file for `year`.
+    """
+    # Constructing source file name on the basis of year specified
+    source_file_id = get_normalized_namcs_file_name(year)
+    return os.path.join(
+        ERROR_FILES_DIR_PATH,
+        get_customized_file_name(source_file_id, extension="err")
+    )
+
+
+def write_error_file(error_file, errors):
+    """
+    Method to dump records rejected during translation into `error_file`.
+
+    Parameters:
+        error_file (:class:`str`): Absolute path of error file.
+        errors (:class:`list`): Rejected records, each represented by
+            :class:`dict` having keys defined by :class:`NAMCSErrorFieldEnum`.
+    """
+    # TODO: Discard record or replace None value for erroneous field
+    with open(error_file, "w") as error_file_handler:
+        # Error file headers
+        error_file_headers = (
+            NAMCSErrorFieldEnum.RECORD_NUMBER.value,
+            NAMCSErrorFieldEnum.EXCEPTION.value,
+            NAMCSErrorFieldEnum.RECORD.value
+        )
+        writer = csv.DictWriter(
+            error_file_handler,
+            delimiter = ",",
+            fieldnames = error_file_headers
+        )
+        writer.writeheader()
+        for _error in errors:
+            writer.writerow(_error)
+        log.info("Finished writing to error file {}".format(error_file))
+
+
+def translate_records(year, numbered_records, errors, value_pools=None):
+    """
+    Method to translate raw NAMCS records of `year` in human readable form.
+
+    Parameters:
+        year (:class:`int`): NAMCS year of records.
+        numbered_records (:class:`iterable`): Pairs of zero based record
+            number in dataset file and raw record.
+        errors (:class:`list`): Records rejected due to erroneous field value
+            are appended to this list.
+        value_pools (:class:`dict`): :class:`hdx_ahcd.helpers.pools.ValuePool`
+            by field name, equal values of these fields are shared between
+            translated records. **Default** new pool per field of
+            `INTERNED_FIELDS`.
+
+    Returns:
+        :class:`generator`: Generator object containing translated records.
+
+    Raises:
+        :class:`Exception`: If some of attributes/fields are not
+        implemented in the class for `year`, exception is raised
+        For example if :class:`Year1973` doesn't implement attribute
+        `gender` an exception will be raised.
+    """
+    # Constructing source file name on the basis of year specified
+    source_file_id = get_normalized_namcs_file_name(year)
+
+    with try_except(TypeError, re_raise=True):
+        # Get the specific year class from module years
+        year_class_object = vars(years).get("Year{}".format(year))
+
+    # Get the mappings from year class
+    field_mappings = year_class_object.get_field_slice_mapping()
+
+    if value_pools is None:
+        value_pools = get_value_pools()
+
+    for record_no, record in numbered_records:
+        translated_record = {
+            NAMCSFieldEnum.SOURCE_FILE_ID.value: source_file_id,
+            NAMCSFieldEnum.SOURCE_FILE_ROW.value: record_no + 1
+        }
+        try:
+            for field_name, slice_object in field_mappings.items():
+                # Evaluate `field_name` which is collection mappings
+                if isinstance(slice_object, (list, tuple)):
+                    translated_code = process_multiple_slice_objects(
+                        record, field_name, slice_object
+                    )
+                else:
+                    translated_code = get_field_code_from_record(
+                        record, field_name, slice_object
+                    )
+                translated_record[field_name] = translated_code
+
+            # Populate all `CONVERTED_CSV_FIELDS` for `record`
+            translated_record = populate_missing_fields(
+                CONVERTED_CSV_FIELDS,
+                translated_record
+            )
+
+            # Case : Removing blank `physician diagnoses` codes from
+            # `translated_record`
+            # Fetching `field_name` whose `translated_code` is `list`
+            # in `translated_record`
+            for field_name in filter(
+                lambda key: isinstance(translated_record[key], list),
+                translated_record
+            ):
+                # Removing blank, empty element from `translated_code`
+                # and reassigning new value to
+                # `translated_record[field_name]`
+                translated_record[field_name] = list(
+                    filter(len, translated_record[field_name])
+                )
+        except Exception as exc:
+            detailed_exception_info(logger=log)
+            errors.append(
+                {
+                    NAMCSErrorFieldEnum.RECORD_NUMBER.value: record_no + 1,
+                    NAMCSErrorFieldEnum.RECORD.value: record,
+                    NAMCSErrorFieldEnum.EXCEPTION.value: str(exc)
+                }
+            )
+        yield intern_record(translated_record, value_pools)
+
+
 @create_path_if_does_not_exists(ERROR_FILES_DIR_PATH)
-def get_generator_by_year(year, namcs_raw_dataset_file=None):
+def get_generator_by_year(year, namcs_raw_dataset_file=None, value_pools=None):
     """
     Method to translate raw NAMCS patient case data for a given year in human 
     readable form.
@@ -59,6 +215,10 @@ def get_generator_by_year(year, namcs_raw_dataset_file=None):
             deduced on the basis of `year` specified by user.
             Note: Local (extracted) file must exists for this method to yield
                 desired response.
+        value_pools (:class:`dict`): :class:`hdx_ahcd.helpers.pools.ValuePool`
+            by field name, see :func:`translate_records`. Pass empty pools of
+            :func:`hdx_ahcd.helpers.pools.get_value_pools` to get counters
+            once translation is complete. **Default** :const:`None`.
 
     Returns:
         :class:`generator`: Generator object containing translated
@@ -72,104 +232,110 @@ def get_generator_by_year(year, namcs_raw_dataset_file=None):
     """
     dataset_file = namcs_raw_dataset_file if namcs_raw_dataset_file is not None \
         else get_namcs_dataset_path_for_year(year)
-    # Constructing source file name on the basis of year specified
-    source_file_id = get_normalized_namcs_file_name(year)
     # Error file name to dump the rejected data set
-    error_file = os.path.join(
-        ERROR_FILES_DIR_PATH, 
-        get_customized_file_name(source_file_id, extension="err")
-    )
+    error_file = get_error_file_path(year)
 
     # Removing existing error file to avoid confusion
     if os.path.exists(error_file):
         with try_except():
             os.remove(error_file)
 
+    if value_pools is None:
+        value_pools = get_value_pools()
+
     # Check if data set file exist before processing
     if os.path.exists(dataset_file):
         with open(dataset_file, "r") as dataset_file_handler:
             errors = []
-            with try_except(TypeError, re_raise=True):
-                # Get the specific year class from module years                
-                year_class_object = vars(years).get("Year{}".format(year))
-
-            # Get the mappings from year class
-            field_mappings = year_class_object.get_field_slice_mapping()
-
-            for record_no, record in safe_read_file(dataset_file_handler):
-                translated_record = {
-                    NAMCSFieldEnum.SOURCE_FILE_ID.value: source_file_id,
-                    NAMCSFieldEnum.SOURCE_FILE_ROW.value: record_no + 1
-                }
-                try:
-                    for field_name, slice_object in field_mappings.items():
-                        # Evaluate `field_name` which is collection mappings
-                        if isinstance(slice_object, (list, tuple)):
-                            translated_code = process_multiple_slice_objects(
-                                record, field_name, slice_object
-                            )
-                        else:
-                            translated_code = get_field_code_from_record(
-                                record, field_name, slice_object
-                            )
-                        translated_record[field_name] = translated_code
-
-                    # Populate all `CONVERTED_CSV_FIELDS` for `record`
-                    translated_record = populate_missing_fields(
-                        CONVERTED_CSV_FIELDS,
-                        translated_record
-                    )
-
-                    # Case : Removing blank `physician diagnoses` codes from
-                    # `translated_record`
-                    # Fetching `field_name` whose `translated_code` is `list`
-                    # in `translated_record`
-                    for field_name in filter(
-                        lambda key: isinstance(translated_record[key], list),
-                        translated_record
-                    ):
-                        # Removing blank, empty element from `translated_code`
-                        # and reassigning new value to
-                        # `translated_record[field_name]`
-                        translated_record[field_name] = list(
-                            filter(len, translated_record[field_name])
-                        )
-                except Exception as exc:
-                    detailed_exception_info(logger=log)
-                    errors.append(
-                        {
-                            NAMCSErrorFieldEnum.RECORD_NUMBER.value:
-                                record_no + 1,
-                            NAMCSErrorFieldEnum.RECORD.value: record,
-                            NAMCSErrorFieldEnum.EXCEPTION.value: str(exc)
-                        }
-                    )
+            for translated_record in translate_records(
+                    year, safe_read_file(dataset_file_handler), errors,
+                    value_pools
+            ):
                 yield translated_record
 
+            log.info(
+                "Value pools of year: {} saved {} bytes".format(
+                    year, get_value_pools_stats(value_pools)["saved_bytes"]
+                )
+            )
+
             # Check if any records was rejected during NAMCS data set processing
             # due to erroneous field value
             if errors:
-                # TODO: Discard record or replace None value for erroneous field
-                with open(error_file, "w") as error_file_handler:
-                    # Error file headers
-                    error_file_headers = (
-                        NAMCSErrorFieldEnum.RECORD_NUMBER.value,
-                        NAMCSErrorFieldEnum.EXCEPTION.value,
-                        NAMCSErrorFieldEnum.RECORD.value
-                    )
-                    writer = csv.DictWriter(
-                        error_file_handler,
-                        delimiter = ",",
-                        fieldnames = error_file_headers
-                    )
-                    writer.writeheader()
-                    for _error in errors:
-                        writer.writerow(_error)
-                    log.info("Finished writing to error file {}".format(
-                        error_file))
+                write_error_file(error_file, errors)
+
+
+def get_csv_rows(translated_records, diagnoses_separator=None):
+    """
+    Method to get csv rows of translated records, values are in the order of
+    `CONVERTED_CSV_FIELDS`.
+
+    Parameters:
+        translated_records (:class:`iterable`): Translated NAMCS patient case
+            data.
+        diagnoses_separator (:class:`str`): Separator used to join physician
+            diagnoses codes. If not specified, diagnoses are written as
+            python list, like `['V70.00', '401.9']`. **Default** :const:`None`.
+
+    Returns:
+        :class:`generator`: Generator object containing row per translated
+        record.
+
+    Note:
+        Missing fields are written as empty value, fields not defined in
+        `CONVERTED_CSV_FIELDS` are discarded.
+    """
+    diagnoses_index = CONVERTED_CSV_FIELDS.index(
+        NAMCSFieldEnum.PHYSICIANS_DIAGNOSES.value
+    )
+    if diagnoses_separator is None:
+        for translated_record in translated_records:
+            yield tuple(map(translated_record.get, CONVERTED_CSV_FIELDS))
+        return
+
+    for translated_record in translated_records:
+        row = list(map(translated_record.get, CONVERTED_CSV_FIELDS))
+        if row[diagnoses_index]:
+            row[diagnoses_index] = \
+                diagnoses_separator.join(row[diagnoses_index])
+        yield row
+
+
+def write_csv_rows(csv_file, rows, batch_size=CSV_WRITE_BATCH_SIZE):
+    """
+    Method to write csv `rows` into `csv_file` in batches of `batch_size`
+    rows.
 
+    Parameters:
+        csv_file (:class:`file`): File handle opened for writing.
+        rows (:class:`iterable`): Rows as returned by :func:`get_csv_rows`.
+        batch_size (:class:`int`): Number of rows written at once.
+            **Default** `CSV_WRITE_BATCH_SIZE`.
 
-def export_to_csv(year, generator_object):
+    Returns:
+        :class:`int`: Number of rows written.
+    """
+    writer = csv.writer(csv_file, delimiter = ",")
+    rows = iter(rows)
+    row_count = 0
+    for batch in iter(lambda: list(islice(rows, batch_size)), []):
+        writer.writerows(batch)
+        row_count += len(batch)
+    return row_count
+
+
+def write_csv_header(csv_file):
+    """
+    Method to write header row, `CONVERTED_CSV_FIELDS`, into `csv_file`.
+
+    Parameters:
+        csv_file (:class:`file`): File handle opened for writing.
+    """
+    csv.writer(csv_file, delimiter = ",").writerow(CONVERTED_CSV_FIELDS)
+
+
+def export_to_csv(year, generator_object, export_dir=None,
+                  diagnoses_separator=None, compression=None):
     """
     Method to export the translated NAMCS patient case data into CSV file for a
     given year.
@@ -179,37 +345,294 @@ def export_to_csv(year, generator_object):
             exported to csv.
         generator_object (:class:`generator`): Generator object containing
             translated NAMCS patient case data for `year`.
+        export_dir (:class:`str`): Directory where csv file is written.
+            **Default** `NAMCS_DATA_DIR_PATH`.
+        diagnoses_separator (:class:`str`): Separator used to join physician
+            diagnoses codes, see :func:`get_csv_rows`.
+            **Default** :const:`None`.
+        compression (:class:`str`): Compression of csv file, `gzip`, `bz2`,
+            `xz`, `zstd` or `lz4`, see :func:`open_export_file`.
+            **Default** :const:`None`, csv file is not compressed.
 
     Returns:
         :class:`str`: Absolute path of exported csv file.
+
+    Raises:
+        :class:`Exception`: If records can not be translated or written,
+        existing csv file is left unchanged.
+
+    Note:
+        Csv file is written atomically, existing file is replaced only once
+        all the records are written.
     """
     # Constructing source file name on the basis of year specified
     source_file_id = get_normalized_namcs_file_name(year)
 
     # Absolute path of file where data is exported
     translated_csv_file = os.path.join(
-        NAMCS_DATA_DIR_PATH, 
+        export_dir or NAMCS_DATA_DIR_PATH,
         get_customized_file_name(
             source_file_id, CONVERTED_CSV_FILE_NAME_SUFFIX, extension="csv"
         )
     )
 
-    with try_except():
-        # Write all the translated records into CSV file
-        with open(translated_csv_file, "w") as csv_file:
-            writer = csv.DictWriter(csv_file,
-                                    delimiter = ",",
-                                    fieldnames = CONVERTED_CSV_FIELDS)
-            writer.writeheader()
-            for translated_record in generator_object:
-                writer.writerow(translated_record)
-            log.info("Finished writing to the file %s" % translated_csv_file)
+    # Write all the translated records into CSV file, exception is raised
+    # to caller so that failed year is reported
+    with open_export_file(
+            translated_csv_file, compression=compression
+    ) as csv_file:
+        write_csv_header(csv_file)
+        write_csv_rows(
+            csv_file,
+            get_csv_rows(generator_object, diagnoses_separator)
+        )
+    translated_csv_file = \
+        get_compressed_file_name(translated_csv_file, compression)
+    log.info("Finished writing to the file %s" % translated_csv_file)
 
     return os.path.realpath(translated_csv_file)
 
 
+def export_translated_data(year, generator_object,
+                           export_format=ExportFormatEnum.CSV.value,
+                           export_dir=None, compression=None,
+                           partitioned=False):
+    """
+    Method to export the translated NAMCS patient case data for a given year
+    into file of `export_format`.
+
+    Parameters:
+        year (:class:`int`): Year for which translated NAMCS data will be
+            exported.
+        generator_object (:class:`generator`): Generator object containing
+            translated NAMCS patient case data for `year`.
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+            **Default** `csv`.
+        export_dir (:class:`str`): Directory where file is written.
+            **Default** `NAMCS_DATA_DIR_PATH`.
+        compression (:class:`str`): Compression of csv file, see
+            :func:`export_to_csv`. **Default** :const:`None`.
+        partitioned (:class:`bool`): Whether to export into partitioned
+            layout, see :func:`export_to_partitioned`.
+            **Default** :const:`False`.
+
+    Returns:
+        :class:`str`: Absolute path of exported file, or year directory if
+        `partitioned`.
+
+    Raises:
+        :class:`ValueError`: If `compression` is specified for columnar
+        `export_format`.
+    """
+    if partitioned:
+        # Avoids cyclic import issue
+        from hdx_ahcd.controllers.namcs_partitioned import \
+            export_to_partitioned
+        return export_to_partitioned(
+            year, generator_object, export_format=export_format,
+            export_dir=export_dir, compression=compression
+        )
+    if export_format == ExportFormatEnum.CSV.value:
+        return export_to_csv(
+            year, generator_object, export_dir=export_dir,
+            compression=compression
+        )
+    if compression is not None:
+        raise ValueError(
+            "Compression is supported only for export format: csv"
+        )
+    return export_to_columnar(
+        year, generator_object, export_format=export_format,
+        export_dir=export_dir
+    )
+
+
+def get_export_file_path(year, export_format=ExportFormatEnum.CSV.value,
+                         export_dir=None, compression=None,
+                         partitioned=False):
+    """
+    Method to get absolute path of file translated data of `year` is
+    exported to.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+            **Default** `csv`.
+        export_dir (:class:`str`): Directory where file is written.
+            **Default** `NAMCS_DATA_DIR_PATH`.
+        compression (:class:`str`): Compression of csv file.
+            **Default** :const:`None`.
+        partitioned (:class:`bool`): Whether year is exported into
+            partitioned layout. **Default** :const:`False`.
+
+    Returns:
+        :class:`str`: Absolute path of exported file, or year directory if
+        `partitioned`.
+    """
+    export_dir = export_dir or NAMCS_DATA_DIR_PATH
+    if partitioned:
+        # Avoids cyclic import issue
+        from hdx_ahcd.controllers.namcs_partitioned import \
+            get_partitioned_year_dir
+        return get_partitioned_year_dir(year, export_dir)
+    if export_format != ExportFormatEnum.CSV.value:
+        return get_columnar_file_path(year, export_format, export_dir)
+    return get_compressed_file_name(
+        os.path.join(
+            export_dir,
+            get_customized_file_name(
+                get_normalized_namcs_file_name(year),
+                CONVERTED_CSV_FILE_NAME_SUFFIX,
+                extension="csv"
+            )
+        ),
+        compression
+    )
+
+
+def get_year_export_fingerprint(year, dataset_file, export_file,
+                                export_format=ExportFormatEnum.CSV.value,
+                                compression=None, partitioned=False):
+    """
+    Method to get fingerprint of export of `year`, see
+    :func:`get_export_fingerprint`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+        export_file (:class:`str`): Absolute path of exported file.
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+        compression (:class:`str`): Compression of csv file.
+        partitioned (:class:`bool`): Whether year is exported into
+            partitioned layout.
+
+    Returns:
+        :class:`dict`: Fingerprint of export, :const:`None` if `dataset_file`
+        does not exist.
+    """
+    if dataset_file is None or not os.path.exists(dataset_file):
+        return None
+    export_options = {
+        "export_format": export_format,
+        "compression": compression,
+    }
+    if partitioned:
+        export_options["partitioned"] = True
+    return get_export_fingerprint(
+        year, dataset_file, export_file, export_options=export_options
+    )
+
+
+def export_year_if_outdated(year, generator_object, dataset_file,
+                            export_format=ExportFormatEnum.CSV.value,
+                            export_dir=None, compression=None,
+                            force_export=False, sinks=None,
+                            partitioned=False):
+    """
+    Method to export translated NAMCS data of `year`, unless exported file is
+    up to date with `dataset_file`, year layout, converter version and export
+    options. Records are decoded once for export and `sinks`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        generator_object (:class:`generator`): Generator object containing
+            translated NAMCS patient case data for `year`, not consumed if
+            export is up to date and there are no `sinks`.
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+            **Default** `csv`.
+        export_dir (:class:`str`): Directory where file is written.
+            **Default** `NAMCS_DATA_DIR_PATH`.
+        compression (:class:`str`): Compression of csv file.
+            **Default** :const:`None`.
+        force_export (:class:`bool`): Whether to export even if exported file
+            is up to date. **Default** :const:`False`.
+        sinks (:class:`list`): Objects of
+            :class:`hdx_ahcd.controllers.namcs_sinks.RecordSink` fed along
+            with export, even if export is skipped.
+            **Default** :const:`None`.
+        partitioned (:class:`bool`): Whether to export into partitioned
+            layout. **Default** :const:`False`.
+
+    Returns:
+        :class:`dict`: Absolute path of exported file as `file_name`,
+        `up_to_date`, True if export was skipped, and result of `sinks` by
+        name as `sinks`.
+    """
+    # Avoids cyclic import issue
+    from hdx_ahcd.controllers.namcs_sinks import get_export_sink
+
+    export_dir = export_dir or NAMCS_DATA_DIR_PATH
+    export_file = get_export_file_path(
+        year, export_format, export_dir, compression, partitioned
+    )
+    fingerprint = get_year_export_fingerprint(
+        year, dataset_file, export_file, export_format, compression,
+        partitioned
+    )
+    if fingerprint is not None and not force_export and \
+            is_export_up_to_date(export_file, fingerprint):
+        log.info(
+            "Skipping export of year: {}, {} is up to date".format(
+                year, export_file
+            )
+        )
+        export_result = {
+            "file_name": os.path.realpath(export_file), "up_to_date": True
+        }
+        if sinks:
+            export_result["sinks"] = get_sink_results(
+                year, generator_object, sinks
+            )
+        return export_result
+
+    # Export is just another sink, fed in the same pass as `sinks`
+    sinks = [
+        get_export_sink(export_format, export_dir, compression, partitioned)
+    ] + list(sinks or [])
+    with ExitStack() as exit_stack:
+        if fingerprint is not None:
+            exit_stack.enter_context(
+                record_fingerprint(export_file, fingerprint)
+            )
+        sink_results = get_sink_results(year, generator_object, sinks)
+    export_result = {
+        "file_name": sink_results.pop(sinks[0].name), "up_to_date": False
+    }
+    if len(sinks) > 1:
+        export_result["sinks"] = sink_results
+    return export_result
+
+
+def get_sink_results(year, generator_object, sinks):
+    """
+    Method to hand translated records of `year` to `sinks` in a single pass,
+    see :func:`hdx_ahcd.controllers.namcs_sinks.fan_out`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        generator_object (:class:`generator`): Generator object containing
+            translated NAMCS patient case data for `year`.
+        sinks (:class:`list`): Objects of
+            :class:`hdx_ahcd.controllers.namcs_sinks.RecordSink`.
+
+    Returns:
+        :class:`dict`: Result of every sink by name of sink.
+    """
+    # Avoids cyclic import issue
+    from hdx_ahcd.controllers.namcs_sinks import fan_out
+    return dict(zip(
+        [sink.name for sink in sinks],
+        fan_out(year, generator_object, sinks)
+    ))
+
+
 def get_year_wise_generator(year=None, namcs_raw_dataset_file=None,
-                            do_export = False):
+                            do_export = False, workers=None,
+                            export_format=ExportFormatEnum.CSV.value,
+                            compression=None, force_export=False, sinks=None,
+                            partitioned=False, use_cache=False,
+                            use_memory_cache=False, where=None):
     """
     Method to translated NAMCS data for `year` and/or `namcs_dataset_file`
     into human readable form,
@@ -226,32 +649,142 @@ def get_year_wise_generator(year=None, namcs_raw_dataset_file=None,
             desired response.
         do_export (:class:`bool`): Indicates whether to export translated NAMCS
             data to csv file.**Default** :const:`False`.
+        workers (:class:`int`): Number of worker processes used to translate
+            and export years in parallel, used only when `do_export` is True.
+            **Default** :const:`None`, years are exported one by one.
+        export_format (:class:`str`): File format translated data is
+            exported to, `csv`, `arrow` or `parquet`. **Default** `csv`.
+        compression (:class:`str`): Compression of exported csv file, `gzip`,
+            `bz2`, `xz`, `zstd` or `lz4`. **Default** :const:`None`.
+        force_export (:class:`bool`): Whether to export years whose exported
+            file is up to date. **Default** :const:`False`.
+        sinks (:class:`list`): Objects of
+            :class:`hdx_ahcd.controllers.namcs_sinks.RecordSink`, like
+            statistics or callback, fed in the same pass over translated
+            records as export. **Default** :const:`None`.
+        partitioned (:class:`bool`): Whether to export into Hive style
+            partitioned layout, a directory per year and month of visit,
+            see :func:`export_to_partitioned`. **Default** :const:`False`.
+        use_cache (:class:`bool`): Whether to read translated records from
+            persistent cache of decoded years, written on first full
+            iteration of year, see
+            :func:`hdx_ahcd.controllers.namcs_cache.get_cached_generator_by_year`.
+            **Default** :const:`False`.
+        use_memory_cache (:class:`bool`): Whether to keep translated years in
+            in-process cache within memory budget, see
+            :func:`hdx_ahcd.controllers.namcs_cache.get_memory_cached_generator_by_year`.
+            **Default** :const:`False`.
+        where (:class:`dict` or :class:`list`): Values of low cardinality
+            fields, like `{"sex": "Female", "month_of_visit": (1, 2, 3)}`,
+            records must match. Matching records are selected by bitmap
+            index of year and only they are translated, see
+            :func:`hdx_ahcd.controllers.namcs_bitmap.validate_where`. Caches
+            are not used with `where`. **Default** :const:`None`, all the
+            records.
 
     Returns:
         :class:`defaultdict`: Dictionary containing generator of translated
         NAMCS patient case data for given year along with source file info.
         Further if `do_export` is True, it returns the absolute path of csv
-        file where the data is exported.
+        file where the data is exported. With `workers`, it also returns
+        export statistics, or error if export failed, for each year.
+        `up_to_date` is True for years whose export was skipped. Result of
+        `sinks` is returned by name of sink as `sinks`. Returned generator is
+        not consumed by export, iterating it translates the year again.
+
+    Raises:
+        :class:`ValueError`: If `sinks` are specified along with `workers`,
+        `where` is specified along with `do_export` or `where` is invalid.
     """
     year_wise_translated_data = defaultdict(dict)
 
     # If `year` not specified, translate data for all years `YEARS_AVAILABLE`
     year = YEARS_AVAILABLE if year is None else get_iterable(year)
 
+    generator_method = get_generator_by_year
+    if use_cache:
+        # Avoids cyclic import issue
+        from hdx_ahcd.controllers.namcs_cache import \
+            get_cached_generator_by_year as generator_method
+    if use_memory_cache:
+        # Avoids cyclic import issue
+        from hdx_ahcd.controllers.namcs_cache import \
+            get_memory_cached_generator_by_year
+        generator_method = partial(
+            get_memory_cached_generator_by_year,
+            generator_method=generator_method
+        )
+    if where is not None:
+        if do_export:
+            raise ValueError(
+                "Filter `where` is not supported with export, years are "
+                "exported in full"
+            )
+        # Avoids cyclic import issue
+        from hdx_ahcd.controllers.namcs_bitmap import (
+            get_filtered_generator_by_year,
+            validate_where,
+        )
+        validate_where(where)
+        generator_method = partial(get_filtered_generator_by_year, where=where)
+
+    # Translate and export years in parallel worker processes
+    if do_export and workers is not None and workers > 1:
+        if sinks:
+            raise ValueError(
+                "Sinks are not supported with workers, records are "
+                "translated in worker processes"
+            )
+        # Avoids cyclic import issue
+        from hdx_ahcd.controllers.namcs_parallel import export_years_in_parallel
+        year_wise_export_result = export_years_in_parallel(
+            year, namcs_raw_dataset_file, workers=workers,
+            export_dir=NAMCS_DATA_DIR_PATH, export_format=export_format,
+            compression=compression, force_export=force_export,
+            partitioned=partitioned
+        )
+        for _year in map(int, year):
+            year_wise_translated_data[_year]["generator"] = \
+                generator_method(_year, namcs_raw_dataset_file)
+            year_wise_translated_data[_year]["source_file_info"] = \
+                get_namcs_source_file_info(_year)
+            year_wise_translated_data[_year].update(
+                year_wise_export_result.get(_year, {})
+            )
+        return year_wise_translated_data
+
     # Using integer value for `year`
     for _year in map(int, year):
         year_wise_translated_data[_year]["generator"] = \
-            get_generator_by_year(_year, namcs_raw_dataset_file)
+            generator_method(_year, namcs_raw_dataset_file)
         # NAMCS dataset source file info
         year_wise_translated_data[_year]["source_file_info"] = \
             get_namcs_source_file_info(_year)
-        # Export translated data to csv file
-        if do_export:
-            # Using :func:`tee` of module `itertools` to have copy of generator.
-            gen_object = tee(
-                year_wise_translated_data.get(_year).get("generator"), 1
-            )[0]
-            year_wise_translated_data[_year]["file_name"] = \
-                export_to_csv(_year, gen_object)
+        if not (do_export or sinks):
+            continue
+
+        # Export translated data to file of `export_format` and feed `sinks`
+        # in a single pass, returned generator is left unconsumed
+        gen_object = generator_method(_year, namcs_raw_dataset_file)
+        try:
+            if do_export:
+                year_wise_translated_data[_year].update(
+                    export_year_if_outdated(
+                        _year, gen_object,
+                        namcs_raw_dataset_file or
+                        get_namcs_dataset_path_for_year(_year),
+                        export_format=export_format,
+                        compression=compression,
+                        force_export=force_export,
+                        sinks=sinks,
+                        partitioned=partitioned
+                    )
+                )
+            else:
+                year_wise_translated_data[_year]["sinks"] = \
+                    get_sink_results(_year, gen_object, sinks)
+        except Exception as exc:
+            detailed_exception_info(logger=log)
+            year_wise_translated_data[_year]["error"] = str(exc)
 
     return year_wise_translated_data
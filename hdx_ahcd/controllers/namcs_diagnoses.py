@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing methods to export physician diagnoses of translated NAMCS
+patient case data in long format, a row per diagnosis of every visit with
+`DIAGNOSES_CSV_FIELDS` as columns. Unlike converted csv file, where
+diagnoses of a visit are written as python list in a single value,
+diagnoses can be joined with ICD-9 tables or grouped without parsing.
+
+Note:
+    Diagnoses are exported as csv, or as Arrow IPC or Parquet file if
+    3rd party package `pyarrow` is installed.
+"""
+# Python modules
+from contextlib import ExitStack
+import csv
+import os
+import uuid
+
+# Other modules
+from hdx_ahcd.controllers.namcs_columnar import (
+    get_columnar_writer,
+    validate_columnar_export_format,
+)
+from hdx_ahcd.controllers.namcs_sinks import (
+    fan_out,
+    RecordSink,
+)
+from hdx_ahcd.helpers.compression import (
+    get_compressed_file_name,
+    open_export_file,
+)
+from hdx_ahcd.helpers.functions import (
+    get_customized_file_name,
+    get_normalized_namcs_file_name,
+)
+from hdx_ahcd.namcs.config import (
+    DIAGNOSES_CSV_FIELDS,
+    DIAGNOSES_FILE_NAME_SUFFIX,
+    log,
+    NAMCS_DATA_DIR_PATH,
+)
+from hdx_ahcd.namcs.enums import (
+    ExportFormatEnum,
+    NAMCSFieldEnum,
+)
+
+# 3rd party modules
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+# Global vars
+# -N/A
+
+
+def get_diagnoses_file_path(year, export_format=ExportFormatEnum.CSV.value,
+                            export_dir=None, compression=None):
+    """
+    Method to get absolute path of diagnoses file of `year`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+            **Default** `csv`.
+        export_dir (:class:`str`): Directory where file is written.
+            **Default** `NAMCS_DATA_DIR_PATH`.
+        compression (:class:`str`): Compression of csv file.
+            **Default** :const:`None`.
+
+    Returns:
+        :class:`str`: Absolute path of diagnoses file, like
+        `2000_NAMCS_DIAGNOSES.csv`.
+    """
+    return get_compressed_file_name(
+        os.path.join(
+            export_dir or NAMCS_DATA_DIR_PATH,
+            get_customized_file_name(
+                get_normalized_namcs_file_name(year),
+                DIAGNOSES_FILE_NAME_SUFFIX,
+                extension=export_format
+            )
+        ),
+        compression
+    )
+
+
+def get_diagnoses_rows(translated_records):
+    """
+    Method to get a row per physician diagnosis of translated records,
+    values are in the order of `DIAGNOSES_CSV_FIELDS`.
+
+    Parameters:
+        translated_records (:class:`iterable`): Translated NAMCS patient case
+            data.
+
+    Returns:
+        :class:`generator`: Generator object containing row per diagnosis.
+
+    Note:
+        `position` is 1 based position of diagnosis among diagnoses of the
+        visit, same as `position` of table `visit_diagnosis`, see
+        :mod:`hdx_ahcd.controllers.namcs_sqlite`. Visits without diagnosis
+        have no row.
+    """
+    for translated_record in translated_records:
+        source_file_id = translated_record.get(
+            NAMCSFieldEnum.SOURCE_FILE_ID.value
+        )
+        source_file_row = translated_record.get(
+            NAMCSFieldEnum.SOURCE_FILE_ROW.value
+        )
+        visit_weight = translated_record.get(NAMCSFieldEnum.VISIT_WEIGHT.value)
+        for position, diagnosis in enumerate(
+                translated_record.get(
+                    NAMCSFieldEnum.PHYSICIANS_DIAGNOSES.value
+                ) or (), 1
+        ):
+            yield (
+                source_file_id, source_file_row, position, diagnosis,
+                visit_weight
+            )
+
+
+def get_diagnoses_schema():
+    """
+    Method to get schema of columnar diagnoses export, columns are in the
+    order of `DIAGNOSES_CSV_FIELDS`.
+
+    Returns:
+        :class:`pyarrow.Schema`: Schema of exported diagnoses.
+
+    Note:
+        Diagnosis is plain string column, as Arrow IPC file does not allow
+        dictionary of a column to change between record batches. Parquet
+        writer dictionary encodes string columns on its own.
+    """
+    return pyarrow.schema(
+        list(zip(
+            DIAGNOSES_CSV_FIELDS,
+            (
+                pyarrow.string(), pyarrow.int32(), pyarrow.int8(),
+                pyarrow.string(), pyarrow.float64()
+            )
+        ))
+    )
+
+
+def get_diagnoses_record_batch(rows, schema):
+    """
+    Method to convert diagnoses rows into typed record batch.
+
+    Parameters:
+        rows (:class:`list`): Non empty list of rows, see
+            :func:`get_diagnoses_rows`.
+        schema (:class:`pyarrow.Schema`): Schema of record batch.
+
+    Returns:
+        :class:`pyarrow.RecordBatch`: Record batch with column per field of
+        `schema`.
+    """
+    return pyarrow.RecordBatch.from_arrays(
+        [
+            pyarrow.array(column, type=field.type)
+            for column, field in zip(zip(*rows), schema)
+        ],
+        schema=schema
+    )
+
+
+class DiagnosesSink(RecordSink):
+    """
+    Sink writing physician diagnoses of translated records in long format,
+    see :mod:`hdx_ahcd.controllers.namcs_sinks`. Along with export sink,
+    converted file and diagnoses file are written from a single pass.
+    """
+    name = "diagnoses"
+
+    def __init__(self, export_format=ExportFormatEnum.CSV.value,
+                 export_dir=None, compression=None):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+                **Default** `csv`.
+            export_dir (:class:`str`): Directory where file is written.
+                **Default** `NAMCS_DATA_DIR_PATH`.
+            compression (:class:`str`): Compression of csv file.
+                **Default** :const:`None`.
+
+        Raises:
+            :class:`ImportError`: If `pyarrow` is not installed for columnar
+            `export_format`.
+            :class:`ValueError`: If `compression` is specified for columnar
+            `export_format`.
+        """
+        if export_format != ExportFormatEnum.CSV.value:
+            if compression is not None:
+                raise ValueError(
+                    "Compression is supported only for export format: csv"
+                )
+            validate_columnar_export_format(export_format)
+        self.export_format = export_format
+        self.export_dir = export_dir
+        self.compression = compression
+
+    def open(self, year):
+        super().open(year)
+        self.file_name = get_diagnoses_file_path(
+            year, self.export_format, self.export_dir, self.compression
+        )
+        self.exit_stack = ExitStack()
+        if self.export_format == ExportFormatEnum.CSV.value:
+            csv_file = self.exit_stack.enter_context(
+                open_export_file(
+                    get_diagnoses_file_path(
+                        year, export_dir=self.export_dir
+                    ),
+                    compression=self.compression
+                )
+            )
+            writer = csv.writer(csv_file, delimiter=",")
+            writer.writerow(DIAGNOSES_CSV_FIELDS)
+            self.write_rows = writer.writerows
+        else:
+            schema = get_diagnoses_schema()
+            # Written atomically as csv file, see
+            # :func:`hdx_ahcd.helpers.compression.open_export_file`
+            self.temporary_file_name = os.path.join(
+                os.path.dirname(self.file_name),
+                ".{}.{}.tmp".format(
+                    os.path.basename(self.file_name), uuid.uuid4().hex
+                )
+            )
+            writer, write_batch = get_columnar_writer(
+                self.temporary_file_name, self.export_format, schema
+            )
+            self.exit_stack.callback(writer.close)
+            self.write_rows = lambda rows: write_batch(
+                get_diagnoses_record_batch(rows, schema)
+            )
+        self.rows = 0
+
+    def write(self, translated_records):
+        rows = list(get_diagnoses_rows(translated_records))
+        if rows:
+            self.write_rows(rows)
+            self.rows += len(rows)
+
+    def close(self):
+        try:
+            self.exit_stack.close()
+            if self.export_format != ExportFormatEnum.CSV.value:
+                os.replace(self.temporary_file_name, self.file_name)
+        except BaseException as exc:
+            self.abort(exc)
+            raise
+        log.info(
+            "Finished writing {} diagnoses to the file {}".format(
+                self.rows, self.file_name
+            )
+        )
+        return os.path.realpath(self.file_name)
+
+    def abort(self, exc):
+        # Temporary file is removed, existing file is kept
+        self.exit_stack.__exit__(type(exc), exc, exc.__traceback__)
+        if self.export_format != ExportFormatEnum.CSV.value and \
+                os.path.exists(self.temporary_file_name):
+            os.remove(self.temporary_file_name)
+
+
+def export_diagnoses(year, generator_object,
+                     export_format=ExportFormatEnum.CSV.value,
+                     export_dir=None, compression=None):
+    """
+    Method to export physician diagnoses of translated NAMCS patient case
+    data for a given year in long format.
+
+    Parameters:
+        year (:class:`int`): Year for which diagnoses will be exported.
+        generator_object (:class:`generator`): Generator object containing
+            translated NAMCS patient case data for `year`.
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+            **Default** `csv`.
+        export_dir (:class:`str`): Directory where file is written.
+            **Default** `NAMCS_DATA_DIR_PATH`.
+        compression (:class:`str`): Compression of csv file.
+            **Default** :const:`None`.
+
+    Returns:
+        :class:`str`: Absolute path of exported file.
+    """
+    return fan_out(
+        year, generator_object,
+        [
+            DiagnosesSink(
+                export_format=export_format, export_dir=export_dir,
+                compression=compression
+            )
+        ]
+    )[0]
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing dictionary encoding of physician diagnoses. ICD-9 codes of
+all the years are mapped to stable int32 ids by a single dictionary,
+persisted in `NAMCS_DATA_DIR_PATH`, so that diagnoses can be grouped,
+joined and counted by integer instead of by string.
+
+Dictionary file holds a code per line, line number being id of the code.
+New codes are only appended, ids assigned once never change. Ids are
+assigned under a lock of dictionary file, after reloading codes appended by
+other processes, hence processes sharing a dictionary file assign same ids,
+see :func:`DiagnosisDictionary.encode`. Within a process a single dictionary
+is shared by path, see :func:`get_diagnosis_dictionary`.
+"""
+# Python modules
+from array import array
+import hashlib
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Other modules
+from hdx_ahcd.namcs.config import (
+    DIAGNOSIS_DICTIONARY_FILE_NAME,
+    log,
+    NAMCS_DATA_DIR_PATH,
+)
+from hdx_ahcd.namcs.enums import NAMCSFieldEnum
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# Type code of :class:`array.array` holding ids and offsets, int32
+ID_TYPE_CODE = "i"
+# Dictionaries shared within process, by absolute path of dictionary file
+diagnosis_dictionaries = {}
+diagnosis_dictionaries_lock = threading.Lock()
+
+
+def get_diagnosis_dictionary_path(data_dir=None):
+    """
+    Method to get absolute path of diagnosis dictionary file.
+
+    Parameters:
+        data_dir (:class:`str`): Directory holding dictionary file.
+            **Default** `NAMCS_DATA_DIR_PATH`.
+
+    Returns:
+        :class:`str`: Absolute path of diagnosis dictionary file.
+    """
+    return os.path.join(
+        data_dir or NAMCS_DATA_DIR_PATH, DIAGNOSIS_DICTIONARY_FILE_NAME
+    )
+
+
+def read_diagnosis_codes(file_name):
+    """
+    Method to read codes of diagnosis dictionary file.
+
+    Parameters:
+        file_name (:class:`str`): Absolute path of dictionary file.
+
+    Returns:
+        :class:`list`: Codes in the order of their ids, empty if file does
+        not exist.
+    """
+    if not os.path.exists(file_name):
+        return []
+    with open(file_name, "r", newline="\n") as file_handle:
+        return file_handle.read().splitlines()
+
+
+def get_diagnosis_dictionary(file_name=None):
+    """
+    Method to get dictionary of `file_name` shared within process, so that
+    caches and exports of different years consumed at the same time assign
+    ids through one dictionary. Dictionary is loaded again if its file was
+    removed or replaced by a shorter one, like when cache directory is
+    cleared.
+
+    Parameters:
+        file_name (:class:`str`): Absolute path of dictionary file.
+            **Default** `DIAGNOSIS_DICTIONARY_FILE_NAME` in
+            `NAMCS_DATA_DIR_PATH`.
+
+    Returns:
+        :class:`DiagnosisDictionary`: Shared dictionary.
+    """
+    file_name = os.path.abspath(file_name or get_diagnosis_dictionary_path())
+    with diagnosis_dictionaries_lock:
+        diagnosis_dictionary = diagnosis_dictionaries.get(file_name)
+        file_size = os.path.getsize(file_name) \
+            if os.path.exists(file_name) else 0
+        if diagnosis_dictionary is None or \
+                file_size < diagnosis_dictionary.file_size:
+            diagnosis_dictionary = diagnosis_dictionaries[file_name] = \
+                DiagnosisDictionary(file_name)
+        return diagnosis_dictionary
+
+
+class DiagnosisDictionary(object):
+    """
+    Dictionary mapping ICD-9 codes to int32 ids, assigned in the order codes
+    are seen. Codes not in dictionary are appended to dictionary file as
+    soon as they are added on :func:`encode`.
+    """
+    def __init__(self, file_name=None):
+        """
+        Method to construct new object of class, loading codes of
+        `file_name` if it exists.
+
+        Parameters:
+            file_name (:class:`str`): Absolute path of dictionary file.
+                **Default** `DIAGNOSIS_DICTIONARY_FILE_NAME` in
+                `NAMCS_DATA_DIR_PATH`.
+        """
+        self.file_name = file_name or get_diagnosis_dictionary_path()
+        self.codes = []
+        self.ids = {}
+        # Number of bytes of dictionary file loaded
+        self.file_size = 0
+        self.lock = threading.Lock()
+        with self.lock:
+            self.reload()
+
+    def __len__(self):
+        return len(self.codes)
+
+    def reload(self):
+        """
+        Method to load codes appended to dictionary file by other processes
+        since it was last read. Caller must hold `lock`.
+
+        Raises:
+            :class:`RuntimeError`: If dictionary file is shorter than codes
+            already loaded, ids loaded can not be trusted.
+        """
+        if not os.path.exists(self.file_name):
+            if self.file_size:
+                raise RuntimeError(
+                    "Diagnosis dictionary {} is removed, reload "
+                    "dictionary".format(self.file_name)
+                )
+            return
+        with open(self.file_name, "rb") as file_handle:
+            file_handle.seek(0, os.SEEK_END)
+            if file_handle.tell() < self.file_size:
+                raise RuntimeError(
+                    "Diagnosis dictionary {} is truncated, reload "
+                    "dictionary".format(self.file_name)
+                )
+            file_handle.seek(self.file_size)
+            data = file_handle.read()
+        # Ignore partially written line
+        data = data[:data.rfind(b"\n") + 1]
+        for code in data.decode("utf-8").splitlines():
+            if code not in self.ids:
+                self.ids[code] = len(self.codes)
+            self.codes.append(code)
+        self.file_size += len(data)
+
+    def add_codes(self, codes):
+        """
+        Method to add new `codes`, under exclusive lock of dictionary file.
+        Codes appended by other processes are loaded first, codes still new
+        are appended to dictionary file. Lock is not taken on platforms
+        without :mod:`fcntl`.
+
+        Parameters:
+            codes (:class:`list`): ICD-9 codes.
+        """
+        with self.lock:
+            os.makedirs(os.path.dirname(self.file_name), exist_ok=True)
+            with open(self.file_name, "ab") as file_handle:
+                # Exclusive lock across processes, released on close once
+                # codes are written
+                if fcntl is not None:
+                    fcntl.flock(file_handle.fileno(), fcntl.LOCK_EX)
+                self.reload()
+                new_codes = [
+                    code for code in dict.fromkeys(codes)
+                    if code not in self.ids
+                ]
+                if not new_codes:
+                    return
+                data = "".join(
+                    "{}\n".format(code) for code in new_codes
+                ).encode("utf-8")
+                file_handle.write(data)
+            for code in new_codes:
+                self.ids[code] = len(self.codes)
+                self.codes.append(code)
+            self.file_size += len(data)
+            log.debug(
+                "Added {} codes to diagnosis dictionary {}".format(
+                    len(new_codes), self.file_name
+                )
+            )
+
+    def encode(self, code):
+        """
+        Method to get id of `code`, adding `code` if it is new.
+
+        Parameters:
+            code (:class:`str`): ICD-9 code.
+
+        Returns:
+            :class:`int`: Id of `code`.
+        """
+        _id = self.ids.get(code)
+        if _id is None:
+            self.add_codes([code])
+            _id = self.ids[code]
+        return _id
+
+    def encode_list(self, codes):
+        """
+        Method to get ids of `codes`, new codes are added at once.
+
+        Parameters:
+            codes (:class:`list`): ICD-9 codes.
+
+        Returns:
+            :class:`list`: Ids, in the order of `codes`.
+        """
+        ids = self.ids
+        codes = list(codes)
+        new_codes = [code for code in codes if code not in ids]
+        if new_codes:
+            self.add_codes(new_codes)
+        return [ids[code] for code in codes]
+
+    def decode(self, _id):
+        """
+        Method to get code of `_id`.
+
+        Parameters:
+            _id (:class:`int`): Id of code.
+
+        Returns:
+            :class:`str`: ICD-9 code.
+        """
+        return self.codes[_id]
+
+    def decode_list(self, ids):
+        """
+        Method to get codes of `ids`.
+
+        Parameters:
+            ids (:class:`list`): Ids of codes.
+
+        Returns:
+            :class:`list`: ICD-9 codes, in the order of `ids`.
+        """
+        codes = self.codes
+        return [codes[_id] for _id in ids]
+
+    def get_digest(self, size=None):
+        """
+        Method to get digest of first `size` codes, data encoded with those
+        codes is decoded correctly as long as digest is unchanged.
+
+        Parameters:
+            size (:class:`int`): Number of codes. **Default** all the codes.
+
+        Returns:
+            :class:`dict`: Number of codes digested as `size` and their hash
+            as `sha256`.
+        """
+        codes = self.codes[:size] if size is not None else list(self.codes)
+        return {
+            "size": len(codes),
+            "sha256": hashlib.sha256(
+                "\n".join(codes).encode("utf-8")
+            ).hexdigest(),
+        }
+
+    def save(self):
+        """
+        Method kept for callers persisting dictionary once done, codes are
+        already appended to dictionary file when added, see
+        :func:`add_codes`. Codes appended by other processes are loaded.
+        """
+        with self.lock:
+            self.reload()
+
+
+def encode_diagnoses(translated_records, diagnosis_dictionary):
+    """
+    Method to encode physician diagnoses of `translated_records` as int32
+    ids with offsets, ids of record `n` are
+    `ids[offsets[n]:offsets[n + 1]]`.
+
+    Parameters:
+        translated_records (:class:`iterable`): Translated NAMCS patient case
+            data.
+        diagnosis_dictionary (:class:`DiagnosisDictionary`): Dictionary of
+            codes.
+
+    Returns:
+        :class:`tuple`: With elements as:
+            :class:`array.array`: Offsets, one more than number of records.
+            :class:`array.array`: Ids of diagnoses of all the records.
+
+    Usage:
+        >>> offsets, ids = encode_diagnoses(
+        ...     get_generator_by_year(2000), DiagnosisDictionary()
+        ... )
+        >>> diagnoses_count = Counter(ids)
+    """
+    offsets = array(ID_TYPE_CODE, [0])
+    ids = array(ID_TYPE_CODE)
+    for translated_record in translated_records:
+        ids.extend(
+            diagnosis_dictionary.encode_list(
+                translated_record.get(
+                    NAMCSFieldEnum.PHYSICIANS_DIAGNOSES.value
+                ) or ()
+            )
+        )
+        offsets.append(len(ids))
+    return offsets, ids
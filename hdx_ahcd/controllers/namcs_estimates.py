@@ -0,0 +1,484 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing aggregation of translated NAMCS patient case data into
+national estimates. Patient visit weights are summed by groups, like gender
+and age group, in a single pass over every year without materializing
+records.
+
+Group is a combination of values of dimensions, dimension being either a
+field of translated record, like `sex` or `month_of_visit`, or derived
+from it, see :class:`EstimateDimensionEnum`. Diagnosis dimensions are
+multi valued, a visit is counted once in every diagnosis group it belongs to.
+
+Years whose persistent cache is up to date, see
+:mod:`hdx_ahcd.controllers.namcs_cache`, are aggregated column wise with
+`pyarrow`, other years are streamed record by record.
+"""
+# Python modules
+from bisect import bisect_right
+from collections import Counter
+from functools import reduce
+from itertools import product
+
+# Other modules
+from hdx_ahcd.controllers.namcs_cache import (
+    get_cached_generator_by_year,
+    get_cached_table,
+)
+from hdx_ahcd.controllers.namcs_converter import get_generator_by_year
+from hdx_ahcd.controllers.namcs_sinks import (
+    fan_out,
+    RecordSink,
+)
+from hdx_ahcd.helpers.functions import (
+    get_iterable,
+    get_namcs_dataset_path_for_year,
+)
+from hdx_ahcd.namcs.config import (
+    CONVERTED_CSV_FIELDS,
+    ESTIMATE_AGE_BUCKETS,
+    log,
+    YEARS_AVAILABLE,
+)
+from hdx_ahcd.namcs.enums import (
+    EstimateDimensionEnum,
+    EstimateMeasureEnum,
+    NAMCSFieldEnum,
+)
+
+# 3rd party modules
+try:
+    import pyarrow
+    import pyarrow.compute
+except ImportError:
+    pyarrow = None
+
+# Global vars
+# Fields of translated record which can not be used as dimension
+NON_DIMENSION_FIELDS = (
+    NAMCSFieldEnum.SOURCE_FILE_ROW.value,
+    NAMCSFieldEnum.PHYSICIANS_DIAGNOSES.value,
+    NAMCSFieldEnum.VISIT_WEIGHT.value,
+)
+
+# Number of days in a year used to convert patient age into years, ages
+# derived from dates of birth are not shorter than 365 days a year
+DAYS_IN_YEAR = 365
+
+
+def get_age_bucket_labels():
+    """
+    Method to get labels of age groups of `ESTIMATE_AGE_BUCKETS`.
+
+    Returns:
+        :class:`list`: Labels, like `Under 15`, `15-24` and `75 and over`.
+    """
+    labels = []
+    for index, lower_bound in enumerate(ESTIMATE_AGE_BUCKETS):
+        if index == len(ESTIMATE_AGE_BUCKETS) - 1:
+            labels.append("{} and over".format(lower_bound))
+        elif index == 0 and lower_bound == 0:
+            labels.append("Under {}".format(ESTIMATE_AGE_BUCKETS[1]))
+        else:
+            labels.append("{}-{}".format(
+                lower_bound, ESTIMATE_AGE_BUCKETS[index + 1] - 1
+            ))
+    return labels
+
+
+def get_age_bucket(age, labels=None):
+    """
+    Method to get age group of patient age.
+
+    Parameters:
+        age (:class:`float`): Patient's age in days.
+        labels (:class:`list`): Labels of age groups.
+            **Default** :func:`get_age_bucket_labels`.
+
+    Returns:
+        :class:`str`: Label of age group, :const:`None` if age is unknown.
+
+    Example:
+        >>> get_age_bucket(13140.0)
+        '25-44'
+    """
+    if age is None:
+        return None
+    index = bisect_right(ESTIMATE_AGE_BUCKETS, age / DAYS_IN_YEAR) - 1
+    return (labels or get_age_bucket_labels())[index] if index >= 0 else None
+
+
+def get_diagnosis_category(diagnosis):
+    """
+    Method to get 3 digit ICD-9 category of physician diagnosis.
+
+    Parameters:
+        diagnosis (:class:`str`): ICD-9 code, like `401.9` or `V70.00`.
+
+    Returns:
+        :class:`str`: Category, like `401` or `V70`. Codes without category,
+        like `AHCD.LBBS`, are returned as it is.
+    """
+    if diagnosis.startswith("AHCD."):
+        return diagnosis
+    return diagnosis.split(".", 1)[0]
+
+
+def validate_estimate_options(group_by, measure):
+    """
+    Method to check if estimates can be computed for `group_by` and
+    `measure`.
+
+    Parameters:
+        group_by (:class:`tuple`): Dimensions.
+        measure (:class:`str`): Value of :class:`EstimateMeasureEnum`.
+
+    Raises:
+        :class:`ValueError`: If any of dimensions or measure is unknown.
+    """
+    dimensions = [
+        field_name for field_name in CONVERTED_CSV_FIELDS
+        if field_name not in NON_DIMENSION_FIELDS
+    ] + [dimension.value for dimension in EstimateDimensionEnum]
+    for dimension in group_by:
+        if dimension not in dimensions:
+            raise ValueError(
+                "Dimension: {} is not one of {}".format(
+                    dimension, ", ".join(dimensions)
+                )
+            )
+    if measure not in [_measure.value for _measure in EstimateMeasureEnum]:
+        raise ValueError("Measure: {} is not supported".format(measure))
+
+
+def get_dimension_values_method(dimension):
+    """
+    Method to get method returning values of `dimension` for a translated
+    record.
+
+    Parameters:
+        dimension (:class:`str`): Field name or value of
+            :class:`EstimateDimensionEnum`.
+
+    Returns:
+        :class:`function`: Method returning :class:`tuple` of values,
+        distinct diagnoses for diagnosis dimensions and a single value
+        otherwise.
+    """
+    diagnoses_field = NAMCSFieldEnum.PHYSICIANS_DIAGNOSES.value
+    if dimension == EstimateDimensionEnum.AGE_BUCKET.value:
+        labels = get_age_bucket_labels()
+
+        def _get_values(translated_record):
+            return get_age_bucket(
+                translated_record.get(NAMCSFieldEnum.PATIENT_AGE.value),
+                labels
+            ),
+    elif dimension == EstimateDimensionEnum.DIAGNOSIS.value:
+        def _get_values(translated_record):
+            return tuple(set(
+                diagnosis
+                for diagnosis in translated_record.get(diagnoses_field) or ()
+                if diagnosis
+            ))
+    elif dimension == EstimateDimensionEnum.DIAGNOSIS_CATEGORY.value:
+        def _get_values(translated_record):
+            return tuple(set(
+                get_diagnosis_category(diagnosis)
+                for diagnosis in translated_record.get(diagnoses_field) or ()
+                if diagnosis
+            ))
+    else:
+        def _get_values(translated_record):
+            return translated_record.get(dimension),
+    return _get_values
+
+
+class EstimateSink(RecordSink):
+    """
+    Sink aggregating translated records into estimates of every group, see
+    :mod:`hdx_ahcd.controllers.namcs_sinks`. Result of a year is
+    :class:`dict` of estimate by group, group being :class:`tuple` of values
+    in the order of dimensions.
+    """
+    name = "estimates"
+
+    def __init__(self, group_by=(), measure=EstimateMeasureEnum.VISITS.value):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            group_by (:class:`tuple`): Dimensions, fields of translated
+                record or values of :class:`EstimateDimensionEnum`.
+                **Default** no dimension, a single total.
+            measure (:class:`str`): Value of :class:`EstimateMeasureEnum`.
+                **Default** `visits`.
+
+        Raises:
+            :class:`ValueError`: If any of dimensions or measure is unknown.
+        """
+        group_by = tuple(get_iterable(group_by))
+        validate_estimate_options(group_by, measure)
+        self.group_by = group_by
+        self.measure = measure
+        self.values_methods = [
+            get_dimension_values_method(dimension) for dimension in group_by
+        ]
+
+    def open(self, year):
+        super().open(year)
+        self.estimates = Counter()
+
+    def get_groups(self, translated_record):
+        """
+        Method to get groups `translated_record` belongs to.
+
+        Parameters:
+            translated_record (:class:`dict`): Translated record.
+
+        Returns:
+            :class:`itertools.product`: Distinct groups, as values of every
+            dimension are distinct.
+        """
+        return product(
+            *[_get_values(translated_record)
+              for _get_values in self.values_methods]
+        )
+
+    def get_value(self, translated_record):
+        """
+        Method to get value of measure of `translated_record`.
+
+        Parameters:
+            translated_record (:class:`dict`): Translated record.
+
+        Returns:
+            :class:`float`: Patient visit weight, or 1 if measure is
+            `records`.
+        """
+        if self.measure == EstimateMeasureEnum.RECORDS.value:
+            return 1
+        return translated_record.get(
+            NAMCSFieldEnum.VISIT_WEIGHT.value
+        ) or 0.0
+
+    def write(self, translated_records):
+        estimates = self.estimates
+        for translated_record in translated_records:
+            value = self.get_value(translated_record)
+            for group in self.get_groups(translated_record):
+                estimates[group] += value
+
+    def close(self):
+        return dict(self.estimates)
+
+
+def get_table_estimates(table, diagnosis_dictionary, group_by=(),
+                        measure=EstimateMeasureEnum.VISITS.value):
+    """
+    Method to aggregate translated records of `table` column wise, result is
+    same as result of :class:`EstimateSink`.
+
+    Parameters:
+        table (:class:`pyarrow.Table`): Translated records with physician
+            diagnoses as int32 ids, like cache of a year.
+        diagnosis_dictionary (:class:`DiagnosisDictionary`): Dictionary of
+            ids.
+        group_by (:class:`tuple`): Dimensions. **Default** no dimension.
+        measure (:class:`str`): Value of :class:`EstimateMeasureEnum`.
+            **Default** `visits`.
+
+    Returns:
+        :class:`dict`: Estimate by group.
+    """
+    compute = pyarrow.compute
+    group_by = tuple(get_iterable(group_by))
+    validate_estimate_options(group_by, measure)
+    if measure == EstimateMeasureEnum.RECORDS.value:
+        values = pyarrow.array([1] * table.num_rows, pyarrow.int64())
+    else:
+        values = table.column(NAMCSFieldEnum.VISIT_WEIGHT.value)
+
+    diagnosis_dimensions = (
+        EstimateDimensionEnum.DIAGNOSIS.value,
+        EstimateDimensionEnum.DIAGNOSIS_CATEGORY.value,
+    )
+    visits = None
+    if any(dimension in diagnosis_dimensions for dimension in group_by):
+        # A row per diagnosis, with columns of its visit
+        diagnoses = table.column(
+            NAMCSFieldEnum.PHYSICIANS_DIAGNOSES.value
+        ).combine_chunks()
+        visits = compute.list_parent_indices(diagnoses)
+        ids = compute.list_flatten(diagnoses)
+        codes = pyarrow.array(
+            diagnosis_dictionary.codes, pyarrow.string()
+        ).take(ids)
+        values = values.take(visits)
+
+    def _get_column(field_name):
+        column = table.column(field_name)
+        return column.take(visits) if visits is not None else column
+
+    columns = []
+    for dimension in group_by:
+        if dimension == EstimateDimensionEnum.AGE_BUCKET.value:
+            years = compute.divide(
+                _get_column(NAMCSFieldEnum.PATIENT_AGE.value),
+                float(DAYS_IN_YEAR)
+            )
+            # Number of lower bounds not above age, 0 being unknown age
+            index = reduce(compute.add, [
+                compute.cast(
+                    compute.greater_equal(years, lower_bound), pyarrow.int8()
+                )
+                for lower_bound in ESTIMATE_AGE_BUCKETS
+            ])
+            columns.append(
+                pyarrow.array(
+                    [None] + get_age_bucket_labels(), pyarrow.string()
+                ).take(index)
+            )
+        elif dimension == EstimateDimensionEnum.DIAGNOSIS.value:
+            columns.append(codes)
+        elif dimension == EstimateDimensionEnum.DIAGNOSIS_CATEGORY.value:
+            columns.append(
+                pyarrow.array(
+                    [
+                        get_diagnosis_category(code)
+                        for code in diagnosis_dictionary.codes
+                    ],
+                    pyarrow.string()
+                ).take(ids)
+            )
+        else:
+            columns.append(_get_column(dimension))
+
+    if not group_by:
+        total = compute.sum(values).as_py()
+        if total is None:
+            total = 0 if measure == EstimateMeasureEnum.RECORDS.value \
+                else 0.0
+        return {(): total}
+
+    names = ["dimension_{}".format(index) for index in range(len(group_by))]
+    value_name = "value"
+    grouped_table = pyarrow.table(
+        columns + [values], names=names + [value_name]
+    )
+    if visits is not None:
+        # Blank diagnoses are not grouped, visit is counted once per group
+        grouped_table = grouped_table.append_column("visit", visits).filter(
+            compute.not_equal(codes, "")
+        ).group_by(names + ["visit"]).aggregate([(value_name, "max")])
+        value_name = "{}_max".format(value_name)
+    grouped_table = grouped_table.group_by(names).aggregate(
+        [(value_name, "sum")]
+    )
+    groups = zip(*[grouped_table.column(name).to_pylist() for name in names])
+    return dict(zip(
+        groups,
+        grouped_table.column("{}_sum".format(value_name)).to_pylist()
+    ))
+
+
+def get_estimates_by_year(year, group_by=(),
+                          measure=EstimateMeasureEnum.VISITS.value,
+                          namcs_raw_dataset_file=None, use_cache=False,
+                          cache_dir=None):
+    """
+    Method to get estimates of every group for a given year.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        group_by (:class:`tuple`): Dimensions, see :class:`EstimateSink`.
+            **Default** no dimension, a single total.
+        measure (:class:`str`): Value of :class:`EstimateMeasureEnum`.
+            **Default** `visits`.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            file. **Default** dataset file of `year`.
+        use_cache (:class:`bool`): Whether to aggregate persistent cache of
+            `year` column wise, cache is written while records are streamed
+            if it is not up to date. **Default** :const:`False`.
+        cache_dir (:class:`str`): Directory holding cache files.
+            **Default** `CACHE_DIR_PATH`.
+
+    Returns:
+        :class:`dict`: Estimate by group.
+
+    Raises:
+        :class:`ValueError`: If any of dimensions or measure is unknown.
+    """
+    sink = EstimateSink(group_by, measure)
+    if use_cache:
+        cached_table = get_cached_table(
+            year, namcs_raw_dataset_file, cache_dir
+        )
+        if cached_table is not None:
+            log.debug("Aggregating year: {} from cache".format(year))
+            table, diagnosis_dictionary = cached_table
+            return get_table_estimates(
+                table, diagnosis_dictionary, sink.group_by, measure
+            )
+        generator_object = get_cached_generator_by_year(
+            year, namcs_raw_dataset_file, cache_dir
+        )
+    else:
+        generator_object = get_generator_by_year(year, namcs_raw_dataset_file)
+    estimates, = fan_out(year, generator_object, [sink])
+    return estimates
+
+
+def estimate(year=None, group_by=(), measure=EstimateMeasureEnum.VISITS.value,
+             use_cache=False, cache_dir=None):
+    """
+    Method to get national estimates of every group for `year`, summed over
+    all the years. Years for which NAMCS dataset file is not available
+    locally are skipped.
+
+    Parameters:
+        year (:class:`int` or :class:`tuple` or :class:`list`): NAMCS year(s)
+            to aggregate. If year is not specified, all the years defined in
+            `YEARS_AVAILABLE` are aggregated.
+        group_by (:class:`tuple`): Dimensions, fields of translated record or
+            values of :class:`EstimateDimensionEnum`, add `year_of_visit` to
+            get estimates per year. **Default** no dimension, a single total.
+        measure (:class:`str`): Value of :class:`EstimateMeasureEnum`.
+            **Default** `visits`.
+        use_cache (:class:`bool`): Whether to aggregate persistent cache
+            column wise, see :func:`get_estimates_by_year`.
+            **Default** :const:`False`.
+        cache_dir (:class:`str`): Directory holding cache files.
+            **Default** `CACHE_DIR_PATH`.
+
+    Returns:
+        :class:`dict`: Estimate by group, group being :class:`tuple` of
+        values in the order of `group_by`.
+
+    Raises:
+        :class:`ValueError`: If any of dimensions or measure is unknown.
+
+    Usage:
+        >>> estimates = estimate(
+        ...     (2000, 2001), group_by=("sex", "age_bucket", "dx3")
+        ... )
+        >>> estimates[("Female", "25-44", "V70")]
+    """
+    validate_estimate_options(tuple(get_iterable(group_by)), measure)
+    years = sorted(
+        set(map(int, YEARS_AVAILABLE if year is None else get_iterable(year)))
+    )
+    estimates = {}
+    for _year in years:
+        if get_namcs_dataset_path_for_year(_year) is None:
+            log.error(
+                "NAMCS dataset file for year: {} is not available, skipping "
+                "year".format(_year)
+            )
+            continue
+        for group, value in get_estimates_by_year(
+                _year, group_by, measure, use_cache=use_cache,
+                cache_dir=cache_dir
+        ).items():
+            estimates[group] = estimates.get(group, 0) + value
+    return estimates
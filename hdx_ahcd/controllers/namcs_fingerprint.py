@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing methods to skip export of NAMCS years whose exported file
+is up to date. Every exported file has a fingerprint file next to it,
+recording hash of source dataset file, hash of year layout definition,
+converter version and export options. Year is exported again only when any
+of them changes.
+"""
+# Python modules
+from contextlib import contextmanager
+import hashlib
+import inspect
+import json
+import os
+
+# Other modules
+from hdx_ahcd.mappers import years
+from hdx_ahcd.namcs.config import (
+    CONVERTED_CSV_FIELDS,
+    CONVERTER_VERSION,
+    FINGERPRINT_FILE_EXTENSION,
+    FINGERPRINT_HASH_CHUNK_SIZE,
+    log,
+)
+from hdx_ahcd.utils.context import try_except
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# -N/A
+
+
+def get_fingerprint_file_path(export_file):
+    """
+    Method to get absolute path of fingerprint file of `export_file`.
+
+    Parameters:
+        export_file (:class:`str`): Absolute path of exported file.
+
+    Returns:
+        :class:`str`: Absolute path of fingerprint file, inside exported
+        directory for partitioned export, prefixed with `_` so that dataset
+        readers skip it.
+    """
+    if os.path.isdir(export_file):
+        return os.path.join(
+            export_file, "_{}".format(FINGERPRINT_FILE_EXTENSION)
+        )
+    return "{}.{}".format(export_file, FINGERPRINT_FILE_EXTENSION)
+
+
+def read_fingerprint(export_file):
+    """
+    Method to read recorded fingerprint of `export_file`.
+
+    Parameters:
+        export_file (:class:`str`): Absolute path of exported file.
+
+    Returns:
+        :class:`dict`: Recorded fingerprint, :const:`None` if fingerprint
+        file does not exist or is not readable.
+    """
+    fingerprint_file = get_fingerprint_file_path(export_file)
+    if not os.path.exists(fingerprint_file):
+        return None
+    try:
+        with open(fingerprint_file, "r") as file_handle:
+            return json.load(file_handle)
+    except (OSError, ValueError):
+        log.warning("Ignoring unreadable fingerprint file: {}".format(
+            fingerprint_file
+        ))
+        return None
+
+
+def write_fingerprint(export_file, fingerprint):
+    """
+    Method to record `fingerprint` of `export_file`.
+
+    Parameters:
+        export_file (:class:`str`): Absolute path of exported file.
+        fingerprint (:class:`dict`): Fingerprint as returned by
+            :func:`get_export_fingerprint`.
+    """
+    with try_except():
+        with open(get_fingerprint_file_path(export_file), "w") as file_handle:
+            json.dump(fingerprint, file_handle, indent=4, sort_keys=True)
+
+
+def get_source_file_hash(dataset_file, previous_fingerprint=None):
+    """
+    Method to get SHA-256 hash of `dataset_file`. Hash recorded in
+    `previous_fingerprint` is reused if size and modification time of
+    `dataset_file` are unchanged, so that up to date years are not read.
+
+    Parameters:
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+        previous_fingerprint (:class:`dict`): Recorded fingerprint.
+
+    Returns:
+        :class:`dict`: Hash, size and modification time of `dataset_file`.
+    """
+    file_stat = os.stat(dataset_file)
+    source_file = {
+        "size": file_stat.st_size,
+        "mtime_ns": file_stat.st_mtime_ns,
+    }
+    previous_source_file = (previous_fingerprint or {}).get("source_file", {})
+    if all(
+            previous_source_file.get(key) == value
+            for key, value in source_file.items()
+    ) and previous_source_file.get("sha256"):
+        source_file["sha256"] = previous_source_file["sha256"]
+        return source_file
+
+    sha256 = hashlib.sha256()
+    with open(dataset_file, "rb") as file_handle:
+        for chunk in iter(
+                lambda: file_handle.read(FINGERPRINT_HASH_CHUNK_SIZE), b""
+        ):
+            sha256.update(chunk)
+    source_file["sha256"] = sha256.hexdigest()
+    return source_file
+
+
+def get_layout_hash(year):
+    """
+    Method to get SHA-256 hash of layout definition of `year`, field
+    locations and definition of year class.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+
+    Returns:
+        :class:`str`: Hex digest of layout definition.
+    """
+    year_class_object = vars(years).get("Year{}".format(year))
+    sha256 = hashlib.sha256(
+        repr(sorted(
+            year_class_object.get_field_slice_mapping().items()
+        )).encode("utf-8")
+    )
+    with try_except(OSError, TypeError):
+        sha256.update(inspect.getsource(year_class_object).encode("utf-8"))
+    return sha256.hexdigest()
+
+
+def get_export_fingerprint(year, dataset_file, export_file,
+                           export_options=None):
+    """
+    Method to get fingerprint of exporting `dataset_file` of `year` into
+    `export_file`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+        export_file (:class:`str`): Absolute path of exported file.
+        export_options (:class:`dict`): Options affecting exported content,
+            like `export_format` and `compression`.
+
+    Returns:
+        :class:`dict`: Fingerprint of export.
+    """
+    return {
+        "year": int(year),
+        "source_file": get_source_file_hash(
+            dataset_file, read_fingerprint(export_file)
+        ),
+        "layout_sha256": get_layout_hash(year),
+        "converter_version": CONVERTER_VERSION,
+        "fields": list(CONVERTED_CSV_FIELDS),
+        "export_options": export_options or {},
+    }
+
+
+def is_export_up_to_date(export_file, fingerprint):
+    """
+    Method to check if `export_file` was exported with same `fingerprint`.
+
+    Parameters:
+        export_file (:class:`str`): Absolute path of exported file.
+        fingerprint (:class:`dict`): Fingerprint as returned by
+            :func:`get_export_fingerprint`.
+
+    Returns:
+        :class:`bool`: True if `export_file` exists and its recorded
+        fingerprint matches `fingerprint`.
+
+    Note:
+        Modification time of dataset file is not compared, touched dataset
+        file with same content does not make export stale. Recorded
+        modification time is refreshed, so that hash is reused next time.
+    """
+    def _get_comparable_fingerprint(_fingerprint):
+        source_file = dict(_fingerprint.get("source_file", {}))
+        source_file.pop("mtime_ns", None)
+        return dict(_fingerprint, source_file=source_file)
+
+    if not os.path.exists(export_file):
+        return False
+    recorded_fingerprint = read_fingerprint(export_file)
+    if recorded_fingerprint is None or \
+            _get_comparable_fingerprint(recorded_fingerprint) != \
+            _get_comparable_fingerprint(fingerprint):
+        return False
+    if recorded_fingerprint != fingerprint:
+        write_fingerprint(export_file, fingerprint)
+    return True
+
+
+@contextmanager
+def record_fingerprint(export_file, fingerprint):
+    """
+    Context manager to record `fingerprint` of `export_file` exported in
+    the block. Fingerprint is recorded only if `export_file` was written by
+    the block, so that failed export is retried by next run.
+
+    Parameters:
+        export_file (:class:`str`): Absolute path of exported file.
+        fingerprint (:class:`dict`): Fingerprint as returned by
+            :func:`get_export_fingerprint`.
+
+    Returns:
+        :class:`generator`: Generator object for method `record_fingerprint`.
+    """
+    def _get_file_identity():
+        if not os.path.exists(export_file):
+            return None
+        file_stat = os.stat(export_file)
+        return file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size
+
+    fingerprint_file = get_fingerprint_file_path(export_file)
+    if os.path.exists(fingerprint_file):
+        os.remove(fingerprint_file)
+    file_identity = _get_file_identity()
+    yield
+    # Exported file is replaced atomically, unchanged file means failed export
+    if _get_file_identity() not in (None, file_identity):
+        write_fingerprint(export_file, fingerprint)
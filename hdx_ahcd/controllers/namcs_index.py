@@ -0,0 +1,504 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing inverted index of physician diagnoses. Index of a year maps
+every ICD-9 code to sorted numbers of records having it, see
+:class:`DiagnosisIndex`, and is written next to extracted dataset file of the
+year while it is translated. Records having a code or a code prefix are then
+decoded by seeking to their position in fixed length dataset file, instead of
+translating the whole year.
+
+Index file starts with a json header line holding sorted codes and offsets
+of their records, followed by int32 record numbers of all the codes.
+Index file has a fingerprint file next to it, see
+:mod:`hdx_ahcd.controllers.namcs_fingerprint`, index is rebuilt when dataset
+file, year layout or converter version changes.
+"""
+# Python modules
+from array import array
+from bisect import bisect_left
+from heapq import merge
+import json
+import os
+import sys
+import uuid
+
+# Other modules
+from hdx_ahcd.controllers.namcs_codes import DiagnosisCodeRanges
+from hdx_ahcd.controllers.namcs_converter import (
+    get_generator_by_year,
+    translate_records,
+)
+from hdx_ahcd.controllers.namcs_encoding import ID_TYPE_CODE
+from hdx_ahcd.controllers.namcs_fingerprint import (
+    get_export_fingerprint,
+    is_export_up_to_date,
+    record_fingerprint,
+)
+from hdx_ahcd.controllers.namcs_sinks import (
+    fan_out,
+    RecordSink,
+)
+from hdx_ahcd.helpers.functions import (
+    get_customized_file_name,
+    get_dataset_record_layout,
+    get_iterable,
+    get_namcs_dataset_path_for_year,
+    get_normalized_namcs_file_name,
+    safe_read_file,
+)
+from hdx_ahcd.namcs.config import (
+    DIAGNOSIS_INDEX_FILE_EXTENSION,
+    DIAGNOSIS_INDEX_FILE_NAME_SUFFIX,
+    log,
+    YEARS_AVAILABLE,
+)
+from hdx_ahcd.namcs.enums import NAMCSFieldEnum
+from hdx_ahcd.utils.context import try_except
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# -N/A
+
+
+def get_index_file_path(year, suffix, index_dir=None):
+    """
+    Method to get absolute path of index file of `year`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        suffix (:class:`str`): Suffix of index file name, like
+            `DIAGNOSIS_INDEX_FILE_NAME_SUFFIX`.
+        index_dir (:class:`str`): Directory holding index files.
+            **Default** directory of extracted dataset file of `year`.
+
+    Returns:
+        :class:`str`: Absolute path of index file, like
+        `2000_NAMCS_<suffix>.idx`, :const:`None` if dataset file of `year`
+        is not available and `index_dir` is not specified.
+    """
+    if index_dir is None:
+        dataset_file = get_namcs_dataset_path_for_year(year)
+        if dataset_file is None:
+            return None
+        index_dir = os.path.dirname(dataset_file)
+    return os.path.join(
+        index_dir,
+        get_customized_file_name(
+            get_normalized_namcs_file_name(year), suffix,
+            extension=DIAGNOSIS_INDEX_FILE_EXTENSION
+        )
+    )
+
+
+def get_diagnosis_index_path(year, index_dir=None):
+    """
+    Method to get absolute path of diagnosis index file of `year`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        index_dir (:class:`str`): Directory holding index files.
+            **Default** directory of extracted dataset file of `year`.
+
+    Returns:
+        :class:`str`: Absolute path of index file, like
+        `2000_NAMCS_DIAGNOSIS_INDEX.idx`, see :func:`get_index_file_path`.
+    """
+    return get_index_file_path(
+        year, DIAGNOSIS_INDEX_FILE_NAME_SUFFIX, index_dir
+    )
+
+
+def get_diagnosis_index_fingerprint(year, dataset_file, index_file):
+    """
+    Method to get fingerprint of diagnosis index of `dataset_file`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+        index_file (:class:`str`): Absolute path of index file.
+
+    Returns:
+        :class:`dict`: Fingerprint, see
+        :func:`hdx_ahcd.controllers.namcs_fingerprint.get_export_fingerprint`.
+    """
+    return get_export_fingerprint(
+        year, dataset_file, index_file,
+        export_options={"index": DIAGNOSIS_INDEX_FILE_NAME_SUFFIX}
+    )
+
+
+class DiagnosisIndex(object):
+    """
+    Inverted index of physician diagnoses of a year. Record numbers of code
+    `codes[n]` are `rows[offsets[n]:offsets[n + 1]]`, in ascending order.
+    Record numbers are same as `source_file_row` of translated records,
+    one based.
+    """
+    def __init__(self, codes=(), offsets=None, rows=None):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            codes (:class:`list`): Sorted ICD-9 codes.
+            offsets (:class:`array.array`): Offsets of records of codes, one
+                more than number of codes.
+            rows (:class:`array.array`): Record numbers of all the codes.
+        """
+        self.codes = list(codes)
+        self.offsets = offsets if offsets is not None else \
+            array(ID_TYPE_CODE, [0])
+        self.rows = rows if rows is not None else array(ID_TYPE_CODE)
+        self.code_ranges = None
+
+    def __len__(self):
+        return len(self.codes)
+
+    @classmethod
+    def from_code_rows(cls, code_rows):
+        """
+        Method to construct index from record numbers by code.
+
+        Parameters:
+            code_rows (:class:`dict`): Sorted record numbers by code.
+
+        Returns:
+            :class:`DiagnosisIndex`: Index of `code_rows`.
+        """
+        codes = sorted(code_rows)
+        offsets = array(ID_TYPE_CODE, [0])
+        rows = array(ID_TYPE_CODE)
+        for code in codes:
+            rows.extend(code_rows[code])
+            offsets.append(len(rows))
+        return cls(codes, offsets, rows)
+
+    @classmethod
+    def read(cls, index_file):
+        """
+        Method to read index from `index_file`.
+
+        Parameters:
+            index_file (:class:`str`): Absolute path of index file.
+
+        Returns:
+            :class:`DiagnosisIndex`: Index read from file.
+        """
+        with open(index_file, "rb") as file_handle:
+            header = json.loads(file_handle.readline().decode("utf-8"))
+            rows = array(ID_TYPE_CODE)
+            rows.frombytes(file_handle.read())
+        if header["byteorder"] != sys.byteorder:
+            rows.byteswap()
+        return cls(
+            header["codes"], array(ID_TYPE_CODE, header["offsets"]), rows
+        )
+
+    def write(self, index_file):
+        """
+        Method to write index into `index_file`, file is replaced
+        atomically.
+
+        Parameters:
+            index_file (:class:`str`): Absolute path of index file.
+        """
+        os.makedirs(os.path.dirname(index_file), exist_ok=True)
+        temporary_file_name = os.path.join(
+            os.path.dirname(index_file),
+            ".{}.{}.tmp".format(os.path.basename(index_file), uuid.uuid4().hex)
+        )
+        header = {
+            "byteorder": sys.byteorder,
+            "codes": self.codes,
+            "offsets": self.offsets.tolist(),
+        }
+        try:
+            with open(temporary_file_name, "wb") as file_handle:
+                file_handle.write(json.dumps(header).encode("utf-8") + b"\n")
+                self.rows.tofile(file_handle)
+            os.replace(temporary_file_name, index_file)
+        except BaseException:
+            with try_except():
+                os.remove(temporary_file_name)
+            raise
+
+    def get_codes_by_prefix(self, prefix):
+        """
+        Method to get codes starting with `prefix`.
+
+        Parameters:
+            prefix (:class:`str`): Code prefix, like `250` or `V7`.
+
+        Returns:
+            :class:`list`: Sorted codes.
+        """
+        codes = []
+        for code in self.codes[bisect_left(self.codes, prefix):]:
+            if not code.startswith(prefix):
+                break
+            codes.append(code)
+        return codes
+
+    def get_rows(self, code):
+        """
+        Method to get numbers of records having `code`.
+
+        Parameters:
+            code (:class:`str`): ICD-9 code, like `250.00`.
+
+        Returns:
+            :class:`array.array`: Sorted record numbers, empty if no record
+            has `code`.
+        """
+        index = bisect_left(self.codes, code)
+        if index == len(self.codes) or self.codes[index] != code:
+            return array(ID_TYPE_CODE)
+        return self.rows[self.offsets[index]:self.offsets[index + 1]]
+
+    def get_rows_by_prefix(self, prefix):
+        """
+        Method to get numbers of records having any code starting with
+        `prefix`.
+
+        Parameters:
+            prefix (:class:`str`): Code prefix, like `250` or `V7`.
+
+        Returns:
+            :class:`list`: Sorted distinct record numbers.
+        """
+        return self.get_rows_by_codes(self.get_codes_by_prefix(prefix))
+
+    def get_rows_by_pattern(self, pattern):
+        """
+        Method to get numbers of records having any code matching
+        `pattern`.
+
+        Parameters:
+            pattern (:class:`str` or :class:`tuple` or :class:`list`): Code
+                prefix or range, like `250` or `390-459`, or their list, see
+                :mod:`hdx_ahcd.controllers.namcs_codes`.
+
+        Returns:
+            :class:`list`: Sorted distinct record numbers.
+
+        Raises:
+            :class:`ValueError`: If `pattern` is invalid.
+        """
+        if self.code_ranges is None:
+            self.code_ranges = DiagnosisCodeRanges(self.codes)
+        return self.get_rows_by_codes(self.code_ranges.get_codes(pattern))
+
+    def get_rows_by_codes(self, codes):
+        """
+        Method to get numbers of records having any of `codes`.
+
+        Parameters:
+            codes (:class:`iterable`): ICD-9 codes.
+
+        Returns:
+            :class:`list`: Sorted distinct record numbers.
+        """
+        rows = []
+        for row in merge(*map(self.get_rows, codes)):
+            if not rows or rows[-1] != row:
+                rows.append(row)
+        return rows
+
+
+class DiagnosisIndexSink(RecordSink):
+    """
+    Sink writing diagnosis index of translated records, see
+    :mod:`hdx_ahcd.controllers.namcs_sinks`. Along with export sink, index
+    is built in the same pass as conversion.
+    """
+    name = "diagnosis_index"
+
+    def __init__(self, index_dir=None, namcs_raw_dataset_file=None):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            index_dir (:class:`str`): Directory where index file is written.
+                **Default** directory of extracted dataset file.
+            namcs_raw_dataset_file (:class:`str`): Absolute path of raw
+                dataset file records are translated from, recorded in
+                fingerprint of index. **Default** dataset file of the year.
+        """
+        self.index_dir = index_dir
+        self.namcs_raw_dataset_file = namcs_raw_dataset_file
+
+    def open(self, year):
+        super().open(year)
+        self.code_rows = {}
+
+    def write(self, translated_records):
+        code_rows = self.code_rows
+        for translated_record in translated_records:
+            row = translated_record.get(NAMCSFieldEnum.SOURCE_FILE_ROW.value)
+            for code in translated_record.get(
+                    NAMCSFieldEnum.PHYSICIANS_DIAGNOSES.value
+            ) or ():
+                rows = code_rows.get(code)
+                if rows is None:
+                    rows = code_rows[code] = array(ID_TYPE_CODE)
+                # Same code in multiple slots of a visit is indexed once
+                if not rows or rows[-1] != row:
+                    rows.append(row)
+
+    def close(self):
+        self.index = DiagnosisIndex.from_code_rows(self.code_rows)
+        dataset_file = self.namcs_raw_dataset_file or \
+            get_namcs_dataset_path_for_year(self.year)
+        index_file = get_diagnosis_index_path(
+            self.year, self.index_dir or os.path.dirname(dataset_file)
+        )
+        with record_fingerprint(
+                index_file,
+                get_diagnosis_index_fingerprint(
+                    self.year, dataset_file, index_file
+                )
+        ):
+            self.index.write(index_file)
+        log.info("Finished writing to the file %s" % index_file)
+        return index_file
+
+
+def get_diagnosis_index(year, namcs_raw_dataset_file=None, index_dir=None):
+    """
+    Method to get diagnosis index of `year`, year is translated and index is
+    written if index file is missing or outdated.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            file. **Default** dataset file of `year`.
+        index_dir (:class:`str`): Directory holding index files.
+            **Default** directory of extracted dataset file.
+
+    Returns:
+        :class:`DiagnosisIndex`: Index of `year`, :const:`None` if dataset
+        file of `year` is not available.
+    """
+    dataset_file = namcs_raw_dataset_file or \
+        get_namcs_dataset_path_for_year(year)
+    if dataset_file is None or not os.path.exists(dataset_file):
+        return None
+
+    index_file = get_diagnosis_index_path(
+        year, index_dir or os.path.dirname(dataset_file)
+    )
+    if is_export_up_to_date(
+            index_file,
+            get_diagnosis_index_fingerprint(year, dataset_file, index_file)
+    ):
+        return DiagnosisIndex.read(index_file)
+
+    sink = DiagnosisIndexSink(os.path.dirname(index_file), dataset_file)
+    fan_out(year, get_generator_by_year(year, dataset_file), [sink])
+    return sink.index
+
+
+def get_records_by_rows(year, rows, namcs_raw_dataset_file=None):
+    """
+    Method to translate only records of `rows` of dataset file of `year`.
+    Records of fixed length dataset file are read by seeking to their
+    position, otherwise dataset file is scanned without translating other
+    records.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        rows (:class:`iterable`): Sorted record numbers, one based.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            file. **Default** dataset file of `year`.
+
+    Returns:
+        :class:`generator`: Generator object containing translated records.
+    """
+    dataset_file = namcs_raw_dataset_file or \
+        get_namcs_dataset_path_for_year(year)
+    record_layout = get_dataset_record_layout(dataset_file)
+
+    def _get_numbered_records():
+        if record_layout is None:
+            wanted_rows = set(rows)
+            with open(dataset_file, "r") as file_handle:
+                for record_no, record in safe_read_file(file_handle):
+                    if record_no + 1 in wanted_rows:
+                        yield record_no, record
+            return
+
+        record_length = record_layout[0]
+        with open(dataset_file, "rb") as file_handle:
+            for row in rows:
+                file_handle.seek((row - 1) * record_length)
+                yield row - 1, file_handle.readline().rstrip(
+                    b"\r\n"
+                ).decode("utf-8", errors="replace")
+
+    errors = []
+    yield from translate_records(year, _get_numbered_records(), errors)
+    if errors:
+        log.error(
+            "Rejected {} records of year: {} read by index".format(
+                len(errors), year
+            )
+        )
+
+
+def get_records_by_diagnosis(year=None, diagnosis=None, prefix=None,
+                             index_dir=None, pattern=None):
+    """
+    Method to get translated records having physician diagnosis `diagnosis`,
+    any diagnosis starting with `prefix` or matching `pattern`, only
+    matching records are decoded. Years for which NAMCS dataset file is not
+    available locally are skipped.
+
+    Parameters:
+        year (:class:`int` or :class:`tuple` or :class:`list`): NAMCS year(s)
+            to search. If year is not specified, all the years defined in
+            `YEARS_AVAILABLE` are searched.
+        diagnosis (:class:`str`): ICD-9 code, like `250.00`.
+        prefix (:class:`str`): Code prefix, like `250` for all the codes of
+            category diabetes mellitus.
+        index_dir (:class:`str`): Directory holding index files.
+            **Default** directory of extracted dataset file.
+        pattern (:class:`str` or :class:`tuple` or :class:`list`): Code
+            prefix or range, like `390-459` for all the codes of chapter
+            diseases of the circulatory system, or their list, see
+            :mod:`hdx_ahcd.controllers.namcs_codes`.
+
+    Returns:
+        :class:`generator`: Generator object containing translated records,
+        in year order.
+
+    Raises:
+        :class:`ValueError`: If not exactly one of `diagnosis`, `prefix` and
+        `pattern` is specified, or `pattern` is invalid.
+
+    Usage:
+        >>> diabetes_visits = list(
+        ...     get_records_by_diagnosis((2014, 2015), prefix="250")
+        ... )
+    """
+    if [diagnosis, prefix, pattern].count(None) != 2:
+        raise ValueError("Specify one of diagnosis, prefix or pattern")
+
+    for _year in sorted(
+            set(map(int, YEARS_AVAILABLE if year is None
+                    else get_iterable(year)))
+    ):
+        diagnosis_index = get_diagnosis_index(_year, index_dir=index_dir)
+        if diagnosis_index is None:
+            log.error(
+                "NAMCS dataset file for year: {} is not available, skipping "
+                "year".format(_year)
+            )
+            continue
+        if diagnosis is not None:
+            rows = diagnosis_index.get_rows(diagnosis)
+        elif prefix is not None:
+            rows = diagnosis_index.get_rows_by_prefix(prefix)
+        else:
+            rows = diagnosis_index.get_rows_by_pattern(pattern)
+        yield from get_records_by_rows(_year, rows)
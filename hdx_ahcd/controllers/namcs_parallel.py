@@ -0,0 +1,634 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing methods to translate and export NAMCS dataset file(s) in
+parallel worker processes. Independent years are processed by separate
+workers, and since every record of a NAMCS dataset file has fixed length, a
+single year can be split into record aligned shards processed by separate
+workers as well.
+"""
+# Python modules
+from collections import (defaultdict, deque)
+from concurrent.futures import (as_completed, ProcessPoolExecutor)
+from itertools import islice
+import os
+import shutil
+import time
+
+# Other modules
+from hdx_ahcd.controllers.namcs_converter import (
+    export_translated_data,
+    get_csv_rows,
+    get_error_file_path,
+    get_export_file_path,
+    get_generator_by_year,
+    get_year_export_fingerprint,
+    translate_records,
+    write_csv_header,
+    write_csv_rows,
+    write_error_file,
+)
+from hdx_ahcd.controllers.namcs_fingerprint import (
+    get_fingerprint_file_path,
+    is_export_up_to_date,
+    write_fingerprint,
+)
+from hdx_ahcd.controllers.namcs_scheduler import get_schedule
+from hdx_ahcd.helpers.compression import (
+    get_compressed_file_name,
+    open_export_file,
+)
+from hdx_ahcd.helpers.functions import (
+    get_customized_file_name,
+    get_dataset_shards,
+    get_iterable,
+    get_namcs_dataset_path_for_year,
+    get_normalized_namcs_file_name,
+    read_dataset_shard,
+)
+from hdx_ahcd.namcs.config import (
+    CONVERTED_CSV_FILE_NAME_SUFFIX,
+    CSV_WRITE_BUFFER_SIZE,
+    log,
+    NAMCS_DATA_DIR_PATH,
+    SHARD_RECORD_COUNT,
+    YEARS_AVAILABLE,
+)
+from hdx_ahcd.namcs.enums import ExportFormatEnum
+from hdx_ahcd.utils.context import try_except
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# -N/A
+
+
+def convert_and_export_year(year, namcs_raw_dataset_file, export_dir,
+                            export_format=ExportFormatEnum.CSV.value,
+                            compression=None, partitioned=False):
+    """
+    Method to translate and export NAMCS data for a single `year`, executed
+    in worker process.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            input file for `year`.
+        export_dir (:class:`str`): Directory where file is written.
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+            **Default** `csv`.
+        compression (:class:`str`): Value of :class:`CompressionEnum`.
+            **Default** :const:`None`.
+        partitioned (:class:`bool`): Whether to export into partitioned
+            layout. **Default** :const:`False`.
+
+    Returns:
+        :class:`dict`: Absolute path of exported file and export
+        statistics, number of records, elapsed time, records per second and
+        process id of worker.
+    """
+    started_at = time.perf_counter()
+    record_count = 0
+
+    def _count_records(generator_object):
+        nonlocal record_count
+        for translated_record in generator_object:
+            record_count += 1
+            yield translated_record
+
+    file_name = export_translated_data(
+        year,
+        _count_records(get_generator_by_year(year, namcs_raw_dataset_file)),
+        export_format=export_format,
+        export_dir=export_dir,
+        compression=compression,
+        partitioned=partitioned
+    )
+    elapsed_time = time.perf_counter() - started_at
+
+    return {
+        "file_name": file_name,
+        "stats": {
+            "records": record_count,
+            "elapsed_time": elapsed_time,
+            "records_per_second":
+                record_count / elapsed_time if elapsed_time else 0.0,
+            "pid": os.getpid()
+        }
+    }
+
+
+def convert_shard(year, dataset_file, shard):
+    """
+    Method to translate records in `shard` of NAMCS dataset file, executed
+    in worker process.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+        shard (:class:`tuple`): Shard as returned by
+            :func:`get_dataset_shards`.
+
+    Returns:
+        :class:`tuple`: With elements as:
+            :class:`list`: Translated records of `shard`.
+            :class:`list`: Records rejected during translation.
+    """
+    errors = []
+    translated_records = list(
+        translate_records(
+            year, read_dataset_shard(dataset_file, shard), errors
+        )
+    )
+    return translated_records, errors
+
+
+def get_sharded_generator_by_year(year, namcs_raw_dataset_file=None,
+                                  workers=None,
+                                  shard_size=SHARD_RECORD_COUNT):
+    """
+    Method to translate raw NAMCS patient case data for a given year with
+    shards of dataset file translated in parallel worker processes.
+    Translated records are yielded in `source_file_row` order, exactly as by
+    :func:`get_generator_by_year`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            input file. If not specified, local file path will be deduced on
+            the basis of `year`.
+        workers (:class:`int`): Maximum number of worker processes.
+            **Default** number of processors on the machine.
+        shard_size (:class:`int`): Number of records per shard.
+
+    Returns:
+        :class:`generator`: Generator object containing translated
+        raw NAMCS patient case data for given year.
+
+    Note:
+        At most two shards per worker are translated ahead of consumer,
+        which bounds the memory used by translated records.
+    """
+    dataset_file = namcs_raw_dataset_file or \
+        get_namcs_dataset_path_for_year(year)
+    if dataset_file is None or not os.path.exists(dataset_file):
+        log.error(
+            "NAMCS dataset file for year: {} is not available".format(year)
+        )
+        return
+
+    error_file = get_error_file_path(year)
+    # Removing existing error file to avoid confusion
+    if os.path.exists(error_file):
+        with try_except():
+            os.remove(error_file)
+
+    shards = iter(get_dataset_shards(dataset_file, shard_size=shard_size))
+    errors = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        max_pending = 2 * (workers or os.cpu_count() or 1)
+        pending = deque(
+            executor.submit(convert_shard, year, dataset_file, shard)
+            for shard in islice(shards, max_pending)
+        )
+
+        while pending:
+            translated_records, shard_errors = pending.popleft().result()
+            # Keep workers busy while consumer processes current shard
+            shard = next(shards, None)
+            if shard is not None:
+                pending.append(
+                    executor.submit(convert_shard, year, dataset_file, shard)
+                )
+            errors.extend(shard_errors)
+            for translated_record in translated_records:
+                yield translated_record
+
+    if errors:
+        write_error_file(error_file, errors)
+
+
+def convert_and_export_shard(year, dataset_file, shard, part_file,
+                             write_header):
+    """
+    Method to translate records in `shard` of NAMCS dataset file and export
+    them into csv file `part_file`, executed in worker process.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+        shard (:class:`tuple`): Shard as returned by
+            :func:`get_dataset_shards`.
+        part_file (:class:`str`): Absolute path of csv file for `shard`.
+        write_header (:class:`bool`): Whether to write csv header.
+
+    Returns:
+        :class:`tuple`: With elements as:
+            :class:`int`: Number of exported records.
+            :class:`list`: Records rejected during translation.
+    """
+    errors = []
+    with open(part_file, "w", buffering=CSV_WRITE_BUFFER_SIZE) as csv_file:
+        if write_header:
+            write_csv_header(csv_file)
+        record_count = write_csv_rows(
+            csv_file,
+            get_csv_rows(
+                translate_records(
+                    year, read_dataset_shard(dataset_file, shard), errors
+                )
+            )
+        )
+    return record_count, errors
+
+
+def _get_translated_csv_file(year, export_dir, *suffixes):
+    """
+    Method to get absolute path of csv file where translated data of `year`
+    is exported.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        export_dir (:class:`str`): Directory where csv file is written.
+        suffixes (:class:`tuple`): Additional file name suffixes, like shard
+            number.
+
+    Returns:
+        :class:`str`: Absolute path of csv file.
+    """
+    source_file_id = get_normalized_namcs_file_name(year)
+    return os.path.join(
+        export_dir,
+        get_customized_file_name(
+            source_file_id, CONVERTED_CSV_FILE_NAME_SUFFIX, *suffixes,
+            extension="csv"
+        )
+    )
+
+
+def _get_part_file(year, export_dir, shard_no):
+    """
+    Method to get absolute path of csv file of shard `shard_no` of `year`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        export_dir (:class:`str`): Directory where csv file is written.
+        shard_no (:class:`int`): Zero based shard number.
+
+    Returns:
+        :class:`str`: Absolute path of csv file of shard.
+    """
+    return _get_translated_csv_file(
+        year, export_dir, "part{:04d}".format(shard_no)
+    )
+
+
+def _merge_part_files(translated_csv_file, part_files, compression=None):
+    """
+    Method to merge shard csv files, written without header, into single csv
+    file in the order of `part_files`. Shard csv files are deleted.
+
+    Parameters:
+        translated_csv_file (:class:`str`): Absolute path of merged csv file.
+        part_files (:class:`list`): Absolute paths of shard csv files.
+        compression (:class:`str`): Value of :class:`CompressionEnum`.
+            **Default** :const:`None`.
+
+    Returns:
+        :class:`str`: Absolute path of merged csv file.
+    """
+    with open_export_file(
+            translated_csv_file, compression=compression
+    ) as csv_file:
+        write_csv_header(csv_file)
+        for part_file in part_files:
+            # Keep line terminators written by csv writer
+            with open(part_file, "r", newline="") as part_file_handle:
+                shutil.copyfileobj(part_file_handle, csv_file)
+    for part_file in part_files:
+        os.remove(part_file)
+    translated_csv_file = \
+        get_compressed_file_name(translated_csv_file, compression)
+    log.info("Finished writing to the file %s" % translated_csv_file)
+    return os.path.realpath(translated_csv_file)
+
+
+def _remove_error_file(year):
+    """
+    Method to remove existing error file of `year` to avoid confusion.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+    """
+    error_file = get_error_file_path(year)
+    if os.path.exists(error_file):
+        with try_except():
+            os.remove(error_file)
+
+
+def _get_sharded_export_stats(shard_results, elapsed_time):
+    """
+    Method to get export statistics of year exported in shards.
+
+    Parameters:
+        shard_results (:class:`list`): Results of
+            :func:`convert_and_export_shard` for all shards of year.
+        elapsed_time (:class:`float`): Export time of year in seconds.
+
+    Returns:
+        :class:`dict`: Export statistics, number of records, elapsed time,
+        records per second and number of shards.
+    """
+    record_count = sum(records for records, _ in shard_results)
+    return {
+        "records": record_count,
+        "elapsed_time": elapsed_time,
+        "records_per_second":
+            record_count / elapsed_time if elapsed_time else 0.0,
+        "shards": len(shard_results)
+    }
+
+
+def export_year_in_shards(year, namcs_raw_dataset_file=None, workers=None,
+                          shard_count=None, export_dir=None, merge=True,
+                          compression=None):
+    """
+    Method to translate and export NAMCS data for a single `year` with
+    record aligned shards of dataset file processed in parallel worker
+    processes.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            input file. If not specified, local file path will be deduced on
+            the basis of `year`.
+        workers (:class:`int`): Maximum number of worker processes.
+            **Default** number of processors on the machine.
+        shard_count (:class:`int`): Number of shards. **Default** number of
+            workers.
+        export_dir (:class:`str`): Directory where csv files are written.
+            **Default** `NAMCS_DATA_DIR_PATH`.
+        merge (:class:`bool`): If True, shard files are merged in
+            `source_file_row` order into single csv file, identical to the
+            one written by :func:`export_to_csv`. If False, ordered shard
+            files, each with csv header, are kept. **Default** :const:`True`.
+        compression (:class:`str`): Compression of merged csv file, value of
+            :class:`CompressionEnum`. Shard files are not compressed.
+            **Default** :const:`None`.
+
+    Returns:
+        :class:`dict`: Absolute path of exported csv file as `file_name`, or
+        list of absolute paths of shard files as `file_names` if `merge` is
+        False, along with export statistics.
+    """
+    started_at = time.perf_counter()
+    export_dir = export_dir or NAMCS_DATA_DIR_PATH
+    dataset_file = namcs_raw_dataset_file or \
+        get_namcs_dataset_path_for_year(year)
+    shards = get_dataset_shards(
+        dataset_file, shard_count=shard_count or workers or os.cpu_count()
+    )
+    part_files = [
+        _get_part_file(year, export_dir, shard_no)
+        for shard_no in range(len(shards))
+    ]
+    _remove_error_file(year)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                convert_and_export_shard, year, dataset_file, shard,
+                part_file, not merge
+            )
+            for shard, part_file in zip(shards, part_files)
+        ]
+        shard_results = [future.result() for future in futures]
+
+    errors = [
+        _error for _, shard_errors in shard_results for _error in shard_errors
+    ]
+    if errors:
+        write_error_file(get_error_file_path(year), errors)
+
+    year_export_result = {}
+    if merge:
+        year_export_result["file_name"] = _merge_part_files(
+            _get_translated_csv_file(year, export_dir), part_files,
+            compression=compression
+        )
+    else:
+        year_export_result["file_names"] = \
+            [os.path.realpath(part_file) for part_file in part_files]
+    year_export_result["stats"] = _get_sharded_export_stats(
+        shard_results, time.perf_counter() - started_at
+    )
+    return year_export_result
+
+
+def _finish_sharded_year(year, shard_results, export_dir, elapsed_time,
+                         compression=None):
+    """
+    Method to merge shards of `year` once all of them are exported.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        shard_results (:class:`list`): Results of
+            :func:`convert_and_export_shard` in shard order, or exception
+            raised by the shard.
+        export_dir (:class:`str`): Directory where csv files are written.
+        elapsed_time (:class:`float`): Time since dispatch of first task.
+        compression (:class:`str`): Value of :class:`CompressionEnum`.
+            **Default** :const:`None`.
+
+    Returns:
+        :class:`dict`: Export result of `year`, same as
+        :func:`export_year_in_shards`, or `error` if any shard failed.
+    """
+    part_files = [
+        _get_part_file(year, export_dir, shard_no)
+        for shard_no in range(len(shard_results))
+    ]
+    failed_shards = [
+        result for result in shard_results if isinstance(result, Exception)
+    ]
+    if failed_shards:
+        for part_file in filter(os.path.exists, part_files):
+            os.remove(part_file)
+        return {"error": str(failed_shards[0])}
+
+    errors = [
+        _error for _, shard_errors in shard_results for _error in shard_errors
+    ]
+    if errors:
+        write_error_file(get_error_file_path(year), errors)
+
+    return {
+        "file_name": _merge_part_files(
+            _get_translated_csv_file(year, export_dir), part_files,
+            compression=compression
+        ),
+        "stats": _get_sharded_export_stats(shard_results, elapsed_time)
+    }
+
+
+def export_years_in_parallel(year=None, namcs_raw_dataset_file=None,
+                             workers=None, export_dir=None,
+                             export_format=ExportFormatEnum.CSV.value,
+                             compression=None, force_export=False,
+                             partitioned=False):
+    """
+    Method to translate and export NAMCS data for `year` in a pool of worker
+    processes. Failure for one year does not abort translation of other
+    years.
+
+    Parameters:
+        year (:class:`int` or :class:`tuple` or :class:`list`): NAMCS year(s)
+            to export. If year is not specified, all the years defined in
+            `YEARS_AVAILABLE` are exported.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            input file. If not specified, local file path will be deduced on
+            the basis of `year`.
+        workers (:class:`int`): Maximum number of worker processes.
+            **Default** number of processors on the machine.
+        export_dir (:class:`str`): Directory where files are written.
+            **Default** `NAMCS_DATA_DIR_PATH`.
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`,
+            only csv files are split in shards. **Default** `csv`.
+        compression (:class:`str`): Value of :class:`CompressionEnum`.
+            **Default** :const:`None`.
+        force_export (:class:`bool`): Whether to export years whose exported
+            file is up to date. **Default** :const:`False`.
+        partitioned (:class:`bool`): Whether to export into partitioned
+            layout, years are not split in shards.
+            **Default** :const:`False`.
+
+    Returns:
+        :class:`dict`: Year wise export result, either absolute path of
+        exported file with export statistics, see :func:`convert_and_export_year`, or
+        `error` describing why export failed for the year. Years whose
+        exported file is up to date are not exported, their result has
+        `up_to_date` set.
+
+    Note:
+        Tasks are dispatched longest job first, and years too expensive for
+        a single worker are split into shards, see
+        :func:`hdx_ahcd.controllers.namcs_scheduler.get_schedule`.
+    """
+    years = list(
+        map(int, YEARS_AVAILABLE if year is None else get_iterable(year))
+    )
+    export_dir = export_dir or NAMCS_DATA_DIR_PATH
+    year_wise_export_result = {}
+
+    dataset_files = {}
+    fingerprints = {}
+    for _year in years:
+        # Resolve dataset path in parent process, worker processes
+        # do not share configuration changed at runtime
+        dataset_file = namcs_raw_dataset_file or \
+            get_namcs_dataset_path_for_year(_year)
+        if dataset_file is None:
+            year_wise_export_result[_year] = {
+                "error": "NAMCS dataset file for year: {} is not "
+                         "available".format(_year)
+            }
+            log.error(year_wise_export_result[_year]["error"])
+            continue
+
+        export_file = get_export_file_path(
+            _year, export_format, export_dir, compression, partitioned
+        )
+        fingerprint = get_year_export_fingerprint(
+            _year, dataset_file, export_file, export_format, compression,
+            partitioned
+        )
+        if fingerprint is not None:
+            if not force_export and \
+                    is_export_up_to_date(export_file, fingerprint):
+                log.info(
+                    "Skipping export of year: {}, {} is up to date".format(
+                        _year, export_file
+                    )
+                )
+                year_wise_export_result[_year] = {
+                    "file_name": os.path.realpath(export_file),
+                    "up_to_date": True,
+                }
+                continue
+            # Stale fingerprint must not survive failed export
+            if os.path.exists(get_fingerprint_file_path(export_file)):
+                os.remove(get_fingerprint_file_path(export_file))
+            fingerprints[_year] = (export_file, fingerprint)
+        dataset_files[_year] = dataset_file
+
+    tasks = get_schedule(
+        dataset_files, workers or os.cpu_count() or 1,
+        split=export_format == ExportFormatEnum.CSV.value and not partitioned
+    )
+    started_at = time.perf_counter()
+    year_wise_shard_results = defaultdict(dict)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        future_to_task = {}
+        for task in tasks:
+            _year = task["year"]
+            if task["shard"] is None:
+                future = executor.submit(
+                    convert_and_export_year, _year, dataset_files[_year],
+                    export_dir, export_format, compression, partitioned
+                )
+            else:
+                if task["shard_no"] == 0:
+                    _remove_error_file(_year)
+                future = executor.submit(
+                    convert_and_export_shard, _year, dataset_files[_year],
+                    task["shard"],
+                    _get_part_file(_year, export_dir, task["shard_no"]),
+                    False
+                )
+            future_to_task[future] = task
+
+        for future in as_completed(future_to_task):
+            task = future_to_task[future]
+            _year = task["year"]
+            try:
+                result = future.result()
+            except Exception as exc:
+                result = exc
+
+            if task["shard"] is not None:
+                shard_results = year_wise_shard_results[_year]
+                shard_results[task["shard_no"]] = result
+                # Wait for remaining shards of `_year`
+                if len(shard_results) < task["shards"]:
+                    continue
+                result = _finish_sharded_year(
+                    _year,
+                    [shard_results[shard_no] for shard_no in
+                     range(task["shards"])],
+                    export_dir,
+                    time.perf_counter() - started_at,
+                    compression
+                )
+            elif isinstance(result, Exception):
+                result = {"error": str(result)}
+
+            year_wise_export_result[_year] = result
+            if "error" in result:
+                log.error(
+                    "Error: '{}', while exporting year: {}".format(
+                        result["error"], _year
+                    )
+                )
+            else:
+                if _year in fingerprints:
+                    write_fingerprint(*fingerprints[_year])
+                log.info(
+                    "Exported year: {}, records: {}, in {:.2f}s".format(
+                        _year,
+                        result["stats"]["records"],
+                        result["stats"]["elapsed_time"]
+                    )
+                )
+
+    return year_wise_export_result
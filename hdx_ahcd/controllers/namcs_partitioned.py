@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing methods to export translated NAMCS patient case data into
+Hive style partitioned layout, a directory per year and month of visit with
+files of bounded number of records, like
+`NAMCS_CONVERTED/year=2000/month=01/part-0000.csv`. Query engines can skip
+partitions not matching a filter and load files of a partition in parallel.
+"""
+# Python modules
+from contextlib import ExitStack
+import csv
+import json
+import os
+import shutil
+import uuid
+
+# Other modules
+from hdx_ahcd.controllers.namcs_columnar import (
+    get_columnar_schema,
+    get_columnar_writer,
+    get_record_batch,
+    validate_columnar_export_format,
+)
+from hdx_ahcd.controllers.namcs_converter import (
+    get_csv_rows,
+    write_csv_header,
+)
+from hdx_ahcd.controllers.namcs_sinks import (
+    fan_out,
+    RecordSink,
+)
+from hdx_ahcd.helpers.compression import (
+    get_compressed_file_name,
+    open_export_file,
+)
+from hdx_ahcd.namcs.config import (
+    COLUMNAR_ROW_GROUP_SIZE,
+    log,
+    NAMCS_DATA_DIR_PATH,
+    PARTITION_MAX_ROWS_PER_FILE,
+    PARTITION_METADATA_FILE_NAME,
+    PARTITIONED_EXPORT_DIR_NAME,
+)
+from hdx_ahcd.namcs.enums import (
+    ExportFormatEnum,
+    NAMCSFieldEnum,
+)
+from hdx_ahcd.utils.context import try_except
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# Partition of records without month of visit, as named by Hive
+DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def get_partitioned_year_dir(year, export_dir=None):
+    """
+    Method to get absolute path of directory holding partitions of `year`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        export_dir (:class:`str`): Directory where partitioned layout is
+            written. **Default** `NAMCS_DATA_DIR_PATH`.
+
+    Returns:
+        :class:`str`: Absolute path of year directory, like
+        `NAMCS_CONVERTED/year=2000`.
+    """
+    return os.path.join(
+        export_dir or NAMCS_DATA_DIR_PATH, PARTITIONED_EXPORT_DIR_NAME,
+        "year={}".format(year)
+    )
+
+
+def get_month_partition(month):
+    """
+    Method to get name of partition directory of `month`.
+
+    Parameters:
+        month (:class:`int`): Month of visit.
+
+    Returns:
+        :class:`str`: Partition name, like `month=01`.
+    """
+    if month is None:
+        return "month={}".format(DEFAULT_PARTITION)
+    return "month={:02d}".format(month)
+
+
+def open_partition_file(file_name, export_format, compression=None):
+    """
+    Method to open file of a partition for writing.
+
+    Parameters:
+        file_name (:class:`str`): Absolute path of file, without extension of
+            `compression`.
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+        compression (:class:`str`): Compression of csv file.
+
+    Returns:
+        :class:`tuple`: With elements as:
+            :class:`function`: Method to write list of translated records.
+            :class:`function`: Method to close file.
+    """
+    if export_format == ExportFormatEnum.CSV.value:
+        exit_stack = ExitStack()
+        csv_file = exit_stack.enter_context(
+            open_export_file(file_name, compression=compression)
+        )
+        write_csv_header(csv_file)
+        writer = csv.writer(csv_file, delimiter=",")
+        return (
+            lambda translated_records:
+                writer.writerows(get_csv_rows(translated_records)),
+            exit_stack.close
+        )
+
+    schema = get_columnar_schema()
+    writer, write_batch = get_columnar_writer(file_name, export_format, schema)
+    return (
+        lambda translated_records:
+            write_batch(get_record_batch(translated_records, schema)),
+        writer.close
+    )
+
+
+class PartitionedSink(RecordSink):
+    """
+    Sink writing translated records into partitioned layout, see
+    :mod:`hdx_ahcd.controllers.namcs_sinks`. Year is written into temporary
+    directory which replaces previous partitions of the year once all the
+    records are written. Records of a partition are buffered and written
+    `row_group_size` records at a time, so that files of columnar
+    `export_format` have row groups of `row_group_size` records.
+    """
+    name = "partitioned"
+
+    def __init__(self, export_format=ExportFormatEnum.CSV.value,
+                 export_dir=None, compression=None,
+                 max_rows_per_file=PARTITION_MAX_ROWS_PER_FILE,
+                 row_group_size=COLUMNAR_ROW_GROUP_SIZE):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+                **Default** `csv`.
+            export_dir (:class:`str`): Directory where partitioned layout is
+                written. **Default** `NAMCS_DATA_DIR_PATH`.
+            compression (:class:`str`): Compression of csv files.
+                **Default** :const:`None`.
+            max_rows_per_file (:class:`int`): Maximum number of records per
+                file. **Default** `PARTITION_MAX_ROWS_PER_FILE`.
+            row_group_size (:class:`int`): Number of records of a partition
+                written at once, as a single record batch or row group of
+                columnar file. **Default** `COLUMNAR_ROW_GROUP_SIZE`.
+
+        Raises:
+            :class:`ImportError`: If `pyarrow` is not installed for columnar
+            `export_format`.
+            :class:`ValueError`: If `compression` is specified for columnar
+            `export_format`.
+        """
+        if export_format != ExportFormatEnum.CSV.value:
+            if compression is not None:
+                raise ValueError(
+                    "Compression is supported only for export format: csv"
+                )
+            validate_columnar_export_format(export_format)
+        self.export_format = export_format
+        self.export_dir = export_dir
+        self.compression = compression
+        self.max_rows_per_file = max_rows_per_file
+        self.row_group_size = row_group_size
+
+    def open(self, year):
+        super().open(year)
+        self.year_dir = get_partitioned_year_dir(year, self.export_dir)
+        os.makedirs(os.path.dirname(self.year_dir), exist_ok=True)
+        self.temporary_dir = os.path.join(
+            os.path.dirname(self.year_dir),
+            ".year={}.{}.tmp".format(year, uuid.uuid4().hex)
+        )
+        os.mkdir(self.temporary_dir)
+        self.partitions = {}
+
+    def _get_file_name(self, partition, part_no):
+        """
+        Method to get absolute path of file `part_no` of `partition`,
+        without extension of compression.
+        """
+        return os.path.join(
+            self.temporary_dir, partition,
+            "part-{:04d}.{}".format(part_no, self.export_format)
+        )
+
+    def _get_partition_state(self, partition):
+        """
+        Method to get files and pending records of `partition`, creating its
+        directory on first use.
+        """
+        state = self.partitions.get(partition)
+        if state is None:
+            os.mkdir(os.path.join(self.temporary_dir, partition))
+            state = self.partitions[partition] = {
+                "files": [], "file_rows": 0, "close": None, "pending": []
+            }
+        return state
+
+    def _write_partition(self, partition, translated_records):
+        """
+        Method to write `translated_records` into files of `partition`,
+        rolling over to next file once current one is full.
+        """
+        state = self._get_partition_state(partition)
+        while translated_records:
+            if state["close"] is None or \
+                    state["file_rows"] >= self.max_rows_per_file:
+                if state["close"] is not None:
+                    state["close"]()
+                file_name = self._get_file_name(partition, len(state["files"]))
+                state["write"], state["close"] = open_partition_file(
+                    file_name, self.export_format, self.compression
+                )
+                state["files"].append({
+                    "file_name": os.path.basename(
+                        get_compressed_file_name(file_name, self.compression)
+                    ),
+                    "rows": 0,
+                })
+                state["file_rows"] = 0
+            records = translated_records[
+                :self.max_rows_per_file - state["file_rows"]
+            ]
+            translated_records = translated_records[len(records):]
+            state["write"](records)
+            state["file_rows"] += len(records)
+            state["files"][-1]["rows"] += len(records)
+
+    def write(self, translated_records):
+        month_wise_records = {}
+        for translated_record in translated_records:
+            month_wise_records.setdefault(
+                translated_record.get(NAMCSFieldEnum.MONTH_OF_VISIT.value), []
+            ).append(translated_record)
+        for month, records in month_wise_records.items():
+            partition = get_month_partition(month)
+            pending_records = \
+                self._get_partition_state(partition)["pending"]
+            pending_records.extend(records)
+            while len(pending_records) >= self.row_group_size:
+                self._write_partition(
+                    partition, pending_records[:self.row_group_size]
+                )
+                del pending_records[:self.row_group_size]
+
+    def get_metadata(self):
+        """
+        Method to get metadata of written partitions.
+
+        Returns:
+            :class:`dict`: Number of records of year, and files and number of
+            records per partition.
+        """
+        partitions = {
+            partition: {
+                "rows": sum(_file["rows"] for _file in state["files"]),
+                "files": state["files"],
+            }
+            for partition, state in sorted(self.partitions.items())
+        }
+        return {
+            "year": self.year,
+            "export_format": self.export_format,
+            "compression": self.compression,
+            "rows": sum(
+                partition["rows"] for partition in partitions.values()
+            ),
+            "partitions": partitions,
+        }
+
+    def close(self):
+        try:
+            for partition, state in self.partitions.items():
+                if state["pending"]:
+                    self._write_partition(partition, state["pending"])
+                    state["pending"] = []
+                state["close"]()
+            with open(
+                    os.path.join(
+                        self.temporary_dir, PARTITION_METADATA_FILE_NAME
+                    ), "w"
+            ) as file_handle:
+                json.dump(self.get_metadata(), file_handle, indent=4)
+        except Exception as exc:
+            self.abort(exc)
+            raise
+
+        # Replace previous partitions of year
+        stale_dir = None
+        if os.path.exists(self.year_dir):
+            stale_dir = "{}.stale".format(self.temporary_dir)
+            os.rename(self.year_dir, stale_dir)
+        os.rename(self.temporary_dir, self.year_dir)
+        if stale_dir is not None:
+            shutil.rmtree(stale_dir)
+        log.info("Finished writing to the directory %s" % self.year_dir)
+
+        return os.path.realpath(self.year_dir)
+
+    def abort(self, exc):
+        for state in self.partitions.values():
+            if state["close"] is not None:
+                with try_except():
+                    state["close"]()
+        shutil.rmtree(self.temporary_dir, ignore_errors=True)
+
+
+def export_to_partitioned(year, generator_object,
+                          export_format=ExportFormatEnum.CSV.value,
+                          export_dir=None, compression=None,
+                          max_rows_per_file=PARTITION_MAX_ROWS_PER_FILE,
+                          row_group_size=COLUMNAR_ROW_GROUP_SIZE):
+    """
+    Method to export the translated NAMCS patient case data for a given year
+    into partitioned layout.
+
+    Parameters:
+        year (:class:`int`): Year for which translated NAMCS data will be
+            exported.
+        generator_object (:class:`generator`): Generator object containing
+            translated NAMCS patient case data for `year`.
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+            **Default** `csv`.
+        export_dir (:class:`str`): Directory where partitioned layout is
+            written. **Default** `NAMCS_DATA_DIR_PATH`.
+        compression (:class:`str`): Compression of csv files.
+            **Default** :const:`None`.
+        max_rows_per_file (:class:`int`): Maximum number of records per file.
+            **Default** `PARTITION_MAX_ROWS_PER_FILE`.
+        row_group_size (:class:`int`): Number of records of a partition
+            written at once, as a single record batch or row group.
+            **Default** `COLUMNAR_ROW_GROUP_SIZE`.
+
+    Returns:
+        :class:`str`: Absolute path of year directory.
+    """
+    return fan_out(
+        year, generator_object,
+        [
+            PartitionedSink(
+                export_format=export_format, export_dir=export_dir,
+                compression=compression, max_rows_per_file=max_rows_per_file,
+                row_group_size=row_group_size
+            )
+        ]
+    )[0]
+
+
+def read_partition_metadata(year_dir):
+    """
+    Method to read metadata of partitioned year.
+
+    Parameters:
+        year_dir (:class:`str`): Absolute path of year directory.
+
+    Returns:
+        :class:`dict`: Metadata, see :func:`PartitionedSink.get_metadata`.
+    """
+    with open(
+            os.path.join(year_dir, PARTITION_METADATA_FILE_NAME), "r"
+    ) as file_handle:
+        return json.load(file_handle)
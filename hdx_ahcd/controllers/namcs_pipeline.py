@@ -0,0 +1,469 @@
+# -*- coding: utf-8 -*-
+"""
+Module to process NAMCS dataset file(s) of multiple years as a staged
+pipeline. Download, translation and export stages run concurrently and are
+connected by bounded queues, so while year N is translated year N+1 is
+downloaded and year N-1 is written.
+"""
+# Python modules
+from collections import defaultdict
+from itertools import islice
+from queue import Queue
+from threading import Thread
+import os
+import time
+
+# Other modules
+from hdx_ahcd.controllers.namcs_converter import (
+    export_year_if_outdated,
+    get_export_file_path,
+    get_generator_by_year,
+    get_year_export_fingerprint,
+)
+from hdx_ahcd.controllers.namcs_fingerprint import is_export_up_to_date
+from hdx_ahcd.controllers.namcs_extractor import initiate_namcs_dataset_download
+from hdx_ahcd.helpers.functions import (
+    get_iterable,
+    get_namcs_dataset_path_for_year,
+    get_namcs_source_file_info,
+)
+from hdx_ahcd.namcs.config import (
+    log,
+    PIPELINE_BATCH_SIZE,
+    PIPELINE_DOWNLOAD_QUEUE_SIZE,
+    PIPELINE_EXPORT_QUEUE_SIZE,
+    YEARS_AVAILABLE,
+)
+from hdx_ahcd.namcs.enums import ExportFormatEnum
+from hdx_ahcd.utils.utils import detailed_exception_info
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# Sentinel put on a queue by a stage once it has no more items to hand over
+END_OF_STAGE = object()
+
+
+class PipelineStage(object):
+    """
+    Class to track the time a pipeline stage spends doing actual work and the
+    time it spends blocked on its input or output queue.
+    """
+    def __init__(self, name):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            name (:class:`str`): Name of pipeline stage.
+        """
+        self.name = name
+        self.started_at = None
+        self.finished_at = None
+        self.wait_time = 0.0
+
+    def start(self):
+        """
+        Mark the start of stage execution.
+        """
+        self.started_at = time.perf_counter()
+
+    def finish(self):
+        """
+        Mark the end of stage execution.
+        """
+        self.finished_at = time.perf_counter()
+
+    def get(self, queue):
+        """
+        Method to get item from input `queue`, time spent waiting for the item
+        is not accounted as busy time.
+
+        Parameters:
+            queue (:class:`queue.Queue`): Input queue of stage.
+
+        Returns:
+            :class:`object`: Item from `queue`.
+        """
+        wait_started_at = time.perf_counter()
+        item = queue.get()
+        self.wait_time += time.perf_counter() - wait_started_at
+        return item
+
+    def put(self, queue, item):
+        """
+        Method to put `item` on output `queue`, time spent waiting for free
+        slot in `queue` (backpressure) is not accounted as busy time.
+
+        Parameters:
+            queue (:class:`queue.Queue`): Output queue of stage.
+            item (:class:`object`): Item handed to next stage.
+        """
+        wait_started_at = time.perf_counter()
+        queue.put(item)
+        self.wait_time += time.perf_counter() - wait_started_at
+
+    @property
+    def elapsed_time(self):
+        """
+        Wall clock time between start and end of stage execution.
+
+        Returns:
+            :class:`float`: Elapsed time in seconds.
+        """
+        if self.started_at is None:
+            return 0.0
+        finished_at = self.finished_at if self.finished_at is not None \
+            else time.perf_counter()
+        return finished_at - self.started_at
+
+    @property
+    def busy_time(self):
+        """
+        Time stage spent doing work, i.e. not waiting on its queues.
+
+        Returns:
+            :class:`float`: Busy time in seconds.
+        """
+        return max(self.elapsed_time - self.wait_time, 0.0)
+
+    def get_stats(self, total_time):
+        """
+        Method to get utilization statistics of stage.
+
+        Parameters:
+            total_time (:class:`float`): Wall clock time of complete pipeline
+                run in seconds.
+
+        Returns:
+            :class:`dict`: Busy time, wait time and utilization of stage,
+            utilization is the fraction of `total_time` stage was busy.
+        """
+        return {
+            "busy_time": self.busy_time,
+            "wait_time": self.wait_time,
+            "utilization": self.busy_time / total_time if total_time else 0.0
+        }
+
+
+def _download_stage(stage, years, downloaded_queue, year_wise_translated_data,
+                    namcs_raw_dataset_file, force_download):
+    """
+    Pipeline stage to download and extract NAMCS dataset file(s) for `years`.
+    Years whose download fails are skipped.
+
+    Parameters:
+        stage (:class:`PipelineStage`): Stage statistics tracker.
+        years (:class:`list`): NAMCS years to process.
+        downloaded_queue (:class:`queue.Queue`): Output queue for years whose
+            dataset file is available locally.
+        year_wise_translated_data (:class:`defaultdict`): Year wise details,
+            updated with error of failed download.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            input file, if provided nothing is downloaded.
+        force_download (:class:`bool`): Whether to force download NAMCS raw
+            dataset file even if data set file exists locally.
+    """
+    stage.start()
+    try:
+        for _year in years:
+            if namcs_raw_dataset_file is None:
+                # Failure is logged and not raised by download, failed
+                # download of a year does not stop later years
+                initiate_namcs_dataset_download(
+                    year=_year, force_download=force_download
+                )
+                if get_namcs_dataset_path_for_year(_year) is None:
+                    error = "NAMCS dataset file for year: {} could not be " \
+                        "downloaded, skipping year".format(_year)
+                    log.error(error)
+                    year_wise_translated_data[_year]["error"] = error
+                    continue
+            stage.put(downloaded_queue, _year)
+    finally:
+        stage.put(downloaded_queue, END_OF_STAGE)
+        stage.finish()
+
+
+def _convert_stage(stage, downloaded_queue, export_queue,
+                   namcs_raw_dataset_file, batch_size):
+    """
+    Pipeline stage to translate NAMCS dataset file(s) in batches of
+    `batch_size` records.
+
+    Parameters:
+        stage (:class:`PipelineStage`): Stage statistics tracker.
+        downloaded_queue (:class:`queue.Queue`): Input queue of years whose
+            dataset file is available locally.
+        export_queue (:class:`queue.Queue`): Output queue of
+            (`year`, `batch`) tuples, a `batch` of :const:`None` marks end of
+            translated data for `year`.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            input file.
+        batch_size (:class:`int`): Number of records per batch.
+    """
+    stage.start()
+    try:
+        for _year in iter(lambda: stage.get(downloaded_queue), END_OF_STAGE):
+            dataset_file = namcs_raw_dataset_file or \
+                get_namcs_dataset_path_for_year(_year)
+            if dataset_file is None:
+                log.error(
+                    "NAMCS dataset file for year: {} is not available, "
+                    "skipping year".format(_year)
+                )
+                continue
+
+            generator = get_generator_by_year(_year, dataset_file)
+            try:
+                for batch in iter(
+                        lambda: list(islice(generator, batch_size)), []
+                ):
+                    stage.put(export_queue, (_year, batch))
+            except Exception:
+                detailed_exception_info(logger=log)
+            stage.put(export_queue, (_year, None))
+    finally:
+        stage.put(export_queue, END_OF_STAGE)
+        stage.finish()
+
+
+def _get_records_for_year(stage, export_queue, year, batch):
+    """
+    Method to get translated records of `year` from `export_queue`, starting
+    with already received `batch`.
+
+    Parameters:
+        stage (:class:`PipelineStage`): Stage statistics tracker.
+        export_queue (:class:`queue.Queue`): Queue of (`year`, `batch`)
+            tuples.
+        year (:class:`int`): NAMCS year.
+        batch (:class:`list`): First batch of translated records for `year`.
+
+    Returns:
+        :class:`generator`: Translated records for `year`.
+    """
+    while batch is not None:
+        for translated_record in batch:
+            yield translated_record
+        _year, batch = stage.get(export_queue)
+
+
+def _export_stage(stage, export_queue, year_wise_translated_data,
+                  namcs_raw_dataset_file, export_format, compression,
+                  force_export, sinks, partitioned):
+    """
+    Pipeline stage to write translated records into file, year by year.
+
+    Parameters:
+        stage (:class:`PipelineStage`): Stage statistics tracker.
+        export_queue (:class:`queue.Queue`): Input queue of (`year`, `batch`)
+            tuples.
+        year_wise_translated_data (:class:`defaultdict`): Year wise details,
+            updated with absolute path of exported file.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            input file.
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+        compression (:class:`str`): Value of :class:`CompressionEnum`.
+        force_export (:class:`bool`): Whether to export years whose exported
+            file is up to date.
+        sinks (:class:`list`): Objects of
+            :class:`hdx_ahcd.controllers.namcs_sinks.RecordSink` fed along
+            with export.
+        partitioned (:class:`bool`): Whether to export into partitioned
+            layout.
+    """
+    stage.start()
+    try:
+        for message in iter(lambda: stage.get(export_queue), END_OF_STAGE):
+            _year, batch = message
+            records = _get_records_for_year(stage, export_queue, _year, batch)
+            try:
+                year_wise_translated_data[_year].update(
+                    export_year_if_outdated(
+                        _year, records,
+                        namcs_raw_dataset_file or
+                        get_namcs_dataset_path_for_year(_year),
+                        export_format=export_format,
+                        compression=compression,
+                        force_export=force_export,
+                        sinks=sinks,
+                        partitioned=partitioned
+                    )
+                )
+            except Exception as exc:
+                detailed_exception_info(logger=log)
+                year_wise_translated_data[_year]["error"] = str(exc)
+
+            # Drain batches left over in case export failed or was skipped
+            # for `_year`
+            for _ in records:
+                pass
+    finally:
+        stage.finish()
+
+
+def _is_year_up_to_date(year, namcs_raw_dataset_file, export_format,
+                        compression, partitioned, year_wise_translated_data):
+    """
+    Method to check if exported file of `year` is up to date with locally
+    available dataset file, in which case `year_wise_translated_data` is
+    updated with absolute path of exported file.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            input file.
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+        compression (:class:`str`): Value of :class:`CompressionEnum`.
+        partitioned (:class:`bool`): Whether year is exported into
+            partitioned layout.
+        year_wise_translated_data (:class:`defaultdict`): Year wise details.
+
+    Returns:
+        :class:`bool`: True if export of `year` can be skipped.
+    """
+    export_file = get_export_file_path(
+        year, export_format, compression=compression, partitioned=partitioned
+    )
+    fingerprint = get_year_export_fingerprint(
+        year,
+        namcs_raw_dataset_file or get_namcs_dataset_path_for_year(year),
+        export_file, export_format, compression, partitioned
+    )
+    if fingerprint is None or \
+            not is_export_up_to_date(export_file, fingerprint):
+        return False
+    log.info("Skipping year: {}, {} is up to date".format(year, export_file))
+    year_wise_translated_data[year].update(
+        {"file_name": os.path.realpath(export_file), "up_to_date": True}
+    )
+    return True
+
+
+def run_pipeline(year=None, namcs_raw_dataset_file=None, force_download=False,
+                 batch_size=PIPELINE_BATCH_SIZE,
+                 export_format=ExportFormatEnum.CSV.value, compression=None,
+                 force_export=False, sinks=None, partitioned=False):
+    """
+    Method to download, translate and export NAMCS data for `year` as a
+    staged pipeline. Each stage runs concurrently with others and stages are
+    connected by bounded queues, so that a slow stage applies backpressure on
+    the stages before it.
+
+    Parameters:
+        year (:class:`int` or :class:`tuple` or :class:`list`): NAMCS year(s)
+            to process. If year is not specified, all the years defined in
+            `YEARS_AVAILABLE` are processed.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            input file. If specified, download stage is skipped.
+        force_download (:class:`bool`): Whether to force download NAMCS raw
+            dataset file even if data set file exists locally.
+            **Default** :const:`False`.
+        batch_size (:class:`int`): Number of translated records handed from
+            translation stage to export stage at once.
+        export_format (:class:`str`): File format translated data is
+            exported to, `csv`, `arrow` or `parquet`. **Default** `csv`.
+        compression (:class:`str`): Compression of exported csv file, `gzip`,
+            `bz2`, `xz`, `zstd` or `lz4`. **Default** :const:`None`.
+        force_export (:class:`bool`): Whether to export years whose exported
+            file is up to date. **Default** :const:`False`.
+        sinks (:class:`list`): Objects of
+            :class:`hdx_ahcd.controllers.namcs_sinks.RecordSink` fed in the
+            same pass over translated records as export.
+            **Default** :const:`None`.
+        partitioned (:class:`bool`): Whether to export into partitioned
+            layout, a directory per year and month of visit.
+            **Default** :const:`False`.
+
+    Returns:
+        :class:`tuple`: With elements as:
+            :class:`defaultdict`: Dictionary containing generator of
+                translated NAMCS patient case data for given year along with
+                source file info and absolute path of exported file.
+            :class:`dict`: Pipeline statistics, total elapsed time and
+                busy time, wait time and utilization per stage.
+
+    Note:
+        Memory used by in flight records is bounded by
+        `batch_size` * `PIPELINE_EXPORT_QUEUE_SIZE` records and at most
+        `PIPELINE_DOWNLOAD_QUEUE_SIZE` downloaded years wait for translation.
+        Years whose dataset file is available locally and exported file is up
+        to date are neither downloaded nor translated, unless there are
+        `sinks` to feed.
+    """
+    year_wise_translated_data = defaultdict(dict)
+
+    # If `year` not specified, process data for all years `YEARS_AVAILABLE`
+    years = list(
+        map(int, YEARS_AVAILABLE if year is None else get_iterable(year))
+    )
+    for _year in years:
+        year_wise_translated_data[_year]["generator"] = \
+            get_generator_by_year(_year, namcs_raw_dataset_file)
+        year_wise_translated_data[_year]["source_file_info"] = \
+            get_namcs_source_file_info(_year)
+
+    if not (force_download or force_export or sinks):
+        years = [
+            _year for _year in years
+            if not _is_year_up_to_date(
+                _year, namcs_raw_dataset_file, export_format, compression,
+                partitioned, year_wise_translated_data
+            )
+        ]
+
+    downloaded_queue = Queue(maxsize=PIPELINE_DOWNLOAD_QUEUE_SIZE)
+    export_queue = Queue(maxsize=PIPELINE_EXPORT_QUEUE_SIZE)
+    stages = (
+        PipelineStage("download"),
+        PipelineStage("convert"),
+        PipelineStage("export"),
+    )
+    download_stage, convert_stage, export_stage = stages
+
+    started_at = time.perf_counter()
+    threads = [
+        Thread(
+            target=_download_stage,
+            args=(download_stage, years, downloaded_queue,
+                  year_wise_translated_data, namcs_raw_dataset_file,
+                  force_download),
+            daemon=True
+        ),
+        Thread(
+            target=_convert_stage,
+            args=(convert_stage, downloaded_queue, export_queue,
+                  namcs_raw_dataset_file, batch_size),
+            daemon=True
+        ),
+    ]
+    for thread in threads:
+        thread.start()
+
+    # Export stage runs in calling thread
+    _export_stage(
+        export_stage, export_queue, year_wise_translated_data,
+        namcs_raw_dataset_file, export_format, compression, force_export,
+        sinks, partitioned
+    )
+    for thread in threads:
+        thread.join()
+    total_time = time.perf_counter() - started_at
+
+    pipeline_stats = {
+        "elapsed_time": total_time,
+        "stages": {
+            stage.name: stage.get_stats(total_time) for stage in stages
+        }
+    }
+    for stage in stages:
+        log.info(
+            "Pipeline stage: {}, busy: {:.2f}s, waiting: {:.2f}s, "
+            "utilization: {:.1%}".format(
+                stage.name, stage.busy_time, stage.wait_time,
+                pipeline_stats["stages"][stage.name]["utilization"]
+            )
+        )
+
+    return year_wise_translated_data, pipeline_stats
@@ -5,14 +5,30 @@ Module containing methods to initiate NAMCS dataset file processing.
 # Python modules
 from collections import defaultdict
 from functools import reduce
+import asyncio
 
 # 3rd party modules
 # -N/A
 
 # Other modules
+from hdx_ahcd.controllers.namcs_async import (
+    get_batches_by_year,
+    get_records_by_year,
+    initiate_namcs_dataset_download_async,
+)
 from hdx_ahcd.controllers.namcs_converter import get_year_wise_generator
 from hdx_ahcd.controllers.namcs_extractor import initiate_namcs_dataset_download
-from hdx_ahcd.helpers.functions import get_year_from_dataset_file_name
+from hdx_ahcd.controllers.namcs_pipeline import run_pipeline
+from hdx_ahcd.helpers.functions import (
+    get_iterable,
+    get_namcs_source_file_info,
+    get_year_from_dataset_file_name,
+)
+from hdx_ahcd.namcs.config import (
+    ASYNC_BATCH_SIZE,
+    YEARS_AVAILABLE,
+)
+from hdx_ahcd.namcs.enums import ExportFormatEnum
 from hdx_ahcd.scripts.namcs_validators import (
     validate_arguments,
     validate_dataset_records
@@ -28,7 +44,11 @@ class NAMCSProcessor(object):
     Class to validate and process NAMCS dataset file(s).
     """
     def execute(self, year=None, file_name=None, do_validation=True,
-                do_export=False, force_download=False):
+                do_export=False, force_download=False, pipeline=False,
+                workers=None, export_format=ExportFormatEnum.CSV.value,
+                compression=None, force_export=False, sinks=None,
+                partitioned=False, use_cache=False, use_memory_cache=False,
+                where=None):
         """
         Method to process NAMCS raw dataset file(s) after successful validation
         of parameters `year` and/or `file_name`.
@@ -46,12 +66,52 @@ class NAMCSProcessor(object):
             force_download (:class:`bool`): Whether to force download
                 NAMCS raw dataset file even if data set file exists locally.
                 *Default** :const:`False`.
+            pipeline (:class:`bool`): Whether to overlap download,
+                translation and export of consecutive years, used only when
+                `do_export` is True. *Default** :const:`False`.
+            workers (:class:`int`): Number of worker processes used to
+                translate and export years in parallel, used only when
+                `do_export` is True, not supported with `pipeline`.
+                *Default** :const:`None`.
+            export_format (:class:`str`): File format translated data is
+                exported to, `csv`, `arrow` or `parquet`, used only when
+                `do_export` is True. *Default** `csv`.
+            compression (:class:`str`): Compression of exported csv file,
+                `gzip`, `bz2`, `xz`, `zstd` or `lz4`, used only when
+                `do_export` is True. *Default** :const:`None`.
+            force_export (:class:`bool`): Whether to export years whose
+                exported file is up to date with dataset file, used only when
+                `do_export` is True. *Default** :const:`False`.
+            sinks (:class:`list`): Objects of
+                :class:`hdx_ahcd.controllers.namcs_sinks.RecordSink`, fed in
+                the same pass over translated records as export, not
+                supported with `workers`. *Default** :const:`None`.
+            partitioned (:class:`bool`): Whether to export into Hive style
+                partitioned layout, a directory per year and month of
+                visit, used only when `do_export` is True.
+                *Default** :const:`False`.
+            use_cache (:class:`bool`): Whether to read translated records
+                from persistent cache of decoded years, not supported with
+                `pipeline`. *Default** :const:`False`.
+            use_memory_cache (:class:`bool`): Whether to keep translated
+                years in in-process cache within memory budget, not
+                supported with `pipeline`. *Default** :const:`False`.
+            where (:class:`dict` or :class:`list`): Values of low
+                cardinality fields records must match, selected by bitmap
+                index of year, not supported with `do_export`.
+                *Default** :const:`None`.
 
         Returns:
             :class:`defaultdict`: Dictionary containing generator of converted
             NAMCS patient case data for given year along with source file
             info. Further if `do_export` is True, it returns
-            the absolute path of csv file where the data is exported.
+            the absolute path of csv file where the data is exported, and
+            with `pipeline` statistics of the pipeline as `pipeline_stats`,
+            see :func:`run_pipeline`.
+
+        Raises:
+            :class:`ValueError`: If `pipeline` is combined with `where`,
+            `workers`, `use_cache` or `use_memory_cache`.
         """
         year_wise_translated_data = defaultdict(dict)
 
@@ -73,6 +133,33 @@ class NAMCSProcessor(object):
         if file_name and year is None:
             year = int(year or get_year_from_dataset_file_name(file_name))
 
+        # Export with `pipeline`, download, translation and export of
+        # consecutive years overlap, see :func:`run_pipeline`
+        if do_export and pipeline:
+            if where is not None:
+                raise ValueError(
+                    "Filter `where` is not supported with export, years are "
+                    "exported in full"
+                )
+            if workers or use_cache or use_memory_cache:
+                raise ValueError(
+                    "Options `workers`, `use_cache` and `use_memory_cache` "
+                    "are not supported with `pipeline`, years are translated "
+                    "by pipeline stages"
+                )
+            year_wise_translated_data, pipeline_stats = run_pipeline(
+                year=year,
+                namcs_raw_dataset_file=file_name,
+                force_download=force_download,
+                export_format=export_format,
+                compression=compression,
+                force_export=force_export,
+                sinks=sinks,
+                partitioned=partitioned
+            )
+            # Statistics of the whole pipeline, shared by its years
+            for _year_translated_data in year_wise_translated_data.values():
+                _year_translated_data["pipeline_stats"] = pipeline_stats
         # Case 1: Data set file not provided.
         # Case 1: `year` is None
         # In this case method `initiate_namcs_dataset_download` and
@@ -84,22 +171,108 @@ class NAMCSProcessor(object):
         # download dataset file if it doesn't exists locally or
         # `force_download` set to True
         # Download and extract files for `year`
-        if file_name is None:
+        elif file_name is None:
             initiate_namcs_dataset_download(
                 year=year, force_download=force_download
             )
             # Translate dataset for all files
-            year_wise_translated_data = \
-                get_year_wise_generator(year=year, do_export=do_export)
+            year_wise_translated_data = get_year_wise_generator(
+                year=year, do_export=do_export, workers=workers,
+                export_format=export_format, compression=compression,
+                force_export=force_export, sinks=sinks,
+                partitioned=partitioned, use_cache=use_cache,
+                use_memory_cache=use_memory_cache, where=where
+            )
         # Case 2: Year and dataset file name provided.
         # Processing `file_name` for `year`
         elif year and file_name:
             year_wise_translated_data = get_year_wise_generator(
-                year, namcs_raw_dataset_file=file_name, do_export=do_export
+                year, namcs_raw_dataset_file=file_name, do_export=do_export,
+                workers=workers, export_format=export_format,
+                compression=compression, force_export=force_export,
+                sinks=sinks, partitioned=partitioned, use_cache=use_cache,
+                use_memory_cache=use_memory_cache, where=where
             )
 
         return year_wise_translated_data
 
+    async def execute_async(self, year=None, file_name=None,
+                            do_validation=True, force_download=False,
+                            batches=False, batch_size=ASYNC_BATCH_SIZE,
+                            executor=None):
+        """
+        Asyncio counterpart of :func:`execute`, validation, download and
+        translation run in `executor` without blocking the event loop.
+
+        Parameters:
+            year (:class:`int` or :class:`tuple` or :class:`list`): Year(s) for
+                which dataset files will be translated.
+            file_name (:class:`str`): Absolute path of
+                raw dataset input file. If not specified, local file path
+                will be deduced on the basis of `year` specified by user.
+            do_validation (:class:`bool`): If to perform validation
+                on `year` and `file_name`. *Default** :const:`True`.
+            force_download (:class:`bool`): Whether to force download
+                NAMCS raw dataset file even if data set file exists locally.
+                *Default** :const:`False`.
+            batches (:class:`bool`): Whether asynchronous generators yield
+                lists of translated records instead of single records.
+                *Default** :const:`False`.
+            batch_size (:class:`int`): Number of records translated in
+                `executor` at once. **Default** `ASYNC_BATCH_SIZE`.
+            executor (:class:`concurrent.futures.ThreadPoolExecutor`):
+                Executor running blocking work. **Default** default executor
+                of event loop.
+
+        Returns:
+            :class:`defaultdict`: Dictionary containing asynchronous generator
+            of converted NAMCS patient case data for given year along with
+            source file info.
+        """
+        year_wise_translated_data = defaultdict(dict)
+        loop = asyncio.get_running_loop()
+
+        # Skip validation if neither year nor filename is specified.
+        if year is None and file_name is None:
+            do_validation = False
+
+        if do_validation:
+            is_validation_success, validation_object = \
+                await loop.run_in_executor(
+                    executor, self.validate, year, file_name
+                )
+
+            # Validation failed.
+            if not is_validation_success:
+                # Log all the validation errors
+                validation_object.show_errors()
+
+                return year_wise_translated_data
+
+        if file_name and year is None:
+            year = int(year or get_year_from_dataset_file_name(file_name))
+
+        # Download and extract files for `year`, see :func:`execute`
+        if file_name is None:
+            await initiate_namcs_dataset_download_async(
+                year=year, force_download=force_download, executor=executor
+            )
+
+        get_async_generator = get_batches_by_year if batches \
+            else get_records_by_year
+        for _year in map(
+                int, YEARS_AVAILABLE if year is None else get_iterable(year)
+        ):
+            year_wise_translated_data[_year]["generator"] = \
+                get_async_generator(
+                    _year, file_name, batch_size=batch_size,
+                    executor=executor
+                )
+            year_wise_translated_data[_year]["source_file_info"] = \
+                get_namcs_source_file_info(_year)
+
+        return year_wise_translated_data
+
     def validate(self, year, file_name):
         """
         Method to validate NAMCS raw dataset file(s).
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing methods to schedule translation of NAMCS dataset file(s)
+of multiple years over a pool of worker processes. Record length of NAMCS
+years varies by more than 30 times, so most expensive years are dispatched
+first and years too expensive for a single worker are split into shards,
+in order to minimize the time of complete run (makespan).
+"""
+# Python modules
+import heapq
+import os
+
+# Other modules
+from hdx_ahcd.helpers.functions import (
+    get_dataset_record_layout,
+    get_dataset_shards,
+)
+from hdx_ahcd.mappers import years
+from hdx_ahcd.namcs.config import (
+    log,
+    NAMCS_PUBLIC_FILE_RECORD_LENGTH_BY_YEAR,
+    SCHEDULER_BYTE_COST,
+)
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# -N/A
+
+
+def get_field_count(year):
+    """
+    Method to get number of fields translated for each record of `year`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+
+    Returns:
+        :class:`int`: Number of field slices defined by year class of `year`.
+    """
+    year_class_object = vars(years).get("Year{}".format(year))
+    return sum(
+        len(slice_object) if isinstance(slice_object, (list, tuple)) else 1
+        for slice_object in
+        year_class_object.get_field_slice_mapping().values()
+    )
+
+
+def estimate_year_cost(year, dataset_file):
+    """
+    Method to estimate relative cost of translating NAMCS dataset file of
+    `year`, based on file size, record length and number of fields.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+
+    Returns:
+        :class:`float`: Estimated cost in units of translating single field
+        of single record.
+    """
+    record_layout = get_dataset_record_layout(dataset_file)
+    if record_layout is not None:
+        record_length, records = record_layout
+    else:
+        record_length = NAMCS_PUBLIC_FILE_RECORD_LENGTH_BY_YEAR[year] + 1
+        records = os.path.getsize(dataset_file) // record_length
+
+    return records * (
+        get_field_count(year) + record_length * SCHEDULER_BYTE_COST
+    )
+
+
+def get_makespan(task_costs, workers):
+    """
+    Method to estimate makespan when tasks are dispatched in the order of
+    `task_costs` to the first free worker.
+
+    Parameters:
+        task_costs (:class:`list`): Costs of tasks in dispatch order.
+        workers (:class:`int`): Number of workers.
+
+    Returns:
+        :class:`float`: Estimated makespan, in cost units.
+    """
+    worker_loads = [0.0] * max(workers, 1)
+    for task_cost in task_costs:
+        heapq.heappush(
+            worker_loads, heapq.heappop(worker_loads) + task_cost
+        )
+    return max(worker_loads)
+
+
+def get_shard_counts(year_costs, workers):
+    """
+    Method to decide number of shards for each year. Starting with one shard
+    per year, the year with most expensive shard is split further as long as
+    it reduces estimated makespan of longest job first schedule.
+
+    Parameters:
+        year_costs (:class:`dict`): Year wise estimated cost.
+        workers (:class:`int`): Number of workers.
+
+    Returns:
+        :class:`dict`: Year wise number of shards.
+    """
+    shard_counts = {_year: 1 for _year in year_costs}
+
+    def _makespan(_shard_counts):
+        task_costs = sorted(
+            (
+                year_costs[_year] / _shard_counts[_year]
+                for _year in _shard_counts
+                for _ in range(_shard_counts[_year])
+            ),
+            reverse=True
+        )
+        return get_makespan(task_costs, workers)
+
+    if not shard_counts:
+        return shard_counts
+
+    makespan = _makespan(shard_counts)
+    while True:
+        # Year having most expensive shard
+        _year = max(
+            shard_counts,
+            key=lambda key: year_costs[key] / shard_counts[key]
+        )
+        if shard_counts[_year] >= workers:
+            break
+        candidate_shard_counts = dict(shard_counts)
+        candidate_shard_counts[_year] += 1
+        candidate_makespan = _makespan(candidate_shard_counts)
+        if candidate_makespan >= makespan:
+            break
+        shard_counts, makespan = candidate_shard_counts, candidate_makespan
+    return shard_counts
+
+
+def get_schedule(dataset_files, workers, split=True):
+    """
+    Method to plan translation of NAMCS dataset files over `workers` worker
+    processes, longest job first.
+
+    Parameters:
+        dataset_files (:class:`dict`): Year wise absolute path of raw dataset
+            file.
+        workers (:class:`int`): Number of worker processes.
+        split (:class:`bool`): Whether years can be split in shards.
+            **Default** :const:`True`.
+
+    Returns:
+        :class:`list`: Tasks in dispatch order, most expensive first. Each
+        task is a :class:`dict` with keys `year`, `cost`, `shard_no`,
+        `shards` (number of shards of year) and `shard` (shard as returned by
+        :func:`get_dataset_shards`, :const:`None` when year is not split).
+    """
+    year_costs = {
+        _year: estimate_year_cost(_year, dataset_file)
+        for _year, dataset_file in dataset_files.items()
+    }
+    shard_counts = get_shard_counts(year_costs, workers if split else 1)
+
+    tasks = []
+    for _year, shard_count in shard_counts.items():
+        shards = [None] if shard_count == 1 else \
+            get_dataset_shards(dataset_files[_year], shard_count=shard_count)
+        for shard_no, shard in enumerate(shards):
+            tasks.append({
+                "year": _year,
+                "cost": year_costs[_year] / len(shards),
+                "shard_no": shard_no,
+                "shards": len(shards),
+                "shard": shard
+            })
+    tasks.sort(key=lambda task: (-task["cost"], task["year"]))
+
+    log.info(
+        "Schedule for {} worker(s), estimated makespan: {:.0f}, lower "
+        "bound: {:.0f}".format(
+            workers,
+            get_makespan([task["cost"] for task in tasks], workers),
+            sum(year_costs.values()) / max(workers, 1)
+        )
+    )
+    for task in tasks:
+        log.info(
+            "Year: {}, shard: {}/{}, estimated cost: {:.0f}".format(
+                task["year"], task["shard_no"] + 1, task["shards"],
+                task["cost"]
+            )
+        )
+    return tasks
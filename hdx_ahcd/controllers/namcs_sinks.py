@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing sinks, consumers of translated NAMCS patient case data.
+Translated records of a year are decoded once and handed batch by batch to
+any number of sinks in the same loop, like csv or columnar export,
+statistics and callback of caller, see :func:`fan_out`.
+"""
+# Python modules
+from collections import Counter
+from contextlib import ExitStack
+from itertools import islice
+import csv
+import os
+import uuid
+
+# Other modules
+from hdx_ahcd.controllers.namcs_columnar import (
+    get_columnar_file_path,
+    get_columnar_schema,
+    get_columnar_writer,
+    get_record_batch,
+    validate_columnar_export_format,
+)
+from hdx_ahcd.controllers.namcs_converter import (
+    get_csv_rows,
+    get_export_file_path,
+    write_csv_header,
+)
+from hdx_ahcd.controllers.namcs_encoding import get_diagnosis_dictionary
+from hdx_ahcd.helpers.compression import open_export_file
+from hdx_ahcd.namcs.config import (
+    COLUMNAR_ROW_GROUP_SIZE,
+    log,
+    NAMCS_DATA_DIR_PATH,
+    SINK_BATCH_SIZE,
+)
+from hdx_ahcd.namcs.enums import (
+    ExportFormatEnum,
+    NAMCSFieldEnum,
+)
+from hdx_ahcd.utils.context import try_except
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# -N/A
+
+
+class RecordSink(object):
+    """
+    Base class of sinks. Sink is opened for a year, receives translated
+    records of the year in batches and is either closed, returning its
+    result, or aborted if translation or another sink failed. Same sink can
+    be opened again for next year.
+    """
+    # Key of result of sink, see :func:`fan_out`
+    name = None
+
+    def open(self, year):
+        """
+        Method to prepare sink for translated records of `year`.
+
+        Parameters:
+            year (:class:`int`): NAMCS year.
+        """
+        self.year = year
+
+    def write(self, translated_records):
+        """
+        Method to consume batch of translated records.
+
+        Parameters:
+            translated_records (:class:`list`): Translated records.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Method to finish consuming translated records of year.
+
+        Returns:
+            :class:`object`: Result of sink.
+        """
+        return None
+
+    def abort(self, exc):
+        """
+        Method to discard partial output, called instead of :func:`close`.
+
+        Parameters:
+            exc (:class:`Exception`): Exception which aborted the year.
+        """
+        pass
+
+
+class CsvSink(RecordSink):
+    """
+    Sink writing translated records into csv file, output is same as
+    :func:`hdx_ahcd.controllers.namcs_converter.export_to_csv`.
+    """
+    name = ExportFormatEnum.CSV.value
+
+    def __init__(self, export_dir=None, diagnoses_separator=None,
+                 compression=None):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            export_dir (:class:`str`): Directory where csv file is written.
+                **Default** `NAMCS_DATA_DIR_PATH`.
+            diagnoses_separator (:class:`str`): Separator used to join
+                physician diagnoses codes. **Default** :const:`None`.
+            compression (:class:`str`): Value of :class:`CompressionEnum`.
+                **Default** :const:`None`.
+        """
+        self.export_dir = export_dir
+        self.diagnoses_separator = diagnoses_separator
+        self.compression = compression
+
+    def open(self, year):
+        super().open(year)
+        self.file_name = get_export_file_path(
+            year, export_dir=self.export_dir or NAMCS_DATA_DIR_PATH,
+            compression=self.compression
+        )
+        self.exit_stack = ExitStack()
+        csv_file = self.exit_stack.enter_context(
+            open_export_file(
+                get_export_file_path(
+                    year, export_dir=self.export_dir or NAMCS_DATA_DIR_PATH
+                ),
+                compression=self.compression
+            )
+        )
+        write_csv_header(csv_file)
+        self.writer = csv.writer(csv_file, delimiter=",")
+
+    def write(self, translated_records):
+        self.writer.writerows(
+            get_csv_rows(translated_records, self.diagnoses_separator)
+        )
+
+    def close(self):
+        self.exit_stack.close()
+        log.info("Finished writing to the file %s" % self.file_name)
+        return os.path.realpath(self.file_name)
+
+    def abort(self, exc):
+        # Temporary file is removed, existing csv file is kept
+        self.exit_stack.__exit__(type(exc), exc, exc.__traceback__)
+
+
+class ColumnarSink(RecordSink):
+    """
+    Sink writing translated records into columnar file, output is same as
+    :func:`hdx_ahcd.controllers.namcs_columnar.export_to_columnar`. File is
+    written atomically, existing file is kept when sink is aborted.
+    """
+    def __init__(self, export_format=ExportFormatEnum.PARQUET.value,
+                 export_dir=None, row_group_size=COLUMNAR_ROW_GROUP_SIZE,
+                 encode_diagnoses=False):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            export_format (:class:`str`): `arrow` for Arrow IPC file or
+                `parquet` for Parquet file. **Default** `parquet`.
+            export_dir (:class:`str`): Directory where file is written.
+                **Default** `NAMCS_DATA_DIR_PATH`.
+            row_group_size (:class:`int`): Number of records per record batch
+                or row group. **Default** `COLUMNAR_ROW_GROUP_SIZE`.
+            encode_diagnoses (:class:`bool`): Whether to store physician
+                diagnoses as int32 ids of shared diagnosis dictionary.
+                **Default** :const:`False`.
+
+        Raises:
+            :class:`ImportError`: If `pyarrow` is not installed.
+            :class:`ValueError`: If `export_format` is not columnar format.
+        """
+        validate_columnar_export_format(export_format)
+        self.name = export_format
+        self.export_dir = export_dir
+        self.row_group_size = row_group_size
+        self.encode_diagnoses = encode_diagnoses
+
+    def open(self, year):
+        super().open(year)
+        self.schema = get_columnar_schema(self.encode_diagnoses)
+        self.diagnosis_dictionary = get_diagnosis_dictionary() \
+            if self.encode_diagnoses else None
+        self.file_name = get_columnar_file_path(
+            year, self.name, self.export_dir or NAMCS_DATA_DIR_PATH
+        )
+        self.temporary_file_name = os.path.join(
+            os.path.dirname(self.file_name),
+            ".{}.{}.tmp".format(
+                os.path.basename(self.file_name), uuid.uuid4().hex
+            )
+        )
+        self.writer, self.write_batch = get_columnar_writer(
+            self.temporary_file_name, self.name, self.schema
+        )
+        self.pending_records = []
+
+    def _flush(self):
+        """
+        Method to write pending records as a record batch.
+        """
+        if self.pending_records:
+            self.write_batch(
+                get_record_batch(
+                    self.pending_records, self.schema,
+                    self.diagnosis_dictionary
+                )
+            )
+            self.pending_records = []
+
+    def write(self, translated_records):
+        self.pending_records.extend(translated_records)
+        while len(self.pending_records) >= self.row_group_size:
+            self.write_batch(get_record_batch(
+                self.pending_records[:self.row_group_size], self.schema,
+                self.diagnosis_dictionary
+            ))
+            del self.pending_records[:self.row_group_size]
+
+    def close(self):
+        try:
+            self._flush()
+            self.writer.close()
+            os.replace(self.temporary_file_name, self.file_name)
+        except BaseException as exc:
+            self.abort(exc)
+            raise
+        if self.diagnosis_dictionary is not None:
+            self.diagnosis_dictionary.save()
+        log.info("Finished writing to the file %s" % self.file_name)
+        return os.path.realpath(self.file_name)
+
+    def abort(self, exc):
+        # Existing file is kept, partial file is discarded
+        with try_except():
+            self.writer.close()
+        if os.path.exists(self.temporary_file_name):
+            os.remove(self.temporary_file_name)
+
+
+class StatsSink(RecordSink):
+    """
+    Sink computing summary statistics of translated records.
+    """
+    name = "stats"
+
+    def open(self, year):
+        super().open(year)
+        self.stats = {
+            "records": 0,
+            "weighted_visits": 0.0,
+            "diagnoses": 0,
+            "records_by_gender": Counter(),
+            "records_by_month": Counter(),
+        }
+
+    def write(self, translated_records):
+        stats = self.stats
+        stats["records"] += len(translated_records)
+        for translated_record in translated_records:
+            stats["weighted_visits"] += translated_record.get(
+                NAMCSFieldEnum.VISIT_WEIGHT.value
+            ) or 0.0
+            stats["diagnoses"] += len(translated_record.get(
+                NAMCSFieldEnum.PHYSICIANS_DIAGNOSES.value
+            ) or ())
+        stats["records_by_gender"].update(
+            translated_record.get(NAMCSFieldEnum.GENDER.value)
+            for translated_record in translated_records
+        )
+        stats["records_by_month"].update(
+            translated_record.get(NAMCSFieldEnum.MONTH_OF_VISIT.value)
+            for translated_record in translated_records
+        )
+
+    def close(self):
+        stats = dict(self.stats)
+        stats["records_by_gender"] = dict(stats["records_by_gender"])
+        stats["records_by_month"] = dict(stats["records_by_month"])
+        return stats
+
+
+class CallbackSink(RecordSink):
+    """
+    Sink handing translated records to callback of caller.
+    """
+    def __init__(self, callback, name="callback"):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            callback (:class:`function`): Called as
+                `callback(year, translated_records)` for every batch,
+                `translated_records` must not be modified.
+            name (:class:`str`): Key of result of sink.
+                **Default** `callback`.
+        """
+        self.callback = callback
+        self.name = name
+
+    def write(self, translated_records):
+        self.callback(self.year, translated_records)
+
+
+def get_export_sink(export_format=ExportFormatEnum.CSV.value,
+                    export_dir=None, compression=None, partitioned=False):
+    """
+    Method to get sink exporting translated records into file of
+    `export_format`.
+
+    Parameters:
+        export_format (:class:`str`): Value of :class:`ExportFormatEnum`.
+            **Default** `csv`.
+        export_dir (:class:`str`): Directory where file is written.
+            **Default** `NAMCS_DATA_DIR_PATH`.
+        compression (:class:`str`): Compression of csv file.
+            **Default** :const:`None`.
+        partitioned (:class:`bool`): Whether to export into partitioned
+            layout. **Default** :const:`False`.
+
+    Returns:
+        :class:`RecordSink`: :class:`CsvSink`, :class:`ColumnarSink` or
+        :class:`hdx_ahcd.controllers.namcs_partitioned.PartitionedSink`.
+
+    Raises:
+        :class:`ValueError`: If `compression` is specified for columnar
+        `export_format`.
+    """
+    if partitioned:
+        # Avoids cyclic import issue
+        from hdx_ahcd.controllers.namcs_partitioned import PartitionedSink
+        return PartitionedSink(
+            export_format=export_format, export_dir=export_dir,
+            compression=compression
+        )
+    if export_format == ExportFormatEnum.CSV.value:
+        return CsvSink(export_dir=export_dir, compression=compression)
+    if compression is not None:
+        raise ValueError(
+            "Compression is supported only for export format: csv"
+        )
+    return ColumnarSink(export_format=export_format, export_dir=export_dir)
+
+
+def fan_out(year, generator_object, sinks, batch_size=SINK_BATCH_SIZE):
+    """
+    Method to hand translated records of `year` to every sink of `sinks` in
+    a single pass over `generator_object`, neither records are buffered
+    beyond a batch nor translated twice.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        generator_object (:class:`generator`): Generator object containing
+            translated NAMCS patient case data for `year`.
+        sinks (:class:`list`): Objects of :class:`RecordSink`.
+        batch_size (:class:`int`): Number of records handed to sinks at
+            once. **Default** `SINK_BATCH_SIZE`.
+
+    Returns:
+        :class:`list`: Result of every sink, in the order of `sinks`.
+
+    Raises:
+        :class:`Exception`: Exception raised by translation or any sink, all
+        the sinks are aborted. If :func:`RecordSink.close` of a sink raises,
+        sinks after it are aborted.
+
+    Usage:
+        >>> stats_sink = StatsSink()
+        >>> file_name, stats = fan_out(
+        ...     2000, get_generator_by_year(2000), [CsvSink(), stats_sink]
+        ... )
+    """
+    opened_sinks = []
+    try:
+        for sink in sinks:
+            sink.open(year)
+            opened_sinks.append(sink)
+        for translated_records in iter(
+                lambda: list(islice(generator_object, batch_size)), []
+        ):
+            for sink in opened_sinks:
+                sink.write(translated_records)
+    except Exception as exc:
+        for sink in opened_sinks:
+            with try_except():
+                sink.abort(exc)
+        raise
+
+    results = []
+    for sink_no, sink in enumerate(opened_sinks):
+        try:
+            results.append(sink.close())
+        except Exception as exc:
+            # Sinks not closed yet are aborted, sinks already closed keep
+            # their output
+            for remaining_sink in opened_sinks[sink_no + 1:]:
+                with try_except():
+                    remaining_sink.abort(exc)
+            raise
+    return results
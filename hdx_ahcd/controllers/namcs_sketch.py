@@ -0,0 +1,554 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing approximate distinct counts of physician diagnoses by
+HyperLogLog sketches (Flajolet et al., 2007), see :class:`HyperLogLog`.
+Sketches of distinct diagnosis codes and of distinct code combinations of a
+visit are built for every group while a year is translated, see
+:class:`DistinctSketchSink`, and written next to extracted dataset file of
+the year. Sketches of any range of years are merged by maximum of their
+registers, without translating years again, see :func:`count_distinct`.
+
+Sketch of precision `p` has `m = 2 ** p` registers of a byte, relative
+standard error of count is `1.04 / sqrt(m)`, 1.6% for default precision 12,
+see `DISTINCT_SKETCH_PRECISION`, whatever the number of distinct values or
+years merged. Small counts are corrected by linear counting and are nearly
+exact.
+"""
+# Python modules
+import hashlib
+import json
+import math
+import os
+import uuid
+import zlib
+
+# Other modules
+from hdx_ahcd.controllers.namcs_converter import get_generator_by_year
+from hdx_ahcd.controllers.namcs_estimates import (
+    EstimateSink,
+    get_dimension_values_method,
+    validate_estimate_options,
+)
+from hdx_ahcd.controllers.namcs_fingerprint import (
+    get_export_fingerprint,
+    is_export_up_to_date,
+    record_fingerprint,
+)
+from hdx_ahcd.controllers.namcs_index import get_index_file_path
+from hdx_ahcd.controllers.namcs_sinks import fan_out
+from hdx_ahcd.helpers.functions import (
+    get_customized_file_name,
+    get_iterable,
+    get_namcs_dataset_path_for_year,
+)
+from hdx_ahcd.namcs.config import (
+    DISTINCT_SKETCH_FILE_NAME_SUFFIX,
+    DISTINCT_SKETCH_PRECISION,
+    log,
+    YEARS_AVAILABLE,
+)
+from hdx_ahcd.namcs.enums import (
+    EstimateDimensionEnum,
+    EstimateMeasureEnum,
+)
+from hdx_ahcd.utils.context import try_except
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# Sketch of distinct diagnosis codes
+SKETCH_CODES = "codes"
+# Sketch of distinct combinations of diagnosis codes of a visit
+SKETCH_COMBINATIONS = "combinations"
+# Number of bits of hash of value
+HASH_BITS = 64
+
+
+def validate_precision(precision):
+    """
+    Method to validate `precision` of sketch.
+
+    Parameters:
+        precision (:class:`int`): Number of index bits of hash.
+
+    Raises:
+        :class:`ValueError`: If `precision` is not between 4 and 16.
+    """
+    if not 4 <= precision <= 16:
+        raise ValueError(
+            "Invalid precision: {}, expected between 4 and 16".format(
+                precision
+            )
+        )
+
+
+def get_hash(value):
+    """
+    Method to get 64 bit hash of `value`, stable across processes.
+
+    Parameters:
+        value (:class:`str`): Counted value.
+
+    Returns:
+        :class:`int`: Hash of `value`.
+    """
+    return int.from_bytes(
+        hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+class HyperLogLog(object):
+    """
+    HyperLogLog sketch of distinct values. Register `n` holds largest rank,
+    position of first set bit, of hashes of values whose leading `precision`
+    bits are `n`.
+    """
+    def __init__(self, precision=DISTINCT_SKETCH_PRECISION, registers=None):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            precision (:class:`int`): Number of index bits of hash, between
+                4 and 16. **Default** `DISTINCT_SKETCH_PRECISION`.
+            registers (:class:`bytes`): Registers of sketch.
+                **Default** empty sketch.
+
+        Raises:
+            :class:`ValueError`: If `precision` is out of range, or number of
+            `registers` doesn't match `precision`.
+        """
+        validate_precision(precision)
+        self.precision = precision
+        self.registers = bytearray(
+            registers if registers is not None else 1 << precision
+        )
+        if len(self.registers) != 1 << precision:
+            raise ValueError(
+                "Expected {} registers for precision: {}, got {}".format(
+                    1 << precision, precision, len(self.registers)
+                )
+            )
+
+    def add(self, value):
+        """
+        Method to add `value` to sketch.
+
+        Parameters:
+            value (:class:`str`): Counted value.
+        """
+        self.add_hash(get_hash(value))
+
+    def add_hash(self, value_hash):
+        """
+        Method to add value of hash `value_hash` to sketch.
+
+        Parameters:
+            value_hash (:class:`int`): Hash of value, see :func:`get_hash`.
+        """
+        rank_bits = HASH_BITS - self.precision
+        index = value_hash >> rank_bits
+        rank = rank_bits - \
+            (value_hash & ((1 << rank_bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """
+        Method to merge sketch `other`, sketch then counts values of both.
+
+        Parameters:
+            other (:class:`HyperLogLog`): Sketch of same precision.
+
+        Raises:
+            :class:`ValueError`: If precision of sketches differ.
+        """
+        if other.precision != self.precision:
+            raise ValueError(
+                "Sketches of precision: {} and {} can not be merged".format(
+                    self.precision, other.precision
+                )
+            )
+        # Byte wise maximum of registers as big integers, registers are
+        # below 128, high bit of every byte of `(a | high_bits) - b` is set
+        # if byte of `a` is not less than byte of `b`
+        size = len(self.registers)
+        high_bits = int.from_bytes(b"\x80" * size, "little")
+        registers = int.from_bytes(self.registers, "little")
+        other_registers = int.from_bytes(other.registers, "little")
+        mask = ((((registers | high_bits) - other_registers) & high_bits)
+                >> 7) * 0xFF
+        self.registers = bytearray(
+            ((registers & mask) | (other_registers & ~mask)).to_bytes(
+                size, "little"
+            )
+        )
+
+    def count(self):
+        """
+        Method to get estimated number of distinct values added.
+
+        Returns:
+            :class:`int`: Estimated count.
+        """
+        size = len(self.registers)
+        if size >= 128:
+            alpha = 0.7213 / (1 + 1.079 / size)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[size]
+        registers = bytes(self.registers)
+        estimate = alpha * size * size / sum(
+            registers.count(rank) * 2.0 ** -rank
+            for rank in range(max(registers) + 1)
+        )
+        zero_registers = self.registers.count(0)
+        # Small range correction by linear counting
+        if estimate <= 2.5 * size and zero_registers:
+            estimate = size * math.log(size / zero_registers)
+        return int(round(estimate))
+
+
+def get_distinct_sketches_path(year, group_by=(), sketch_dir=None):
+    """
+    Method to get absolute path of sketches file of `year` grouped by
+    `group_by`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        group_by (:class:`tuple`): Dimensions of groups.
+            **Default** no dimension.
+        sketch_dir (:class:`str`): Directory holding sketches files.
+            **Default** directory of extracted dataset file of `year`.
+
+    Returns:
+        :class:`str`: Absolute path of sketches file, like
+        `2000_NAMCS_DISTINCT_SKETCHES_SEX.idx`, see
+        :func:`hdx_ahcd.controllers.namcs_index.get_index_file_path`.
+    """
+    return get_index_file_path(
+        year,
+        get_customized_file_name(
+            DISTINCT_SKETCH_FILE_NAME_SUFFIX, *get_iterable(group_by)
+        ).upper(),
+        sketch_dir
+    )
+
+
+def get_distinct_sketches_fingerprint(year, dataset_file, sketches_file,
+                                      group_by=(),
+                                      precision=DISTINCT_SKETCH_PRECISION):
+    """
+    Method to get fingerprint of sketches of `dataset_file`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+        sketches_file (:class:`str`): Absolute path of sketches file.
+        group_by (:class:`tuple`): Dimensions of groups.
+            **Default** no dimension.
+        precision (:class:`int`): Precision of sketches.
+            **Default** `DISTINCT_SKETCH_PRECISION`.
+
+    Returns:
+        :class:`dict`: Fingerprint, see
+        :func:`hdx_ahcd.controllers.namcs_fingerprint.get_export_fingerprint`.
+    """
+    return get_export_fingerprint(
+        year, dataset_file, sketches_file,
+        export_options={
+            "index": DISTINCT_SKETCH_FILE_NAME_SUFFIX,
+            "group_by": list(get_iterable(group_by)),
+            "precision": precision,
+        }
+    )
+
+
+def read_distinct_sketches(sketches_file):
+    """
+    Method to read sketches from `sketches_file`.
+
+    Parameters:
+        sketches_file (:class:`str`): Absolute path of sketches file.
+
+    Returns:
+        :class:`dict`: By group, :class:`dict` of :class:`HyperLogLog` by
+        kind of sketch, `codes` or `combinations`.
+    """
+    with open(sketches_file, "rb") as file_handle:
+        header = json.loads(file_handle.readline().decode("utf-8"))
+        registers = zlib.decompress(file_handle.read())
+    precision = header["precision"]
+    size = 1 << precision
+    sketches = {}
+    for position, (group, kind) in enumerate(header["sketches"]):
+        sketches.setdefault(tuple(group), {})[kind] = HyperLogLog(
+            precision, registers[position * size:(position + 1) * size]
+        )
+    return sketches
+
+
+def write_distinct_sketches(sketches_file, sketches,
+                            precision=DISTINCT_SKETCH_PRECISION):
+    """
+    Method to write `sketches` into `sketches_file`, file is replaced
+    atomically. File starts with a json header line holding group and kind
+    of every sketch, followed by zlib compressed registers of all the
+    sketches.
+
+    Parameters:
+        sketches_file (:class:`str`): Absolute path of sketches file.
+        sketches (:class:`dict`): Sketches by kind by group, see
+            :func:`read_distinct_sketches`.
+        precision (:class:`int`): Precision of `sketches`.
+            **Default** `DISTINCT_SKETCH_PRECISION`.
+    """
+    entries = []
+    registers = []
+    for group, group_sketches in sketches.items():
+        for kind, sketch in group_sketches.items():
+            entries.append([list(group), kind])
+            registers.append(bytes(sketch.registers))
+
+    os.makedirs(os.path.dirname(sketches_file), exist_ok=True)
+    temporary_file_name = os.path.join(
+        os.path.dirname(sketches_file),
+        ".{}.{}.tmp".format(os.path.basename(sketches_file), uuid.uuid4().hex)
+    )
+    try:
+        with open(temporary_file_name, "wb") as file_handle:
+            file_handle.write(
+                json.dumps(
+                    {"precision": precision, "sketches": entries}
+                ).encode("utf-8") + b"\n"
+            )
+            file_handle.write(zlib.compress(b"".join(registers)))
+        os.replace(temporary_file_name, sketches_file)
+    except BaseException:
+        with try_except():
+            os.remove(temporary_file_name)
+        raise
+
+
+class DistinctSketchSink(EstimateSink):
+    """
+    Sink building sketches of distinct diagnosis codes and of distinct code
+    combinations of translated records for every group, see
+    :mod:`hdx_ahcd.controllers.namcs_sinks`. Code combination of a visit is
+    its sorted distinct codes, visits without diagnosis have none. Sketches
+    are written to sketches file of the year, whose path is result of the
+    year, and kept as `sketches`.
+    """
+    name = "distinct_sketches"
+
+    def __init__(self, group_by=(), precision=DISTINCT_SKETCH_PRECISION,
+                 sketch_dir=None, namcs_raw_dataset_file=None):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            group_by (:class:`tuple`): Dimensions, see
+                :class:`hdx_ahcd.controllers.namcs_estimates.EstimateSink`.
+                **Default** no dimension, a single group.
+            precision (:class:`int`): Precision of sketches, see
+                :class:`HyperLogLog`. **Default** `DISTINCT_SKETCH_PRECISION`.
+            sketch_dir (:class:`str`): Directory where sketches file is
+                written. **Default** directory of extracted dataset file.
+            namcs_raw_dataset_file (:class:`str`): Absolute path of raw
+                dataset file records are translated from, recorded in
+                fingerprint of sketches. **Default** dataset file of the
+                year.
+
+        Raises:
+            :class:`ValueError`: If any of dimensions is unknown or
+            `precision` is out of range.
+        """
+        super().__init__(group_by)
+        validate_precision(precision)
+        self.precision = precision
+        self.sketch_dir = sketch_dir
+        self.namcs_raw_dataset_file = namcs_raw_dataset_file
+        self.get_diagnoses = get_dimension_values_method(
+            EstimateDimensionEnum.DIAGNOSIS.value
+        )
+
+    def open(self, year):
+        super().open(year)
+        self.sketches = {}
+
+    def write(self, translated_records):
+        sketches = self.sketches
+        for translated_record in translated_records:
+            codes = sorted(self.get_diagnoses(translated_record))
+            if not codes:
+                continue
+            # Values are hashed once for all the groups of record
+            code_hashes = list(map(get_hash, codes))
+            combination_hash = get_hash(",".join(codes))
+            for group in self.get_groups(translated_record):
+                group_sketches = sketches.get(group)
+                if group_sketches is None:
+                    group_sketches = sketches[group] = {
+                        SKETCH_CODES: HyperLogLog(self.precision),
+                        SKETCH_COMBINATIONS: HyperLogLog(self.precision),
+                    }
+                add_code_hash = group_sketches[SKETCH_CODES].add_hash
+                for code_hash in code_hashes:
+                    add_code_hash(code_hash)
+                group_sketches[SKETCH_COMBINATIONS].add_hash(
+                    combination_hash
+                )
+
+    def close(self):
+        dataset_file = self.namcs_raw_dataset_file or \
+            get_namcs_dataset_path_for_year(self.year)
+        sketches_file = get_distinct_sketches_path(
+            self.year, self.group_by,
+            self.sketch_dir or os.path.dirname(dataset_file)
+        )
+        with record_fingerprint(
+                sketches_file,
+                get_distinct_sketches_fingerprint(
+                    self.year, dataset_file, sketches_file, self.group_by,
+                    self.precision
+                )
+        ):
+            write_distinct_sketches(
+                sketches_file, self.sketches, self.precision
+            )
+        log.info("Finished writing to the file %s" % sketches_file)
+        return sketches_file
+
+
+def get_distinct_sketches(year, group_by=(), namcs_raw_dataset_file=None,
+                          sketch_dir=None):
+    """
+    Method to get sketches of `year` for every group, year is translated and
+    sketches are written if sketches file is missing or outdated.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        group_by (:class:`tuple`): Dimensions, see :class:`DistinctSketchSink`.
+            **Default** no dimension, a single group.
+        namcs_raw_dataset_file (:class:`str`): Absolute path of raw dataset
+            file. **Default** dataset file of `year`.
+        sketch_dir (:class:`str`): Directory holding sketches files.
+            **Default** directory of extracted dataset file.
+
+    Returns:
+        :class:`dict`: Sketches by kind by group, see
+        :func:`read_distinct_sketches`, :const:`None` if dataset file of
+        `year` is not available.
+
+    Raises:
+        :class:`ValueError`: If any of dimensions is unknown.
+    """
+    group_by = tuple(get_iterable(group_by))
+    validate_estimate_options(group_by, EstimateMeasureEnum.VISITS.value)
+    dataset_file = namcs_raw_dataset_file or \
+        get_namcs_dataset_path_for_year(year)
+    if dataset_file is None or not os.path.exists(dataset_file):
+        return None
+
+    sketches_file = get_distinct_sketches_path(
+        year, group_by, sketch_dir or os.path.dirname(dataset_file)
+    )
+    if is_export_up_to_date(
+            sketches_file,
+            get_distinct_sketches_fingerprint(
+                year, dataset_file, sketches_file, group_by
+            )
+    ):
+        return read_distinct_sketches(sketches_file)
+
+    sink = DistinctSketchSink(
+        group_by, sketch_dir=os.path.dirname(sketches_file),
+        namcs_raw_dataset_file=dataset_file
+    )
+    fan_out(year, get_generator_by_year(year, dataset_file), [sink])
+    return sink.sketches
+
+
+def merge_distinct_sketches(year=None, group_by=(), sketch_dir=None):
+    """
+    Method to get sketches of every group merged over all the years. Years
+    for which NAMCS dataset file is not available locally are skipped.
+
+    Parameters:
+        year (:class:`int` or :class:`tuple` or :class:`list`): NAMCS year(s)
+            to merge. If year is not specified, all the years defined in
+            `YEARS_AVAILABLE` are merged.
+        group_by (:class:`tuple`): Dimensions, see :class:`DistinctSketchSink`.
+            **Default** no dimension, a single group.
+        sketch_dir (:class:`str`): Directory holding sketches files.
+            **Default** directory of extracted dataset file.
+
+    Returns:
+        :class:`dict`: Sketches by kind by group, see
+        :func:`read_distinct_sketches`.
+
+    Raises:
+        :class:`ValueError`: If any of dimensions is unknown.
+    """
+    merged_sketches = {}
+    for _year in sorted(
+            set(map(int, YEARS_AVAILABLE if year is None
+                    else get_iterable(year)))
+    ):
+        sketches = get_distinct_sketches(
+            _year, group_by, sketch_dir=sketch_dir
+        )
+        if sketches is None:
+            log.error(
+                "NAMCS dataset file for year: {} is not available, skipping "
+                "year".format(_year)
+            )
+            continue
+        for group, group_sketches in sketches.items():
+            merged_group_sketches = merged_sketches.get(group)
+            if merged_group_sketches is None:
+                merged_sketches[group] = group_sketches
+                continue
+            for kind, sketch in group_sketches.items():
+                merged_group_sketches[kind].merge(sketch)
+    return merged_sketches
+
+
+def count_distinct(year=None, group_by=(), sketch_dir=None):
+    """
+    Method to get approximate number of distinct diagnosis codes and of
+    distinct code combinations of visits of every group over all the years,
+    see :func:`merge_distinct_sketches`. Relative standard error of counts is
+    `1.04 / sqrt(2 ** DISTINCT_SKETCH_PRECISION)`.
+
+    Parameters:
+        year (:class:`int` or :class:`tuple` or :class:`list`): NAMCS year(s)
+            to count. If year is not specified, all the years defined in
+            `YEARS_AVAILABLE` are counted.
+        group_by (:class:`tuple`): Dimensions, see :class:`DistinctSketchSink`.
+            **Default** no dimension, a single group.
+        sketch_dir (:class:`str`): Directory holding sketches files.
+            **Default** directory of extracted dataset file.
+
+    Returns:
+        :class:`dict`: By group, :class:`dict` with keys as:
+            `codes` (:class:`int`): Estimated number of distinct codes.
+            `combinations` (:class:`int`): Estimated number of distinct code
+            combinations of visits.
+
+    Raises:
+        :class:`ValueError`: If any of dimensions is unknown.
+
+    Usage:
+        >>> distinct_counts = count_distinct(
+        ...     tuple(range(2005, 2016)), group_by=("sex",)
+        ... )
+        >>> distinct_counts[("Female",)]["codes"]
+    """
+    return {
+        group: {
+            kind: sketch.count() for kind, sketch in group_sketches.items()
+        }
+        for group, group_sketches in merge_distinct_sketches(
+            year, group_by, sketch_dir
+        ).items()
+    }
@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing methods to bulk load translated NAMCS patient case data
+into local SQLite database. Every visit is a row of table `visits` and every
+physician diagnosis of a visit is a row of table `visit_diagnosis`, so that
+visits can be queried by diagnosis code without parsing lists.
+
+Note:
+    Year is loaded in a single transaction. Indexes are kept when a single
+    year is appended, see :func:`export_to_sqlite`, and dropped during bulk
+    load of years and built once load is complete, see
+    :func:`load_years_to_sqlite`.
+"""
+# Python modules
+import os
+import sqlite3
+
+# Other modules
+from hdx_ahcd.controllers.namcs_converter import get_generator_by_year
+from hdx_ahcd.controllers.namcs_sinks import (
+    fan_out,
+    RecordSink,
+)
+from hdx_ahcd.helpers.functions import (
+    get_iterable,
+    get_namcs_dataset_path_for_year,
+)
+from hdx_ahcd.namcs.config import (
+    log,
+    NAMCS_DATA_DIR_PATH,
+    SQLITE_BULK_LOAD_PRAGMAS,
+    SQLITE_DATABASE_FILE_NAME,
+    YEARS_AVAILABLE,
+)
+from hdx_ahcd.namcs.enums import NAMCSFieldEnum
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# Columns of table `visits` taken from translated record, in insert order
+VISIT_COLUMNS = (
+    NAMCSFieldEnum.SOURCE_FILE_ID.value,
+    NAMCSFieldEnum.SOURCE_FILE_ROW.value,
+    NAMCSFieldEnum.MONTH_OF_VISIT.value,
+    NAMCSFieldEnum.YEAR_OF_VISIT.value,
+    NAMCSFieldEnum.GENDER.value,
+    NAMCSFieldEnum.PATIENT_AGE.value,
+    NAMCSFieldEnum.VISIT_WEIGHT.value,
+)
+
+CREATE_TABLE_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS visits (
+        visit_id INTEGER PRIMARY KEY,
+        year INTEGER NOT NULL,
+        source_file_ID TEXT,
+        source_file_row INTEGER,
+        month_of_visit INTEGER,
+        year_of_visit INTEGER,
+        sex TEXT,
+        age REAL,
+        patient_visit_weight REAL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS visit_diagnosis (
+        visit_id INTEGER NOT NULL REFERENCES visits (visit_id),
+        year INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        diagnosis TEXT NOT NULL
+    )
+    """,
+)
+
+# Index name and its definition, built after bulk load
+INDEXES = (
+    ("idx_visits_year", "visits (year)"),
+    ("idx_visits_month_of_visit", "visits (month_of_visit)"),
+    ("idx_visits_sex", "visits (sex)"),
+    ("idx_visit_diagnosis_diagnosis", "visit_diagnosis (diagnosis)"),
+    ("idx_visit_diagnosis_visit_id", "visit_diagnosis (visit_id)"),
+)
+
+INSERT_VISIT_STATEMENT = \
+    "INSERT INTO visits (visit_id, year, {}) VALUES (?, ?, {})".format(
+        ", ".join(VISIT_COLUMNS), ", ".join("?" for _ in VISIT_COLUMNS)
+    )
+
+INSERT_DIAGNOSIS_STATEMENT = \
+    "INSERT INTO visit_diagnosis (visit_id, year, position, diagnosis) " \
+    "VALUES (?, ?, ?, ?)"
+
+
+def get_sqlite_database_path(database_file=None):
+    """
+    Method to get absolute path of SQLite database.
+
+    Parameters:
+        database_file (:class:`str`): Absolute path of database.
+            **Default** `SQLITE_DATABASE_FILE_NAME` in `NAMCS_DATA_DIR_PATH`.
+
+    Returns:
+        :class:`str`: Absolute path of SQLite database.
+    """
+    return database_file or \
+        os.path.join(NAMCS_DATA_DIR_PATH, SQLITE_DATABASE_FILE_NAME)
+
+
+def connect_for_bulk_load(database_file):
+    """
+    Method to open connection to `database_file` tuned for bulk insert,
+    tables are created if they do not exist.
+
+    Parameters:
+        database_file (:class:`str`): Absolute path of SQLite database.
+
+    Returns:
+        :class:`sqlite3.Connection`: Connection in manual transaction mode.
+    """
+    # Transactions are managed explicitly, see :class:`SqliteSink`
+    connection = sqlite3.connect(database_file, isolation_level=None)
+    for pragma, value in SQLITE_BULK_LOAD_PRAGMAS:
+        connection.execute("PRAGMA {} = {}".format(pragma, value))
+    for statement in CREATE_TABLE_STATEMENTS:
+        connection.execute(statement)
+    return connection
+
+
+def create_sqlite_indexes(connection):
+    """
+    Method to create indexes of loaded tables which do not exist.
+
+    Parameters:
+        connection (:class:`sqlite3.Connection`): Connection to database.
+    """
+    for index_name, index_definition in INDEXES:
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS {} ON {}".format(
+                index_name, index_definition
+            )
+        )
+
+
+def build_sqlite_indexes(connection):
+    """
+    Method to build indexes of loaded tables and refresh statistics of query
+    planner.
+
+    Parameters:
+        connection (:class:`sqlite3.Connection`): Connection to database.
+    """
+    create_sqlite_indexes(connection)
+    connection.execute("ANALYZE")
+
+
+class SqliteSink(RecordSink):
+    """
+    Sink loading translated records into SQLite database, see
+    :mod:`hdx_ahcd.controllers.namcs_sinks`. Rows previously loaded for the
+    year are replaced, and year is loaded in a single transaction, so that
+    failed load leaves database as it was.
+    """
+    name = "sqlite"
+
+    def __init__(self, database_file=None, drop_indexes=False):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            database_file (:class:`str`): Absolute path of SQLite database.
+                **Default** `SQLITE_DATABASE_FILE_NAME` in
+                `NAMCS_DATA_DIR_PATH`.
+            drop_indexes (:class:`bool`): Whether to drop indexes while the
+                year is loaded, caller then builds them once all the years
+                are loaded, see :func:`build_sqlite_indexes`.
+                **Default** :const:`False`, indexes are kept and updated
+                with inserted rows.
+        """
+        self.database_file = database_file
+        self.drop_indexes = drop_indexes
+
+    def open(self, year):
+        super().open(year)
+        self.connection = connect_for_bulk_load(
+            get_sqlite_database_path(self.database_file)
+        )
+        self.connection.execute("BEGIN")
+        if self.drop_indexes:
+            # Maintaining indexes row by row is slower than building them
+            # once for all the years
+            for index_name, _ in INDEXES:
+                self.connection.execute("DROP INDEX IF EXISTS {}".format(
+                    index_name
+                ))
+        else:
+            # Rebuilding indexes over all the loaded years costs more than
+            # updating them with rows of one year
+            create_sqlite_indexes(self.connection)
+        self.connection.execute(
+            "DELETE FROM visit_diagnosis WHERE year = ?", (year,)
+        )
+        self.connection.execute("DELETE FROM visits WHERE year = ?", (year,))
+        # Visit ids are assigned here, so that diagnosis rows can reference
+        # them without reading back ids of inserted rows
+        self.next_visit_id = self.connection.execute(
+            "SELECT COALESCE(MAX(visit_id), 0) + 1 FROM visits"
+        ).fetchone()[0]
+        self.visit_count = 0
+        self.diagnosis_count = 0
+
+    def write(self, translated_records):
+        year = self.year
+        visit_id = self.next_visit_id
+        visit_rows = []
+        diagnosis_rows = []
+        diagnoses_field = NAMCSFieldEnum.PHYSICIANS_DIAGNOSES.value
+        for translated_record in translated_records:
+            visit_rows.append(
+                (visit_id, year) +
+                tuple(map(translated_record.get, VISIT_COLUMNS))
+            )
+            diagnosis_rows.extend(
+                (visit_id, year, position, diagnosis)
+                for position, diagnosis in enumerate(
+                    translated_record.get(diagnoses_field) or (), 1
+                )
+            )
+            visit_id += 1
+        self.connection.executemany(INSERT_VISIT_STATEMENT, visit_rows)
+        self.connection.executemany(INSERT_DIAGNOSIS_STATEMENT, diagnosis_rows)
+        self.next_visit_id = visit_id
+        self.visit_count += len(visit_rows)
+        self.diagnosis_count += len(diagnosis_rows)
+
+    def close(self):
+        try:
+            self.connection.execute("COMMIT")
+            if not self.drop_indexes:
+                # Statistics are refreshed only if they are out of date
+                self.connection.execute("PRAGMA optimize")
+        finally:
+            self.connection.close()
+        log.info(
+            "Loaded year: {}, visits: {}, diagnoses: {} into {}".format(
+                self.year, self.visit_count, self.diagnosis_count,
+                get_sqlite_database_path(self.database_file)
+            )
+        )
+        return {
+            "database_file": os.path.realpath(
+                get_sqlite_database_path(self.database_file)
+            ),
+            "visits": self.visit_count,
+            "diagnoses": self.diagnosis_count,
+        }
+
+    def abort(self, exc):
+        # Dropped indexes and deleted rows are restored as well
+        try:
+            self.connection.execute("ROLLBACK")
+        finally:
+            self.connection.close()
+
+
+def export_to_sqlite(year, generator_object, database_file=None):
+    """
+    Method to load the translated NAMCS patient case data for a given year
+    into SQLite database, indexes are kept and updated with rows of the year.
+
+    Parameters:
+        year (:class:`int`): Year for which translated NAMCS data will be
+            loaded.
+        generator_object (:class:`generator`): Generator object containing
+            translated NAMCS patient case data for `year`.
+        database_file (:class:`str`): Absolute path of SQLite database.
+            **Default** `SQLITE_DATABASE_FILE_NAME` in `NAMCS_DATA_DIR_PATH`.
+
+    Returns:
+        :class:`dict`: Absolute path of database as `database_file` and
+        number of loaded `visits` and `diagnoses`.
+    """
+    return fan_out(year, generator_object, [SqliteSink(database_file)])[0]
+
+
+def load_years_to_sqlite(year=None, database_file=None):
+    """
+    Method to load translated NAMCS data for `year` into SQLite database,
+    indexes are built once after the last year. Years for which NAMCS
+    dataset file is not available locally are skipped.
+
+    Parameters:
+        year (:class:`int` or :class:`tuple` or :class:`list`): NAMCS year(s)
+            to load. If year is not specified, all the years defined in
+            `YEARS_AVAILABLE` are loaded.
+        database_file (:class:`str`): Absolute path of SQLite database.
+            **Default** `SQLITE_DATABASE_FILE_NAME` in `NAMCS_DATA_DIR_PATH`.
+
+    Returns:
+        :class:`dict`: Year wise load result, see :func:`export_to_sqlite`.
+
+    Usage:
+        >>> load_years_to_sqlite((2000, 2001))
+        >>> connection = sqlite3.connect(get_sqlite_database_path())
+        >>> connection.execute(
+        ...     "SELECT year, SUM(patient_visit_weight) FROM visits "
+        ...     "JOIN visit_diagnosis USING (visit_id, year) "
+        ...     "WHERE diagnosis = '401.9' GROUP BY year"
+        ... ).fetchall()
+    """
+    year_wise_load_result = {}
+    sink = SqliteSink(database_file, drop_indexes=True)
+    try:
+        for _year in map(
+                int, YEARS_AVAILABLE if year is None else get_iterable(year)
+        ):
+            if get_namcs_dataset_path_for_year(_year) is None:
+                log.error(
+                    "NAMCS dataset file for year: {} is not available, "
+                    "skipping year".format(_year)
+                )
+                continue
+            year_wise_load_result[_year] = fan_out(
+                _year, get_generator_by_year(_year), [sink]
+            )[0]
+    finally:
+        connection = connect_for_bulk_load(
+            get_sqlite_database_path(database_file)
+        )
+        try:
+            build_sqlite_indexes(connection)
+        finally:
+            connection.close()
+    return year_wise_load_result
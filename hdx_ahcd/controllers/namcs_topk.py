@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing streaming top K physician diagnoses by estimated visits,
+like top 50 diagnoses per year. Weighted visits of every diagnosis are
+counted in a single pass over a year, see :class:`TopDiagnosesSink`, a
+visit is counted once for every distinct diagnosis of its diagnosis slots.
+
+Counts are exact by default. For windows of many years, counts can be kept
+within bounded memory by space saving algorithm (Metwally et al., 2005), see
+:class:`SpaceSavingCounter`, with at most `capacity` diagnoses counted at a
+time. With total weight `W` of all the diagnoses, count of a diagnosis is
+overestimated by at most its `error`, itself at most `W / capacity`, and
+every diagnosis with more than `W / capacity` visits is reported.
+"""
+# Python modules
+from heapq import (
+    heapify,
+    heappop,
+    heappush,
+    nsmallest,
+)
+
+# Other modules
+from hdx_ahcd.controllers.namcs_converter import get_generator_by_year
+from hdx_ahcd.controllers.namcs_estimates import EstimateSink
+from hdx_ahcd.controllers.namcs_sinks import fan_out
+from hdx_ahcd.helpers.functions import (
+    get_iterable,
+    get_namcs_dataset_path_for_year,
+)
+from hdx_ahcd.namcs.config import (
+    log,
+    TOP_DIAGNOSES_K,
+    YEARS_AVAILABLE,
+)
+from hdx_ahcd.namcs.enums import (
+    EstimateDimensionEnum,
+    EstimateMeasureEnum,
+)
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# -N/A
+
+
+class SpaceSavingCounter(object):
+    """
+    Weighted counter of items keeping at most `capacity` items, least
+    counted item is replaced by new item, which inherits its count as
+    `error`. Counts are exact if `capacity` is :const:`None`. Total weight of
+    all the items added is `total`.
+    """
+    def __init__(self, capacity=None):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            capacity (:class:`int`): Maximum number of counted items.
+                **Default** :const:`None`, all the items are counted exactly.
+
+        Raises:
+            :class:`ValueError`: If `capacity` is not positive.
+        """
+        if capacity is not None and capacity < 1:
+            raise ValueError(
+                "Invalid capacity: {}, expected positive number".format(
+                    capacity
+                )
+            )
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        # Min heap of count and item, entries whose count is outdated are
+        # skipped when popped, counts only grow
+        self.heap = []
+        self.total = 0
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add(self, item, weight=1):
+        """
+        Method to add `weight` to count of `item`.
+
+        Parameters:
+            item (:class:`str`): Counted item.
+            weight (:class:`float`): Weight of occurrence of `item`.
+                **Default** 1.
+        """
+        counts = self.counts
+        self.total += weight
+        count = counts.get(item)
+        if count is not None:
+            count = counts[item] = count + weight
+        elif self.capacity is None or len(counts) < self.capacity:
+            count = counts[item] = weight
+            self.errors[item] = 0
+        else:
+            # Replace least counted item
+            heap = self.heap
+            min_count, min_item = heappop(heap)
+            while counts.get(min_item) != min_count:
+                min_count, min_item = heappop(heap)
+            del counts[min_item]
+            del self.errors[min_item]
+            count = counts[item] = min_count + weight
+            self.errors[item] = min_count
+
+        if self.capacity is not None:
+            heappush(self.heap, (count, item))
+            # Drop outdated entries
+            if len(self.heap) > 4 * self.capacity:
+                self.heap = [(_count, _item) for _item, _count in
+                             counts.items()]
+                heapify(self.heap)
+
+    def get_top(self, k):
+        """
+        Method to get `k` items with largest counts.
+
+        Parameters:
+            k (:class:`int`): Number of items.
+
+        Returns:
+            :class:`list`: :class:`tuple` of item, count and error, in
+            descending order of count, items with same count ordered by item.
+            True count of item is between `count - error` and `count`.
+        """
+        return [
+            (item, count, self.errors[item])
+            for item, count in nsmallest(
+                k, self.counts.items(), key=lambda item: (-item[1], item[0])
+            )
+        ]
+
+
+class TopDiagnosesSink(EstimateSink):
+    """
+    Sink counting weighted visits of every diagnosis of translated records,
+    see :mod:`hdx_ahcd.controllers.namcs_sinks`. Result of a year is
+    :class:`list` of top `k` diagnoses, see
+    :func:`SpaceSavingCounter.get_top`.
+    """
+    name = "top_diagnoses"
+
+    def __init__(self, k=TOP_DIAGNOSES_K,
+                 measure=EstimateMeasureEnum.VISITS.value, capacity=None,
+                 counter=None):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            k (:class:`int`): Number of diagnoses reported.
+                **Default** `TOP_DIAGNOSES_K`.
+            measure (:class:`str`): Value of :class:`EstimateMeasureEnum`.
+                **Default** `visits`.
+            capacity (:class:`int`): Maximum number of diagnoses counted,
+                see :class:`SpaceSavingCounter`. **Default** :const:`None`,
+                counts are exact.
+            counter (:class:`SpaceSavingCounter`): Counter shared by all the
+                years, result of a year is then top diagnoses of the year and
+                all the years before it. **Default** :const:`None`, new
+                counter for every year.
+
+        Raises:
+            :class:`ValueError`: If `k` is not positive, `capacity` is less
+            than `k` or `measure` is unknown.
+        """
+        super().__init__(
+            (EstimateDimensionEnum.DIAGNOSIS.value,), measure
+        )
+        if k < 1:
+            raise ValueError(
+                "Invalid k: {}, expected positive number".format(k)
+            )
+        if capacity is not None and capacity < k:
+            raise ValueError(
+                "Capacity: {} must be at least k: {}".format(capacity, k)
+            )
+        self.k = k
+        self.capacity = capacity
+        self.counter = counter
+
+    def open(self, year):
+        super().open(year)
+        self.year_counter = self.counter if self.counter is not None \
+            else SpaceSavingCounter(self.capacity)
+
+    def write(self, translated_records):
+        add = self.year_counter.add
+        get_diagnoses = self.values_methods[0]
+        for translated_record in translated_records:
+            value = self.get_value(translated_record)
+            # Distinct diagnoses, a visit is counted once for a diagnosis in
+            # multiple slots
+            for diagnosis in get_diagnoses(translated_record):
+                add(diagnosis, value)
+
+    def close(self):
+        return self.year_counter.get_top(self.k)
+
+
+def get_top_diagnoses_by_year(year=None, k=TOP_DIAGNOSES_K,
+                              measure=EstimateMeasureEnum.VISITS.value):
+    """
+    Method to get top `k` diagnoses of every year by exact estimated visits,
+    every year is translated once. Years for which NAMCS dataset file is not
+    available locally are skipped.
+
+    Parameters:
+        year (:class:`int` or :class:`tuple` or :class:`list`): NAMCS
+            year(s). If year is not specified, all the years defined in
+            `YEARS_AVAILABLE` are reported.
+        k (:class:`int`): Number of diagnoses of a year.
+            **Default** `TOP_DIAGNOSES_K`.
+        measure (:class:`str`): Value of :class:`EstimateMeasureEnum`.
+            **Default** `visits`.
+
+    Returns:
+        :class:`dict`: Top diagnoses by year, :class:`list` of
+        :class:`tuple` of diagnosis, count and error, error being 0.
+
+    Raises:
+        :class:`ValueError`: If `k` is not positive or `measure` is unknown.
+
+    Usage:
+        >>> top_diagnoses = get_top_diagnoses_by_year((2014, 2015), k=50)
+        >>> diagnosis, visits, _ = top_diagnoses[2015][0]
+    """
+    sink = TopDiagnosesSink(k, measure)
+    top_diagnoses = {}
+    for _year in sorted(
+            set(map(int, YEARS_AVAILABLE if year is None
+                    else get_iterable(year)))
+    ):
+        if get_namcs_dataset_path_for_year(_year) is None:
+            log.error(
+                "NAMCS dataset file for year: {} is not available, skipping "
+                "year".format(_year)
+            )
+            continue
+        top_diagnoses[_year], = fan_out(
+            _year, get_generator_by_year(_year), [sink]
+        )
+    return top_diagnoses
+
+
+def get_top_diagnoses(year=None, k=TOP_DIAGNOSES_K,
+                      measure=EstimateMeasureEnum.VISITS.value,
+                      capacity=None):
+    """
+    Method to get top `k` diagnoses by estimated visits summed over all the
+    years, every year is translated once. Years for which NAMCS dataset file
+    is not available locally are skipped.
+
+    Parameters:
+        year (:class:`int` or :class:`tuple` or :class:`list`): NAMCS
+            year(s). If year is not specified, all the years defined in
+            `YEARS_AVAILABLE` are counted.
+        k (:class:`int`): Number of diagnoses.
+            **Default** `TOP_DIAGNOSES_K`.
+        measure (:class:`str`): Value of :class:`EstimateMeasureEnum`.
+            **Default** `visits`.
+        capacity (:class:`int`): Maximum number of diagnoses counted across
+            all the years, like `10 * k`, see :class:`SpaceSavingCounter`.
+            **Default** :const:`None`, counts are exact.
+
+    Returns:
+        :class:`list`: :class:`tuple` of diagnosis, count and error, in
+        descending order of count. True count is between `count - error` and
+        `count`.
+
+    Raises:
+        :class:`ValueError`: If `k` is not positive, `capacity` is less than
+        `k` or `measure` is unknown.
+
+    Usage:
+        >>> top_diagnoses = get_top_diagnoses(
+        ...     tuple(range(2005, 2016)), k=50, capacity=2000
+        ... )
+    """
+    sink = TopDiagnosesSink(
+        k, measure, capacity, counter=SpaceSavingCounter(capacity)
+    )
+    top_diagnoses = []
+    for _year in sorted(
+            set(map(int, YEARS_AVAILABLE if year is None
+                    else get_iterable(year)))
+    ):
+        if get_namcs_dataset_path_for_year(_year) is None:
+            log.error(
+                "NAMCS dataset file for year: {} is not available, skipping "
+                "year".format(_year)
+            )
+            continue
+        top_diagnoses, = fan_out(_year, get_generator_by_year(_year), [sink])
+    return top_diagnoses
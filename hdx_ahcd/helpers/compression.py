@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing methods to write exported files atomically, optionally
+compressed in a background thread.
+"""
+# Python modules
+from contextlib import contextmanager
+from queue import Queue
+from threading import Thread
+import bz2
+import io
+import lzma
+import os
+import uuid
+import zlib
+
+# Other modules
+from hdx_ahcd.namcs.config import (
+    COMPRESSED_FILE_EXTENSIONS,
+    COMPRESSION_QUEUE_SIZE,
+    CSV_WRITE_BUFFER_SIZE,
+)
+from hdx_ahcd.namcs.enums import CompressionEnum
+
+# 3rd party modules
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+# Global vars
+# Sentinel put on queue of compression thread once nothing is left to write
+END_OF_FILE = object()
+
+
+class _LZ4Compressor(object):
+    """
+    Adapter of :class:`lz4.frame.LZ4FrameCompressor` to the `compress` and
+    `flush` interface of standard library compressors.
+    """
+    def __init__(self):
+        self.compressor = lz4.frame.LZ4FrameCompressor()
+        self.frame_header = self.compressor.begin()
+
+    def compress(self, data):
+        compressed_data = self.frame_header + self.compressor.compress(data)
+        self.frame_header = b""
+        return compressed_data
+
+    def flush(self):
+        return self.frame_header + self.compressor.flush()
+
+
+def get_compressor(compression):
+    """
+    Method to get incremental compressor for `compression`.
+
+    Parameters:
+        compression (:class:`str`): Value of :class:`CompressionEnum`.
+
+    Returns:
+        :class:`object`: Compressor having methods `compress` and `flush`.
+
+    Raises:
+        :class:`ImportError`: If 3rd party package for `compression` is not
+        installed.
+        :class:`ValueError`: If `compression` is not supported.
+    """
+    if compression == CompressionEnum.GZIP.value:
+        # wbits 16 + MAX_WBITS writes gzip header and trailer
+        return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if compression == CompressionEnum.BZ2.value:
+        return bz2.BZ2Compressor()
+    if compression == CompressionEnum.XZ.value:
+        return lzma.LZMACompressor()
+    if compression == CompressionEnum.ZSTD.value:
+        if zstandard is None:
+            raise ImportError(
+                "Package zstandard is required for compression: zstd, "
+                "install it using `pip install zstandard`"
+            )
+        return zstandard.ZstdCompressor().compressobj()
+    if compression == CompressionEnum.LZ4.value:
+        if lz4 is None:
+            raise ImportError(
+                "Package lz4 is required for compression: lz4, install it "
+                "using `pip install lz4`"
+            )
+        return _LZ4Compressor()
+    raise ValueError(
+        "Compression: {} is not supported, supported compressions are: "
+        "{}".format(compression, [_enum.value for _enum in CompressionEnum])
+    )
+
+
+def get_compressed_file_name(file_name, compression=None):
+    """
+    Method to get name of `file_name` compressed with `compression`.
+
+    Parameters:
+        file_name (:class:`str`): Name of uncompressed file.
+        compression (:class:`str`): Value of :class:`CompressionEnum`.
+
+    Returns:
+        :class:`str`: File name with extension of `compression` appended,
+        `file_name` if `compression` is not specified.
+    """
+    if compression is None:
+        return file_name
+    return "{}.{}".format(file_name, COMPRESSED_FILE_EXTENSIONS[compression])
+
+
+class CompressedWriter(io.RawIOBase):
+    """
+    Binary file like object, data written to it is compressed and written to
+    `file_handle` in a background thread, so that writer is not stalled by
+    compression. `file_handle` is closed along with the object.
+    """
+    def __init__(self, file_handle, compression):
+        """
+        Method to construct new object of class.
+
+        Parameters:
+            file_handle (:class:`file`): Binary file handle compressed data
+                is written to.
+            compression (:class:`str`): Value of :class:`CompressionEnum`.
+        """
+        super().__init__()
+        self.file_handle = file_handle
+        self.compressor = get_compressor(compression)
+        self.chunks = Queue(maxsize=COMPRESSION_QUEUE_SIZE)
+        self.error = None
+        self.thread = Thread(target=self._compress, daemon=True)
+        self.thread.start()
+
+    def _compress(self):
+        """
+        Compression thread, compresses and writes queued chunks until
+        `END_OF_FILE`. After an error, chunks are drained and discarded.
+        """
+        for chunk in iter(self.chunks.get, END_OF_FILE):
+            if self.error is not None:
+                continue
+            try:
+                self.file_handle.write(self.compressor.compress(chunk))
+            except Exception as exc:
+                self.error = exc
+        if self.error is None:
+            try:
+                self.file_handle.write(self.compressor.flush())
+            except Exception as exc:
+                self.error = exc
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        """
+        Method to queue `data` for compression.
+
+        Parameters:
+            data (:class:`bytes`): Uncompressed data.
+
+        Returns:
+            :class:`int`: Number of bytes written.
+        """
+        if self.error is not None:
+            raise self.error
+        self.chunks.put(bytes(data))
+        return len(data)
+
+    def close(self):
+        """
+        Method to wait for queued data to be compressed and written.
+
+        Raises:
+            :class:`Exception`: Exception raised in compression thread.
+        """
+        if self.closed:
+            return
+        super().close()
+        self.chunks.put(END_OF_FILE)
+        self.thread.join()
+        self.file_handle.close()
+        if self.error is not None:
+            raise self.error
+
+
+@contextmanager
+def open_export_file(file_name, mode="w", compression=None):
+    """
+    Context manager to write file `file_name` atomically. Data is written to
+    temporary file in same directory, which replaces `file_name` only when
+    the block completes without exception, so readers never see partially
+    written file.
+
+    Parameters:
+        file_name (:class:`str`): Absolute path of file, without extension
+            of `compression`.
+        mode (:class:`str`): `w` for text or `wb` for binary file handle.
+            **Default** `w`.
+        compression (:class:`str`): Value of :class:`CompressionEnum`.
+            **Default** :const:`None`, file is not compressed.
+
+    Returns:
+        :class:`file`: File handle opened for writing.
+
+    Usage:
+        >>> with open_export_file("/tmp/2000.csv", compression="gzip") as f:
+        ...     f.write("source_file_ID")
+        >>> os.path.exists("/tmp/2000.csv.gz")
+        True
+    """
+    file_name = get_compressed_file_name(file_name, compression)
+    temporary_file_name = os.path.join(
+        os.path.dirname(os.path.abspath(file_name)),
+        ".{}.{}.tmp".format(os.path.basename(file_name), uuid.uuid4().hex)
+    )
+    # Same permissions as file created by :func:`open`, subject to umask
+    file_descriptor = os.open(
+        temporary_file_name, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666
+    )
+    try:
+        if compression is None:
+            raw_writer = io.open(file_descriptor, "wb", buffering=0)
+        else:
+            raw_writer = CompressedWriter(
+                io.open(file_descriptor, "wb"), compression
+            )
+        buffered_writer = io.BufferedWriter(
+            raw_writer, buffer_size=CSV_WRITE_BUFFER_SIZE
+        )
+        file_handle = buffered_writer if mode == "wb" \
+            else io.TextIOWrapper(buffered_writer)
+        try:
+            yield file_handle
+        finally:
+            file_handle.close()
+        os.replace(temporary_file_name, file_name)
+    except BaseException:
+        if os.path.exists(temporary_file_name):
+            os.remove(temporary_file_name)
+        raise
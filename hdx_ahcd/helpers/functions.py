@@ -5,6 +5,8 @@ Module containing useful methods for package `hdx_ahcd`.
 # Python modules
 from copy import deepcopy
 from datetime import datetime
+from itertools import islice
+import io
 import os
 
 # Other modules
@@ -14,6 +16,7 @@ from hdx_ahcd.namcs.config import (
     NAMCS_FILE_NAME,
     NAMCS_PUBLIC_FILE_EXTENSIONS,
     NAMCS_PUBLIC_FILE_URL,
+    RECORD_LAYOUT_SAMPLE_RECORDS,
 )
 from hdx_ahcd.utils.context import try_except
 from hdx_ahcd.utils.decorators import (
@@ -413,3 +416,121 @@ def safe_read_file(file_handle):
         for line_no, line in safe_read_file(file_handle):
             line = line.strip()
             yield line_no, line
+
+
+def get_dataset_record_layout(dataset_file,
+                              sample_records=RECORD_LAYOUT_SAMPLE_RECORDS):
+    """
+    Method to get length in bytes of a single record, including line
+    terminator, and number of records in fixed length NAMCS dataset file.
+
+    Parameters:
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+        sample_records (:class:`int`): Number of records, spread evenly over
+            dataset file, checked to end with line terminator of first
+            record. **Default** `RECORD_LAYOUT_SAMPLE_RECORDS`.
+
+    Returns:
+        :class:`tuple` or :class:`NoneType`: With elements as:
+            :class:`int`: Record length in bytes, including line terminator.
+            :class:`int`: Number of records in dataset file.
+        :const:`None` if records in `dataset_file` are not of fixed length.
+
+    Note:
+        Last record of dataset file may not have line terminator.
+    """
+    file_size = os.path.getsize(dataset_file)
+    with open(dataset_file, "rb") as file_handle:
+        first_record = file_handle.readline()
+        record_length = len(first_record)
+
+        if not record_length:
+            return None
+
+        terminator = first_record[len(first_record.rstrip(b"\r\n")):]
+        records, remainder = divmod(file_size, record_length)
+        terminated_records = records
+
+        # Last record without line terminator
+        if remainder and remainder == record_length - len(terminator):
+            records += 1
+        elif remainder:
+            return None
+
+        # Size of variable length file may be multiple of length of first
+        # record, check that sampled records end where expected
+        step = max(terminated_records // max(sample_records, 1), 1)
+        for record_no in sorted(
+                set(range(0, terminated_records, step)) |
+                {terminated_records - 1}
+        ):
+            file_handle.seek(record_no * record_length)
+            record = file_handle.read(record_length)
+            if not record.endswith(terminator) or \
+                    b"\n" in record[:record_length - len(terminator)]:
+                return None
+        if records > terminated_records and \
+                b"\n" in file_handle.read(remainder):
+            return None
+    return record_length, records
+
+
+def get_dataset_shards(dataset_file, shard_count=None, shard_size=None):
+    """
+    Method to split fixed length NAMCS dataset file into record aligned
+    byte ranges, which can be read independently of each other.
+
+    Parameters:
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+        shard_count (:class:`int`): Number of shards to split dataset file in.
+        shard_size (:class:`int`): Number of records per shard, used when
+            `shard_count` is not specified.
+
+    Returns:
+        :class:`list`: Shards in record order, each shard is a :class:`tuple`
+        of zero based number of first record, number of records and byte
+        offset of first record. If records are not of fixed length, a single
+        shard covering complete file is returned, with number of records as
+        :const:`None`.
+    """
+    record_layout = get_dataset_record_layout(dataset_file)
+    if record_layout is None:
+        return [(0, None, 0)]
+
+    record_length, records = record_layout
+    if shard_count:
+        shard_size = -(-records // shard_count)
+    shard_size = max(shard_size or records, 1)
+
+    return [
+        (
+            start_record,
+            min(shard_size, records - start_record),
+            start_record * record_length
+        )
+        for start_record in range(0, records, shard_size)
+    ]
+
+
+def read_dataset_shard(dataset_file, shard):
+    """
+    Method to read records in `shard` of NAMCS dataset file.
+
+    Parameters:
+        dataset_file (:class:`str`): Absolute path of raw dataset file.
+        shard (:class:`tuple`): Shard as returned by
+            :func:`get_dataset_shards`.
+
+    Returns:
+        :class:`generator`: Zero based record number in dataset file and
+        record, same as :func:`safe_read_file`.
+    """
+    start_record, records, byte_offset = shard
+    with open(dataset_file, "rb") as file_handle:
+        file_handle.seek(byte_offset)
+        # Decode same way as file opened in text mode
+        with io.TextIOWrapper(file_handle) as text_file_handle:
+            for line_no, line in islice(
+                    safe_read_file(text_file_handle), records
+            ):
+                yield start_record + line_no, line
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing value pools, used to share a single object between equal
+values repeated across translated records, like gender or physician
+diagnoses codes.
+"""
+# Python modules
+import sys
+
+# Other modules
+from hdx_ahcd.namcs.config import INTERNED_FIELDS
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+# -N/A
+
+
+class ValuePool(object):
+    """
+    Pool of distinct values, equal values are replaced by the first object
+    seen. Unlike :func:`sys.intern`, pooled values are released along with
+    the pool.
+    """
+    def __init__(self):
+        """
+        Method to construct new object of class.
+        """
+        self.values = {}
+        self.lookups = 0
+
+    def intern(self, value):
+        """
+        Method to get pooled object equal to `value`.
+
+        Parameters:
+            value (:class:`object`): Hashable value.
+
+        Returns:
+            :class:`object`: Pooled object, `value` itself if it is seen the
+            first time.
+        """
+        self.lookups += 1
+        return self.values.setdefault(value, value)
+
+    def get_stats(self):
+        """
+        Method to get counters of pool.
+
+        Returns:
+            :class:`dict`: Number of `lookups`, number of `distinct` values
+            and estimate of bytes saved as `saved_bytes`, assuming every
+            lookup would otherwise hold a separate object of average size.
+        """
+        distinct = len(self.values)
+        average_size = sum(map(sys.getsizeof, self.values)) / distinct \
+            if distinct else 0
+        return {
+            "lookups": self.lookups,
+            "distinct": distinct,
+            "saved_bytes": int((self.lookups - distinct) * average_size),
+        }
+
+
+def get_value_pools(fields=INTERNED_FIELDS):
+    """
+    Method to get empty value pool per field of `fields`.
+
+    Parameters:
+        fields (:class:`tuple`): Field names. **Default** `INTERNED_FIELDS`.
+
+    Returns:
+        :class:`dict`: :class:`ValuePool` by field name.
+    """
+    return {field_name: ValuePool() for field_name in fields}
+
+
+def intern_record(translated_record, value_pools):
+    """
+    Method to replace values of `translated_record` by pooled objects, in
+    place. List values are pooled element wise.
+
+    Parameters:
+        translated_record (:class:`dict`): Translated record.
+        value_pools (:class:`dict`): :class:`ValuePool` by field name.
+
+    Returns:
+        :class:`dict`: `translated_record`.
+    """
+    for field_name, value_pool in value_pools.items():
+        value = translated_record.get(field_name)
+        if isinstance(value, list):
+            translated_record[field_name] = list(map(value_pool.intern, value))
+        elif value is not None:
+            translated_record[field_name] = value_pool.intern(value)
+    return translated_record
+
+
+def get_value_pools_stats(value_pools):
+    """
+    Method to get counters of `value_pools`.
+
+    Parameters:
+        value_pools (:class:`dict`): :class:`ValuePool` by field name.
+
+    Returns:
+        :class:`dict`: Counters by field name, see
+        :func:`ValuePool.get_stats`, and total of bytes saved as
+        `saved_bytes`.
+    """
+    stats = {
+        field_name: value_pool.get_stats()
+        for field_name, value_pool in value_pools.items()
+    }
+    stats["saved_bytes"] = sum(
+        field_stats["saved_bytes"] for field_stats in stats.values()
+    )
+    return stats
@@ -8,7 +8,10 @@ import logging
 import os
 
 # Other modules
-from hdx_ahcd.namcs.enums import NAMCSFieldEnum
+from hdx_ahcd.namcs.enums import (
+    EstimateDimensionEnum,
+    NAMCSFieldEnum,
+)
 from hdx_ahcd.utils.utils import RangeDict
 
 # 3rd party modules
@@ -135,3 +138,188 @@ NAMCS_PUBLIC_FILE_RECORD_LENGTH_BY_YEAR = RangeDict(
         2015: 2713,
     }
 )
+
+# Pipelined execution: maximum number of downloaded years waiting to be
+# converted. Keeps the number of extracted but unprocessed files bounded.
+PIPELINE_DOWNLOAD_QUEUE_SIZE = 1
+
+# Pipelined execution: number of translated records handed from conversion
+# stage to export stage at once
+PIPELINE_BATCH_SIZE = 5000
+
+# Pipelined execution: maximum number of record batches waiting to be written.
+# Memory used by the pipeline is bounded by
+# `PIPELINE_BATCH_SIZE` * `PIPELINE_EXPORT_QUEUE_SIZE` translated records.
+PIPELINE_EXPORT_QUEUE_SIZE = 4
+
+# Sharded translation: number of records of a dataset file translated by single
+# worker task when records are merged back in order
+SHARD_RECORD_COUNT = 20000
+
+# Sharded translation: number of records, spread evenly over a dataset file,
+# whose line terminator is checked before records are taken as fixed length
+RECORD_LAYOUT_SAMPLE_RECORDS = 256
+
+# Scheduler cost model: relative cost of reading a single byte of a record
+# compared to translating a single field of a record
+SCHEDULER_BYTE_COST = 0.01
+
+# Asyncio API: number of translated records decoded in an executor per await,
+# amortizes cost of handing work between event loop and executor thread
+ASYNC_BATCH_SIZE = 1000
+
+# Columnar export: number of translated records written at once, as a single
+# record batch of Arrow IPC file or a single row group of Parquet file
+COLUMNAR_ROW_GROUP_SIZE = 65536
+
+# CSV export: number of rows handed to `csv.writer.writerows` at once
+CSV_WRITE_BATCH_SIZE = 10000
+
+# CSV export: size of write buffer of exported csv file, in bytes
+CSV_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Compressed export: file extension appended to exported csv file name per
+# compression, like `2000_NAMCS_CONVERTED.csv.gz`
+COMPRESSED_FILE_EXTENSIONS = {
+    "gzip": "gz",
+    "bz2": "bz2",
+    "xz": "xz",
+    "zstd": "zst",
+    "lz4": "lz4",
+}
+
+# Compressed export: maximum number of written chunks, each of
+# `CSV_WRITE_BUFFER_SIZE` bytes, waiting to be compressed in background thread
+COMPRESSION_QUEUE_SIZE = 4
+
+# Incremental export: version of translation logic recorded in fingerprint of
+# exported files, bump whenever translated output changes so that existing
+# exports are rebuilt
+CONVERTER_VERSION = "1.0.1"
+
+# Incremental export: extension of fingerprint file written next to exported
+# file, like `2000_NAMCS_CONVERTED.csv.fingerprint`
+FINGERPRINT_FILE_EXTENSION = "fingerprint"
+
+# Incremental export: number of bytes of dataset file hashed at once
+FINGERPRINT_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Sinks: number of translated records handed to every sink at once
+SINK_BATCH_SIZE = 10000
+
+# SQLite export: file name of database translated years are loaded into,
+# created in `NAMCS_DATA_DIR_PATH`
+SQLITE_DATABASE_FILE_NAME = "namcs.sqlite3"
+
+# SQLite export: connection pragmas applied during bulk load, durability is
+# traded for speed, load of a year is still a single transaction
+SQLITE_BULK_LOAD_PRAGMAS = (
+    ("synchronous", "OFF"),
+    ("journal_mode", "MEMORY"),
+    ("temp_store", "MEMORY"),
+    ("cache_size", -256 * 1024),
+)
+
+# Partitioned export: directory in export directory holding Hive style
+# partitions, like `NAMCS_CONVERTED/year=2000/month=01/part-0000.csv`
+PARTITIONED_EXPORT_DIR_NAME = "NAMCS_CONVERTED"
+
+# Partitioned export: maximum number of records per file of a partition
+PARTITION_MAX_ROWS_PER_FILE = 250000
+
+# Partitioned export: file in year directory recording row count per
+# partition, prefixed with `_` so that dataset readers skip it
+PARTITION_METADATA_FILE_NAME = "_metadata.json"
+
+# Combined export: file name of single file holding translated data of all
+# the years, created in `NAMCS_DATA_DIR_PATH`
+COMBINED_EXPORT_FILE_NAME = "NAMCS_ALL_YEARS_CONVERTED.csv"
+
+# Combined export: number of rows handed from year producer to writer at once
+COMBINED_EXPORT_BATCH_SIZE = 5000
+
+# Combined export: maximum number of batches of a year waiting for writer,
+# producers ahead of writer block once their queue is full
+COMBINED_EXPORT_QUEUE_SIZE = 4
+
+# Diagnoses export: suffix of file holding a row per physician diagnosis of
+# every visit, like `2000_NAMCS_DIAGNOSES.csv`
+DIAGNOSES_FILE_NAME_SUFFIX = "DIAGNOSES"
+
+# Diagnoses export: fields of a row, in the order of columns
+DIAGNOSES_CSV_FIELDS = (
+    NAMCSFieldEnum.SOURCE_FILE_ID.value,
+    NAMCSFieldEnum.SOURCE_FILE_ROW.value,
+    "position",
+    "diagnosis",
+    NAMCSFieldEnum.VISIT_WEIGHT.value,
+)
+
+# Decoded data cache: directory holding translated records of every year as
+# Arrow IPC file, read back by memory mapping instead of translating again
+CACHE_DIR_PATH = os.path.join(NAMCS_ROOT_PATH, "cache")
+
+# Decoded data cache: suffix of cache file, like `2000_NAMCS_CACHE.arrow`
+CACHE_FILE_NAME_SUFFIX = "CACHE"
+
+# Decoded data cache: number of translated records per record batch
+CACHE_RECORD_BATCH_SIZE = 10000
+
+# In-process cache: memory budget in bytes of translated years held by
+# `DECODED_YEAR_CACHE`, least recently used years are evicted beyond it
+MEMORY_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+# In-process cache: number of rows of a translated year sampled to estimate
+# its size, size of sampled rows is scaled by number of rows of year
+MEMORY_CACHE_SIZE_SAMPLE_ROWS = 1000
+
+# Value pools: fields of translated record whose values are shared between
+# records, values are repeated across millions of records of a year
+INTERNED_FIELDS = (
+    NAMCSFieldEnum.SOURCE_FILE_ID.value,
+    NAMCSFieldEnum.GENDER.value,
+    NAMCSFieldEnum.PHYSICIANS_DIAGNOSES.value,
+)
+
+# Diagnosis dictionary: file in `NAMCS_DATA_DIR_PATH` mapping ICD-9 codes of
+# all the years to int32 ids, a code per line, line number being its id
+DIAGNOSIS_DICTIONARY_FILE_NAME = "diagnosis_dictionary.txt"
+
+# Estimates: lower bounds in years of patient age groups of `age_bucket`
+# dimension, same as age groups of NAMCS summary reports
+ESTIMATE_AGE_BUCKETS = (0, 15, 25, 45, 65, 75)
+
+# Diagnosis index: suffix of file mapping ICD-9 codes of a year to sorted
+# numbers of records having them, written next to extracted dataset file,
+# like `2000_NAMCS_DIAGNOSIS_INDEX.idx`
+DIAGNOSIS_INDEX_FILE_NAME_SUFFIX = "DIAGNOSIS_INDEX"
+
+# Diagnosis index: extension of index file
+DIAGNOSIS_INDEX_FILE_EXTENSION = "idx"
+
+# Bitmap index: suffix of file holding bitmaps of records by value of low
+# cardinality fields of a year, written next to extracted dataset file, like
+# `2000_NAMCS_BITMAP_INDEX.idx`
+BITMAP_INDEX_FILE_NAME_SUFFIX = "BITMAP_INDEX"
+
+# Bitmap index: fields whose values are indexed, `age_bucket` is derived from
+# patient age, see `ESTIMATE_AGE_BUCKETS`
+BITMAP_INDEX_FIELDS = (
+    NAMCSFieldEnum.GENDER.value,
+    NAMCSFieldEnum.MONTH_OF_VISIT.value,
+    EstimateDimensionEnum.AGE_BUCKET.value,
+)
+
+# Top diagnoses: default number of diagnoses with most estimated visits
+# reported per year or window of years
+TOP_DIAGNOSES_K = 50
+
+# Distinct count sketches: suffix of file holding HyperLogLog sketches of
+# distinct diagnoses of a year per group, written next to extracted dataset
+# file, like `2000_NAMCS_DISTINCT_SKETCHES_SEX.idx` for groups by `sex`
+DISTINCT_SKETCH_FILE_NAME_SUFFIX = "DISTINCT_SKETCHES"
+
+# Distinct count sketches: number of index bits of hash, sketch has
+# 2 ** precision registers of a byte and relative standard error of
+# 1.04 / sqrt(2 ** precision), 1.6% for 12
+DISTINCT_SKETCH_PRECISION = 12
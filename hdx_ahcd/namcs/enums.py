@@ -77,3 +77,48 @@ class PhysicianDiagnosesEnum(Enum):
     LEFT_BEFORE_BEING_SEEN = "AHCD.LBBS"  # Code: "V9910", "209910"
     TRANSFER_TO_ANOTHER_FACILITY = "AHCD.TTAF"  # Code: "V9920", "209920"
     HMO_WILL_NOT_AUTHORIZE_TREATMENT = "AHCD.HNAT"  # Code: "209930"
+
+
+class ExportFormatEnum(Enum):
+    """
+    Enums for defining file formats translated NAMCS data is exported to.
+    Value is used as extension of exported file.
+    """
+    CSV = "csv"
+    ARROW = "arrow"
+    PARQUET = "parquet"
+
+
+class CompressionEnum(Enum):
+    """
+    Enums for defining compression of exported csv files.
+    """
+    GZIP = "gzip"
+    BZ2 = "bz2"
+    XZ = "xz"
+    ZSTD = "zstd"
+    LZ4 = "lz4"
+
+
+class EstimateMeasureEnum(Enum):
+    """
+    Enums for defining measures of national estimates.
+    """
+    # Sum of patient visit weights, estimated number of visits
+    VISITS = "visits"
+    # Number of sample records, unweighted
+    RECORDS = "records"
+
+
+class EstimateDimensionEnum(Enum):
+    """
+    Enums for defining dimensions of national estimates derived from fields
+    of translated record, see
+    :mod:`hdx_ahcd.controllers.namcs_estimates`.
+    """
+    # Age group of patient, see `ESTIMATE_AGE_BUCKETS`
+    AGE_BUCKET = "age_bucket"
+    # ICD-9 code of physician diagnosis
+    DIAGNOSIS = "dx"
+    # 3 digit ICD-9 category of physician diagnosis, like `401` of `401.9`
+    DIAGNOSIS_CATEGORY = "dx3"
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Module to benchmark csv export of translated NAMCS data, year by year.
+
+Usage:
+    python namcs_benchmark.py [--data-dir DIR] [YEAR [YEAR ...]]
+"""
+# Python modules
+import argparse
+import csv
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+# Other modules
+from hdx_ahcd.controllers.namcs_converter import (
+    export_to_csv,
+    get_generator_by_year,
+)
+from hdx_ahcd.helpers import functions
+from hdx_ahcd.helpers.functions import get_namcs_dataset_path_for_year
+from hdx_ahcd.namcs.config import (
+    CONVERTED_CSV_FIELDS,
+    log,
+    YEARS_AVAILABLE,
+)
+
+# 3rd party modules
+# -N/A
+
+# Global vars
+logging.basicConfig(level=logging.INFO)  # Configure logger
+LOG = logging.getLogger("NAMCS_benchmark")
+
+
+def export_with_dict_writer(csv_file_name, translated_records):
+    """
+    Method to export translated records with :class:`csv.DictWriter`, row by
+    row, used as baseline of benchmark.
+
+    Parameters:
+        csv_file_name (:class:`str`): Absolute path of csv file.
+        translated_records (:class:`list`): Translated NAMCS records.
+    """
+    with open(csv_file_name, "w") as csv_file:
+        writer = csv.DictWriter(
+            csv_file, delimiter=",", fieldnames=CONVERTED_CSV_FIELDS
+        )
+        writer.writeheader()
+        for translated_record in translated_records:
+            writer.writerow(translated_record)
+
+
+def get_rows_per_second(method, record_count):
+    """
+    Method to measure throughput of `method`.
+
+    Parameters:
+        method (:class:`function`): Method to measure, called without
+            arguments.
+        record_count (:class:`int`): Number of records processed by `method`.
+
+    Returns:
+        :class:`float`: Records processed per second.
+    """
+    started_at = time.perf_counter()
+    method()
+    elapsed_time = time.perf_counter() - started_at
+    return record_count / elapsed_time if elapsed_time else float("inf")
+
+
+def benchmark_year(year, export_dir):
+    """
+    Method to benchmark translation and csv export of NAMCS data for `year`.
+
+    Parameters:
+        year (:class:`int`): NAMCS year.
+        export_dir (:class:`str`): Directory where csv files are written.
+
+    Returns:
+        :class:`dict`: Number of records and rows per second of translation,
+        :class:`csv.DictWriter` export and :func:`export_to_csv`.
+    """
+    translated_records = []
+    decode_rows_per_second = get_rows_per_second(
+        lambda: translated_records.extend(get_generator_by_year(year)), 1
+    )
+    record_count = len(translated_records)
+    decode_rows_per_second *= record_count
+
+    baseline_file_name = os.path.join(export_dir, "baseline.csv")
+    benchmark = {
+        "records": record_count,
+        "decode": decode_rows_per_second,
+        "dict_writer": get_rows_per_second(
+            lambda: export_with_dict_writer(
+                baseline_file_name, translated_records
+            ),
+            record_count
+        ),
+        "export_to_csv": get_rows_per_second(
+            lambda: export_to_csv(
+                year, iter(translated_records), export_dir=export_dir
+            ),
+            record_count
+        ),
+        "export_to_csv_joined": get_rows_per_second(
+            lambda: export_to_csv(
+                year, iter(translated_records), export_dir=export_dir,
+                diagnoses_separator="|"
+            ),
+            record_count
+        ),
+    }
+    return benchmark
+
+
+def namcs_benchmark(years=None):
+    """
+    Benchmark csv export for `years`, years for which NAMCS dataset file is
+    not available locally are skipped.
+
+    Parameters:
+        years (:class:`list`): NAMCS years. **Default** `YEARS_AVAILABLE`.
+
+    Note:
+        This is strictly for dev purpose, translated records of a year are
+        held in memory so that only export is measured.
+    """
+    # Export logs every file written, keep report readable
+    log.setLevel(logging.WARNING)
+    export_dir = tempfile.mkdtemp()
+    try:
+        LOG.info(
+            "{:>6} {:>9} {:>12} {:>12} {:>14} {:>14}".format(
+                "year", "records", "decode/s", "DictWriter/s",
+                "export_to_csv/s", "joined/s"
+            )
+        )
+        for year in years or YEARS_AVAILABLE:
+            if get_namcs_dataset_path_for_year(year) is None:
+                LOG.warning("Skipping year: {}, dataset file not "
+                            "available".format(year))
+                continue
+            benchmark = benchmark_year(year, export_dir)
+            LOG.info(
+                "{:>6} {:>9} {:>12.0f} {:>12.0f} {:>14.0f} {:>14.0f}".format(
+                    year, benchmark["records"], benchmark["decode"],
+                    benchmark["dict_writer"], benchmark["export_to_csv"],
+                    benchmark["export_to_csv_joined"]
+                )
+            )
+    finally:
+        shutil.rmtree(export_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("years", nargs="*", type=int, help="NAMCS years")
+    parser.add_argument(
+        "--data-dir", help="Directory of extracted NAMCS dataset files"
+    )
+    arguments = parser.parse_args()
+    if arguments.data_dir:
+        functions.EXTRACTED_DATA_DIR_PATH = arguments.data_dir
+    namcs_benchmark(arguments.years)
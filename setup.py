@@ -34,6 +34,12 @@ config = {
     'url': 'https://github.com/humandx/NAMCS-NHAMCS-data-extraction#hdx_ahcd'
            '-nhamcs-data-extraction',
     'packages': find_packages(),
+    'extras_require': {
+        # Arrow IPC and Parquet export
+        'columnar': ['pyarrow'],
+        # zstd and lz4 compression of exported csv files
+        'compression': ['zstandard', 'lz4'],
+    },
     'classifiers': (
         'Programming Language :: Python :: 3',
         'Operating System :: OS Independent',
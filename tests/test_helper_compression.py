@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `helpers.compression`.
+"""
+# Python modules
+from unittest import mock, TestCase
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+
+# Third party modules
+# -N/A
+
+# Other modules
+from hdx_ahcd.controllers.namcs_converter import (
+    export_to_csv,
+    get_generator_by_year,
+)
+from hdx_ahcd.controllers.namcs_parallel import export_years_in_parallel
+from hdx_ahcd.helpers import (
+    compression,
+    functions,
+)
+from hdx_ahcd.helpers.compression import (
+    get_compressor,
+    open_export_file,
+)
+
+
+class CompressionTest(TestCase):
+    """
+    TestCase class for atomic and compressed export files.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = self.data_dir
+
+    def test_open_export_file(self):
+        """
+        Test if data spanning several write buffers is compressed correctly.
+        """
+        # Setup
+        content = "".join(
+            "{},V70.00,86790.0\r\n".format(row) for row in range(60000)
+        )
+        file_name = os.path.join(self.output_dir, "export.csv")
+
+        for compression_name, open_method in (
+                ("gzip", gzip.open), ("bz2", bz2.open), ("xz", lzma.open)
+        ):
+            # Call to func :func:`open_export_file`
+            with open_export_file(
+                    file_name, compression=compression_name
+            ) as file_handle:
+                file_handle.write(content)
+
+            # Assert decompressed content
+            compressed_files = [
+                _file_name for _file_name in os.listdir(self.output_dir)
+                if not _file_name.endswith(".csv")
+            ]
+            self.assertEqual(1, len(compressed_files))
+            with open_method(
+                    os.path.join(self.output_dir, compressed_files[0]), "rt",
+                    newline=""
+            ) as file_handle:
+                self.assertEqual(content, file_handle.read())
+            os.remove(os.path.join(self.output_dir, compressed_files[0]))
+
+    def test_open_export_file_is_atomic(self):
+        """
+        Test if existing file is kept when export fails.
+        """
+        # Setup
+        file_name = os.path.join(self.output_dir, "export.csv")
+        with open(file_name, "w") as file_handle:
+            file_handle.write("previous export")
+
+        # Call to func :func:`open_export_file`
+        with self.assertRaises(RuntimeError):
+            with open_export_file(file_name) as file_handle:
+                file_handle.write("partial export")
+                raise RuntimeError("decoder failed")
+
+        # Assert previous file kept and no temporary file left
+        self.assertEqual(["export.csv"], os.listdir(self.output_dir))
+        with open(file_name) as file_handle:
+            self.assertEqual("previous export", file_handle.read())
+
+    def test_get_compressor(self):
+        """
+        Test if unsupported or unavailable compression is reported.
+        """
+        # Assert :class:`ValueError`
+        with self.assertRaises(ValueError):
+            get_compressor("rar")
+
+        # Assert :class:`ImportError`
+        with mock.patch.object(compression, "zstandard", None):
+            with self.assertRaises(ImportError):
+                get_compressor("zstd")
+
+    def test_compressed_export(self):
+        """
+        Test if compressed csv file has same content as uncompressed one.
+        """
+        # Setup
+        expected_file_name = export_to_csv(
+            2000,
+            get_generator_by_year(2000),
+            export_dir=tempfile.mkdtemp(dir=self.output_dir)
+        )
+        with open(expected_file_name, newline="") as file_handle:
+            expected_content = file_handle.read()
+
+        # Case 1: Sequential export
+        # Call to func :func:`export_to_csv`
+        file_name = export_to_csv(
+            2000, get_generator_by_year(2000), export_dir=self.output_dir,
+            compression="gzip"
+        )
+
+        # Assert file name and content
+        self.assertEqual(
+            os.path.join(self.output_dir, "2000_NAMCS_CONVERTED.csv.gz"),
+            file_name
+        )
+        with gzip.open(file_name, "rt", newline="") as file_handle:
+            self.assertEqual(expected_content, file_handle.read())
+        os.remove(file_name)
+
+        # Case 2: Year exported in shards
+        # Call to func :func:`export_years_in_parallel`
+        year_export_result = export_years_in_parallel(
+            2000, workers=2, export_dir=self.output_dir, compression="xz"
+        ).get(2000)
+
+        # Assert merged shards
+        self.assertEqual(2, year_export_result["stats"]["shards"])
+        with lzma.open(
+                year_export_result["file_name"], "rt", newline=""
+        ) as file_handle:
+            self.assertEqual(expected_content, file_handle.read())
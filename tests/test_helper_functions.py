@@ -6,12 +6,15 @@ Module containing tests for module `helper.functions`.
 from unittest import mock, TestCase
 import datetime
 import os
+import tempfile
 
 # Other modules
 from hdx_ahcd.helpers import functions
 from hdx_ahcd.helpers.functions import (
     get_customized_file_name,
     get_conversion_method,
+    get_dataset_record_layout,
+    get_dataset_shards,
     get_field_code_from_record,
     get_iterable,
     get_namcs_dataset_path_for_year,
@@ -23,6 +26,8 @@ from hdx_ahcd.helpers.functions import (
     rename_namcs_dataset_for_year,
     populate_missing_fields,
     process_multiple_slice_objects,
+    read_dataset_shard,
+    safe_read_file,
 )
 from hdx_ahcd.namcs.enums import NAMCSFieldEnum
 
@@ -469,3 +474,82 @@ class HelperFunctionsTest(TestCase):
 
         # Asert for iterable `parameter`
         self.assertEqual(expected_parameter, actual_parameter)
+
+    def test_get_dataset_record_layout(self):
+        """
+        Test record length and number of records of fixed length dataset file.
+        """
+        # Setup
+        dataset_file = \
+            os.path.join(os.path.dirname(__file__), "data", "2000_NAMCS")
+
+        # Call to :func:`get_dataset_record_layout`
+        # Assert 663 characters and CRLF line terminator per record
+        self.assertEqual((665, 5), get_dataset_record_layout(dataset_file))
+
+        # Case: Records are not of fixed length
+        with tempfile.NamedTemporaryFile("w", delete=False) as file_handle:
+            file_handle.write("0123456789\n01234\n0123456789\n")
+        self.addCleanup(os.remove, file_handle.name)
+        self.assertIsNone(get_dataset_record_layout(file_handle.name))
+
+        # Case: Records are not of fixed length, but file size is multiple
+        # of length of first record
+        with tempfile.NamedTemporaryFile("w", delete=False) as file_handle:
+            file_handle.write("01234\n0\n0123\n012345\n012345678\n")
+        self.addCleanup(os.remove, file_handle.name)
+        self.assertEqual(30, os.path.getsize(file_handle.name))
+        self.assertIsNone(get_dataset_record_layout(file_handle.name))
+        self.assertEqual(
+            [(0, None, 0)], get_dataset_shards(file_handle.name, shard_size=2)
+        )
+
+        # Case: Only some of records are sampled
+        with tempfile.NamedTemporaryFile("w", delete=False) as file_handle:
+            file_handle.write("0123\n" * 6 + "01\n0123\n0\n" + "0123\n" * 6)
+        self.addCleanup(os.remove, file_handle.name)
+        self.assertIsNone(get_dataset_record_layout(file_handle.name))
+        self.assertEqual(
+            (5, 14), get_dataset_record_layout(
+                file_handle.name, sample_records=3
+            )
+        )
+
+    def test_get_dataset_shards(self):
+        """
+        Test if dataset file is split into record aligned shards.
+        """
+        # Setup
+        dataset_file = \
+            os.path.join(os.path.dirname(__file__), "data", "2000_NAMCS")
+
+        # Call to :func:`get_dataset_shards`
+        self.assertEqual(
+            [(0, 3, 0), (3, 2, 1995)],
+            get_dataset_shards(dataset_file, shard_count=2)
+        )
+        self.assertEqual(
+            [(0, 2, 0), (2, 2, 1330), (4, 1, 2660)],
+            get_dataset_shards(dataset_file, shard_size=2)
+        )
+
+    def test_read_dataset_shard(self):
+        """
+        Test if records read shard by shard are same as records read from
+        complete file.
+        """
+        # Setup
+        dataset_file = \
+            os.path.join(os.path.dirname(__file__), "data", "2000_NAMCS")
+        with open(dataset_file, "r") as file_handle:
+            expected_records = list(safe_read_file(file_handle))
+
+        # Call to :func:`read_dataset_shard`
+        actual_records = [
+            numbered_record
+            for shard in get_dataset_shards(dataset_file, shard_size=2)
+            for numbered_record in read_dataset_shard(dataset_file, shard)
+        ]
+
+        # Assert records and record numbers
+        self.assertEqual(expected_records, actual_records)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `helpers.pools`.
+"""
+# Python modules
+from unittest import TestCase
+import os
+
+# Third party modules
+# -N/A
+
+# Other modules
+from hdx_ahcd.controllers.namcs_converter import get_generator_by_year
+from hdx_ahcd.helpers import functions
+from hdx_ahcd.helpers.pools import (
+    get_value_pools,
+    get_value_pools_stats,
+    intern_record,
+    ValuePool,
+)
+
+
+class ValuePoolTest(TestCase):
+    """
+    TestCase class for value pools.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = \
+            os.path.join(os.path.dirname(__file__), "data")
+
+    def test_value_pool(self):
+        """
+        Test if equal values are replaced by first object seen.
+        """
+        # Setup
+        value_pool = ValuePool()
+        first_value = "".join(["V70", ".0"])
+        second_value = "".join(["V7", "0.0"])
+        self.assertIsNot(first_value, second_value)
+
+        # Call to func :func:`intern`
+        self.assertIs(first_value, value_pool.intern(first_value))
+        self.assertIs(first_value, value_pool.intern(second_value))
+
+        # Assert counters
+        stats = value_pool.get_stats()
+        self.assertEqual((2, 1), (stats["lookups"], stats["distinct"]))
+        self.assertGreater(stats["saved_bytes"], 0)
+
+    def test_intern_record(self):
+        """
+        Test if string and list values of pooled fields are pooled.
+        """
+        # Setup
+        value_pools = get_value_pools()
+        records = [
+            {
+                "sex": "".join(["Fe", "male"]),
+                "physician_diagnoses": ["".join(["401", ".9"])],
+                "age": 10.0,
+            }
+            for _ in range(2)
+        ]
+
+        # Call to func :func:`intern_record`
+        first_record, second_record = [
+            intern_record(record, value_pools) for record in records
+        ]
+
+        # Assert values are shared
+        self.assertIs(first_record["sex"], second_record["sex"])
+        self.assertIs(
+            first_record["physician_diagnoses"][0],
+            second_record["physician_diagnoses"][0]
+        )
+        self.assertEqual(10.0, second_record["age"])
+
+    def test_get_generator_by_year_with_value_pools(self):
+        """
+        Test if translated records of year share pooled values.
+        """
+        # Call to func :func:`get_generator_by_year`
+        value_pools = get_value_pools()
+        records = list(get_generator_by_year(2001, value_pools=value_pools))
+
+        # Assert values are pooled
+        self.assertEqual(
+            len(records), value_pools["sex"].get_stats()["lookups"]
+        )
+        self.assertEqual(
+            {id(value_pools["sex"].values[record["sex"]])
+             for record in records},
+            {id(record["sex"]) for record in records}
+        )
+        stats = get_value_pools_stats(value_pools)
+        self.assertEqual(
+            sum(
+                len(record["physician_diagnoses"]) for record in records
+            ),
+            stats["physician_diagnoses"]["lookups"]
+        )
+        self.assertEqual(
+            sum(
+                stats[field_name]["saved_bytes"]
+                for field_name in value_pools
+            ),
+            stats["saved_bytes"]
+        )
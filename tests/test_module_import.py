@@ -41,12 +41,75 @@ class ImportModuleTest(TestCase):
     def test_helpers_functions(self):
         import hdx_ahcd.helpers.functions
 
+    def test_helpers_compression(self):
+        import hdx_ahcd.helpers.compression
+
+    def test_helpers_pools(self):
+        import hdx_ahcd.helpers.pools
+
     def test_controllers_namcs_extractor(self):
         import hdx_ahcd.controllers.namcs_extractor
 
     def test_controllers_namcs_converter(self):
         import hdx_ahcd.controllers.namcs_converter
 
+    def test_controllers_namcs_columnar(self):
+        import hdx_ahcd.controllers.namcs_columnar
+
+    def test_controllers_namcs_fingerprint(self):
+        import hdx_ahcd.controllers.namcs_fingerprint
+
+    def test_controllers_namcs_sinks(self):
+        import hdx_ahcd.controllers.namcs_sinks
+
+    def test_controllers_namcs_sqlite(self):
+        import hdx_ahcd.controllers.namcs_sqlite
+
+    def test_controllers_namcs_partitioned(self):
+        import hdx_ahcd.controllers.namcs_partitioned
+
+    def test_controllers_namcs_combined(self):
+        import hdx_ahcd.controllers.namcs_combined
+
+    def test_controllers_namcs_diagnoses(self):
+        import hdx_ahcd.controllers.namcs_diagnoses
+
+    def test_controllers_namcs_cache(self):
+        import hdx_ahcd.controllers.namcs_cache
+
+    def test_controllers_namcs_encoding(self):
+        import hdx_ahcd.controllers.namcs_encoding
+
+    def test_controllers_namcs_estimates(self):
+        import hdx_ahcd.controllers.namcs_estimates
+
+    def test_controllers_namcs_index(self):
+        import hdx_ahcd.controllers.namcs_index
+
+    def test_controllers_namcs_bitmap(self):
+        import hdx_ahcd.controllers.namcs_bitmap
+
+    def test_controllers_namcs_codes(self):
+        import hdx_ahcd.controllers.namcs_codes
+
+    def test_controllers_namcs_topk(self):
+        import hdx_ahcd.controllers.namcs_topk
+
+    def test_controllers_namcs_sketch(self):
+        import hdx_ahcd.controllers.namcs_sketch
+
+    def test_controllers_namcs_async(self):
+        import hdx_ahcd.controllers.namcs_async
+
+    def test_controllers_namcs_pipeline(self):
+        import hdx_ahcd.controllers.namcs_pipeline
+
+    def test_controllers_namcs_parallel(self):
+        import hdx_ahcd.controllers.namcs_parallel
+
+    def test_controllers_namcs_scheduler(self):
+        import hdx_ahcd.controllers.namcs_scheduler
+
     def test_utils_context(self):
         import hdx_ahcd.utils.context
 
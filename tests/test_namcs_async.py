@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_async`.
+"""
+# Python modules
+from unittest import mock, TestCase
+import asyncio
+import inspect
+import os
+
+# Third party modules
+# -N/A
+
+# Other modules
+from hdx_ahcd.api import get_cleaned_data_by_year_async
+from hdx_ahcd.controllers.namcs_async import (
+    get_batches_by_year,
+    get_records_by_year,
+    initiate_namcs_dataset_download_async,
+)
+from hdx_ahcd.controllers.namcs_converter import get_generator_by_year
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSAsyncTest(TestCase):
+    """
+    TestCase class for asyncio API.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = self.data_dir
+
+    def _collect(self, async_generator, limit=None):
+        async def _consume():
+            items = []
+            async for item in async_generator:
+                items.append(item)
+                if len(items) == limit:
+                    break
+            await async_generator.aclose()
+            return items
+        return self.loop.run_until_complete(_consume())
+
+    def test_get_batches_by_year(self):
+        """
+        Test if records are yielded in batches of `batch_size`.
+        """
+        # Call to func :func:`get_batches_by_year`
+        batches = self._collect(get_batches_by_year(2000, batch_size=2))
+
+        # Assert batches
+        self.assertEqual([2, 2, 1], [len(batch) for batch in batches])
+        self.assertEqual(
+            list(get_generator_by_year(2000)),
+            [record for batch in batches for record in batch]
+        )
+
+    def test_get_records_by_year(self):
+        """
+        Test if records are yielded in order and consumer can stop early.
+        """
+        # Case 1: All records
+        # Call to func :func:`get_records_by_year`
+        records = self._collect(get_records_by_year(2001, batch_size=2))
+
+        # Assert records
+        self.assertEqual(list(get_generator_by_year(2001)), records)
+
+        # Case 2: Consumer stops after first record
+        records = self._collect(
+            get_records_by_year(2001, batch_size=2), limit=1
+        )
+
+        # Assert records
+        self.assertEqual([1], [record["source_file_row"] for record in records])
+
+    @mock.patch("hdx_ahcd.controllers.namcs_async."
+                "initiate_namcs_dataset_download")
+    def test_initiate_namcs_dataset_download_async(
+            self, mocked_initiate_namcs_dataset_download
+    ):
+        """
+        Test if dataset file of every year is downloaded.
+        """
+        # Call to func :func:`initiate_namcs_dataset_download_async`
+        self.loop.run_until_complete(
+            initiate_namcs_dataset_download_async(
+                year=(2000, 2001), force_download=True
+            )
+        )
+
+        # Assert call to :func:`initiate_namcs_dataset_download`
+        self.assertEqual(
+            [
+                mock.call(year=2000, force_download=True),
+                mock.call(year=2001, force_download=True)
+            ],
+            sorted(
+                mocked_initiate_namcs_dataset_download.call_args_list,
+                key=lambda call: call[1]["year"]
+            )
+        )
+
+    @mock.patch("hdx_ahcd.controllers.namcs_processors."
+                "initiate_namcs_dataset_download_async")
+    def test_get_cleaned_data_by_year_async(
+            self, mocked_initiate_namcs_dataset_download_async
+    ):
+        """
+        Test if `get_cleaned_data_by_year_async` returns asynchronous
+        generators of translated records.
+        """
+        # Setup
+        mocked_initiate_namcs_dataset_download_async.return_value = \
+            asyncio.Future(loop=self.loop)
+        mocked_initiate_namcs_dataset_download_async.return_value.set_result(
+            None
+        )
+
+        # Call to func :func:`get_cleaned_data_by_year_async`
+        year_wise_translated_data = self.loop.run_until_complete(
+            get_cleaned_data_by_year_async(year=(2000, 2001), batches=True)
+        )
+
+        # Assert download and asynchronous generators
+        self.assertTrue(mocked_initiate_namcs_dataset_download_async.called)
+        for year in (2000, 2001):
+            async_generator = year_wise_translated_data.get(year).get(
+                "generator"
+            )
+            self.assertTrue(inspect.isasyncgen(async_generator))
+            self.assertEqual(
+                [list(get_generator_by_year(year))],
+                self._collect(async_generator)
+            )
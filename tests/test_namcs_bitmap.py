@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_bitmap`.
+"""
+# Python modules
+from unittest import mock, TestCase
+import os
+import shutil
+import tempfile
+
+# Third party modules
+# -N/A
+
+# Other modules
+from hdx_ahcd.controllers import (
+    namcs_bitmap,
+    namcs_index,
+)
+from hdx_ahcd.controllers.namcs_bitmap import (
+    BitmapIndex,
+    BitmapIndexSink,
+    get_bitmap_index,
+    get_bitmap_index_path,
+    get_filtered_generator_by_year,
+)
+from hdx_ahcd.controllers.namcs_converter import (
+    get_generator_by_year,
+    get_year_wise_generator,
+)
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSBitmapTest(TestCase):
+    """
+    TestCase class for bitmap indexes of low cardinality fields.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.index_dir)
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = \
+            os.path.join(os.path.dirname(__file__), "data")
+
+    def test_bitmap_index(self):
+        """
+        Test if bitmaps are combined by filter, and index is read back from
+        file.
+        """
+        # Setup
+        bitmap_index = BitmapIndex({
+            "sex": {"Female": 0b10110, "Male": 0b01000, None: 1 << 900},
+            "month_of_visit": {1: 0b00110, 7: 0b11000},
+        })
+        index_file = os.path.join(self.index_dir, "index.idx")
+        bitmap_index.write(index_file)
+
+        for _bitmap_index in (bitmap_index, BitmapIndex.read(index_file)):
+            self.assertEqual(bitmap_index.bitmaps, _bitmap_index.bitmaps)
+
+            # Case 1: Fields are AND-ed, values of a field are OR-ed
+            self.assertEqual(
+                0b00110, _bitmap_index.get_bitmap(
+                    {"sex": "Female", "month_of_visit": (1, 2, 3)}
+                )
+            )
+            self.assertEqual(
+                0b11110, _bitmap_index.get_bitmap(
+                    {"sex": ["Female", "Male"]}
+                )
+            )
+
+            # Case 2: List of filters is OR-ed
+            self.assertEqual(
+                3, _bitmap_index.count(
+                    [{"month_of_visit": 1}, {"sex": "Male"}]
+                )
+            )
+
+            # Case 3: Value not present in records
+            self.assertEqual(0, _bitmap_index.count({"month_of_visit": 12}))
+        self.assertEqual([1, 2, 4, 900], BitmapIndex.get_rows(0b10110 |
+                                                             1 << 900))
+        self.assertEqual([], BitmapIndex.get_rows(0))
+        self.assertEqual(["index.idx"], os.listdir(self.index_dir))
+
+    def test_invalid_where(self):
+        """
+        Test if filter on field which is not indexed raises error on call.
+        """
+        for where in ({"physician_diagnoses": "401.9"}, {}, [], "Female"):
+            with self.assertRaises(ValueError):
+                get_filtered_generator_by_year(
+                    2000, where=where, index_dir=self.index_dir
+                )
+
+    def test_get_bitmap_index(self):
+        """
+        Test if index is written on first call and read afterwards.
+        """
+        # Case 1: Index is built and written with fingerprint
+        bitmap_index = get_bitmap_index(2001, index_dir=self.index_dir)
+        self.assertEqual(
+            [
+                "2001_NAMCS_BITMAP_INDEX.idx",
+                "2001_NAMCS_BITMAP_INDEX.idx.fingerprint",
+            ],
+            sorted(os.listdir(self.index_dir))
+        )
+        self.assertEqual(
+            {"Male": 0b010110, "Female": 0b101000}, bitmap_index.bitmaps["sex"]
+        )
+        self.assertEqual([2], bitmap_index.get_values("month_of_visit"))
+
+        # Case 2: Index is read from file, without translation
+        with mock.patch.object(
+                namcs_bitmap, "get_generator_by_year",
+                side_effect=AssertionError("translated again")
+        ):
+            self.assertEqual(
+                bitmap_index.bitmaps,
+                get_bitmap_index(2001, index_dir=self.index_dir).bitmaps
+            )
+
+    def test_get_filtered_generator_by_year(self):
+        """
+        Test if only records matching filter are decoded.
+        """
+        # Setup
+        records = list(get_generator_by_year(2001))
+        where = {
+            "sex": "Female", "month_of_visit": (1, 2, 3),
+            "age_bucket": ("65-74", "75 and over"),
+        }
+        get_bitmap_index(2001, index_dir=self.index_dir)
+
+        # Call to func :func:`get_filtered_generator_by_year`
+        with mock.patch.object(
+                namcs_index, "translate_records",
+                wraps=namcs_index.translate_records
+        ) as mocked_translate_records:
+            filtered_records = list(get_filtered_generator_by_year(
+                2001, where=where, index_dir=self.index_dir
+            ))
+
+        # Assert only matching records
+        self.assertEqual([records[2], records[4]], filtered_records)
+        self.assertEqual(1, mocked_translate_records.call_count)
+        self.assertEqual([], list(get_filtered_generator_by_year(
+            2001, where={"month_of_visit": 1}, index_dir=self.index_dir
+        )))
+
+    def test_get_year_wise_generator_with_where(self):
+        """
+        Test if years are filtered by bitmap index.
+        """
+        # Call to func :func:`get_year_wise_generator`, index is written
+        # into temporary directory
+        with mock.patch.object(
+                namcs_bitmap, "get_bitmap_index",
+                side_effect=lambda year, file, index_dir: get_bitmap_index(
+                    year, file, self.index_dir
+                )
+        ):
+            year_wise_translated_data = get_year_wise_generator(
+                (2000, 2001), where={"age_bucket": "25-44"}
+            )
+            self.assertEqual(
+                [1, 4, 5],
+                [
+                    record["source_file_row"] for record in
+                    year_wise_translated_data[2000]["generator"]
+                ]
+            )
+            self.assertEqual(
+                [], list(year_wise_translated_data[2001]["generator"])
+            )
+
+        # Filter is not supported with export, and validated upfront
+        with self.assertRaises(ValueError):
+            get_year_wise_generator(2000, do_export=True, where={"sex": "M"})
+        with self.assertRaises(ValueError):
+            get_year_wise_generator(2000, where={"dx": "401.9"})
+
+    def test_bitmap_index_sink(self):
+        """
+        Test if index is written along with conversion.
+        """
+        # Call to func :func:`get_year_wise_generator`
+        year_wise_translated_data = get_year_wise_generator(
+            2000, sinks=[BitmapIndexSink(index_dir=self.index_dir)]
+        )
+
+        # Assert index file
+        index_file = get_bitmap_index_path(2000, self.index_dir)
+        self.assertEqual(
+            index_file,
+            year_wise_translated_data[2000]["sinks"]["bitmap_index"]
+        )
+        self.assertEqual(
+            1, BitmapIndex.read(index_file).count({"sex": "Female"})
+        )
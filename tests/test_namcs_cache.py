@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_cache`.
+"""
+# Python modules
+from itertools import zip_longest
+from unittest import mock, skipUnless, TestCase
+import os
+import shutil
+import tempfile
+
+# Third party modules
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+# Other modules
+from hdx_ahcd.controllers import (
+    namcs_cache,
+    namcs_columnar,
+    namcs_fingerprint,
+)
+from hdx_ahcd.controllers.namcs_cache import (
+    DecodedYearCache,
+    get_cache_file_path,
+    get_cached_generator_by_year,
+    get_memory_cached_generator_by_year,
+)
+from hdx_ahcd.controllers.namcs_converter import (
+    get_generator_by_year,
+    get_year_wise_generator,
+)
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSCacheTest(TestCase):
+    """
+    TestCase class for persistent cache of translated records.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = self.data_dir
+
+    def test_get_cached_generator_by_year_without_pyarrow(self):
+        """
+        Test if records are translated without cache when `pyarrow` is not
+        installed.
+        """
+        with mock.patch.object(namcs_columnar, "pyarrow", None):
+            # Call to func :func:`get_cached_generator_by_year`
+            records = list(
+                get_cached_generator_by_year(2000, cache_dir=self.cache_dir)
+            )
+
+        # Assert records and no cache file
+        self.assertEqual(list(get_generator_by_year(2000)), records)
+        self.assertEqual([], os.listdir(self.cache_dir))
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_get_cached_generator_by_year(self):
+        """
+        Test if cache is written on first iteration, served afterwards and
+        rebuilt when converter version changes.
+        """
+        # Setup
+        expected_records = list(get_generator_by_year(2000))
+        cache_file = get_cache_file_path(2000, self.cache_dir)
+
+        # Case 1: Partial iteration does not write cache
+        generator_object = get_cached_generator_by_year(
+            2000, cache_dir=self.cache_dir
+        )
+        next(generator_object)
+        generator_object.close()
+        self.assertFalse(os.path.exists(cache_file))
+
+        # Case 2: Cache is written on first full iteration
+        self.assertEqual(
+            expected_records,
+            list(get_cached_generator_by_year(2000, cache_dir=self.cache_dir))
+        )
+        self.assertEqual(
+            [
+                "2000_NAMCS_CACHE.arrow", "2000_NAMCS_CACHE.arrow.fingerprint",
+                "diagnosis_dictionary.txt"
+            ],
+            sorted(os.listdir(self.cache_dir))
+        )
+
+        # Case 3: Records are read from cache, without translation
+        with mock.patch.object(
+                namcs_cache, "get_generator_by_year",
+                side_effect=AssertionError("translated again")
+        ):
+            self.assertEqual(
+                expected_records,
+                list(
+                    get_cached_generator_by_year(
+                        2000, cache_dir=self.cache_dir
+                    )
+                )
+            )
+
+        # Case 4: Cache is rebuilt when converter version changes
+        with mock.patch.object(
+                namcs_fingerprint, "CONVERTER_VERSION", "test"
+        ):
+            self.assertEqual(
+                expected_records,
+                list(
+                    get_cached_generator_by_year(
+                        2000, cache_dir=self.cache_dir
+                    )
+                )
+            )
+        self.assertEqual(
+            "test",
+            namcs_fingerprint.read_fingerprint(cache_file)["converter_version"]
+        )
+
+        # Case 5: Cache is rebuilt when diagnosis dictionary is lost
+        os.remove(os.path.join(self.cache_dir, "diagnosis_dictionary.txt"))
+        with mock.patch.object(
+                namcs_cache, "write_cache", wraps=namcs_cache.write_cache
+        ) as mocked_write_cache:
+            self.assertEqual(
+                expected_records,
+                list(
+                    get_cached_generator_by_year(
+                        2000, cache_dir=self.cache_dir
+                    )
+                )
+            )
+        mocked_write_cache.assert_called_once()
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_get_year_wise_generator_with_use_cache(self):
+        """
+        Test if `get_year_wise_generator` returns generator reading from
+        cache.
+        """
+        with mock.patch.object(namcs_cache, "CACHE_DIR_PATH", self.cache_dir):
+            # Call to func :func:`get_year_wise_generator`, twice to read
+            # from cache
+            for _ in range(2):
+                year_wise_translated_data = get_year_wise_generator(
+                    (2000, 2001), use_cache=True
+                )
+
+                # Assert records
+                for year in (2000, 2001):
+                    self.assertEqual(
+                        list(get_generator_by_year(year)),
+                        list(year_wise_translated_data[year]["generator"])
+                    )
+
+        # Assert cache files
+        self.assertEqual(
+            ["2000_NAMCS_CACHE.arrow", "2001_NAMCS_CACHE.arrow"],
+            sorted(
+                file_name for file_name in os.listdir(self.cache_dir)
+                if file_name.endswith(".arrow")
+            )
+        )
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_get_cached_generator_by_year_interleaved(self):
+        """
+        Test if caches of years written at the same time share ids of
+        diagnosis dictionary.
+        """
+        # Setup
+        expected_records = {
+            year: list(get_generator_by_year(year)) for year in (2000, 2001)
+        }
+        generator_objects = {
+            year: get_cached_generator_by_year(year, cache_dir=self.cache_dir)
+            for year in (2000, 2001)
+        }
+
+        # Call to func :func:`get_cached_generator_by_year`, records of both
+        # years are consumed alternately
+        records = {year: [] for year in (2000, 2001)}
+        for year_records in zip_longest(*generator_objects.values()):
+            for year, record in zip(generator_objects, year_records):
+                if record is not None:
+                    records[year].append(record)
+        self.assertEqual(expected_records, records)
+
+        # Assert records read from both caches
+        with mock.patch.object(
+                namcs_cache, "get_generator_by_year",
+                side_effect=AssertionError("translated again")
+        ):
+            for year in (2000, 2001):
+                self.assertEqual(
+                    expected_records[year],
+                    list(
+                        get_cached_generator_by_year(
+                            year, cache_dir=self.cache_dir
+                        )
+                    )
+                )
+
+    def test_decoded_year_cache_eviction(self):
+        """
+        Test if least recently used years are evicted beyond memory budget.
+        """
+        # Setup
+        rows = tuple((str(row_no), row_no) for row_no in range(10))
+        size = DecodedYearCache.get_rows_size(rows)
+        memory_cache = DecodedYearCache(max_bytes=2 * size)
+
+        # Call to func :func:`put` and :func:`get`
+        memory_cache.put((2000, None), rows)
+        memory_cache.put((2001, None), rows)
+        self.assertEqual(rows, memory_cache.get((2000, None)))
+        memory_cache.put((2002, None), rows)
+
+        # Assert 2001, least recently used, is evicted
+        self.assertIsNone(memory_cache.get((2001, None)))
+        self.assertEqual(rows, memory_cache.get((2002, None)))
+
+        # Assert year exceeding budget is not cached
+        self.assertFalse(
+            memory_cache.put(
+                (2003, None),
+                tuple((str(row_no), row_no) for row_no in range(30))
+            )
+        )
+
+        # Assert counters
+        self.assertEqual(
+            {
+                "hits": 2, "misses": 1, "evictions": 1, "entries": 2,
+                "size": 2 * size, "max_bytes": 2 * size,
+            },
+            memory_cache.get_stats()
+        )
+
+    def test_decoded_year_cache_get_rows_size(self):
+        """
+        Test if size of rows is estimated from sample of rows.
+        """
+        # Setup
+        rows = tuple(
+            (str(row_no), float(row_no), ("V70.0", str(row_no)))
+            for row_no in range(10000)
+        )
+
+        # Call to func :func:`get_rows_size`
+        size = DecodedYearCache.get_rows_size(rows, sample_size=100)
+
+        # Assert estimate within 5% of exact size
+        exact_size = DecodedYearCache.get_rows_size(rows, sample_size=10000)
+        self.assertAlmostEqual(1, size / exact_size, delta=0.05)
+        self.assertEqual(
+            exact_size, DecodedYearCache.get_rows_size(rows, sample_size=20000)
+        )
+        self.assertEqual(
+            DecodedYearCache.get_rows_size(()),
+            DecodedYearCache.get_rows_size((), sample_size=1)
+        )
+
+    def test_get_memory_cached_generator_by_year(self):
+        """
+        Test if year is translated once and served from memory afterwards.
+        """
+        # Setup
+        expected_records = list(get_generator_by_year(2000))
+        memory_cache = DecodedYearCache()
+        generator_method = mock.Mock(side_effect=get_generator_by_year)
+
+        for _ in range(3):
+            # Call to func :func:`get_memory_cached_generator_by_year`
+            records = list(
+                get_memory_cached_generator_by_year(
+                    2000, generator_method=generator_method,
+                    memory_cache=memory_cache
+                )
+            )
+
+            # Assert records, modified records do not change cache
+            self.assertEqual(expected_records, records)
+            records[0]["physician_diagnoses"].append("V70.0")
+
+        # Assert year is translated only once
+        generator_method.assert_called_once_with(2000, None)
+        self.assertEqual(
+            {"hits": 2, "misses": 1, "entries": 1},
+            {
+                key: value for key, value in memory_cache.get_stats().items()
+                if key in ("hits", "misses", "entries")
+            }
+        )
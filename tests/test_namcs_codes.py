@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_codes`.
+"""
+# Python modules
+from unittest import TestCase
+import os
+import shutil
+import tempfile
+
+# Third party modules
+# -N/A
+
+# Other modules
+from hdx_ahcd.controllers.namcs_codes import DiagnosisCodeRanges
+from hdx_ahcd.controllers.namcs_encoding import DiagnosisDictionary
+from hdx_ahcd.controllers.namcs_index import DiagnosisIndex
+from hdx_ahcd.mappers.functions import convert_physician_diagnoses_code
+
+
+class NAMCSCodesTest(TestCase):
+    """
+    TestCase class for sorted ranges over ICD-9 codes.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir)
+
+        # Codes as converted from raw codes, including special values
+        self.diagnosis_dictionary = DiagnosisDictionary(
+            os.path.join(data_dir, "dictionary.txt")
+        )
+        self.diagnosis_dictionary.encode_list(
+            convert_physician_diagnoses_code(raw_code) for raw_code in (
+                "V700", "125000", "125001", "12500", "13899", "14019",
+                "14599", "14600", "10010", "V9910", "V9920", "209930",
+                "00000", "20450", "V823",
+            )
+        )
+        self.code_ranges = DiagnosisCodeRanges.from_dictionary(
+            self.diagnosis_dictionary
+        )
+
+    def test_get_codes_by_prefix(self):
+        """
+        Test if prefix is resolved to codes of category or subcategory.
+        """
+        self.assertEqual(["250.0", "250.00", "250.01"],
+                         self.code_ranges.get_codes("250"))
+        self.assertEqual(self.code_ranges.get_codes("250"),
+                         self.code_ranges.get_codes("250.xx"))
+        self.assertEqual(["250.01"], self.code_ranges.get_codes("250.01 "))
+        self.assertEqual(["V45.0", "V70.0"],
+                         self.code_ranges.get_codes(("v70", "V4")))
+        self.assertEqual([], self.code_ranges.get_codes("251"))
+
+    def test_get_codes_by_range(self):
+        """
+        Test if range is resolved to codes of all the categories within
+        bounds, including upper bound category.
+        """
+        self.assertEqual(["401.9", "459.9"],
+                         self.code_ranges.get_codes("390-459"))
+        self.assertEqual(["001.0", "250.0", "250.00", "250.01"],
+                         self.code_ranges.get_codes("001-250.0"))
+        self.assertEqual(["V45.0", "V70.0", "V82.3"],
+                         self.code_ranges.get_codes("V01-V82"))
+
+        # Bounds of different kinds or in descending order
+        for pattern in ("800-V82", "459-390", "AHCD.HNAT-AHCD.TTAF", "-250"):
+            with self.assertRaises(ValueError):
+                self.code_ranges.get_codes(pattern)
+
+    def test_get_codes_of_special_values(self):
+        """
+        Test if special values are matched by name only.
+        """
+        self.assertEqual(["AHCD.HNAT", "AHCD.LBBS", "AHCD.TTAF"],
+                         self.code_ranges.get_codes("AHCD"))
+        self.assertEqual(["AHCD.LBBS"],
+                         self.code_ranges.get_codes("AHCD.LBBS"))
+        self.assertEqual([], self.code_ranges.get_codes("V99"))
+        self.assertNotIn("", self.code_ranges.codes)
+
+    def test_get_ids(self):
+        """
+        Test if pattern is resolved to ids of dictionary once.
+        """
+        ids = self.code_ranges.get_ids(("250", "V70"))
+        self.assertEqual(
+            ["250.0", "250.00", "250.01", "V70.0"],
+            sorted(self.diagnosis_dictionary.decode_list(ids))
+        )
+        self.assertIs(ids, self.code_ranges.get_ids(("250", "V70")))
+
+    def test_diagnosis_index_get_rows_by_pattern(self):
+        """
+        Test if records are looked up by code range.
+        """
+        diagnosis_index = DiagnosisIndex.from_code_rows({
+            "250.00": [2, 7], "401.9": [1, 7], "459.9": [3], "V70.0": [5],
+        })
+        self.assertEqual(
+            [1, 3, 7], diagnosis_index.get_rows_by_pattern("390-459")
+        )
+        self.assertEqual(
+            [1, 2, 3, 5, 7],
+            diagnosis_index.get_rows_by_pattern(["001-459", "V"])
+        )
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_columnar`.
+"""
+# Python modules
+from unittest import mock, skipUnless, TestCase
+import os
+import shutil
+import tempfile
+
+# Third party modules
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Other modules
+from hdx_ahcd.controllers import (
+    namcs_columnar,
+    namcs_converter,
+)
+from hdx_ahcd.controllers.namcs_columnar import export_to_columnar
+from hdx_ahcd.controllers.namcs_converter import (
+    get_generator_by_year,
+    get_year_wise_generator,
+)
+from hdx_ahcd.helpers import functions
+from hdx_ahcd.namcs.config import CONVERTED_CSV_FIELDS
+
+
+class NAMCSColumnarTest(TestCase):
+    """
+    TestCase class for columnar export.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = self.data_dir
+
+    def test_export_to_columnar_without_pyarrow(self):
+        """
+        Test if columnar export fails when `pyarrow` is not installed.
+        """
+        with mock.patch.object(namcs_columnar, "pyarrow", None):
+            # Assert :class:`ImportError`
+            with self.assertRaises(ImportError):
+                export_to_columnar(
+                    2000, get_generator_by_year(2000),
+                    export_dir=self.output_dir
+                )
+
+        # Assert :class:`ValueError` for non columnar format
+        with self.assertRaises(ValueError):
+            export_to_columnar(
+                2000, get_generator_by_year(2000), export_format="csv",
+                export_dir=self.output_dir
+            )
+
+    @mock.patch("hdx_ahcd.controllers.namcs_sinks.ColumnarSink")
+    def test_get_year_wise_generator_with_export_format(
+            self, mocked_columnar_sink
+    ):
+        """
+        Test if `get_year_wise_generator` exports to `export_format`.
+        """
+        # Setup
+        mocked_columnar_sink.return_value.name = "arrow"
+        mocked_columnar_sink.return_value.close.return_value = \
+            "2000_NAMCS_CONVERTED.arrow"
+
+        with mock.patch.object(
+                namcs_converter, "NAMCS_DATA_DIR_PATH", self.output_dir
+        ):
+            # Call to func :func:`get_year_wise_generator`
+            year_wise_translated_data = get_year_wise_generator(
+                2000, do_export=True, export_format="arrow"
+            )
+
+        # Assert export through :class:`ColumnarSink`
+        self.assertEqual(
+            "2000_NAMCS_CONVERTED.arrow",
+            year_wise_translated_data.get(2000).get("file_name")
+        )
+        self.assertEqual(
+            "arrow", mocked_columnar_sink.call_args[1]["export_format"]
+        )
+        self.assertEqual(
+            5,
+            sum(
+                len(call[0][0]) for call in
+                mocked_columnar_sink.return_value.write.call_args_list
+            )
+        )
+        self.assertFalse(os.listdir(self.output_dir))
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_export_to_parquet(self):
+        """
+        Test if parquet file has typed columns and a row group per batch.
+        """
+        # Call to func :func:`export_to_columnar`
+        file_name = export_to_columnar(
+            2000, get_generator_by_year(2000), export_format="parquet",
+            export_dir=self.output_dir, row_group_size=2
+        )
+
+        # Assert file name, row groups and content
+        self.assertEqual(
+            os.path.join(self.output_dir, "2000_NAMCS_CONVERTED.parquet"),
+            file_name
+        )
+        parquet_file = pyarrow.parquet.ParquetFile(file_name)
+        self.assertEqual(3, parquet_file.num_row_groups)
+        table = parquet_file.read()
+        self.assertEqual(list(CONVERTED_CSV_FIELDS), table.column_names)
+        self.assertEqual(
+            [
+                {field: record[field] for field in CONVERTED_CSV_FIELDS}
+                for record in get_generator_by_year(2000)
+            ],
+            table.to_pylist()
+        )
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_export_to_arrow(self):
+        """
+        Test if Arrow IPC file keeps diagnoses as list column.
+        """
+        # Call to func :func:`export_to_columnar`
+        file_name = export_to_columnar(
+            2001, get_generator_by_year(2001), export_format="arrow",
+            export_dir=self.output_dir
+        )
+
+        # Assert content
+        table = pyarrow.ipc.open_file(file_name).read_all()
+        self.assertEqual(5, table.num_rows)
+        self.assertEqual(
+            [
+                record["physician_diagnoses"]
+                for record in get_generator_by_year(2001)
+            ],
+            table.column("physician_diagnoses").to_pylist()
+        )
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_failed_export_to_columnar_keeps_existing_file(self):
+        """
+        Test if failure while writing columnar file is raised, keeping
+        previously exported file.
+        """
+        # Setup
+        file_name = export_to_columnar(
+            2000, get_generator_by_year(2000), export_dir=self.output_dir
+        )
+
+        def broken_generator():
+            yield from get_generator_by_year(2000)
+            raise IOError("broken record stream")
+
+        # Call to func :func:`export_to_columnar`
+        with self.assertRaisesRegex(IOError, "broken record stream"):
+            export_to_columnar(
+                2000, broken_generator(), export_dir=self.output_dir,
+                row_group_size=2
+            )
+
+        # Assert previous file is kept and no temporary file is left
+        self.assertEqual(
+            [os.path.basename(file_name)], os.listdir(self.output_dir)
+        )
+        self.assertEqual(5, pyarrow.parquet.read_table(file_name).num_rows)
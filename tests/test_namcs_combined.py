@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_combined`.
+"""
+# Python modules
+from unittest import mock, TestCase
+import csv
+import os
+import shutil
+import tempfile
+
+# Third party modules
+# -N/A
+
+# Other modules
+from hdx_ahcd.controllers import namcs_combined
+from hdx_ahcd.controllers.namcs_combined import export_combined
+from hdx_ahcd.controllers.namcs_converter import (
+    export_to_csv,
+    get_generator_by_year,
+)
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSCombinedTest(TestCase):
+    """
+    TestCase class for combined export of multiple years.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+        self.output_file = os.path.join(self.output_dir, "namcs.tsv")
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = self.data_dir
+
+    @staticmethod
+    def _read_rows(file_name, delimiter=","):
+        """
+        Method to read rows of csv file, header included.
+        """
+        with open(file_name, newline="") as file_handle:
+            return list(csv.reader(file_handle, delimiter=delimiter))
+
+    def test_export_combined(self):
+        """
+        Test if rows of every year are written in year order irrespective
+        of number of workers, and missing year is skipped.
+        """
+        # Setup
+        expected_rows = []
+        for year in (2000, 2001):
+            rows = self._read_rows(
+                export_to_csv(
+                    year, get_generator_by_year(year),
+                    export_dir=self.output_dir
+                )
+            )
+            expected_rows.extend(rows if not expected_rows else rows[1:])
+
+        for workers in (1, 2):
+            # Call to func :func:`export_combined`, years out of order
+            combined_export = export_combined(
+                (2001, 2002, 2000), self.output_file, workers=workers,
+                delimiter="\t", batch_size=2, queue_size=1
+            )
+
+            # Assert result
+            self.assertEqual(
+                os.path.realpath(self.output_file),
+                combined_export["file_name"]
+            )
+            self.assertEqual({2000: 5, 2001: 5}, combined_export["rows"])
+            self.assertEqual([2002], combined_export["skipped"])
+
+            # Assert rows are same as csv export of every year
+            self.assertEqual(
+                expected_rows, self._read_rows(self.output_file, "\t")
+            )
+
+    def test_export_combined_failure_keeps_output(self):
+        """
+        Test if previous output file is kept when translation of a year
+        fails.
+        """
+        # Setup
+        export_combined(2000, self.output_file)
+        with open(self.output_file) as file_handle:
+            expected_content = file_handle.read()
+
+        with mock.patch.object(
+                namcs_combined, "get_generator_by_year",
+                side_effect=ValueError("decoder failed")
+        ):
+            # Assert :class:`RuntimeError`
+            with self.assertRaisesRegex(RuntimeError, "decoder failed"):
+                export_combined((2000, 2001), self.output_file, workers=1)
+
+        # Assert output file and no temporary file left
+        with open(self.output_file) as file_handle:
+            self.assertEqual(expected_content, file_handle.read())
+        self.assertEqual(["namcs.tsv"], os.listdir(self.output_dir))
@@ -3,10 +3,12 @@
 Tests for module `namcs_converter`.
 """
 # Python modules
-from itertools import tee
 from unittest import mock, TestCase
+import csv
 import inspect
 import os
+import shutil
+import tempfile
 
 # Third party modules
 # -N/A
@@ -18,9 +20,13 @@ from hdx_ahcd.controllers.namcs_converter import (
     get_year_wise_generator,
     export_to_csv,
 )
+from hdx_ahcd.controllers.namcs_sinks import StatsSink
 from hdx_ahcd.helpers import functions
 from hdx_ahcd.helpers.functions import get_namcs_source_file_info
-from hdx_ahcd.namcs.config import YEARS_AVAILABLE
+from hdx_ahcd.namcs.config import (
+    CONVERTED_CSV_FIELDS,
+    YEARS_AVAILABLE,
+)
 
 
 class NAMCSConverterTest(TestCase):
@@ -176,8 +182,8 @@ class NAMCSConverterTest(TestCase):
             }
         ], rows)
 
-    @mock.patch("builtins.open")
-    def test_export_to_csv(self, mocked_open):
+    @mock.patch("hdx_ahcd.controllers.namcs_converter.open_export_file")
+    def test_export_to_csv(self, mocked_open_export_file):
         """
         Test if converted data is exported to a CSV file successfully.
         """
@@ -366,24 +372,27 @@ class NAMCSConverterTest(TestCase):
             year_wise_translated_data.get(2001).get("source_file_info")
         )
 
-    @mock.patch("hdx_ahcd.controllers.namcs_converter.export_to_csv")
-    def test_get_year_wise_generator_for_year_with_export(
-        self, mocked_export_to_csv
-    ):
+    def test_get_year_wise_generator_for_year_with_export(self):
         """
         Test if valid generator objects are returned by
         `get_year_wise_generator` method when a list of year is specified.
         """
         # Setup
         years = (2000, 2001)
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
 
         # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
         functions.EXTRACTED_DATA_DIR_PATH = \
             os.path.join(os.path.dirname(__file__), "data")
 
         # Call to func :func:`get_year_wise_generator`
-        year_wise_translated_data = \
-            get_year_wise_generator(years, do_export=True)
+        with mock.patch.object(
+                namcs_converter, "NAMCS_DATA_DIR_PATH", output_dir
+        ):
+            year_wise_translated_data = get_year_wise_generator(
+                years, do_export=True, sinks=[StatsSink()]
+            )
 
         # Assert if the year wise dict has generator object
         self.assertTrue(
@@ -417,17 +426,28 @@ class NAMCSConverterTest(TestCase):
             year_wise_translated_data.get(2001).get("source_file_info")
         )
 
-        # Verify the `export_to_csv` call
-        self.assertEqual(
-            years,
-            tuple([call[0][0] for call in mocked_export_to_csv.call_args_list])
-        )
-        self.assertTrue(all(
-            [
-                isinstance(call[0][1], type(tee(())[0]))
-                for call in mocked_export_to_csv.call_args_list
-            ]
-        ))
+        for year in years:
+            # Assert export and sink were fed in the same pass
+            self.assertEqual(
+                os.path.join(
+                    output_dir, "{}_NAMCS_CONVERTED.csv".format(year)
+                ),
+                year_wise_translated_data.get(year).get("file_name")
+            )
+            self.assertEqual(
+                5,
+                year_wise_translated_data.get(year)["sinks"]["stats"][
+                    "records"
+                ]
+            )
+
+            # Assert returned generator is not consumed by export
+            self.assertEqual(
+                1,
+                next(year_wise_translated_data.get(year).get("generator"))[
+                    "source_file_row"
+                ]
+            )
 
     def test_get_year_wise_generator_with_no_year(self):
         """
@@ -454,3 +474,74 @@ class NAMCSConverterTest(TestCase):
                 get_namcs_source_file_info(year),
                 year_wise_translated_data.get(year).get("source_file_info")
             )
+
+    def test_export_to_csv_matches_dict_writer(self):
+        """
+        Test if csv file is identical to the one written by
+        :class:`csv.DictWriter`, and if physician diagnoses can be joined
+        with separator.
+        """
+        # Setup
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        functions.EXTRACTED_DATA_DIR_PATH = \
+            os.path.join(os.path.dirname(__file__), "data")
+        translated_records = list(get_generator_by_year(2001))
+        # Record rejected during translation misses fields
+        translated_records.append(
+            {"source_file_ID": "2001_NAMCS", "source_file_row": 6}
+        )
+        expected_file_name = os.path.join(output_dir, "expected.csv")
+        with open(expected_file_name, "w") as csv_file:
+            writer = csv.DictWriter(
+                csv_file, delimiter=",", fieldnames=CONVERTED_CSV_FIELDS
+            )
+            writer.writeheader()
+            writer.writerows(translated_records)
+
+        # Case 1: Diagnoses written as list
+        # Call to func :func:`export_to_csv`
+        file_name = export_to_csv(
+            2001, iter(translated_records), export_dir=output_dir
+        )
+
+        # Assert output is byte identical
+        with open(expected_file_name, "rb") as expected_file, \
+                open(file_name, "rb") as csv_file:
+            self.assertEqual(expected_file.read(), csv_file.read())
+
+        # Case 2: Diagnoses joined with separator
+        translated_records[0]["physician_diagnoses"] = ["553.10", "V45.01"]
+        # Call to func :func:`export_to_csv`
+        file_name = export_to_csv(
+            2001, iter(translated_records), export_dir=output_dir,
+            diagnoses_separator="|"
+        )
+
+        # Assert diagnoses column
+        with open(file_name) as csv_file:
+            rows = list(csv.DictReader(csv_file))
+        self.assertEqual("553.10|V45.01", rows[0]["physician_diagnoses"])
+        self.assertEqual("", rows[5]["physician_diagnoses"])
+
+    def test_export_to_csv_with_failure(self):
+        """
+        Test if failure while writing csv file is raised, without leaving
+        csv file behind.
+        """
+        # Setup
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        functions.EXTRACTED_DATA_DIR_PATH = \
+            os.path.join(os.path.dirname(__file__), "data")
+
+        def broken_generator():
+            yield from get_generator_by_year(2000)
+            raise IOError("broken record stream")
+
+        # Call to func :func:`export_to_csv`
+        with self.assertRaisesRegex(IOError, "broken record stream"):
+            export_to_csv(2000, broken_generator(), export_dir=output_dir)
+
+        # Assert no csv file is written
+        self.assertEqual([], os.listdir(output_dir))
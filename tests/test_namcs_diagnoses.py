@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_diagnoses`.
+"""
+# Python modules
+from unittest import mock, skipUnless, TestCase
+import csv
+import os
+import shutil
+import tempfile
+
+# Third party modules
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Other modules
+from hdx_ahcd.controllers import namcs_converter
+from hdx_ahcd.controllers.namcs_converter import (
+    get_generator_by_year,
+    get_year_wise_generator,
+)
+from hdx_ahcd.controllers.namcs_diagnoses import (
+    DiagnosesSink,
+    export_diagnoses,
+)
+from hdx_ahcd.controllers.namcs_sinks import fan_out
+from hdx_ahcd.helpers import functions
+from hdx_ahcd.namcs.config import DIAGNOSES_CSV_FIELDS
+
+
+class NAMCSDiagnosesTest(TestCase):
+    """
+    TestCase class for long format diagnoses export.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = self.data_dir
+
+    @staticmethod
+    def _get_expected_rows(year):
+        """
+        Method to get a row per diagnosis of translated records of `year`.
+        """
+        return [
+            (
+                record["source_file_ID"], record["source_file_row"],
+                position, diagnosis, record["patient_visit_weight"]
+            )
+            for record in get_generator_by_year(year)
+            for position, diagnosis in enumerate(
+                record["physician_diagnoses"], 1
+            )
+        ]
+
+    def test_export_diagnoses(self):
+        """
+        Test if a row is written per diagnosis of every visit.
+        """
+        # Call to func :func:`export_diagnoses`
+        file_name = export_diagnoses(
+            2000, get_generator_by_year(2000), export_dir=self.output_dir
+        )
+
+        # Assert file name and rows
+        self.assertEqual(
+            os.path.join(
+                os.path.realpath(self.output_dir), "2000_NAMCS_DIAGNOSES.csv"
+            ),
+            file_name
+        )
+        with open(file_name, newline="") as file_handle:
+            rows = list(csv.reader(file_handle))
+        self.assertEqual(list(DIAGNOSES_CSV_FIELDS), rows[0])
+        self.assertEqual(
+            [
+                list(map(str, expected_row))
+                for expected_row in self._get_expected_rows(2000)
+            ],
+            rows[1:]
+        )
+
+    def test_get_year_wise_generator_with_diagnoses_sink(self):
+        """
+        Test if converted file and diagnoses file are written from a single
+        pass.
+        """
+        with mock.patch.object(
+                namcs_converter, "NAMCS_DATA_DIR_PATH", self.output_dir
+        ):
+            # Call to func :func:`get_year_wise_generator`
+            year_wise_translated_data = get_year_wise_generator(
+                2001, do_export=True,
+                sinks=[DiagnosesSink(export_dir=self.output_dir)]
+            )
+
+        # Assert both files are written
+        self.assertEqual(
+            [
+                "2001_NAMCS_CONVERTED.csv",
+                "2001_NAMCS_CONVERTED.csv.fingerprint",
+                "2001_NAMCS_DIAGNOSES.csv"
+            ],
+            sorted(os.listdir(self.output_dir))
+        )
+        self.assertEqual(
+            os.path.join(
+                os.path.realpath(self.output_dir), "2001_NAMCS_DIAGNOSES.csv"
+            ),
+            year_wise_translated_data[2001]["sinks"]["diagnoses"]
+        )
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_export_diagnoses_parquet(self):
+        """
+        Test if diagnoses are exported as typed parquet file.
+        """
+        # Call to func :func:`export_diagnoses`
+        file_name = export_diagnoses(
+            2000, get_generator_by_year(2000), export_format="parquet",
+            export_dir=self.output_dir
+        )
+
+        # Assert rows
+        table = pyarrow.parquet.read_table(file_name)
+        self.assertEqual(list(DIAGNOSES_CSV_FIELDS), table.column_names)
+        self.assertEqual(
+            self._get_expected_rows(2000),
+            [
+                tuple(row[field] for field in DIAGNOSES_CSV_FIELDS)
+                for row in table.to_pylist()
+            ]
+        )
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_export_diagnoses_arrow_in_many_batches(self):
+        """
+        Test if diagnoses written in many record batches are exported as
+        Arrow IPC file.
+        """
+        # Call to func :func:`fan_out`, with batches of 2 records
+        file_name, = fan_out(
+            2000, get_generator_by_year(2000),
+            [
+                DiagnosesSink(
+                    export_format="arrow", export_dir=self.output_dir
+                )
+            ],
+            batch_size=2
+        )
+
+        # Assert rows of every record batch
+        reader = pyarrow.ipc.open_file(file_name)
+        self.assertEqual(3, reader.num_record_batches)
+        table = reader.read_all()
+        self.assertEqual(list(DIAGNOSES_CSV_FIELDS), table.column_names)
+        self.assertEqual(
+            self._get_expected_rows(2000),
+            [
+                tuple(row[field] for field in DIAGNOSES_CSV_FIELDS)
+                for row in table.to_pylist()
+            ]
+        )
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_failed_export_diagnoses_keeps_existing_file(self):
+        """
+        Test if previously exported diagnoses file is kept when export fails.
+        """
+        # Setup
+        file_name = export_diagnoses(
+            2000, get_generator_by_year(2000), export_format="parquet",
+            export_dir=self.output_dir
+        )
+
+        def broken_generator():
+            yield from get_generator_by_year(2000)
+            raise IOError("broken record stream")
+
+        # Call to func :func:`export_diagnoses`
+        with self.assertRaisesRegex(IOError, "broken record stream"):
+            export_diagnoses(
+                2000, broken_generator(), export_format="parquet",
+                export_dir=self.output_dir
+            )
+
+        # Assert previous file is kept and no temporary file is left
+        self.assertEqual(
+            [os.path.basename(file_name)], os.listdir(self.output_dir)
+        )
+        self.assertEqual(
+            len(self._get_expected_rows(2000)),
+            pyarrow.parquet.read_table(file_name).num_rows
+        )
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_encoding`.
+"""
+# Python modules
+from unittest import skipUnless, TestCase
+import os
+import shutil
+import tempfile
+
+# Third party modules
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Other modules
+from hdx_ahcd.controllers.namcs_columnar import export_to_columnar
+from hdx_ahcd.controllers import namcs_encoding
+from hdx_ahcd.controllers.namcs_converter import get_generator_by_year
+from hdx_ahcd.controllers.namcs_encoding import (
+    DiagnosisDictionary,
+    encode_diagnoses,
+    get_diagnosis_dictionary,
+)
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSEncodingTest(TestCase):
+    """
+    TestCase class for dictionary encoding of physician diagnoses.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+        self.dictionary_file = os.path.join(
+            self.output_dir, "diagnosis_dictionary.txt"
+        )
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = self.data_dir
+
+    def test_diagnosis_dictionary(self):
+        """
+        Test if ids are stable across dictionaries of same file.
+        """
+        # Setup
+        diagnosis_dictionary = DiagnosisDictionary(self.dictionary_file)
+
+        # Call to func :func:`encode_list` and :func:`save`
+        self.assertEqual(
+            [0, 1, 0], diagnosis_dictionary.encode_list(
+                ["V70.0", "401.9", "V70.0"]
+            )
+        )
+        diagnosis_dictionary.save()
+
+        # Assert ids of loaded dictionary, new codes are appended
+        loaded_dictionary = DiagnosisDictionary(self.dictionary_file)
+        self.assertEqual(
+            ["V70.0", "401.9"], loaded_dictionary.decode_list([0, 1])
+        )
+        self.assertEqual(2, loaded_dictionary.encode("250.00"))
+        loaded_dictionary.save()
+        with open(self.dictionary_file) as file_handle:
+            self.assertEqual("V70.0\n401.9\n250.00\n", file_handle.read())
+
+        # Assert codes added by another dictionary are loaded before new
+        # codes are assigned ids
+        self.assertEqual(3, diagnosis_dictionary.encode("786.50"))
+        self.assertEqual(2, diagnosis_dictionary.encode("250.00"))
+        diagnosis_dictionary.save()
+        self.assertEqual(
+            [3, 2], loaded_dictionary.encode_list(["786.50", "250.00"])
+        )
+        with open(self.dictionary_file) as file_handle:
+            self.assertEqual(
+                "V70.0\n401.9\n250.00\n786.50\n", file_handle.read()
+            )
+
+    def test_get_diagnosis_dictionary(self):
+        """
+        Test if dictionary is shared by path, and loaded again once its file
+        is removed.
+        """
+        # Call to func :func:`get_diagnosis_dictionary`
+        diagnosis_dictionary = get_diagnosis_dictionary(self.dictionary_file)
+        diagnosis_dictionary.encode("V70.0")
+
+        # Assert same dictionary for same path
+        self.assertIs(
+            diagnosis_dictionary,
+            get_diagnosis_dictionary(
+                os.path.join(
+                    self.output_dir, ".", "diagnosis_dictionary.txt"
+                )
+            )
+        )
+
+        # Assert new dictionary once file is removed
+        os.remove(self.dictionary_file)
+        loaded_dictionary = get_diagnosis_dictionary(self.dictionary_file)
+        self.assertIsNot(diagnosis_dictionary, loaded_dictionary)
+        self.assertEqual(0, len(loaded_dictionary))
+
+    def test_encode_diagnoses(self):
+        """
+        Test if diagnoses of records are encoded as ids with offsets.
+        """
+        # Setup
+        records = list(get_generator_by_year(2000))
+        diagnosis_dictionary = DiagnosisDictionary(self.dictionary_file)
+
+        # Call to func :func:`encode_diagnoses`
+        offsets, ids = encode_diagnoses(records, diagnosis_dictionary)
+
+        # Assert ids of every record
+        self.assertEqual(len(records) + 1, len(offsets))
+        self.assertEqual(
+            [record["physician_diagnoses"] for record in records],
+            [
+                diagnosis_dictionary.decode_list(
+                    ids[offsets[record_no]:offsets[record_no + 1]]
+                )
+                for record_no in range(len(records))
+            ]
+        )
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_export_to_columnar_with_encode_diagnoses(self):
+        """
+        Test if columnar export stores diagnoses as ids of saved dictionary.
+        """
+        # Setup
+        records = list(get_generator_by_year(2000))
+        namcs_encoding.NAMCS_DATA_DIR_PATH, data_dir_path = \
+            self.output_dir, namcs_encoding.NAMCS_DATA_DIR_PATH
+        self.addCleanup(
+            setattr, namcs_encoding, "NAMCS_DATA_DIR_PATH", data_dir_path
+        )
+
+        # Call to func :func:`export_to_columnar`
+        file_name = export_to_columnar(
+            2000, iter(records), export_dir=self.output_dir,
+            encode_diagnoses=True
+        )
+
+        # Assert ids decode to diagnoses
+        table = pyarrow.parquet.read_table(file_name)
+        self.assertEqual(
+            pyarrow.list_(pyarrow.int32()),
+            table.schema.field("physician_diagnoses").type
+        )
+        diagnosis_dictionary = DiagnosisDictionary(self.dictionary_file)
+        self.assertEqual(
+            [record["physician_diagnoses"] for record in records],
+            [
+                diagnosis_dictionary.decode_list(ids)
+                for ids in table.column("physician_diagnoses").to_pylist()
+            ]
+        )
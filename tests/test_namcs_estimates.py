@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_estimates`.
+"""
+# Python modules
+from unittest import mock, skipUnless, TestCase
+import os
+import shutil
+import tempfile
+
+# Third party modules
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+# Other modules
+from hdx_ahcd.controllers import (
+    namcs_cache,
+    namcs_columnar,
+    namcs_estimates,
+)
+from hdx_ahcd.controllers.namcs_converter import get_generator_by_year
+from hdx_ahcd.controllers.namcs_estimates import (
+    estimate,
+    EstimateSink,
+    get_age_bucket,
+    get_diagnosis_category,
+)
+from hdx_ahcd.controllers.namcs_sinks import (
+    fan_out,
+    StatsSink,
+)
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSEstimatesTest(TestCase):
+    """
+    TestCase class for national estimates.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = \
+            os.path.join(os.path.dirname(__file__), "data")
+
+    def test_get_age_bucket(self):
+        """
+        Test if age in days is mapped to age group.
+        """
+        self.assertEqual("Under 15", get_age_bucket(2190.0))
+        self.assertEqual("25-44", get_age_bucket(13140.0))
+        self.assertEqual("45-64", get_age_bucket(45 * 365.0))
+        self.assertEqual("75 and over", get_age_bucket(30000.0))
+        self.assertIsNone(get_age_bucket(None))
+
+    def test_get_diagnosis_category(self):
+        """
+        Test if ICD-9 code is mapped to 3 digit category.
+        """
+        self.assertEqual("401", get_diagnosis_category("401.9"))
+        self.assertEqual("V70", get_diagnosis_category("V70.00"))
+        self.assertEqual("AHCD.LBBS", get_diagnosis_category("AHCD.LBBS"))
+
+    def test_estimate(self):
+        """
+        Test if patient visit weights are summed by groups.
+        """
+        # Case 1: Total of all the years
+        self.assertEqual(
+            {(): 524550.0}, estimate((2000, 2001), measure="visits")
+        )
+        self.assertEqual({(): 10}, estimate((2000, 2001), measure="records"))
+
+        # Case 2: Visit is counted once per distinct diagnosis category,
+        # 787.91 and 787.60 are diagnoses of the same visit
+        estimates = estimate(2001, group_by=("sex", "age_bucket", "dx3"))
+        self.assertEqual(18120.0, estimates[("Female", "75 and over", "787")])
+        self.assertEqual(18120.0, estimates[("Male", "65-74", "V45")])
+        self.assertEqual(8, len(estimates))
+
+        # Case 3: Estimates per year
+        self.assertEqual(
+            {(2000, "Male"): 4, (2000, "Female"): 1,
+             (2001, "Male"): 3, (2001, "Female"): 2},
+            estimate(
+                (2000, 2001), group_by=("year_of_visit", "sex"),
+                measure="records"
+            )
+        )
+
+    def test_estimate_with_invalid_options(self):
+        """
+        Test if unknown dimension or measure raises error.
+        """
+        with self.assertRaises(ValueError):
+            estimate(2000, group_by=("physician_diagnoses",))
+        with self.assertRaises(ValueError):
+            estimate(2000, measure="patients")
+
+    def test_estimate_sink(self):
+        """
+        Test if estimates are computed along with other sinks in a single
+        pass.
+        """
+        # Call to func :func:`fan_out`
+        estimates, stats = fan_out(
+            2000, get_generator_by_year(2000),
+            [EstimateSink(group_by="sex"), StatsSink()]
+        )
+
+        # Assert estimates
+        self.assertEqual({("Male",): 347160.0, ("Female",): 86790.0},
+                         estimates)
+        self.assertEqual(
+            stats["weighted_visits"], sum(estimates.values())
+        )
+
+    def test_estimate_with_use_cache_without_pyarrow(self):
+        """
+        Test if records are streamed when `pyarrow` is not installed.
+        """
+        with mock.patch.object(namcs_columnar, "pyarrow", None):
+            self.assertEqual(
+                estimate(2001, group_by="dx"),
+                estimate(2001, group_by="dx", use_cache=True,
+                         cache_dir=self.cache_dir)
+            )
+        self.assertEqual([], os.listdir(self.cache_dir))
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_estimate_with_use_cache(self):
+        """
+        Test if cached years are aggregated column wise, with same
+        estimates as streamed years.
+        """
+        for group_by in ((), ("month_of_visit", "age_bucket"),
+                         ("sex", "dx3"), ("dx",)):
+            for measure in ("visits", "records"):
+                expected_estimates = estimate(
+                    (2000, 2001), group_by=group_by, measure=measure
+                )
+
+                # Case 1: Cache is written while records are streamed
+                self.assertEqual(
+                    expected_estimates,
+                    estimate(
+                        (2000, 2001), group_by=group_by, measure=measure,
+                        use_cache=True, cache_dir=self.cache_dir
+                    )
+                )
+
+                # Case 2: Cache is aggregated column wise, without
+                # translation
+                with mock.patch.object(
+                        namcs_cache, "get_generator_by_year",
+                        side_effect=AssertionError("translated again")
+                ), mock.patch.object(
+                    namcs_estimates, "get_table_estimates",
+                    wraps=namcs_estimates.get_table_estimates
+                ) as mocked_get_table_estimates:
+                    self.assertEqual(
+                        expected_estimates,
+                        estimate(
+                            (2000, 2001), group_by=group_by,
+                            measure=measure, use_cache=True,
+                            cache_dir=self.cache_dir
+                        )
+                    )
+                self.assertEqual(2, mocked_get_table_estimates.call_count)
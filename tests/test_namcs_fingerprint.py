@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_fingerprint`.
+"""
+# Python modules
+from unittest import mock, TestCase
+import os
+import shutil
+import tempfile
+
+# Third party modules
+# -N/A
+
+# Other modules
+from hdx_ahcd.controllers.namcs_converter import (
+    export_year_if_outdated,
+    get_generator_by_year,
+)
+from hdx_ahcd.controllers.namcs_fingerprint import (
+    get_fingerprint_file_path,
+    get_source_file_hash,
+    read_fingerprint,
+)
+from hdx_ahcd.controllers.namcs_parallel import export_years_in_parallel
+from hdx_ahcd.controllers.namcs_sinks import CsvSink
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSFingerprintTest(TestCase):
+    """
+    TestCase class for incremental export.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = self.data_dir
+
+        # Copy of dataset file which tests are free to modify
+        self.dataset_file = os.path.join(self.output_dir, "2000_NAMCS")
+        shutil.copyfile(
+            os.path.join(self.data_dir, "2000_NAMCS"), self.dataset_file
+        )
+
+    def _export(self, force_export=False):
+        """
+        Method to export year 2000 from copy of dataset file.
+        """
+        return export_year_if_outdated(
+            2000, get_generator_by_year(2000, self.dataset_file),
+            self.dataset_file, export_dir=self.output_dir,
+            force_export=force_export
+        )
+
+    def test_export_year_if_outdated(self):
+        """
+        Test if year is exported again only when dataset file changes or
+        export is forced.
+        """
+        # Case 1: First export
+        export_result = self._export()
+        self.assertFalse(export_result["up_to_date"])
+        self.assertEqual(
+            2000, read_fingerprint(export_result["file_name"])["year"]
+        )
+
+        # Case 2: Nothing changed
+        self.assertTrue(self._export()["up_to_date"])
+
+        # Case 3: Dataset file touched, content unchanged
+        os.utime(self.dataset_file, (0, 0))
+        self.assertTrue(self._export()["up_to_date"])
+
+        # Case 4: Export forced
+        self.assertFalse(self._export(force_export=True)["up_to_date"])
+
+        # Case 5: Dataset file changed, first record dropped
+        with open(self.dataset_file, "rb") as file_handle:
+            records = file_handle.read().splitlines(True)
+        with open(self.dataset_file, "wb") as file_handle:
+            file_handle.writelines(records[1:])
+        export_result = self._export()
+        self.assertFalse(export_result["up_to_date"])
+        with open(export_result["file_name"]) as file_handle:
+            self.assertEqual(5, len(file_handle.read().splitlines()))
+
+    def test_failed_export_is_not_fingerprinted(self):
+        """
+        Test if year is exported again by next run when export failed.
+        """
+        # Setup
+        export_file = self._export()["file_name"]
+
+        with mock.patch.object(
+                CsvSink, "write", side_effect=RuntimeError("disk full")
+        ):
+            # Assert :class:`RuntimeError`
+            with self.assertRaises(RuntimeError):
+                self._export(force_export=True)
+
+        # Assert stale fingerprint is removed
+        self.assertFalse(
+            os.path.exists(get_fingerprint_file_path(export_file))
+        )
+        self.assertFalse(self._export()["up_to_date"])
+
+    def test_get_source_file_hash(self):
+        """
+        Test if recorded hash is reused when size and modification time of
+        dataset file are unchanged.
+        """
+        # Setup
+        source_file = get_source_file_hash(self.dataset_file)
+        previous_fingerprint = {
+            "source_file": dict(source_file, sha256="recorded")
+        }
+
+        # Assert recorded hash is reused
+        self.assertEqual(
+            "recorded",
+            get_source_file_hash(
+                self.dataset_file, previous_fingerprint
+            )["sha256"]
+        )
+
+        # Assert hash is computed when modification time differs
+        os.utime(self.dataset_file, (0, 0))
+        self.assertEqual(
+            source_file["sha256"],
+            get_source_file_hash(
+                self.dataset_file, previous_fingerprint
+            )["sha256"]
+        )
+
+    def test_export_years_in_parallel(self):
+        """
+        Test if up to date years are not dispatched to worker processes.
+        """
+        # Case 1: First export
+        year_wise_export_result = export_years_in_parallel(
+            (2000, 2001), workers=2, export_dir=self.output_dir
+        )
+        for year in (2000, 2001):
+            self.assertIn("stats", year_wise_export_result[year])
+            self.assertIsNotNone(
+                read_fingerprint(year_wise_export_result[year]["file_name"])
+            )
+
+        # Case 2: Nothing changed
+        year_wise_export_result = export_years_in_parallel(
+            (2000, 2001), workers=2, export_dir=self.output_dir
+        )
+        for year in (2000, 2001):
+            self.assertTrue(year_wise_export_result[year]["up_to_date"])
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_index`.
+"""
+# Python modules
+from unittest import mock, TestCase
+import os
+import shutil
+import tempfile
+
+# Third party modules
+# -N/A
+
+# Other modules
+from hdx_ahcd.controllers import namcs_index
+from hdx_ahcd.controllers.namcs_converter import (
+    get_generator_by_year,
+    get_year_wise_generator,
+)
+from hdx_ahcd.controllers.namcs_index import (
+    DiagnosisIndex,
+    DiagnosisIndexSink,
+    get_diagnosis_index,
+    get_diagnosis_index_path,
+    get_records_by_diagnosis,
+    get_records_by_rows,
+)
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSIndexTest(TestCase):
+    """
+    TestCase class for inverted index of physician diagnoses.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.index_dir)
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = \
+            os.path.join(os.path.dirname(__file__), "data")
+
+    def test_diagnosis_index(self):
+        """
+        Test if record numbers are looked up by code and prefix, and index
+        is read back from file.
+        """
+        # Setup
+        diagnosis_index = DiagnosisIndex.from_code_rows({
+            "250.00": [2, 7], "250.01": [3, 7], "401.9": [1], "V70.0": [5],
+        })
+        index_file = os.path.join(self.index_dir, "index.idx")
+        diagnosis_index.write(index_file)
+
+        for _diagnosis_index in (diagnosis_index,
+                                 DiagnosisIndex.read(index_file)):
+            # Assert lookups
+            self.assertEqual([2, 7], list(_diagnosis_index.get_rows("250.00")))
+            self.assertEqual([], list(_diagnosis_index.get_rows("250")))
+            self.assertEqual(
+                ["250.00", "250.01"],
+                _diagnosis_index.get_codes_by_prefix("250")
+            )
+            self.assertEqual(
+                [2, 3, 7], _diagnosis_index.get_rows_by_prefix("250")
+            )
+            self.assertEqual([], _diagnosis_index.get_rows_by_prefix("V8"))
+        self.assertEqual(["index.idx"], os.listdir(self.index_dir))
+
+    def test_get_diagnosis_index(self):
+        """
+        Test if index is written on first call and read afterwards.
+        """
+        # Case 1: Index is built and written with fingerprint
+        diagnosis_index = get_diagnosis_index(2001, index_dir=self.index_dir)
+        self.assertEqual(
+            [
+                "2001_NAMCS_DIAGNOSIS_INDEX.idx",
+                "2001_NAMCS_DIAGNOSIS_INDEX.idx.fingerprint",
+            ],
+            sorted(os.listdir(self.index_dir))
+        )
+        records = list(get_generator_by_year(2001))
+        for code in diagnosis_index.codes:
+            self.assertEqual(
+                [
+                    record["source_file_row"] for record in records
+                    if code in record["physician_diagnoses"]
+                ],
+                list(diagnosis_index.get_rows(code))
+            )
+
+        # Case 2: Index is read from file, without translation
+        with mock.patch.object(
+                namcs_index, "get_generator_by_year",
+                side_effect=AssertionError("translated again")
+        ):
+            self.assertEqual(
+                diagnosis_index.codes,
+                get_diagnosis_index(2001, index_dir=self.index_dir).codes
+            )
+
+    def test_get_records_by_rows(self):
+        """
+        Test if only records of rows are translated.
+        """
+        records = list(get_generator_by_year(2000))
+        self.assertEqual(
+            [records[1], records[4]], list(get_records_by_rows(2000, [2, 5]))
+        )
+
+    def test_get_records_by_diagnosis(self):
+        """
+        Test if records having diagnosis or prefix of diagnosis are returned
+        across years.
+        """
+        # Setup
+        records = list(get_generator_by_year(2000)) + \
+            list(get_generator_by_year(2001))
+
+        # Case 1: By code
+        self.assertEqual(
+            [
+                record for record in records
+                if "V70.00" in record["physician_diagnoses"]
+            ],
+            list(get_records_by_diagnosis(
+                (2000, 2001), diagnosis="V70.00", index_dir=self.index_dir
+            ))
+        )
+
+        # Case 2: By prefix, visit having two codes of prefix is returned once
+        expected_records = [
+            record for record in records
+            if any(code.startswith("78")
+                   for code in record["physician_diagnoses"])
+        ]
+        self.assertTrue(expected_records)
+        self.assertEqual(
+            expected_records,
+            list(get_records_by_diagnosis(
+                (2000, 2001), prefix="78", index_dir=self.index_dir
+            ))
+        )
+
+        # Case 3: By range of categories
+        self.assertEqual(
+            expected_records,
+            list(get_records_by_diagnosis(
+                (2000, 2001), pattern="780-789", index_dir=self.index_dir
+            ))
+        )
+
+        # Case 4: One of diagnosis, prefix or pattern is required
+        with self.assertRaises(ValueError):
+            list(get_records_by_diagnosis(2000))
+        with self.assertRaises(ValueError):
+            list(get_records_by_diagnosis(2000, prefix="78", pattern="78"))
+
+    def test_diagnosis_index_sink(self):
+        """
+        Test if index is written along with conversion.
+        """
+        # Call to func :func:`get_year_wise_generator`
+        year_wise_translated_data = get_year_wise_generator(
+            2000, sinks=[DiagnosisIndexSink(index_dir=self.index_dir)]
+        )
+
+        # Assert index file
+        index_file = get_diagnosis_index_path(2000, self.index_dir)
+        self.assertEqual(
+            index_file,
+            year_wise_translated_data[2000]["sinks"]["diagnosis_index"]
+        )
+        self.assertEqual(
+            [1, 4, 5],
+            list(DiagnosisIndex.read(index_file).get_rows("V70.00"))
+        )
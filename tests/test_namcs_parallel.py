@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_parallel`.
+"""
+# Python modules
+from unittest import mock, TestCase
+import inspect
+import os
+import shutil
+import tempfile
+
+# Third party modules
+# -N/A
+
+# Other modules
+from hdx_ahcd.controllers import namcs_converter
+from hdx_ahcd.controllers.namcs_converter import (
+    export_to_csv,
+    get_generator_by_year,
+    get_year_wise_generator,
+)
+from hdx_ahcd.controllers.namcs_parallel import (
+    convert_and_export_year,
+    export_year_in_shards,
+    export_years_in_parallel,
+    get_sharded_generator_by_year,
+)
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSParallelTest(TestCase):
+    """
+    TestCase class for parallel NAMCS export.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = self.data_dir
+
+    def _read(self, file_name):
+        with open(file_name, newline="") as file_handle:
+            return file_handle.read()
+
+    def test_convert_and_export_year(self):
+        """
+        Test if `convert_and_export_year` exports data and reports stats.
+        """
+        # Call to func :func:`convert_and_export_year`
+        result = convert_and_export_year(
+            2000, os.path.join(self.data_dir, "2000_NAMCS"), self.output_dir
+        )
+
+        # Assert return value
+        self.assertEqual(
+            os.path.join(self.output_dir, "2000_NAMCS_CONVERTED.csv"),
+            result["file_name"]
+        )
+        self.assertEqual(5, result["stats"]["records"])
+        self.assertEqual(os.getpid(), result["stats"]["pid"])
+
+    def test_convert_and_export_year_with_failure(self):
+        """
+        Test if failure of export is raised to caller instead of reporting
+        exported file.
+        """
+        # Setup
+        def broken_generator(year, namcs_raw_dataset_file):
+            yield from get_generator_by_year(year, namcs_raw_dataset_file)
+            raise IOError("broken record stream")
+
+        with mock.patch(
+                "hdx_ahcd.controllers.namcs_parallel.get_generator_by_year",
+                side_effect=broken_generator
+        ):
+            # Call to func :func:`convert_and_export_year`
+            with self.assertRaisesRegex(IOError, "broken record stream"):
+                convert_and_export_year(
+                    2000, os.path.join(self.data_dir, "2000_NAMCS"),
+                    self.output_dir
+                )
+
+        # Assert no csv file is written
+        self.assertEqual([], os.listdir(self.output_dir))
+
+    def test_export_years_in_parallel(self):
+        """
+        Test if `export_years_in_parallel` exports same data as sequential
+        export and isolates failure of a single year.
+        """
+        # Call to func :func:`export_years_in_parallel`
+        year_wise_export_result = export_years_in_parallel(
+            (2000, 2001, 2002), workers=2, export_dir=self.output_dir
+        )
+
+        for year in (2000, 2001):
+            expected_file_name = export_to_csv(
+                year,
+                get_generator_by_year(year),
+                export_dir=tempfile.mkdtemp(dir=self.output_dir)
+            )
+            # Assert output matches sequential export
+            self.assertEqual(
+                self._read(expected_file_name),
+                self._read(year_wise_export_result[year]["file_name"])
+            )
+            self.assertEqual(
+                5, year_wise_export_result[year]["stats"]["records"]
+            )
+
+        # Assert failed year reports error
+        self.assertIn("error", year_wise_export_result[2002])
+
+    def test_get_year_wise_generator_with_workers(self):
+        """
+        Test if `get_year_wise_generator` exports years in worker processes
+        when `workers` is specified.
+        """
+        with mock.patch.object(
+                namcs_converter, "NAMCS_DATA_DIR_PATH", self.output_dir
+        ):
+            # Call to func :func:`get_year_wise_generator`
+            year_wise_translated_data = get_year_wise_generator(
+                (2000, 2001), do_export=True, workers=2
+            )
+
+        for year in (2000, 2001):
+            # Assert export result and an unconsumed generator
+            self.assertEqual(
+                os.path.join(
+                    self.output_dir, "{}_NAMCS_CONVERTED.csv".format(year)
+                ),
+                year_wise_translated_data.get(year).get("file_name")
+            )
+            self.assertIn("stats", year_wise_translated_data.get(year))
+            generator_obj = year_wise_translated_data.get(year).get(
+                "generator"
+            )
+            self.assertTrue(inspect.isgenerator(generator_obj))
+            self.assertEqual(5, len(list(generator_obj)))
+
+    def test_get_sharded_generator_by_year(self):
+        """
+        Test if records translated in shards are yielded in
+        `source_file_row` order.
+        """
+        # Call to func :func:`get_sharded_generator_by_year`
+        rows = list(
+            get_sharded_generator_by_year(2001, workers=2, shard_size=2)
+        )
+
+        # Assert same records as sequential translation
+        self.assertEqual(list(get_generator_by_year(2001)), rows)
+        self.assertEqual(
+            [1, 2, 3, 4, 5], [row["source_file_row"] for row in rows]
+        )
+
+    def test_export_year_in_shards(self):
+        """
+        Test if year exported in shards matches sequential export.
+        """
+        # Setup
+        expected_file_name = export_to_csv(
+            2000,
+            get_generator_by_year(2000),
+            export_dir=tempfile.mkdtemp(dir=self.output_dir)
+        )
+
+        # Case 1: Shards merged into single file
+        # Call to func :func:`export_year_in_shards`
+        year_export_result = export_year_in_shards(
+            2000, workers=2, shard_count=3, export_dir=self.output_dir
+        )
+
+        # Assert merged output matches sequential export
+        self.assertEqual(
+            self._read(expected_file_name),
+            self._read(year_export_result["file_name"])
+        )
+        self.assertEqual(5, year_export_result["stats"]["records"])
+        self.assertEqual(3, year_export_result["stats"]["shards"])
+        self.assertEqual(
+            ["2000_NAMCS_CONVERTED.csv"], sorted(
+                file_name for file_name in os.listdir(self.output_dir)
+                if file_name.endswith(".csv")
+            )
+        )
+
+        # Case 2: Ordered shard files
+        # Call to func :func:`export_year_in_shards`
+        year_export_result = export_year_in_shards(
+            2000, workers=2, shard_count=2, export_dir=self.output_dir,
+            merge=False
+        )
+
+        # Assert each shard file has header and shard records in order
+        shard_rows = [
+            self._read(file_name).splitlines()
+            for file_name in year_export_result["file_names"]
+        ]
+        expected_rows = self._read(expected_file_name).splitlines()
+        self.assertEqual([4, 3], [len(rows) for rows in shard_rows])
+        self.assertEqual(
+            expected_rows,
+            shard_rows[0] + shard_rows[1][1:]
+        )
+
+    def test_export_years_in_parallel_for_single_year(self):
+        """
+        Test if single year is exported in shards.
+        """
+        # Call to func :func:`export_years_in_parallel`
+        year_wise_export_result = export_years_in_parallel(
+            2000, workers=2, export_dir=self.output_dir
+        )
+
+        # Assert year is split into shards
+        self.assertEqual(
+            2, year_wise_export_result[2000]["stats"]["shards"]
+        )
+        self.assertEqual(
+            5, year_wise_export_result[2000]["stats"]["records"]
+        )
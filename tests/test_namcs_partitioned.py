@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_partitioned`.
+"""
+# Python modules
+from unittest import mock, skipUnless, TestCase
+import csv
+import os
+import shutil
+import tempfile
+
+# Third party modules
+try:
+    import pyarrow
+    import pyarrow.dataset
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Other modules
+from hdx_ahcd.controllers import namcs_converter
+from hdx_ahcd.controllers.namcs_converter import (
+    export_to_csv,
+    get_generator_by_year,
+    get_year_wise_generator,
+)
+from hdx_ahcd.controllers.namcs_partitioned import (
+    export_to_partitioned,
+    PartitionedSink,
+    read_partition_metadata,
+)
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSPartitionedTest(TestCase):
+    """
+    TestCase class for partitioned export.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = self.data_dir
+
+    @staticmethod
+    def _get_records():
+        """
+        Method to get translated records of year 2000 spread over months
+        1, 2 and without month.
+        """
+        records = list(get_generator_by_year(2000))
+        for record, month in zip(records, (1, 1, 1, 2, None)):
+            record["month_of_visit"] = month
+        return records
+
+    @staticmethod
+    def _read_rows(file_name):
+        """
+        Method to read rows of csv file, header excluded.
+        """
+        with open(file_name, newline="") as file_handle:
+            return list(csv.reader(file_handle))[1:]
+
+    def test_export_to_partitioned(self):
+        """
+        Test if records are written into month partitions of bounded size.
+        """
+        # Setup
+        records = self._get_records()
+        expected_rows = self._read_rows(
+            export_to_csv(
+                2000, iter(records),
+                export_dir=tempfile.mkdtemp(dir=self.output_dir)
+            )
+        )
+
+        # Call to func :func:`export_to_partitioned`
+        year_dir = export_to_partitioned(
+            2000, iter(records), export_dir=self.output_dir,
+            max_rows_per_file=2
+        )
+
+        # Assert layout
+        self.assertEqual(
+            os.path.join(self.output_dir, "NAMCS_CONVERTED", "year=2000"),
+            year_dir
+        )
+        self.assertEqual(
+            ["_metadata.json", "month=01", "month=02",
+             "month=__HIVE_DEFAULT_PARTITION__"],
+            sorted(os.listdir(year_dir))
+        )
+        self.assertEqual(
+            ["part-0000.csv", "part-0001.csv"],
+            sorted(os.listdir(os.path.join(year_dir, "month=01")))
+        )
+
+        # Assert metadata
+        metadata = read_partition_metadata(year_dir)
+        self.assertEqual(5, metadata["rows"])
+        self.assertEqual(
+            {
+                "month=01": 3, "month=02": 1,
+                "month=__HIVE_DEFAULT_PARTITION__": 1
+            },
+            {
+                partition: partition_metadata["rows"]
+                for partition, partition_metadata in
+                metadata["partitions"].items()
+            }
+        )
+        self.assertEqual(
+            [2, 1],
+            [
+                _file["rows"] for _file in
+                metadata["partitions"]["month=01"]["files"]
+            ]
+        )
+
+        # Assert rows are same as csv export
+        exported_rows = []
+        for partition in sorted(metadata["partitions"]):
+            for _file in metadata["partitions"][partition]["files"]:
+                exported_rows.extend(
+                    self._read_rows(
+                        os.path.join(year_dir, partition, _file["file_name"])
+                    )
+                )
+        self.assertEqual(expected_rows, exported_rows)
+
+    def test_export_to_partitioned_replaces_year(self):
+        """
+        Test if partitions of previous export are replaced, and kept when
+        export fails.
+        """
+        # Setup
+        year_dir = export_to_partitioned(
+            2000, iter(self._get_records()), export_dir=self.output_dir,
+            max_rows_per_file=1
+        )
+
+        # Case 1: Failed export
+        with mock.patch.object(
+                PartitionedSink, "write", side_effect=RuntimeError
+        ):
+            # Assert :class:`RuntimeError`
+            with self.assertRaises(RuntimeError):
+                export_to_partitioned(
+                    2000, get_generator_by_year(2000),
+                    export_dir=self.output_dir
+                )
+        self.assertEqual(
+            ["year=2000"],
+            os.listdir(os.path.dirname(year_dir))
+        )
+        self.assertEqual(
+            3, len(os.listdir(os.path.join(year_dir, "month=01")))
+        )
+
+        # Case 2: Successful export
+        export_to_partitioned(
+            2000, get_generator_by_year(2000), export_dir=self.output_dir
+        )
+        self.assertEqual(
+            ["_metadata.json", "month=09"], sorted(os.listdir(year_dir))
+        )
+
+    def test_get_year_wise_generator_partitioned(self):
+        """
+        Test if `get_year_wise_generator` exports partitioned layout, skipping
+        years whose partitions are up to date.
+        """
+        with mock.patch.object(
+                namcs_converter, "NAMCS_DATA_DIR_PATH", self.output_dir
+        ):
+            for workers, up_to_date in ((None, False), (None, True),
+                                        (2, True)):
+                # Call to func :func:`get_year_wise_generator`
+                year_wise_translated_data = get_year_wise_generator(
+                    (2000, 2001), do_export=True, workers=workers,
+                    partitioned=True
+                )
+
+                # Assert year directories
+                for year in (2000, 2001):
+                    self.assertEqual(
+                        os.path.join(
+                            self.output_dir, "NAMCS_CONVERTED",
+                            "year={}".format(year)
+                        ),
+                        year_wise_translated_data[year]["file_name"]
+                    )
+                    self.assertEqual(
+                        up_to_date,
+                        year_wise_translated_data[year].get(
+                            "up_to_date", False
+                        )
+                    )
+
+        # Assert fingerprint is kept inside year directory
+        self.assertEqual(
+            ["_fingerprint", "_metadata.json", "month=09"],
+            sorted(
+                os.listdir(
+                    os.path.join(self.output_dir, "NAMCS_CONVERTED",
+                                 "year=2000")
+                )
+            )
+        )
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_export_to_partitioned_parquet(self):
+        """
+        Test if partitioned parquet files are read back as Hive dataset.
+        """
+        # Call to func :func:`export_to_partitioned`
+        export_to_partitioned(
+            2000, iter(self._get_records()), export_format="parquet",
+            export_dir=self.output_dir, max_rows_per_file=2
+        )
+
+        # Assert dataset discovered with partition columns
+        dataset = pyarrow.dataset.dataset(
+            os.path.join(self.output_dir, "NAMCS_CONVERTED"),
+            format="parquet", partitioning="hive"
+        )
+        self.assertEqual(5, dataset.count_rows())
+        self.assertEqual(
+            3,
+            dataset.count_rows(filter=pyarrow.dataset.field("month") == 1)
+        )
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_partitioned_sink_row_groups(self):
+        """
+        Test if records of a partition are buffered into row groups of
+        `row_group_size` records, across writes of the sink.
+        """
+        # Setup
+        sink = PartitionedSink(
+            export_format="parquet", export_dir=self.output_dir,
+            row_group_size=2
+        )
+
+        # Call to func :func:`write`, a record at a time
+        sink.open(2000)
+        for record in self._get_records():
+            sink.write([record])
+        year_dir = sink.close()
+
+        # Assert row groups of every partition
+        for partition, row_groups in (
+                ("month=01", [2, 1]),
+                ("month=02", [1]),
+                ("month=__HIVE_DEFAULT_PARTITION__", [1]),
+        ):
+            metadata = pyarrow.parquet.ParquetFile(
+                os.path.join(year_dir, partition, "part-0000.parquet")
+            ).metadata
+            self.assertEqual(
+                row_groups,
+                [
+                    metadata.row_group(row_group).num_rows
+                    for row_group in range(metadata.num_row_groups)
+                ]
+            )
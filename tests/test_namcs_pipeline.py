@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_pipeline`.
+"""
+# Python modules
+from unittest import mock, TestCase
+import inspect
+import os
+import shutil
+import tempfile
+
+# Third party modules
+# -N/A
+
+# Other modules
+from hdx_ahcd.controllers import namcs_converter
+from hdx_ahcd.controllers.namcs_converter import (
+    export_to_csv,
+    get_generator_by_year,
+)
+from hdx_ahcd.controllers.namcs_pipeline import run_pipeline
+from hdx_ahcd.controllers.namcs_processors import NAMCSProcessor
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSPipelineTest(TestCase):
+    """
+    TestCase class for NAMCS pipeline.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.output_dir = tempfile.mkdtemp()
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = self.data_dir
+
+        # Patch `NAMCS_DATA_DIR_PATH` to temporary directory
+        patcher = mock.patch.object(
+            namcs_converter, "NAMCS_DATA_DIR_PATH", self.output_dir
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+    def _read(self, file_name):
+        with open(file_name) as file_handle:
+            return file_handle.read()
+
+    @mock.patch("hdx_ahcd.controllers.namcs_pipeline."
+                "initiate_namcs_dataset_download")
+    def test_run_pipeline(self, mocked_initiate_namcs_dataset_download):
+        """
+        Test if `run_pipeline` exports same data as sequential export.
+        """
+        # Setup
+        years = (2000, 2001)
+
+        # Call to func :func:`run_pipeline`, small batches to exercise
+        # backpressure between stages
+        year_wise_translated_data, pipeline_stats = \
+            run_pipeline(year=years, batch_size=2)
+
+        # Assert every year was downloaded
+        self.assertEqual(
+            list(years),
+            [
+                call[1]["year"] for call in
+                mocked_initiate_namcs_dataset_download.call_args_list
+            ]
+        )
+
+        for year in years:
+            file_name = year_wise_translated_data.get(year).get("file_name")
+            pipelined_output = self._read(file_name)
+
+            # Assert output matches sequential export
+            expected_output = self._read(
+                export_to_csv(year, get_generator_by_year(year))
+            )
+            self.assertEqual(expected_output, pipelined_output)
+            self.assertTrue(
+                inspect.isgenerator(
+                    year_wise_translated_data.get(year).get("generator")
+                )
+            )
+
+        # Assert stage statistics
+        self.assertEqual(
+            {"download", "convert", "export"},
+            set(pipeline_stats["stages"])
+        )
+        for stage_stats in pipeline_stats["stages"].values():
+            self.assertGreaterEqual(stage_stats["utilization"], 0.0)
+            self.assertLessEqual(stage_stats["utilization"], 1.0)
+
+    def test_run_pipeline_with_file_name(self):
+        """
+        Test if `run_pipeline` skips download when dataset file is provided.
+        """
+        # Setup
+        file_name = os.path.join(self.data_dir, "2000_NAMCS")
+
+        with mock.patch("hdx_ahcd.controllers.namcs_pipeline."
+                        "initiate_namcs_dataset_download") as mocked_download:
+            # Call to func :func:`run_pipeline`
+            year_wise_translated_data, _ = \
+                run_pipeline(year=2000, namcs_raw_dataset_file=file_name)
+
+        # Assert nothing is downloaded
+        self.assertFalse(mocked_download.called)
+
+        # Assert header and 5 rows are exported
+        file_name = year_wise_translated_data.get(2000).get("file_name")
+        self.assertEqual(6, len(self._read(file_name).splitlines()))
+
+    @mock.patch("hdx_ahcd.controllers.namcs_pipeline."
+                "initiate_namcs_dataset_download")
+    def test_run_pipeline_with_missing_year(
+        self, mocked_initiate_namcs_dataset_download
+    ):
+        """
+        Test if `run_pipeline` continues with other years when dataset file
+        for a year is not available.
+        """
+        # Call to func :func:`run_pipeline`
+        year_wise_translated_data, _ = run_pipeline(year=(2002, 2000))
+
+        # Assert only available year is exported
+        self.assertIsNone(year_wise_translated_data.get(2002).get("file_name"))
+        self.assertTrue(
+            os.path.exists(
+                year_wise_translated_data.get(2000).get("file_name")
+            )
+        )
+
+    @mock.patch("hdx_ahcd.controllers.namcs_extractor.download_namcs_zipfile",
+                side_effect=IOError("download failed"))
+    def test_run_pipeline_with_failed_download(
+        self, mocked_download_namcs_zipfile
+    ):
+        """
+        Test if `run_pipeline` continues with later years when download of a
+        year fails.
+        """
+        # Call to func :func:`run_pipeline`, dataset file of 2002 is not
+        # available locally
+        year_wise_translated_data, _ = run_pipeline(year=(2002, 2001))
+
+        # Assert failed year is reported and later year is exported
+        self.assertEqual(
+            [mock.call(2002, download_path=mock.ANY)],
+            mocked_download_namcs_zipfile.call_args_list
+        )
+        self.assertIn(
+            "could not be downloaded",
+            year_wise_translated_data[2002]["error"]
+        )
+        self.assertIsNone(year_wise_translated_data[2002].get("file_name"))
+        self.assertTrue(
+            os.path.exists(year_wise_translated_data[2001]["file_name"])
+        )
+
+    @mock.patch("hdx_ahcd.controllers.namcs_processors.run_pipeline")
+    def test_execute_with_pipeline(self, mocked_run_pipeline):
+        """
+        Test if `execute` uses pipeline when export is requested.
+        """
+        # Setup
+        pipeline_stats = {"elapsed_time": 1.0, "stages": {}}
+        mocked_run_pipeline.return_value = ({2000: {}}, pipeline_stats)
+
+        # Call to func :func:`execute`
+        year_wise_translated_data = NAMCSProcessor().execute(
+            year=2000, do_export=True, pipeline=True
+        )
+
+        # Assert :func:`run_pipeline` call and pipeline statistics
+        mocked_run_pipeline.assert_called_once_with(
+            year=2000, namcs_raw_dataset_file=None, force_download=False,
+            export_format="csv", compression=None, force_export=False,
+            sinks=None, partitioned=False
+        )
+        self.assertIs(
+            pipeline_stats, year_wise_translated_data[2000]["pipeline_stats"]
+        )
+
+        # Assert options not supported with pipeline are rejected
+        for option in ("workers", "use_cache", "use_memory_cache"):
+            with self.assertRaises(ValueError):
+                NAMCSProcessor().execute(
+                    year=2000, do_export=True, pipeline=True,
+                    **{option: 2 if option == "workers" else True}
+                )
+        mocked_run_pipeline.assert_called_once()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_scheduler`.
+"""
+# Python modules
+from unittest import TestCase
+import os
+
+# Third party modules
+# -N/A
+
+# Other modules
+from hdx_ahcd.controllers.namcs_scheduler import (
+    estimate_year_cost,
+    get_makespan,
+    get_schedule,
+    get_shard_counts,
+)
+
+
+class NAMCSSchedulerTest(TestCase):
+    """
+    TestCase class for scheduling of parallel NAMCS export.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.dataset_files = {
+            year: os.path.join(self.data_dir, "{}_NAMCS".format(year))
+            for year in (2000, 2001)
+        }
+
+    def test_estimate_year_cost(self):
+        """
+        Test if year with more fields and longer records costs more.
+        """
+        # Call to func :func:`estimate_year_cost`
+        cost_2000 = estimate_year_cost(2000, self.dataset_files[2000])
+        cost_2001 = estimate_year_cost(2001, self.dataset_files[2001])
+
+        # Assert cost
+        self.assertGreater(cost_2000, 0)
+        self.assertGreater(cost_2001, cost_2000)
+
+    def test_get_makespan(self):
+        """
+        Test makespan of tasks dispatched to first free worker.
+        """
+        # Assert longest job first makespan
+        self.assertEqual(10, get_makespan([7, 5, 4, 3, 1], 2))
+
+        # Assert makespan with single worker is total cost
+        self.assertEqual(20, get_makespan([7, 5, 4, 3, 1], 1))
+
+    def test_get_shard_counts(self):
+        """
+        Test if only years dominating makespan are split in shards.
+        """
+        # Case 1: Single year split over all workers
+        self.assertEqual({2000: 4}, get_shard_counts({2000: 100.0}, 4))
+
+        # Case 2: Similar years are not split
+        self.assertEqual(
+            {2000: 1, 2001: 1},
+            get_shard_counts({2000: 100.0, 2001: 90.0}, 2)
+        )
+
+        # Case 3: Expensive year split, cheap years kept whole
+        self.assertEqual(
+            {2000: 10, 2001: 1, 2002: 1},
+            get_shard_counts({2000: 1000.0, 2001: 10.0, 2002: 10.0}, 10)
+        )
+
+    def test_get_schedule(self):
+        """
+        Test if tasks are ordered longest job first.
+        """
+        # Call to func :func:`get_schedule`
+        with self.assertLogs("hdx_ahcd", level="INFO") as captured_logs:
+            tasks = get_schedule(self.dataset_files, 2)
+
+        # Assert most expensive year dispatched first, years not split
+        self.assertEqual([2001, 2000], [task["year"] for task in tasks])
+        self.assertEqual([None, None], [task["shard"] for task in tasks])
+        self.assertEqual(3, len(captured_logs.output))
+
+        # Call to func :func:`get_schedule` with single year
+        tasks = get_schedule({2000: self.dataset_files[2000]}, 2)
+
+        # Assert year split in record aligned shards
+        self.assertEqual([(0, 3, 0), (3, 2, 1995)],
+                         [task["shard"] for task in tasks])
+        self.assertEqual([2, 2], [task["shards"] for task in tasks])
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_sinks`.
+"""
+# Python modules
+from unittest import mock, skipUnless, TestCase
+import os
+import shutil
+import tempfile
+
+# Third party modules
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Other modules
+from hdx_ahcd.controllers.namcs_columnar import export_to_columnar
+from hdx_ahcd.controllers.namcs_converter import (
+    export_to_csv,
+    get_generator_by_year,
+    get_year_wise_generator,
+)
+from hdx_ahcd.controllers.namcs_sinks import (
+    CallbackSink,
+    ColumnarSink,
+    CsvSink,
+    fan_out,
+    StatsSink,
+)
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSSinksTest(TestCase):
+    """
+    TestCase class for sinks of translated records.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = self.data_dir
+
+    @staticmethod
+    def _read(file_name):
+        """
+        Method to read exported file, line endings preserved.
+        """
+        with open(file_name, newline="") as file_handle:
+            return file_handle.read()
+
+    def test_fan_out(self):
+        """
+        Test if every sink is fed in a single pass over translated records.
+        """
+        # Setup
+        expected_output = self._read(
+            export_to_csv(
+                2000, get_generator_by_year(2000),
+                export_dir=tempfile.mkdtemp(dir=self.output_dir)
+            )
+        )
+        records_read = []
+        callback_batches = []
+
+        def generator_object():
+            for translated_record in get_generator_by_year(2000):
+                records_read.append(translated_record)
+                yield translated_record
+
+        # Call to func :func:`fan_out`, small batches to exercise batching
+        file_name, stats, callback_result = fan_out(
+            2000, generator_object(),
+            [
+                CsvSink(export_dir=self.output_dir),
+                StatsSink(),
+                CallbackSink(
+                    lambda year, batch: callback_batches.append((year, batch))
+                ),
+            ],
+            batch_size=2
+        )
+
+        # Assert records are translated once
+        self.assertEqual(5, len(records_read))
+
+        # Assert csv sink output matches :func:`export_to_csv`
+        self.assertEqual(
+            os.path.join(self.output_dir, "2000_NAMCS_CONVERTED.csv"),
+            file_name
+        )
+        self.assertEqual(expected_output, self._read(file_name))
+
+        # Assert statistics
+        self.assertEqual(5, stats["records"])
+        self.assertEqual(
+            sum(
+                translated_record["patient_visit_weight"]
+                for translated_record in records_read
+            ),
+            stats["weighted_visits"]
+        )
+        self.assertEqual(5, sum(stats["records_by_gender"].values()))
+
+        # Assert callback received every batch
+        self.assertIsNone(callback_result)
+        self.assertEqual([2000, 2000, 2000], [year for year, _ in
+                                              callback_batches])
+        self.assertEqual(
+            records_read,
+            [
+                translated_record for _, batch in callback_batches
+                for translated_record in batch
+            ]
+        )
+
+    def test_fan_out_aborts_sinks(self):
+        """
+        Test if partially written file is discarded when a sink fails.
+        """
+        # Setup
+        failing_sink = CallbackSink(mock.Mock(side_effect=RuntimeError))
+
+        # Assert :class:`RuntimeError`
+        with self.assertRaises(RuntimeError):
+            fan_out(
+                2000, get_generator_by_year(2000),
+                [CsvSink(export_dir=self.output_dir), failing_sink]
+            )
+
+        # Assert no file is left behind
+        self.assertEqual([], os.listdir(self.output_dir))
+
+    def test_fan_out_aborts_sinks_on_failed_close(self):
+        """
+        Test if sinks after a sink failing to close are aborted.
+        """
+        # Setup
+        failing_sink = StatsSink()
+        failing_sink.close = mock.Mock(side_effect=RuntimeError)
+        remaining_sink = CsvSink(export_dir=self.output_dir)
+
+        # Assert :class:`RuntimeError`
+        with self.assertRaises(RuntimeError):
+            fan_out(
+                2000, get_generator_by_year(2000),
+                [failing_sink, remaining_sink]
+            )
+
+        # Assert file of remaining sink is discarded
+        self.assertEqual([], os.listdir(self.output_dir))
+
+    def test_get_year_wise_generator_with_sinks(self):
+        """
+        Test if `get_year_wise_generator` feeds sinks without export.
+        """
+        # Call to func :func:`get_year_wise_generator`
+        year_wise_translated_data = get_year_wise_generator(
+            (2000, 2001), sinks=[StatsSink()]
+        )
+
+        # Assert sink results per year
+        for year in (2000, 2001):
+            self.assertEqual(
+                5,
+                year_wise_translated_data.get(year)["sinks"]["stats"][
+                    "records"
+                ]
+            )
+            self.assertNotIn("file_name", year_wise_translated_data.get(year))
+
+        # Assert :class:`ValueError` with worker processes
+        with self.assertRaises(ValueError):
+            get_year_wise_generator(
+                2000, do_export=True, workers=2, sinks=[StatsSink()]
+            )
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_columnar_sink(self):
+        """
+        Test if columnar sink writes same row groups as
+        :func:`export_to_columnar`.
+        """
+        # Setup
+        expected_table = pyarrow.parquet.ParquetFile(
+            export_to_columnar(
+                2000, get_generator_by_year(2000),
+                export_dir=tempfile.mkdtemp(dir=self.output_dir),
+                row_group_size=2
+            )
+        )
+
+        # Call to func :func:`fan_out`, batches not aligned to row groups
+        file_name, = fan_out(
+            2000, get_generator_by_year(2000),
+            [ColumnarSink(export_dir=self.output_dir, row_group_size=2)],
+            batch_size=3
+        )
+
+        # Assert table and row groups
+        parquet_file = pyarrow.parquet.ParquetFile(file_name)
+        self.assertEqual(
+            expected_table.metadata.num_row_groups,
+            parquet_file.metadata.num_row_groups
+        )
+        self.assertTrue(
+            expected_table.read().equals(parquet_file.read())
+        )
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_aborted_columnar_sink_keeps_existing_file(self):
+        """
+        Test if previously exported columnar file is kept when another sink
+        fails.
+        """
+        # Setup
+        file_name, = fan_out(
+            2000, get_generator_by_year(2000),
+            [ColumnarSink(export_dir=self.output_dir)]
+        )
+        failing_sink = CallbackSink(mock.Mock(side_effect=RuntimeError))
+
+        # Assert :class:`RuntimeError`
+        with self.assertRaises(RuntimeError):
+            fan_out(
+                2000, get_generator_by_year(2000),
+                [ColumnarSink(export_dir=self.output_dir), failing_sink]
+            )
+
+        # Assert previous file is kept and no temporary file is left
+        self.assertEqual(
+            [os.path.basename(file_name)], os.listdir(self.output_dir)
+        )
+        self.assertEqual(5, pyarrow.parquet.read_table(file_name).num_rows)
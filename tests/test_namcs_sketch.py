@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_sketch`.
+"""
+# Python modules
+from unittest import mock, TestCase
+import os
+import shutil
+import tempfile
+
+# Third party modules
+# -N/A
+
+# Other modules
+from hdx_ahcd.controllers import namcs_sketch
+from hdx_ahcd.controllers.namcs_converter import (
+    get_generator_by_year,
+    get_year_wise_generator,
+)
+from hdx_ahcd.controllers.namcs_sketch import (
+    count_distinct,
+    DistinctSketchSink,
+    get_distinct_sketches_path,
+    HyperLogLog,
+    read_distinct_sketches,
+)
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSSketchTest(TestCase):
+    """
+    TestCase class for distinct count sketches.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.sketch_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.sketch_dir)
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = \
+            os.path.join(os.path.dirname(__file__), "data")
+
+    def test_hyper_log_log(self):
+        """
+        Test if counts are within error bound, and merged sketch counts
+        union of values.
+        """
+        # Setup
+        first_sketch = HyperLogLog()
+        second_sketch = HyperLogLog()
+        for number in range(20000):
+            first_sketch.add("code_{}".format(number))
+        for number in range(10000, 40000):
+            second_sketch.add("code_{}".format(number))
+
+        # Assert counts within 4 standard errors of 1.6%
+        self.assertAlmostEqual(20000, first_sketch.count(), delta=1300)
+        self.assertAlmostEqual(30000, second_sketch.count(), delta=1950)
+        first_sketch.merge(second_sketch)
+        self.assertAlmostEqual(40000, first_sketch.count(), delta=2600)
+
+        # Small counts are nearly exact, duplicates are counted once
+        sketch = HyperLogLog()
+        for code in ("401.9", "250.00", "401.9", "V70.0"):
+            sketch.add(code)
+        self.assertEqual(3, sketch.count())
+        self.assertEqual(0, HyperLogLog().count())
+
+        # Invalid precision
+        with self.assertRaises(ValueError):
+            HyperLogLog(precision=20)
+        with self.assertRaises(ValueError):
+            HyperLogLog(precision=10).merge(HyperLogLog(precision=12))
+
+    def test_count_distinct(self):
+        """
+        Test if sketches of years are written once and merged.
+        """
+        # Setup
+        records = list(get_generator_by_year(2000)) + \
+            list(get_generator_by_year(2001))
+        combinations = set(
+            tuple(sorted(set(record["physician_diagnoses"]) - {""}))
+            for record in records
+        )
+
+        # Case 1: All the years
+        self.assertEqual(
+            {(): {"codes": 12, "combinations": len(combinations)}},
+            count_distinct((2000, 2001), sketch_dir=self.sketch_dir)
+        )
+        self.assertEqual(
+            [
+                "2000_NAMCS_DISTINCT_SKETCHES.idx",
+                "2000_NAMCS_DISTINCT_SKETCHES.idx.fingerprint",
+                "2001_NAMCS_DISTINCT_SKETCHES.idx",
+                "2001_NAMCS_DISTINCT_SKETCHES.idx.fingerprint",
+            ],
+            sorted(os.listdir(self.sketch_dir))
+        )
+
+        # Case 2: Sketches are read from file, without translation
+        with mock.patch.object(
+                namcs_sketch, "get_generator_by_year",
+                side_effect=AssertionError("translated again")
+        ):
+            self.assertEqual(
+                {(): {"codes": 3, "combinations": 3}},
+                count_distinct(2000, sketch_dir=self.sketch_dir)
+            )
+
+        # Case 3: By group
+        distinct_counts = count_distinct(
+            (2000, 2001), group_by="sex", sketch_dir=self.sketch_dir
+        )
+        self.assertEqual({("Male",), ("Female",)}, set(distinct_counts))
+        self.assertEqual(
+            len(set(
+                code for record in records if record["sex"] == "Female"
+                for code in record["physician_diagnoses"] if code
+            )),
+            distinct_counts[("Female",)]["codes"]
+        )
+
+        # Unknown dimension
+        with self.assertRaises(ValueError):
+            count_distinct(2000, group_by="physician_diagnoses")
+
+    def test_distinct_sketch_sink(self):
+        """
+        Test if sketches are written along with conversion.
+        """
+        # Call to func :func:`get_year_wise_generator`
+        year_wise_translated_data = get_year_wise_generator(
+            2001, sinks=[
+                DistinctSketchSink(
+                    group_by=("sex", "age_bucket"), sketch_dir=self.sketch_dir
+                )
+            ]
+        )
+
+        # Assert sketches file
+        sketches_file = get_distinct_sketches_path(
+            2001, ("sex", "age_bucket"), self.sketch_dir
+        )
+        self.assertTrue(
+            sketches_file.endswith(
+                "2001_NAMCS_DISTINCT_SKETCHES_SEX_AGE_BUCKET.idx"
+            )
+        )
+        self.assertEqual(
+            sketches_file,
+            year_wise_translated_data[2001]["sinks"]["distinct_sketches"]
+        )
+        sketches = read_distinct_sketches(sketches_file)
+        self.assertEqual(
+            2, sketches[("Female", "75 and over")]["codes"].count()
+        )
+        self.assertEqual(
+            1, sketches[("Female", "75 and over")]["combinations"].count()
+        )
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_sqlite`.
+"""
+# Python modules
+from unittest import mock, TestCase
+import os
+import shutil
+import sqlite3
+import tempfile
+
+# Third party modules
+# -N/A
+
+# Other modules
+from hdx_ahcd.controllers import namcs_sqlite
+from hdx_ahcd.controllers.namcs_converter import get_generator_by_year
+from hdx_ahcd.controllers.namcs_sqlite import (
+    export_to_sqlite,
+    load_years_to_sqlite,
+    SqliteSink,
+)
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSSqliteTest(TestCase):
+    """
+    TestCase class for SQLite bulk load.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+        self.database_file = os.path.join(self.output_dir, "namcs.sqlite3")
+
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = self.data_dir
+
+    def _query(self, statement):
+        """
+        Method to run `statement` against test database.
+        """
+        connection = sqlite3.connect(self.database_file)
+        try:
+            return connection.execute(statement).fetchall()
+        finally:
+            connection.close()
+
+    def test_load_years_to_sqlite(self):
+        """
+        Test if visits and exploded diagnoses of every year are loaded and
+        indexed.
+        """
+        # Call to func :func:`load_years_to_sqlite`, twice to check reload
+        load_years_to_sqlite((2000, 2001), self.database_file)
+        year_wise_load_result = load_years_to_sqlite(
+            (2000, 2001, 2002), self.database_file
+        )
+
+        # Assert load result, missing year skipped
+        self.assertEqual({2000, 2001}, set(year_wise_load_result))
+        self.assertEqual(5, year_wise_load_result[2000]["visits"])
+
+        # Assert rows are replaced, not duplicated
+        self.assertEqual(
+            [(2000, 5), (2001, 5)],
+            self._query(
+                "SELECT year, COUNT(*) FROM visits GROUP BY year"
+            )
+        )
+
+        # Assert visits match translated records
+        records = list(get_generator_by_year(2000))
+        self.assertEqual(
+            [
+                (
+                    record["source_file_row"], record["sex"],
+                    record["month_of_visit"], record["age"],
+                    record["patient_visit_weight"]
+                )
+                for record in records
+            ],
+            self._query(
+                "SELECT source_file_row, sex, month_of_visit, age, "
+                "patient_visit_weight FROM visits WHERE year = 2000 "
+                "ORDER BY visit_id"
+            )
+        )
+        self.assertEqual(
+            [
+                (record["source_file_row"], position, diagnosis)
+                for record in records
+                for position, diagnosis in enumerate(
+                    record["physician_diagnoses"], 1
+                )
+            ],
+            self._query(
+                "SELECT source_file_row, position, diagnosis FROM visits "
+                "JOIN visit_diagnosis USING (visit_id, year) "
+                "WHERE year = 2000 ORDER BY visit_id, position"
+            )
+        )
+
+        # Assert indexes are built
+        self.assertEqual(
+            {
+                "idx_visits_year",
+                "idx_visits_month_of_visit",
+                "idx_visits_sex",
+                "idx_visit_diagnosis_diagnosis",
+                "idx_visit_diagnosis_visit_id",
+            },
+            {
+                name for name, in self._query(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                )
+            }
+        )
+
+    def test_export_to_sqlite_keeps_indexes(self):
+        """
+        Test if indexes are kept when a single year is appended, and dropped
+        and built once when years are bulk loaded.
+        """
+        statements = []
+
+        def connect_for_bulk_load(database_file):
+            connection = sqlite3.connect(database_file, isolation_level=None)
+            connection.set_trace_callback(statements.append)
+            for statement in namcs_sqlite.CREATE_TABLE_STATEMENTS:
+                connection.execute(statement)
+            return connection
+
+        with mock.patch.object(
+                namcs_sqlite, "connect_for_bulk_load",
+                side_effect=connect_for_bulk_load
+        ):
+            # Call to func :func:`export_to_sqlite`, on new database
+            export_to_sqlite(
+                2000, get_generator_by_year(2000), self.database_file
+            )
+            export_to_sqlite(
+                2001, get_generator_by_year(2001), self.database_file
+            )
+
+            # Assert indexes are created and never dropped or rebuilt
+            self.assertEqual(
+                [(5,)],
+                self._query(
+                    "SELECT COUNT(*) FROM sqlite_master WHERE type = 'index'"
+                )
+            )
+            self.assertFalse([
+                statement for statement in statements
+                if statement.startswith(("DROP INDEX", "ANALYZE"))
+            ])
+            self.assertEqual(
+                [(2000, 5), (2001, 5)],
+                self._query(
+                    "SELECT year, COUNT(*) FROM visits GROUP BY year"
+                )
+            )
+
+            # Call to func :func:`load_years_to_sqlite`
+            del statements[:]
+            load_years_to_sqlite((2000, 2001), self.database_file)
+
+        # Assert indexes are dropped for every year and analyzed once
+        self.assertEqual(10, sum(
+            statement.startswith("DROP INDEX") for statement in statements
+        ))
+        self.assertEqual(["ANALYZE"], [
+            statement for statement in statements
+            if statement.startswith("ANALYZE")
+        ])
+
+    def test_failed_load_is_rolled_back(self):
+        """
+        Test if previously loaded year is kept when load fails.
+        """
+        # Setup
+        export_to_sqlite(
+            2000, get_generator_by_year(2000), self.database_file
+        )
+
+        with mock.patch.object(
+                SqliteSink, "write", side_effect=RuntimeError("decoder failed")
+        ):
+            # Assert :class:`RuntimeError`
+            with self.assertRaises(RuntimeError):
+                export_to_sqlite(
+                    2000, get_generator_by_year(2000), self.database_file
+                )
+
+        # Assert rows and indexes of previous load
+        self.assertEqual(
+            [(5,)], self._query("SELECT COUNT(*) FROM visits")
+        )
+        self.assertEqual(
+            [(5,)],
+            self._query(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'index'"
+            )
+        )
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for module `namcs_topk`.
+"""
+# Python modules
+from collections import Counter
+from unittest import TestCase
+import os
+import random
+
+# Third party modules
+# -N/A
+
+# Other modules
+from hdx_ahcd.controllers.namcs_converter import get_year_wise_generator
+from hdx_ahcd.controllers.namcs_estimates import estimate
+from hdx_ahcd.controllers.namcs_sinks import fan_out
+from hdx_ahcd.controllers.namcs_topk import (
+    get_top_diagnoses,
+    get_top_diagnoses_by_year,
+    SpaceSavingCounter,
+    TopDiagnosesSink,
+)
+from hdx_ahcd.helpers import functions
+
+
+class NAMCSTopKTest(TestCase):
+    """
+    TestCase class for streaming top diagnoses.
+    """
+    def setUp(self):
+        """
+        Override of :func:`setUp` implementation
+        """
+        # Patch `EXTRACTED_DATA_DIR_PATH` to `test/data` directory
+        functions.EXTRACTED_DATA_DIR_PATH = \
+            os.path.join(os.path.dirname(__file__), "data")
+
+    def test_space_saving_counter(self):
+        """
+        Test if counts are exact without capacity, and bounded by error
+        with capacity.
+        """
+        # Setup
+        items = ["a"] * 300 + ["b"] * 200 + ["c"] * 100 + \
+            ["item_{}".format(n % 150) for n in range(600)]
+        random.Random(7).shuffle(items)
+        exact_counts = Counter(items)
+
+        # Case 1: Exact counts
+        counter = SpaceSavingCounter()
+        for item in items:
+            counter.add(item)
+        self.assertEqual(
+            [("a", 300, 0), ("b", 200, 0), ("c", 100, 0), ("item_0", 4, 0)],
+            counter.get_top(4)
+        )
+
+        # Case 2: Bounded counts, heavy hitters are reported
+        counter = SpaceSavingCounter(capacity=20)
+        for item in items:
+            counter.add(item, 0.5)
+        self.assertEqual(20, len(counter))
+        self.assertEqual(600.0, counter.total)
+        top_items = counter.get_top(3)
+        self.assertEqual(["a", "b", "c"], [item for item, _, _ in top_items])
+        for item, count, error in counter.get_top(20):
+            self.assertLessEqual(error, counter.total / 20)
+            self.assertLessEqual(count - error, exact_counts[item] * 0.5)
+            self.assertGreaterEqual(count, exact_counts[item] * 0.5)
+
+        with self.assertRaises(ValueError):
+            SpaceSavingCounter(capacity=0)
+
+    def test_top_diagnoses_sink(self):
+        """
+        Test if visit is counted once for a diagnosis in multiple slots.
+        """
+        # Setup
+        translated_records = [
+            {"physician_diagnoses": ["401.9", "401.9", "250.00"],
+             "patient_visit_weight": 10.0},
+            {"physician_diagnoses": ["250.00", "", ""],
+             "patient_visit_weight": 20.0},
+            {"physician_diagnoses": ["V70.0"],
+             "patient_visit_weight": 5.0},
+        ]
+
+        # Call to func :func:`fan_out`
+        top_diagnoses, = fan_out(
+            2000, iter(translated_records), [TopDiagnosesSink(k=2)]
+        )
+
+        # Assert top diagnoses
+        self.assertEqual(
+            [("250.00", 30.0, 0), ("401.9", 10.0, 0)], top_diagnoses
+        )
+
+        # Invalid options
+        with self.assertRaises(ValueError):
+            TopDiagnosesSink(k=0)
+        with self.assertRaises(ValueError):
+            TopDiagnosesSink(k=10, capacity=5)
+        with self.assertRaises(ValueError):
+            TopDiagnosesSink(measure="patients")
+
+    def test_get_top_diagnoses_by_year(self):
+        """
+        Test if top diagnoses of every year are same as estimates.
+        """
+        # Call to func :func:`get_top_diagnoses_by_year`
+        top_diagnoses = get_top_diagnoses_by_year((2000, 2001), k=2)
+
+        # Assert top diagnoses
+        self.assertEqual(
+            [("V70.00", 260370.0, 0), ("V20.20", 86790.0, 0)],
+            top_diagnoses[2000]
+        )
+        estimates = estimate(2001, group_by="dx")
+        self.assertEqual(
+            sorted(estimates)[:2],
+            [(diagnosis,) for diagnosis, _, _ in top_diagnoses[2001]]
+        )
+        self.assertEqual(
+            [3, 1, 1],
+            [count for _, count, _ in get_top_diagnoses_by_year(
+                2000, k=5, measure="records"
+            )[2000]]
+        )
+
+    def test_get_top_diagnoses(self):
+        """
+        Test if top diagnoses of a window of years are summed across years,
+        exactly or within bounded memory.
+        """
+        # Case 1: Exact
+        exact_top_diagnoses = get_top_diagnoses((2000, 2001), k=3)
+        self.assertEqual(
+            [("V20.20", 86790.0, 0), ("V67.59", 86790.0, 0),
+             ("V70.00", 260370.0, 0)],
+            sorted(exact_top_diagnoses)
+        )
+
+        # Case 2: Bounded memory, heavy hitter is reported exactly
+        top_diagnoses = get_top_diagnoses((2000, 2001), k=3, capacity=4)
+        self.assertEqual(("V70.00", 260370.0, 0), top_diagnoses[0])
+        self.assertEqual(3, len(top_diagnoses))
+
+    def test_top_diagnoses_sink_with_year_wise_generator(self):
+        """
+        Test if top diagnoses are computed along with conversion.
+        """
+        year_wise_translated_data = get_year_wise_generator(
+            2000, sinks=[TopDiagnosesSink(k=1)]
+        )
+        self.assertEqual(
+            [("V70.00", 260370.0, 0)],
+            year_wise_translated_data[2000]["sinks"]["top_diagnoses"]
+        )